@@ -0,0 +1,365 @@
+"""Vectorized wait and service time analytics of the service turns
+
+The durations of the turns of a range are read without the ORM in large
+keyset batches of plain numbers, the database computing the wait and
+service seconds and the hour of arrival, turned into one array per column
+and bucketed with NumPy into sparse
+log-scale sketches per service, location and hour. Sketch buckets are
+``ANALYTICS_RELATIVE_ACCURACY`` wide relative to their value, so
+percentiles keep that relative error at any volume while the memory only
+grows with the distinct buckets seen, and the sketches of successive
+batches merge by adding their counts.
+
+NumPy is listed in the requirements, the analytics are unavailable without it.
+"""
+
+import math
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from sqlalchemy import Integer, cast, func, literal_column, select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import ColumnElement, Select
+from . import archive
+from . import constants
+from .database import models as db_models
+from .enums import AnalyticsDimension
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# pylint: disable=E1102
+
+LOCATION_SPAN = 1 << 20
+HOUR_SPAN = 32
+BUCKET_SPAN = 1 << 10
+
+GAMMA = (1 + constants.ANALYTICS_RELATIVE_ACCURACY) / (1 - constants.ANALYTICS_RELATIVE_ACCURACY)
+LOG_GAMMA = math.log(GAMMA)
+
+SERVICE_COLUMN = 0
+LOCATION_COLUMN = 1
+HOUR_COLUMN = 2
+WAIT_COLUMN = 3
+SERVICE_TIME_COLUMN = 4
+ID_COLUMN = 5
+
+
+class AnalyticsQuery(NamedTuple):
+    """Range, grouping and filters of the turn analytics"""
+
+    start: datetime
+    end: datetime
+    group_by: List[AnalyticsDimension]
+    service_id: Optional[int] = None
+    location_id: Optional[int] = None
+    include_archived: bool = False
+
+
+class Distribution(NamedTuple):
+    """Percentiles and histogram of the durations of a group"""
+
+    count: int
+    percentiles: Dict[int, Optional[float]]
+    histogram: List[int]
+
+
+class AnalyticsRow(NamedTuple):
+    """Wait and service time distributions of a service, location and hour"""
+
+    service_id: Optional[int]
+    location_id: Optional[int]
+    hour: Optional[int]
+    wait: Distribution
+    service: Distribution
+
+
+def is_available() -> bool:
+    """Checks whether NumPy is installed
+
+    Returns:
+        bool: Whether the analytics can be computed
+    """
+    return np is not None
+
+
+def get_seconds_between(dialect: str, start: ColumnElement, end: ColumnElement) -> ColumnElement:
+    """Builds the seconds between two moments in the SQL of a dialect
+
+    Args:
+        dialect (str): Name of the database dialect
+        start (ColumnElement): Start moment
+        end (ColumnElement): End moment
+
+    Returns:
+        ColumnElement: Seconds, NULL when either moment is NULL
+    """
+    if dialect == "sqlite":
+        return (func.julianday(end) - func.julianday(start)) * 86400
+
+    return func.timestampdiff(literal_column("SECOND"), start, end)
+
+
+def get_hour(dialect: str, moment: ColumnElement) -> ColumnElement:
+    """Builds the hour of a moment in the SQL of a dialect
+
+    Args:
+        dialect (str): Name of the database dialect
+        moment (ColumnElement): Moment
+
+    Returns:
+        ColumnElement: Hour between 0 and 23
+    """
+    if dialect == "sqlite":
+        return cast(func.strftime("%H", moment), Integer)
+
+    return func.hour(moment)
+
+
+def select_turn_durations(
+    dialect: str, query: AnalyticsQuery, turn: type = db_models.ServiceTurn
+) -> Select:
+    """Builds the query of the durations of the turns created in a range
+
+    Args:
+        dialect (str): Name of the database dialect
+        query (AnalyticsQuery): Range and filters
+        turn (type): ServiceTurn or ArchivedServiceTurn
+
+    Returns:
+        Select: Selection of service, location (0 without appointment), hour
+        of creation, wait seconds, service seconds and id
+    """
+    statement = (
+        select(
+            turn.service_id,
+            func.coalesce(db_models.Appointment.location_id, 0),
+            get_hour(dialect, turn.created),
+            get_seconds_between(dialect, turn.created, turn.service_started),
+            get_seconds_between(dialect, turn.service_started, turn.service_ended),
+            turn.id,
+        )
+        .outerjoin(db_models.Appointment, db_models.Appointment.id == turn.appointment_id)
+        .where(turn.created >= query.start)
+        .where(turn.created < query.end)
+    )
+
+    if query.service_id is not None:
+        statement = statement.where(turn.service_id == query.service_id)
+
+    if query.location_id is not None:
+        statement = statement.where(db_models.Appointment.location_id == query.location_id)
+
+    return statement
+
+
+def get_bucket_values(buckets: "np.ndarray") -> "np.ndarray":
+    """Gets the value each sketch bucket stands for
+
+    Args:
+        buckets (np.ndarray): Sketch buckets
+
+    Returns:
+        np.ndarray: Seconds, the middle of each bucket in relative terms
+    """
+    return np.where(buckets > 0, 2 * np.power(GAMMA, buckets - 1.0) / (GAMMA + 1), 0.0)
+
+
+class DurationSketch:
+    """Sparse log-scale histograms of durations by group
+
+    Groups and buckets are packed into a single integer code, kept sorted
+    and unique together with the durations counted in each one. The counts
+    of new batches wait apart until they outgrow the merged ones, so every
+    duration is merged a logarithmic number of times.
+    """
+
+    def __init__(self) -> None:
+        self.codes = np.empty(0, dtype=np.int64)
+        self.counts = np.empty(0, dtype=np.int64)
+        self.pending: List[Tuple["np.ndarray", "np.ndarray"]] = []
+        self.pending_size = 0
+
+    def add(self, groups: "np.ndarray", seconds: "np.ndarray") -> None:
+        """Counts a batch of durations, skipping the missing ones
+
+        Args:
+            groups (np.ndarray): Packed group of each duration
+            seconds (np.ndarray): Durations in seconds, NaN when missing
+        """
+        present = ~np.isnan(seconds)
+        seconds = seconds[present]
+        buckets = np.zeros(seconds.shape, dtype=np.int64)
+        positive = seconds >= 1
+        buckets[positive] = np.minimum(
+            1 + np.ceil(np.log(seconds[positive]) / LOG_GAMMA), BUCKET_SPAN - 1
+        )
+        codes, counts = np.unique(groups[present] * BUCKET_SPAN + buckets, return_counts=True)
+        self.pending.append((codes, counts))
+        self.pending_size += len(codes)
+
+        if self.pending_size > len(self.codes):
+            self.compact()
+
+    def compact(self) -> None:
+        """Merges the pending counts into the sorted ones"""
+        if not self.pending:
+            return
+
+        codes = np.concatenate([self.codes, *(codes for codes, _ in self.pending)])
+        counts = np.concatenate([self.counts, *(counts for _, counts in self.pending)])
+        order = np.argsort(codes, kind="stable")
+        codes = codes[order]
+        starts = np.flatnonzero(np.diff(codes, prepend=-1))
+        self.codes = codes[starts]
+        self.counts = np.add.reduceat(counts[order], starts)
+        self.pending = []
+        self.pending_size = 0
+
+    def summarize(self, percentiles: Tuple[int, ...]) -> Dict[int, Distribution]:
+        """Computes the percentiles and the histogram of every group
+
+        Args:
+            percentiles (Tuple[int, ...]): Percentiles between 0 and 100
+
+        Returns:
+            Dict[int, Distribution]: Distribution by packed group
+        """
+        self.compact()
+        groups, starts = np.unique(self.codes // BUCKET_SPAN, return_index=True)
+
+        if groups.size == 0:
+            return {}
+
+        cumulative = np.cumsum(self.counts)
+        totals = np.add.reduceat(self.counts, starts)
+        offsets = cumulative[starts] - self.counts[starts]
+        values = get_bucket_values(self.codes % BUCKET_SPAN)
+        estimates = {
+            percentile: values[
+                np.searchsorted(cumulative, offsets + (totals - 1) * percentile / 100, "right")
+            ]
+            for percentile in percentiles
+        }
+        buckets = len(constants.ROLLUP_DURATION_BUCKETS) + 1
+        histograms = np.bincount(
+            np.repeat(np.arange(len(groups)), np.diff(np.append(starts, len(self.codes))))
+            * buckets
+            + np.searchsorted(constants.ROLLUP_DURATION_BUCKETS, values),
+            weights=self.counts,
+            minlength=len(groups) * buckets,
+        ).reshape(len(groups), buckets)
+        return {
+            int(group): Distribution(
+                int(totals[index]),
+                {
+                    percentile: round(float(estimates[percentile][index]), 1)
+                    for percentile in percentiles
+                },
+                histograms[index].astype(np.int64).tolist(),
+            )
+            for index, group in enumerate(groups)
+        }
+
+
+def pack_groups(columns: "np.ndarray", group_by: List[AnalyticsDimension]) -> "np.ndarray":
+    """Packs the service, location and hour kept apart into one integer
+
+    Args:
+        columns (np.ndarray): Columns of durations
+        group_by (List[AnalyticsDimension]): Dimensions to keep apart
+
+    Returns:
+        np.ndarray: Packed group of each row
+    """
+    groups = np.zeros(columns.shape[1], dtype=np.int64)
+
+    for dimension, column, span in (
+        (AnalyticsDimension.SERVICE, SERVICE_COLUMN, LOCATION_SPAN * HOUR_SPAN),
+        (AnalyticsDimension.LOCATION, LOCATION_COLUMN, HOUR_SPAN),
+        (AnalyticsDimension.HOUR, HOUR_COLUMN, 1),
+    ):
+        if dimension in group_by:
+            groups += columns[column].astype(np.int64) * span
+
+    return groups
+
+
+def unpack_group(
+    group: int, group_by: List[AnalyticsDimension]
+) -> Tuple[Optional[int], Optional[int], Optional[int]]:
+    """Unpacks the service, location and hour of a packed group
+
+    Args:
+        group (int): Packed group
+        group_by (List[AnalyticsDimension]): Dimensions kept apart
+
+    Returns:
+        Tuple[Optional[int], Optional[int], Optional[int]]: Service, location
+        and hour, None when not kept apart or for turns without location
+    """
+    service_id = group // (LOCATION_SPAN * HOUR_SPAN)
+    location_id = group // HOUR_SPAN % LOCATION_SPAN
+    return (
+        service_id if AnalyticsDimension.SERVICE in group_by else None,
+        (location_id or None) if AnalyticsDimension.LOCATION in group_by else None,
+        group % HOUR_SPAN if AnalyticsDimension.HOUR in group_by else None,
+    )
+
+
+def get_turn_analytics(session: Session, query: AnalyticsQuery) -> List[AnalyticsRow]:
+    """Computes the wait and service time distributions of the turns of a range
+
+    Each table is read in batches following the id of the last turn read, so
+    the database driver never buffers more than a batch.
+
+    Args:
+        session (Session): Database session
+        query (AnalyticsQuery): Range, grouping and filters
+
+    Returns:
+        List[AnalyticsRow]: Distributions by service, location and hour, in order
+    """
+    dialect = session.get_bind().dialect.name
+    wait = DurationSketch()
+    service = DurationSketch()
+    turn_models = archive.TURN_MODELS if query.include_archived else archive.TURN_MODELS[:1]
+
+    for model in turn_models:
+        statement = (
+            select_turn_durations(dialect, query, model)
+            .order_by(model.id)
+            .limit(constants.ANALYTICS_BATCH_SIZE)
+        )
+        last_id = 0
+
+        while True:
+            rows = session.connection().execute(statement.where(model.id > last_id)).all()
+
+            if rows:
+                columns = np.array(list(zip(*rows)), dtype=np.float64)
+                groups = pack_groups(columns, query.group_by)
+                wait.add(groups, columns[WAIT_COLUMN])
+                service.add(groups, columns[SERVICE_TIME_COLUMN])
+
+            if len(rows) < constants.ANALYTICS_BATCH_SIZE:
+                break
+
+            last_id = rows[-1][ID_COLUMN]
+
+    waits = wait.summarize(constants.ANALYTICS_PERCENTILES)
+    services = service.summarize(constants.ANALYTICS_PERCENTILES)
+    empty = Distribution(
+        0,
+        {percentile: None for percentile in constants.ANALYTICS_PERCENTILES},
+        [0] * (len(constants.ROLLUP_DURATION_BUCKETS) + 1),
+    )
+    return [
+        AnalyticsRow(
+            *unpack_group(group, query.group_by),
+            waits.get(group, empty),
+            services.get(group, empty),
+        )
+        for group in sorted(waits.keys() | services.keys())
+    ]
@@ -0,0 +1,134 @@
+"""Turn analytics test cases
+"""
+
+import unittest
+from datetime import datetime, timedelta
+from . import analytics
+from . import constants
+from .database import memory
+from .database import models as db_models
+from .enums import AnalyticsDimension
+
+SERVICE_ID = 1
+OTHER_SERVICE_ID = 2
+HIGH_PRIORITY_ID = 1
+ATTENDED_STATUS_ID = 7
+START = datetime(2024, 1, 1)
+HISTOGRAM_SECONDS = (30, 0, 90, 90, 400)
+
+
+@unittest.skipUnless(analytics.is_available(), "NumPy is not installed")
+class DurationSketchTest(unittest.TestCase):
+    """Log-scale duration sketches test cases
+
+    Args:
+        unittest (unittest.TestCase): TestCase base class
+    """
+
+    def test_percentiles(self):
+        """Percentiles of batches merged over time keep the relative accuracy
+        """
+        np = analytics.np
+        seconds = np.random.default_rng(1).lognormal(6, 1, 20000) + 10
+        sketch = analytics.DurationSketch()
+
+        for batch in np.array_split(seconds, 7):
+            sketch.add(np.zeros(len(batch), dtype=np.int64), batch)
+
+        distribution = sketch.summarize(constants.ANALYTICS_PERCENTILES)[0]
+        ordered = np.sort(seconds)
+
+        self.assertEqual(distribution.count, len(seconds))
+
+        for percentile in constants.ANALYTICS_PERCENTILES:
+            expected = ordered[int((len(seconds) - 1) * percentile / 100)]
+
+            self.assertLess(
+                abs(distribution.percentiles[percentile] - expected) / expected,
+                constants.ANALYTICS_RELATIVE_ACCURACY + 0.001,
+            )
+
+    def test_histograms(self):
+        """Every group gets a histogram of the rollup buckets, without the missing durations
+        """
+        np = analytics.np
+        sketch = analytics.DurationSketch()
+        sketch.add(
+            np.array([1, 1, 1, 1, 1, 2]),
+            np.array([*HISTOGRAM_SECONDS, np.nan], dtype=np.float64),
+        )
+        sketch.add(np.array([2]), np.array([100000], dtype=np.float64))
+        distributions = sketch.summarize(constants.ANALYTICS_PERCENTILES)
+        buckets = len(constants.ROLLUP_DURATION_BUCKETS) + 1
+
+        self.assertEqual(sorted(distributions), [1, 2])
+        self.assertEqual(distributions[1].count, len(HISTOGRAM_SECONDS))
+        self.assertEqual(distributions[1].histogram, [2, 2, 0, 1] + [0] * (buckets - 4))
+        self.assertEqual(distributions[2].histogram, [0] * (buckets - 1) + [1])
+
+
+@unittest.skipUnless(analytics.is_available(), "NumPy is not installed")
+class TurnAnalyticsTest(unittest.TestCase):
+    """Turn analytics test cases over an in-memory database
+
+    Args:
+        unittest (unittest.TestCase): TestCase base class
+    """
+
+    def setUp(self):
+        self.session = memory.create_session()
+
+        for number, service_id, wait in (
+            (1, SERVICE_ID, 60),
+            (2, SERVICE_ID, 600),
+            (3, OTHER_SERVICE_ID, 120),
+        ):
+            created = START + timedelta(hours=number)
+            self.session.add(
+                db_models.ServiceTurn(
+                    ticket_number=f"S{service_id}-{number}",
+                    service_id=service_id,
+                    priority_id=HIGH_PRIORITY_ID,
+                    status_id=ATTENDED_STATUS_ID,
+                    created=created,
+                    service_started=created + timedelta(seconds=wait),
+                )
+            )
+
+        self.session.commit()
+
+    def tearDown(self):
+        self.session.close()
+
+    def test_group_by_service(self):
+        """Turns are grouped by service, the ones still being attended have no service time
+        """
+        rows = analytics.get_turn_analytics(
+            self.session,
+            analytics.AnalyticsQuery(
+                START, START + timedelta(days=1), [AnalyticsDimension.SERVICE]
+            ),
+        )
+
+        self.assertEqual([row.service_id for row in rows], [SERVICE_ID, OTHER_SERVICE_ID])
+        self.assertEqual([row.location_id for row in rows], [None, None])
+        self.assertEqual([row.wait.count for row in rows], [2, 1])
+        self.assertEqual([row.service.count for row in rows], [0, 0])
+        self.assertAlmostEqual(rows[1].wait.percentiles[50], 120, delta=1.5)
+        self.assertIsNone(rows[0].service.percentiles[50])
+
+    def test_group_by_hour(self):
+        """Groups unpack to the hour of creation alone when grouped by hour
+        """
+        rows = analytics.get_turn_analytics(
+            self.session,
+            analytics.AnalyticsQuery(
+                START, START + timedelta(days=1), [AnalyticsDimension.HOUR], SERVICE_ID
+            ),
+        )
+
+        self.assertEqual([(row.service_id, row.hour) for row in rows], [(None, 1), (None, 2)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,9 @@
 """Exceptions"""
 
+from typing import Any, Callable, Iterable, Iterator
 from fastapi import status, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
 from . import base_api_models
 from . import constants
 
@@ -86,3 +89,44 @@ def get_response_from_exception(exc: HTTPException) -> base_api_models.APIRespon
         type=exc.detail["type"],
         message=exc.detail["message"],
     )
+
+
+def iterate_json_array(
+    items: Iterable[Any], mapper: Callable[[Any], BaseModel]
+) -> Iterator[str]:
+    """Encodes the items as a JSON array one item at a time, keeping the
+    non-ASCII characters like the JSON responses
+
+    Args:
+        items (Iterable[Any]): Items to encode
+        mapper (Callable[[Any], BaseModel]): Maps each item to an API model
+
+    Yields:
+        str: Chunks of the JSON array
+    """
+    separator = "["
+
+    for item in items:
+        yield separator
+        yield mapper(item).json(ensure_ascii=False)
+        separator = ","
+
+    yield "[]" if separator == "[" else "]"
+
+
+def get_streaming_list_response(
+    items: Iterable[Any], mapper: Callable[[Any], BaseModel]
+) -> StreamingResponse:
+    """Gets a response streaming the items as a JSON array
+
+    Args:
+        items (Iterable[Any]): Items to return
+        mapper (Callable[[Any], BaseModel]): Maps each item to an API model
+
+    Returns:
+        StreamingResponse: JSON array response
+    """
+    return StreamingResponse(
+        iterate_json_array(items, mapper),
+        media_type=constants.JSON_MEDIA_TYPE,
+    )
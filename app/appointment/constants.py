@@ -9,3 +9,14 @@ DELETE_APPOINTMENT_BY_ID_OPERATION_ID = "deleteAppointmentById"
 ADD_APPOINTMENT_OPERATION_ID = "addAppointment"
 UPDATE_APPOINTMENT_OPERATION_ID = "updateAppointment"
 PATCH_APPOINTMENT_OPERATION_ID = "patchAppointment"
+EXPORT_APPOINTMENTS_OPERATION_ID = "exportAppointments"
+GET_APPOINTMENTS_BATCH_OPERATION_ID = "getAppointmentsBatch"
+GET_APPOINTMENT_AVAILABILITY_OPERATION_ID = "getAppointmentAvailability"
+GET_APPOINTMENTS_REPORT_OPERATION_ID = "getAppointmentsReport"
+
+# Internal routes paths
+BATCH_PATH = "/batch"
+AVAILABILITY_PATH = "/availability"
+REPORT_PATH = "/report"
+EXPORT_PATH = "/export"
+EXPORT_FILENAME = "appointments"
@@ -1,45 +1,92 @@
 """Appointment API handlers"""
 
+from datetime import date, datetime
+from typing import List, Optional, Tuple, Union
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from .. import base_api_models
+from .. import constants
 from .. import api_responses
+from .. import availability
+from .. import exceptions
 from ..database import models as db_models
+from ..database import loaders
 from .. import enums
 from .. import mappers
+from .. import exports
+from .. import rollups
+from ..fieldsets import FieldSet
+from .constants import EXPORT_FILENAME
 from . import models as appointment_api_models
 
 
 def get_appointments(
-    session: Session, offset: int, limit: int
-) -> appointment_api_models.AppointmentsListResponse:
+    session: Session,
+    offset: int,
+    limit: int,
+    fields: Optional[str] = None,
+    expand: Optional[str] = None,
+) -> Union[appointment_api_models.AppointmentsListResponse, JSONResponse]:
     """Get list of appointments
 
     Args:
         session (Session): Database session
         offset (int): The items to skip before collecting the result set.
         limit (int): The items to return.
+        fields (str, optional): Comma separated fields to return.
+        expand (str, optional): Comma separated relationships to embed.
 
     Returns:
         AppointmentsListResponse: List of appointments
     """
-    items = db_models.Appointment.find_paginated(session, limit, offset)
-    return list(map(mappers.map_appointment, items))
+    field_set = FieldSet(mappers.APPOINTMENT_RESOURCE, fields, expand)
+    items = db_models.Appointment.find_paginated(
+        session, limit, offset, options=field_set.get_loader_options()
+    )
+    return field_set.get_list_response(items)
+
+
+def get_appointments_batch(
+    session: Session, ids: List[int]
+) -> appointment_api_models.AppointmentsBatchResponse:
+    """Get info of several existing appointments by their Ids with a single query
+
+    Args:
+        session (Session): Database session
+        ids (List[int]): ids of the appointments
+
+    Returns:
+        AppointmentsBatchResponse: Result for each id, in the requested order
+    """
+    items = db_models.Appointment.find_by_ids(
+        session, ids, loaders.appointment_options()
+    )
+    return mappers.map_batch_items(ids, items, mappers.map_appointment)
 
 
 def get_appointment_by_id(
-    session: Session, appointment_id: int
-) -> base_api_models.Appointment:
+    session: Session,
+    appointment_id: int,
+    fields: Optional[str] = None,
+    expand: Optional[str] = None,
+) -> Union[base_api_models.Appointment, JSONResponse]:
     """Get info of an existing appointment by Id
 
     Args:
         session (Session): Database session
         appointment_id (int): id of the appointment
+        fields (str, optional): Comma separated fields to return.
+        expand (str, optional): Comma separated relationships to embed.
 
     Returns:
         Appointment: Appointment for id
     """
-    item = db_models.Appointment.find_by_id(session, appointment_id)
-    return mappers.map_appointment(item)
+    field_set = FieldSet(mappers.APPOINTMENT_RESOURCE, fields, expand)
+    item = db_models.Appointment.find_by_id(
+        session, appointment_id, field_set.get_loader_options()
+    )
+    return field_set.get_item_response(item)
 
 
 def delete_appointment_by_id(
@@ -55,6 +102,7 @@ def delete_appointment_by_id(
         APIResponse: The result of the deletion
     """
     db_models.Appointment.delete_by_id(session, appointment_id)
+    availability.index.release(appointment_id)
     return api_responses.ITEM_DELETED_RESPONSE
 
 
@@ -74,10 +122,53 @@ def add_appointment(
     db_models.Status.validate_status_type(
         session, payload.statusId, enums.StatusType.APPOINTMENT
     )
-    db_models.Appointment.create_from_data(session, payload.dict())
+    availability.create_appointment(
+        session,
+        payload.dict(),
+        availability.get_booking(
+            payload.serviceId, payload.locationId, payload.serviceEndingExpected
+        ),
+        payload.statusId,
+    )
     return api_responses.ITEM_ADDED_RESPONSE
 
 
+def get_updated_booking(
+    session: Session,
+    appointment_id: int,
+    payload: Union[
+        appointment_api_models.UpdateAppointmentPayload,
+        appointment_api_models.PatchAppointmentPayload,
+    ],
+) -> Tuple[Optional[availability.Booking], Optional[int]]:
+    """Gets the slots and status an appointment will have after an update,
+    recording the day it leaves for the rollups when it is rescheduled
+
+    Args:
+        session (Session): Database session
+        appointment_id (int): id of the appointment to update
+        payload (Union[UpdateAppointmentPayload, PatchAppointmentPayload]): Update
+
+    Returns:
+        Tuple[Optional[Booking], Optional[int]]: Slots and status of the appointment
+    """
+    item = db_models.Appointment.find_by_id(session, appointment_id)
+    booking = availability.get_booking(
+        payload.serviceId or item.service_id,
+        payload.locationId or item.location_id,
+        payload.serviceEndingExpected or item.service_ending_expected,
+    )
+
+    if payload.serviceEndingExpected is not None:
+        rollups.mark_changed(
+            session,
+            enums.StatusType.APPOINTMENT,
+            item.service_ending_expected or item.created,
+        )
+
+    return booking, payload.statusId or item.status_id
+
+
 def update_appointment(
     session: Session,
     appointment_id: int,
@@ -96,7 +187,12 @@ def update_appointment(
     db_models.Status.validate_status_type(
         session, payload.statusId, enums.StatusType.APPOINTMENT
     )
-    db_models.Appointment.update_by_id(session, appointment_id, payload.dict())
+    availability.update_appointment(
+        session,
+        appointment_id,
+        payload.dict(),
+        *get_updated_booking(session, appointment_id, payload),
+    )
     return api_responses.ITEM_UPDATED_RESPONSE
 
 
@@ -120,5 +216,126 @@ def partially_update_appointment(
             session, payload.statusId, enums.StatusType.APPOINTMENT
         )
 
-    db_models.Appointment.update_by_id(session, appointment_id, payload.dict())
+    availability.update_appointment(
+        session,
+        appointment_id,
+        payload.dict(),
+        *get_updated_booking(session, appointment_id, payload),
+    )
     return api_responses.ITEM_UPDATED_RESPONSE
+
+
+def get_appointment_availability(
+    session: Session,
+    start: date,
+    end: date,
+    service_id: Optional[int],
+    location_id: Optional[int],
+) -> JSONResponse:
+    """Gets the free appointment slots of services at locations
+
+    The slots are read from the in-memory availability index, only the
+    active services and locations are queried.
+
+    Args:
+        session (Session): Database session
+        start (date): Inclusive first day
+        end (date): Exclusive last day
+        service_id (int, optional): Only the slots of this service
+        location_id (int, optional): Only the slots at this location
+
+    Raises:
+        HTTPException: When the range is empty or too long
+
+    Returns:
+        JSONResponse: Free slots by day, service and location
+    """
+    if not 0 < (end - start).days <= constants.APPOINTMENT_AVAILABILITY_MAX_DAYS:
+        raise exceptions.INVALID_DATE_RANGE_ERROR
+
+    service_ids = (
+        [service_id]
+        if service_id is not None
+        else session.scalars(
+            select(db_models.Service.id)
+            .where(db_models.Service.is_active.is_(True))
+            .order_by(db_models.Service.id)
+        ).all()
+    )
+    location_ids = (
+        [location_id]
+        if location_id is not None
+        else session.scalars(
+            select(db_models.Location.id)
+            .where(db_models.Location.is_active.is_(True))
+            .order_by(db_models.Location.id)
+        ).all()
+    )
+    items = availability.index.get_free_slots(
+        session,
+        start,
+        end,
+        [(service, location) for service in service_ids for location in location_ids],
+    )
+    # Thousands of slots are returned, so they skip the response model validation
+    return JSONResponse(
+        content=[
+            {
+                "serviceId": item.service_id,
+                "locationId": item.location_id,
+                "date": item.day.isoformat(),
+                "freeSlots": [slot.isoformat() for slot in item.slots],
+            }
+            for item in items
+        ]
+    )
+
+
+def get_appointments_report(
+    session: Session, query: rollups.ReportQuery
+) -> appointment_api_models.AppointmentsReportResponse:
+    """Gets the statistics of the appointments from the daily rollups
+
+    Args:
+        session (Session): Database session
+        query (ReportQuery): Range, period, dimensions and filters
+
+    Returns:
+        AppointmentsReportResponse: Statistics by period and group
+    """
+    return [
+        mappers.map_stats_report_item(row) for row in rollups.get_report(session, query)
+    ]
+
+
+def export_appointments(
+    session: Session,
+    start: datetime,
+    end: datetime,
+    export_format: enums.ExportFormat,
+    compress: bool,
+) -> StreamingResponse:
+    """Exports the appointments created within a date range
+
+    Args:
+        session (Session): Database session
+        start (datetime): Inclusive start of the range
+        end (datetime): Exclusive end of the range
+        export_format (ExportFormat): Output format
+        compress (bool): Whether to gzip the content
+
+    Returns:
+        StreamingResponse: Streamed export
+    """
+    statement = (
+        select(*db_models.Appointment.__table__.columns)
+        .where(db_models.Appointment.created >= start)
+        .where(db_models.Appointment.created < end)
+    )
+    return exports.get_export_response(
+        session,
+        lambda after: exports.select_batch(statement, db_models.Appointment.id, after),
+        export_format,
+        compress,
+        EXPORT_FILENAME,
+    )
@@ -1,6 +1,8 @@
 """Appointment API models"""
 
+from datetime import date, datetime
 from typing import List, Optional
+from pydantic import BaseModel
 from .. import base_api_models
 
 
@@ -16,6 +18,7 @@ class CreateAppointmentPayload(base_api_models.AppointmentBasicData):
     locationId: int
     statusId: int
     serviceId: int
+    serviceEndingExpected: Optional[datetime] = None
 
 
 class UpdateAppointmentPayload(base_api_models.AppointmentBasicData):
@@ -30,6 +33,7 @@ class UpdateAppointmentPayload(base_api_models.AppointmentBasicData):
     locationId: int
     statusId: int
     serviceId: int
+    serviceEndingExpected: Optional[datetime] = None
 
 
 class PatchAppointmentPayload(base_api_models.AppointmentBasicData):
@@ -48,6 +52,23 @@ class PatchAppointmentPayload(base_api_models.AppointmentBasicData):
     locationId: Optional[int] = None
     statusId: Optional[int] = None
     serviceId: Optional[int] = None
+    serviceEndingExpected: Optional[datetime] = None
+
+
+class AppointmentAvailabilityItem(BaseModel):
+    """Free appointment slots of a service at a location on a day
+
+    Args:
+        BaseModel (class): Base model class
+    """
+
+    serviceId: int
+    locationId: int
+    date: date
+    freeSlots: List[datetime]
 
 
 AppointmentsListResponse = List[base_api_models.Appointment]
+AppointmentsBatchResponse = List[base_api_models.BatchItem[base_api_models.Appointment]]
+AppointmentAvailabilityResponse = List[AppointmentAvailabilityItem]
+AppointmentsReportResponse = List[base_api_models.StatsReportItem]
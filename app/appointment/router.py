@@ -1,11 +1,16 @@
 """Appointment API router"""
 
+from datetime import date, datetime
+from typing import List, Optional
 from fastapi import APIRouter, Depends, status, Query
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 from .. import api_responses
 from .. import base_api_models
 from .. import constants
 from .. import helpers
+from .. import rollups
+from ..enums import ExportFormat, StatusType
 from ..database import main
 from .constants import (
     TAGS,
@@ -15,6 +20,14 @@ from .constants import (
     GET_APPOINTMENT_BY_ID_OPERATION_ID,
     PATCH_APPOINTMENT_OPERATION_ID,
     UPDATE_APPOINTMENT_OPERATION_ID,
+    EXPORT_APPOINTMENTS_OPERATION_ID,
+    EXPORT_PATH,
+    GET_APPOINTMENTS_BATCH_OPERATION_ID,
+    GET_APPOINTMENT_AVAILABILITY_OPERATION_ID,
+    GET_APPOINTMENTS_REPORT_OPERATION_ID,
+    BATCH_PATH,
+    REPORT_PATH,
+    AVAILABILITY_PATH,
 )
 from . import handlers
 from . import models as appointment_api_models
@@ -37,12 +50,109 @@ router = APIRouter()
 def get_appointments(
     offset: int = Query(default=constants.DEFAULT_PAGE_OFFSET, ge=0),
     limit: int = Query(default=constants.DEFAULT_PAGE_LIMIT, ge=1),
+    fields: Optional[str] = None,
+    expand: Optional[str] = None,
     session: Session = Depends(main.get_session),
 ) -> appointment_api_models.AppointmentsListResponse:
     """
     Gets a list of appointments
     """
-    return handlers.get_appointments(session, offset, limit)
+    return handlers.get_appointments(session, offset, limit, fields, expand)
+
+
+@router.get(
+    EXPORT_PATH,
+    dependencies=[
+        Depends(helpers.validate_api_access),
+        Depends(helpers.validate_token(constants.READ_APPOINTMENTS_SCOPE)),
+    ],
+    tags=TAGS,
+    operation_id=EXPORT_APPOINTMENTS_OPERATION_ID,
+    response_class=StreamingResponse,
+    responses=api_responses.responses_descriptions,
+)
+def export_appointments(
+    start: datetime,
+    end: datetime,
+    export_format: ExportFormat = Query(default=ExportFormat.NDJSON, alias="format"),
+    compress: bool = Query(default=False, alias="gzip"),
+    session: Session = Depends(main.get_session),
+) -> StreamingResponse:
+    """
+    Exports the appointments created within a date range as NDJSON or CSV
+    """
+    return handlers.export_appointments(session, start, end, export_format, compress)
+
+
+@router.get(
+    REPORT_PATH,
+    dependencies=[
+        Depends(helpers.validate_api_access),
+        Depends(helpers.validate_token(constants.READ_APPOINTMENTS_SCOPE)),
+    ],
+    tags=TAGS,
+    operation_id=GET_APPOINTMENTS_REPORT_OPERATION_ID,
+    response_model=appointment_api_models.AppointmentsReportResponse,
+    responses=api_responses.responses_descriptions,
+)
+def get_appointments_report(
+    query: rollups.ReportQuery = Depends(helpers.get_report_query(StatusType.APPOINTMENT)),
+    session: Session = Depends(main.get_session),
+) -> appointment_api_models.AppointmentsReportResponse:
+    """
+    Gets the statistics of the appointments by day or month from the daily rollups,
+    optionally grouped by a comma separated list of service, location,
+    priority and status
+    """
+    return handlers.get_appointments_report(session, query)
+
+
+@router.get(
+    BATCH_PATH,
+    dependencies=[
+        Depends(helpers.validate_api_access),
+        Depends(helpers.validate_token(constants.READ_APPOINTMENTS_SCOPE)),
+    ],
+    tags=TAGS,
+    operation_id=GET_APPOINTMENTS_BATCH_OPERATION_ID,
+    response_model=appointment_api_models.AppointmentsBatchResponse,
+    responses=api_responses.responses_descriptions,
+)
+def get_appointments_batch(
+    ids: List[int] = Depends(helpers.get_batch_ids),
+    session: Session = Depends(main.get_session),
+) -> appointment_api_models.AppointmentsBatchResponse:
+    """
+    Get info of several existing appointments by a comma separated list of Ids
+    """
+    return handlers.get_appointments_batch(session, ids)
+
+
+@router.get(
+    AVAILABILITY_PATH,
+    dependencies=[
+        Depends(helpers.validate_api_access),
+        Depends(helpers.validate_token(constants.READ_APPOINTMENTS_SCOPE)),
+    ],
+    tags=TAGS,
+    operation_id=GET_APPOINTMENT_AVAILABILITY_OPERATION_ID,
+    response_model=appointment_api_models.AppointmentAvailabilityResponse,
+    responses=api_responses.responses_descriptions,
+)
+def get_appointment_availability(
+    start: date,
+    end: date,
+    service_id: Optional[int] = Query(default=None, alias="serviceId"),
+    location_id: Optional[int] = Query(default=None, alias="locationId"),
+    session: Session = Depends(main.get_session),
+) -> JSONResponse:
+    """
+    Gets the free appointment slots of the services at the locations,
+    from the start day to the day before the end
+    """
+    return handlers.get_appointment_availability(
+        session, start, end, service_id, location_id
+    )
 
 
 @router.get(
@@ -57,12 +167,15 @@ def get_appointments(
     responses=api_responses.responses_descriptions,
 )
 def get_appointment_by_id(
-    appointment_id: int, session: Session = Depends(main.get_session)
+    appointment_id: int,
+    fields: Optional[str] = None,
+    expand: Optional[str] = None,
+    session: Session = Depends(main.get_session),
 ) -> base_api_models.Appointment:
     """
     Get info of an existing appointment by Id
     """
-    return handlers.get_appointment_by_id(session, appointment_id)
+    return handlers.get_appointment_by_id(session, appointment_id, fields, expand)
 
 
 @router.post(
@@ -148,4 +261,4 @@ def delete_appointment_by_id(
     """
     Delete an existing appointment by Id
     """
-    return handlers.get_appointment_by_id(session, appointment_id)
+    return handlers.delete_appointment_by_id(session, appointment_id)
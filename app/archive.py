@@ -0,0 +1,278 @@
+"""Archiving of the service turns
+
+Turns in a terminal status left untouched for ``TURN_ARCHIVE_AFTER_DAYS``
+days are moved in batches from ``service_turns`` to
+``service_turns_archive``, so the live table only holds the turns of the
+last days and the ones still in progress, which is all the status board,
+the dispatching and the ticket numbering read. Services keep how many of
+their turns were archived so ticket numbers keep counting them.
+
+Reads only look into the archive when asked, through the helpers below,
+except the statistics, which always cover both tables.
+"""
+
+import itertools
+import time
+from datetime import date, datetime, time as day_time, timedelta
+from typing import Callable, Dict, Iterable, Iterator, List
+from sqlalchemy import delete, func, insert, or_, select, union_all, update
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import ColumnElement, Select
+from . import constants
+from .database import loaders
+from .database import models as db_models
+from .enums import StatusType
+
+# pylint: disable=E1102
+
+TURN_MODELS = (db_models.ServiceTurn, db_models.ArchivedServiceTurn)
+
+
+def union_turns(build: Callable[[type], Select], include_archived: bool = True) -> Select:
+    """Builds a query over the live turns and optionally the archived ones
+
+    Args:
+        build (Callable[[type], Select]): Builds the query of a turn model, with
+            its filters so that each table uses its own indexes
+        include_archived (bool): Whether to add the archived turns
+
+    Returns:
+        Select: Query of the live turns, or union of both tables
+    """
+    if not include_archived:
+        return build(db_models.ServiceTurn)
+
+    return union_all(*(build(model) for model in TURN_MODELS))
+
+
+def find_turn_by_id(
+    session: Session, turn_id: int, options: Iterable = ()
+) -> db_models.ServiceTurnMixin:
+    """Gets a live turn, or an archived one when it isn't live
+
+    Args:
+        session (Session): Database session
+        turn_id (int): ID of the turn
+        options (Iterable): Loader options of the live turn
+
+    Raises:
+        HTTPException: Not found error when the turn isn't in either table
+
+    Returns:
+        ServiceTurnMixin: The live or archived turn
+    """
+    item = db_models.ServiceTurn.find_by_ids(session, [turn_id], options).get(turn_id)
+
+    if item is None:
+        item = db_models.ArchivedServiceTurn.find_by_id(
+            session,
+            turn_id,
+            loaders.service_turn_options(db_models.ArchivedServiceTurn),
+        )
+
+    return item
+
+
+def find_turns_by_ids(
+    session: Session, turn_ids: List[int]
+) -> Dict[int, db_models.ServiceTurnMixin]:
+    """Gets the live turns of some ids, and the archived ones of the rest
+
+    Args:
+        session (Session): Database session
+        turn_ids (List[int]): IDs of the turns
+
+    Returns:
+        Dict[int, ServiceTurnMixin]: The matched turns by id
+    """
+    items = db_models.ServiceTurn.find_by_ids(
+        session, turn_ids, loaders.service_turn_options()
+    )
+    missing = [turn_id for turn_id in turn_ids if turn_id not in items]
+
+    if missing:
+        items.update(
+            db_models.ArchivedServiceTurn.find_by_ids(
+                session,
+                missing,
+                loaders.service_turn_options(db_models.ArchivedServiceTurn),
+            )
+        )
+
+    return items
+
+
+def find_paginated_turns(
+    session: Session, limit: int, offset: int, options: Iterable = ()
+) -> List[db_models.ServiceTurnMixin]:
+    """Gets a page of the live and archived turns by id
+
+    Args:
+        session (Session): Database session
+        limit (int): total number of items to be returned
+        offset (int): starting offset position
+        options (Iterable): Loader options of the live turns
+
+    Returns:
+        List[ServiceTurnMixin]: The live and archived turns of the page
+    """
+    turn_ids = session.scalars(
+        union_turns(lambda model: select(model.id))
+        .order_by(db_models.ServiceTurn.id.name)
+        .limit(limit)
+        .offset(offset)
+    ).all()
+    items = db_models.ServiceTurn.find_by_ids(session, turn_ids, options)
+    items.update(
+        db_models.ArchivedServiceTurn.find_by_ids(
+            session,
+            [turn_id for turn_id in turn_ids if turn_id not in items],
+            loaders.service_turn_options(db_models.ArchivedServiceTurn),
+        )
+    )
+    return [items[turn_id] for turn_id in turn_ids if turn_id in items]
+
+
+def find_streamed_turns(
+    session: Session, condition: Callable[[type], ColumnElement]
+) -> Iterator[db_models.ServiceTurnMixin]:
+    """Streams the live turns matching a condition, then the archived ones
+
+    Args:
+        session (Session): Database session
+        condition (Callable[[type], ColumnElement]): Builds the condition of a
+            turn model
+
+    Returns:
+        Iterator[ServiceTurnMixin]: The matched turns
+    """
+    return itertools.chain.from_iterable(
+        model.find_streamed(
+            session,
+            lambda x, model=model: x.where(condition(model)),
+            loaders.service_turn_options(model),
+        )
+        for model in TURN_MODELS
+    )
+
+
+def archive_batch(
+    session: Session, status_ids: List[int], cutoff: datetime, batch_size: int
+) -> int:
+    """Moves a batch of old turns to the archive in a single transaction,
+    stamping the turns never modified as last modified when created
+
+    Args:
+        session (Session): Database session
+        status_ids (List[int]): IDs of the terminal statuses
+        cutoff (datetime): Turns created and last modified before it are moved
+        batch_size (int): Maximum number of turns moved
+
+    Returns:
+        int: Turns moved
+    """
+    turn = db_models.ServiceTurn
+    turn_ids = session.scalars(
+        select(turn.id)
+        .where(turn.status_id.in_(status_ids))
+        .where(turn.created < cutoff)
+        .where(or_(turn.last_modified.is_(None), turn.last_modified < cutoff))
+        .order_by(turn.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).all()
+
+    if not turn_ids:
+        session.rollback()
+        return 0
+
+    columns = list(turn.__table__.columns)
+    session.execute(
+        insert(db_models.ArchivedServiceTurn).from_select(
+            [column.name for column in columns],
+            select(
+                *(
+                    func.coalesce(column, turn.created)
+                    if column.name == turn.last_modified.name
+                    else column
+                    for column in columns
+                )
+            ).where(turn.id.in_(turn_ids)),
+        )
+    )
+
+    for service_id, count in session.execute(
+        select(turn.service_id, func.count())
+        .where(turn.id.in_(turn_ids))
+        .group_by(turn.service_id)
+    ).all():
+        session.execute(
+            update(db_models.Service)
+            .where(db_models.Service.id == service_id)
+            .values(
+                archived_turns=func.coalesce(db_models.Service.archived_turns, 0) + count
+            )
+        )
+
+    session.execute(delete(turn).where(turn.id.in_(turn_ids)))
+    session.commit()
+    return len(turn_ids)
+
+
+def archive_turns(
+    session: Session,
+    days: int = constants.TURN_ARCHIVE_AFTER_DAYS,
+    batch_size: int = constants.TURN_ARCHIVE_BATCH_SIZE,
+) -> int:
+    """Moves the turns in a terminal status untouched for some days to the archive
+
+    Every batch is committed on its own, so an interrupted run loses
+    nothing and the live table is never locked for long.
+
+    Args:
+        session (Session): Database session
+        days (int): Full days the turns must have been left untouched
+        batch_size (int): Turns moved per transaction
+
+    Returns:
+        int: Turns moved
+    """
+    status_ids = session.scalars(
+        select(db_models.Status.id)
+        .where(db_models.Status.type == StatusType.TURN)
+        .where(db_models.Status.code.in_(constants.ARCHIVED_TURN_STATUSES))
+    ).all()
+    cutoff = datetime.combine(date.today() - timedelta(days=days), day_time.min)
+    moved = 0
+
+    try:
+        while True:
+            count = archive_batch(session, status_ids, cutoff, batch_size)
+            moved += count
+
+            if count < batch_size:
+                return moved
+    except:
+        session.rollback()
+        raise
+
+
+def run(
+    session: Session,
+    days: int = constants.TURN_ARCHIVE_AFTER_DAYS,
+    batch_size: int = constants.TURN_ARCHIVE_BATCH_SIZE,
+) -> int:
+    """Archives the old turns
+
+    Args:
+        session (Session): Database session
+        days (int): Full days the turns must have been left untouched
+        batch_size (int): Turns moved per transaction
+
+    Returns:
+        int: Turns moved
+    """
+    started = time.perf_counter()
+    moved = archive_turns(session, days, batch_size)
+    print(f"Archived {moved} service turns in {time.perf_counter() - started:.2f} s")
+    return moved
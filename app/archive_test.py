@@ -0,0 +1,103 @@
+"""Service turns archiving test cases
+"""
+
+import unittest
+from datetime import datetime, timedelta
+from sqlalchemy import select
+from . import archive
+from .database import memory
+from .database import models as db_models
+from .service import service
+
+SERVICE_ID = 1
+PREFIX = "DS-SA"
+HIGH_PRIORITY_ID = 1
+PENDING_STATUS_ID = 5
+ATTENDED_STATUS_ID = 7
+
+
+class ArchiveTest(unittest.TestCase):
+    """Archiving test cases over an in-memory database
+
+    Args:
+        unittest (unittest.TestCase): TestCase base class
+    """
+
+    def setUp(self):
+        self.session = memory.create_session()
+        old = datetime.now() - timedelta(days=3)
+
+        for number, status_id, moment in (
+            (1, ATTENDED_STATUS_ID, old),
+            (2, ATTENDED_STATUS_ID, old),
+            (3, PENDING_STATUS_ID, old),
+            (4, ATTENDED_STATUS_ID, old),
+            (5, ATTENDED_STATUS_ID, datetime.now()),
+        ):
+            self.session.add(
+                db_models.ServiceTurn(
+                    ticket_number=f"{PREFIX}-{number}",
+                    service_id=SERVICE_ID,
+                    priority_id=HIGH_PRIORITY_ID,
+                    status_id=status_id,
+                    created=moment,
+                    last_modified=moment,
+                )
+            )
+
+        self.session.commit()
+
+    def tearDown(self):
+        self.session.close()
+
+    def get_tickets(self, model: type) -> list:
+        """Gets the ticket numbers of the test service in a turns table
+
+        Args:
+            model (type): Live or archived turn model
+
+        Returns:
+            list: Ticket numbers in order
+        """
+        return sorted(
+            self.session.scalars(
+                select(model.ticket_number).where(model.service_id == SERVICE_ID)
+            ).all()
+        )
+
+    def get_turns_count(self) -> int:
+        """Gets the count of turns of the test service its ticket numbers go on from
+
+        Returns:
+            int: Live and archived turns
+        """
+        archived = self.session.scalar(
+            select(db_models.Service.archived_turns).where(db_models.Service.id == SERVICE_ID)
+        )
+        return service.get_total_turns_for_service_id(self.session, SERVICE_ID) + archived
+
+    def test_archive_turns(self):
+        """Only the old turns in a terminal status are moved, in batches
+        """
+        archive.archive_turns(self.session, 1, 2)
+
+        self.assertEqual(self.get_tickets(db_models.ServiceTurn), [f"{PREFIX}-3", f"{PREFIX}-5"])
+        self.assertEqual(
+            self.get_tickets(db_models.ArchivedServiceTurn),
+            [f"{PREFIX}-1", f"{PREFIX}-2", f"{PREFIX}-4"],
+        )
+
+    def test_ticket_numbers(self):
+        """The count ticket numbers go on from is the same before and after archiving
+        """
+        self.assertEqual(self.get_turns_count(), 5)
+
+        archive.archive_turns(self.session, 1, 2)
+
+        self.assertEqual(self.get_turns_count(), 5)
+        self.assertEqual(archive.archive_turns(self.session, 1, 2), 0)
+        self.assertEqual(self.get_turns_count(), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+"""Service turns archiving entry point"""
+
+import argparse
+import sys
+import os
+
+# pylint: disable=C0413
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(SCRIPT_DIR))
+
+from app import archive, constants
+from app.database.main import get_session
+
+parser = argparse.ArgumentParser(
+    description="Moves the service turns in a terminal status to the archive"
+)
+parser.add_argument(
+    "--days",
+    type=int,
+    default=constants.TURN_ARCHIVE_AFTER_DAYS,
+    help="Full days the turns must have been left untouched",
+)
+parser.add_argument(
+    "--batch-size",
+    type=int,
+    default=constants.TURN_ARCHIVE_BATCH_SIZE,
+    help="Turns moved per transaction",
+)
+args = parser.parse_args()
+
+session = next(get_session())
+
+try:
+    archive.run(session, args.days, args.batch_size)
+finally:
+    session.close()
@@ -3,6 +3,7 @@
 import requests
 from .. import environment
 from .. import constants
+from .. import metrics
 
 
 common_headers = {
@@ -16,6 +17,7 @@ common_payload = {
 }
 
 
+@metrics.timed_iam_call("validate_token")
 def validate_token(
     application: str, authorization: str, expected_scope: str
 ) -> requests.Response:
@@ -42,6 +44,7 @@ def validate_token(
     return requests.post(url, headers=headers, json=payload, timeout=constants.TIMEOUT)
 
 
+@metrics.timed_iam_call("get_user_basic_data")
 def get_user_basic_data(application: str, authorization: str) -> requests.Response:
     """Gets the user basic for the authorization
 
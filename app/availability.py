@@ -0,0 +1,518 @@
+"""In-memory index of the booked appointment slots
+
+Every worker keeps, for each service, location and day, a bitmap of the
+``APPOINTMENT_SLOT_MINUTES`` slots taken by appointments, so checking a
+booking against the others is a couple of integer operations and the
+free slots of a week are read without querying the appointments. An
+appointment starts at its ``service_ending_expected``, the date chosen when
+booking it, and lasts one slot. Only the appointments from the day the
+index was built on are held: earlier days are history and aren't checked.
+Appointments created by other workers are picked up by id every
+``APPOINTMENT_INDEX_SYNC_INTERVAL`` seconds and the whole index is rebuilt
+every ``APPOINTMENT_INDEX_REBUILD_INTERVAL`` seconds.
+
+The index is only a fast pre-check: the transaction writing an appointment
+locks its service row and checks the slots against the database again, so
+workers holding stale indexes can't book the same slot twice.
+"""
+
+import threading
+import time
+from datetime import date, datetime, time as day_time, timedelta
+from typing import Dict, Hashable, List, NamedTuple, Optional, Set, Tuple
+from sqlalchemy import func, inspect, or_, select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+from . import constants
+from . import exceptions
+from .database import models as db_models
+from .enums import StatusType
+
+# pylint: disable=C0121
+# pylint: disable=E1102
+# pylint: disable=R0902
+
+MINUTES_PER_DAY = 24 * 60
+SLOTS_PER_DAY = MINUTES_PER_DAY // constants.APPOINTMENT_SLOT_MINUTES
+SLOT_OFFSETS = [
+    timedelta(minutes=slot * constants.APPOINTMENT_SLOT_MINUTES)
+    for slot in range(SLOTS_PER_DAY)
+]
+
+BookingKey = Tuple[int, int, date]
+
+
+class Booking(NamedTuple):
+    """Slots of a day taken by an appointment"""
+
+    key: BookingKey
+    mask: int
+
+
+class FreeSlots(NamedTuple):
+    """Free slots of a service at a location on a day"""
+
+    service_id: int
+    location_id: int
+    day: date
+    slots: List[datetime]
+
+
+def get_booking(
+    service_id: Optional[int], location_id: Optional[int], start: Optional[datetime]
+) -> Optional[Booking]:
+    """Gets the slots an appointment takes
+
+    Args:
+        service_id (int, optional): ID of the service
+        location_id (int, optional): ID of the location
+        start (datetime, optional): Start of the appointment
+
+    Returns:
+        Booking: Taken slots, None when the appointment isn't scheduled
+    """
+    if service_id is None or location_id is None or start is None:
+        return None
+
+    slot_seconds = constants.APPOINTMENT_SLOT_MINUTES * 60
+    second = start.hour * 3600 + start.minute * 60 + start.second
+    first = second // slot_seconds
+    last = min(-(-(second + slot_seconds) // slot_seconds), SLOTS_PER_DAY)
+    mask = ((1 << (last - first)) - 1) << first
+    return Booking((service_id, location_id, start.date()), mask)
+
+
+def get_opening_mask() -> int:
+    """Gets the slots of a day within the opening hours
+
+    Returns:
+        int: Bitmap of the bookable slots
+    """
+    first = constants.APPOINTMENT_OPENING_HOUR * 60 // constants.APPOINTMENT_SLOT_MINUTES
+    last = constants.APPOINTMENT_CLOSING_HOUR * 60 // constants.APPOINTMENT_SLOT_MINUTES
+    return ((1 << (last - first)) - 1) << first
+
+
+def get_slot_starts(day: date, mask: int) -> List[datetime]:
+    """Gets the start of every slot of a bitmap
+
+    Args:
+        day (date): Day of the bitmap
+        mask (int): Bitmap of slots
+
+    Returns:
+        List[datetime]: Slot starts in order
+    """
+    midnight = datetime.combine(day, day_time.min)
+    return [
+        midnight + offset
+        for slot, offset in enumerate(SLOT_OFFSETS[: mask.bit_length()])
+        if mask >> slot & 1
+    ]
+
+
+def select_booked_appointments(released_status_ids: Set[int], since: date) -> Select:
+    """Builds the query of the appointments taking slots from a day
+
+    Args:
+        released_status_ids (Set[int]): Statuses of the appointments not taking slots
+        since (date): First day
+
+    Returns:
+        Select: Selection of id, service, location and start
+    """
+    return (
+        select(
+            db_models.Appointment.id,
+            db_models.Appointment.service_id,
+            db_models.Appointment.location_id,
+            db_models.Appointment.service_ending_expected,
+        )
+        .where(
+            db_models.Appointment.service_ending_expected
+            >= datetime.combine(since, day_time.min)
+        )
+        .where(
+            or_(
+                db_models.Appointment.status_id == None,
+                db_models.Appointment.status_id.not_in(released_status_ids),
+            )
+        )
+    )
+
+
+class AvailabilityIndex:
+    """Booked slots of every service and location"""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.refresh_lock = threading.Lock()
+        self.bookings: Dict[BookingKey, int] = {}
+        self.appointments: Dict[Hashable, Booking] = {}
+        self.released_status_ids: Set[int] = set()
+        self.first_day = date.min
+        self.last_appointment_id = 0
+        self.built_at: Optional[float] = None
+        self.synced_at = 0.0
+
+    def refresh(self, session: Session) -> None:
+        """Builds the index on first use, catches up with the appointments
+        created by other workers and rebuilds it periodically
+
+        Args:
+            session (Session): Database session
+        """
+        synced = (
+            self.built_at is not None
+            and time.monotonic() - self.synced_at
+            < constants.APPOINTMENT_INDEX_SYNC_INTERVAL
+        )
+
+        if synced:
+            return
+
+        with self.refresh_lock:
+            elapsed = time.monotonic() - (self.built_at or 0.0)
+
+            if (
+                self.built_at is None
+                or elapsed >= constants.APPOINTMENT_INDEX_REBUILD_INTERVAL
+            ):
+                self.rebuild(session)
+            elif (
+                time.monotonic() - self.synced_at
+                >= constants.APPOINTMENT_INDEX_SYNC_INTERVAL
+            ):
+                self.catch_up(session)
+
+    def rebuild(self, session: Session) -> None:
+        """Loads every appointment from today on
+
+        Args:
+            session (Session): Database session
+        """
+        released_status_ids = set(
+            session.scalars(
+                select(db_models.Status.id)
+                .where(db_models.Status.type == StatusType.APPOINTMENT)
+                .where(
+                    db_models.Status.code.in_(constants.RELEASED_APPOINTMENT_STATUSES)
+                )
+            )
+        )
+        last_appointment_id = (
+            session.scalar(select(func.max(db_models.Appointment.id))) or 0
+        )
+        first_day = date.today()
+        rows = session.execute(
+            select_booked_appointments(released_status_ids, first_day)
+            .where(db_models.Appointment.id <= last_appointment_id)
+            .execution_options(yield_per=constants.STREAM_BATCH_SIZE)
+        )
+        bookings: Dict[BookingKey, int] = {}
+        appointments: Dict[Hashable, Booking] = {}
+
+        for appointment_id, service_id, location_id, start in rows:
+            booking = get_booking(service_id, location_id, start)
+
+            if booking is not None:
+                appointments[appointment_id] = booking
+                bookings[booking.key] = bookings.get(booking.key, 0) | booking.mask
+
+        with self.lock:
+            pending = {
+                holder: booking
+                for holder, booking in self.appointments.items()
+                if not isinstance(holder, int)
+            }
+            self.bookings = bookings
+            self.appointments = appointments
+            self.released_status_ids = released_status_ids
+            self.first_day = first_day
+            self.last_appointment_id = last_appointment_id
+
+            for holder, booking in pending.items():
+                self.set_unlocked(holder, booking)
+
+        self.built_at = self.synced_at = time.monotonic()
+
+    def catch_up(self, session: Session) -> None:
+        """Loads the appointments created since the last sync
+
+        Args:
+            session (Session): Database session
+        """
+        rows = session.execute(
+            select_booked_appointments(self.released_status_ids, self.first_day)
+            .where(db_models.Appointment.id > self.last_appointment_id)
+            .order_by(db_models.Appointment.id)
+        ).all()
+
+        with self.lock:
+            for appointment_id, service_id, location_id, start in rows:
+                self.set_unlocked(appointment_id, get_booking(service_id, location_id, start))
+                self.last_appointment_id = max(self.last_appointment_id, appointment_id)
+
+        self.synced_at = time.monotonic()
+
+    def set_unlocked(self, holder: Hashable, booking: Optional[Booking]) -> None:
+        """Replaces the slots taken by an appointment without taking the lock
+
+        Args:
+            holder (Hashable): ID of the appointment or reservation
+            booking (Booking, optional): New slots, None to free them
+        """
+        previous = self.appointments.pop(holder, None)
+
+        if previous is not None:
+            self.bookings[previous.key] &= ~previous.mask
+
+        if booking is not None and booking.key[2] >= self.first_day:
+            self.appointments[holder] = booking
+            self.bookings[booking.key] = self.bookings.get(booking.key, 0) | booking.mask
+
+    def reserve(
+        self,
+        session: Session,
+        holder: Hashable,
+        booking: Optional[Booking],
+        status_id: Optional[int] = None,
+    ) -> None:
+        """Takes the slots of an appointment if nothing else booked them
+
+        Args:
+            session (Session): Database session
+            holder (Hashable): ID of the appointment, or a new object for an
+                appointment not created yet
+            booking (Booking, optional): Slots of the appointment
+            status_id (int, optional): ID of the status of the appointment
+
+        Raises:
+            HTTPException: When another appointment took any of the slots
+        """
+        self.refresh(session)
+
+        if status_id in self.released_status_ids:
+            booking = None
+
+        with self.lock:
+            if booking is not None and booking.key[2] >= self.first_day:
+                booked = self.bookings.get(booking.key, 0)
+                previous = self.appointments.get(holder)
+
+                if previous is not None and previous.key == booking.key:
+                    booked &= ~previous.mask
+
+                if booked & booking.mask:
+                    raise exceptions.SLOT_UNAVAILABLE_ERROR
+
+            self.set_unlocked(holder, booking)
+
+    def confirm(self, holder: Hashable, appointment_id: int) -> None:
+        """Assigns the slots of a reservation to the created appointment
+
+        Args:
+            holder (Hashable): Reservation
+            appointment_id (int): ID of the appointment
+        """
+        with self.lock:
+            booking = self.appointments.pop(holder, None)
+
+            if booking is not None:
+                self.appointments[appointment_id] = booking
+
+    def release(self, holder: Hashable) -> None:
+        """Frees the slots of a reservation or a deleted appointment
+
+        Args:
+            holder (Hashable): ID of the appointment or reservation
+        """
+        with self.lock:
+            self.set_unlocked(holder, None)
+
+    def sync_appointment(self, session: Session, appointment_id: int) -> None:
+        """Reloads the slots of an appointment after it was written
+
+        Args:
+            session (Session): Database session
+            appointment_id (int): ID of the appointment
+        """
+        self.refresh(session)
+        row = session.execute(
+            select_booked_appointments(self.released_status_ids, self.first_day).where(
+                db_models.Appointment.id == appointment_id
+            )
+        ).first()
+
+        with self.lock:
+            self.set_unlocked(
+                appointment_id, None if row is None else get_booking(*row[1:])
+            )
+
+    def get_free_slots(
+        self,
+        session: Session,
+        start: date,
+        end: date,
+        keys: List[Tuple[int, int]],
+    ) -> List[FreeSlots]:
+        """Gets the free slots of services at locations within a date range
+
+        Args:
+            session (Session): Database session
+            start (date): Inclusive first day
+            end (date): Exclusive last day
+            keys (List[Tuple[int, int]]): Service and location pairs
+
+        Returns:
+            List[FreeSlots]: Free slots by day, service and location
+        """
+        self.refresh(session)
+        opening_mask = get_opening_mask()
+        now = datetime.now()
+        items = []
+
+        for offset in range((end - start).days):
+            day = start + timedelta(days=offset)
+            day_mask = 0 if day < now.date() else opening_mask
+
+            if day == now.date():
+                elapsed = (now.hour * 60 + now.minute) // constants.APPOINTMENT_SLOT_MINUTES
+                day_mask &= ~((1 << (elapsed + 1)) - 1)
+
+            with self.lock:
+                booked = [self.bookings.get((*key, day), 0) for key in keys]
+
+            items.extend(
+                FreeSlots(key[0], key[1], day, get_slot_starts(day, day_mask & ~mask))
+                for key, mask in zip(keys, booked)
+            )
+
+        return items
+
+
+index = AvailabilityIndex()
+
+
+def lock_slots(
+    session: Session,
+    booking: Optional[Booking],
+    status_id: Optional[int],
+    appointment_id: Optional[int] = None,
+) -> None:
+    """Checks the slots of an appointment against the database within the
+    transaction writing it
+
+    The row of the service is locked first, so the bookings of a service are
+    serialized across workers until the transaction ends.
+
+    Args:
+        session (Session): Database session
+        booking (Booking, optional): Slots of the appointment
+        status_id (int, optional): ID of the status of the appointment
+        appointment_id (int, optional): ID of the appointment, when updated
+
+    Raises:
+        HTTPException: When another appointment took any of the slots
+    """
+    if (
+        booking is None
+        or status_id in index.released_status_ids
+        or booking.key[2] < index.first_day
+    ):
+        return
+
+    service_id, location_id, day = booking.key
+    statement = (
+        select_booked_appointments(index.released_status_ids, day)
+        .where(db_models.Appointment.service_id == service_id)
+        .where(db_models.Appointment.location_id == location_id)
+        .where(
+            db_models.Appointment.service_ending_expected
+            < datetime.combine(day + timedelta(days=1), day_time.min)
+        )
+    )
+
+    if appointment_id is not None:
+        statement = statement.where(db_models.Appointment.id != appointment_id)
+
+    try:
+        session.execute(
+            select(db_models.Service.id)
+            .where(db_models.Service.id == service_id)
+            .with_for_update()
+        )
+        rows = session.execute(statement).all()
+    except:
+        session.rollback()
+        raise
+
+    booked = 0
+
+    for row in rows:
+        booked |= get_booking(*row[1:]).mask
+
+    if booked & booking.mask:
+        session.rollback()
+        raise exceptions.SLOT_UNAVAILABLE_ERROR
+
+
+def create_appointment(
+    session: Session, data: dict, booking: Optional[Booking], status_id: Optional[int]
+) -> int:
+    """Creates an appointment once its slots are reserved
+
+    Args:
+        session (Session): Database session
+        data (dict): Appointment data
+        booking (Booking, optional): Slots of the appointment
+        status_id (int, optional): ID of the status of the appointment
+
+    Raises:
+        HTTPException: When the slots are already booked
+
+    Returns:
+        int: ID of the created appointment
+    """
+    holder = object()
+    index.reserve(session, holder, booking, status_id)
+
+    try:
+        lock_slots(session, booking, status_id)
+        item = db_models.Appointment.create_from_data(session, data)
+    except:
+        index.release(holder)
+        raise
+
+    # The identity key is kept after commit, reading the id would refresh the row
+    appointment_id = inspect(item).identity[0]
+    index.confirm(holder, appointment_id)
+    return appointment_id
+
+
+def update_appointment(
+    session: Session,
+    appointment_id: int,
+    data: dict,
+    booking: Optional[Booking],
+    status_id: Optional[int],
+) -> None:
+    """Updates an appointment once its new slots are reserved
+
+    Args:
+        session (Session): Database session
+        appointment_id (int): ID of the appointment
+        data (dict): Update data
+        booking (Booking, optional): New slots of the appointment
+        status_id (int, optional): New status of the appointment
+
+    Raises:
+        HTTPException: When the slots are already booked
+    """
+    index.reserve(session, appointment_id, booking, status_id)
+
+    try:
+        lock_slots(session, booking, status_id, appointment_id)
+        db_models.Appointment.update_by_id(session, appointment_id, data)
+    finally:
+        index.sync_appointment(session, appointment_id)
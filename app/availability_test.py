@@ -0,0 +1,188 @@
+"""Appointment availability test cases
+"""
+
+import time
+import unittest
+from datetime import date, datetime, time as day_time, timedelta
+from unittest import mock
+from fastapi import HTTPException
+from sqlalchemy import func, select
+from . import availability
+from .database import memory
+from .database import models as db_models
+
+# pylint: disable=E1102
+
+SERVICE_ID = 1
+LOCATION_ID = 1
+CUSTOMER_ID = 1
+PENDING_STATUS_ID = 14
+
+
+def at(hour: int, minute: int = 0) -> datetime:
+    """Gets a moment of tomorrow
+
+    Args:
+        hour (int): Hour
+        minute (int): Minute
+
+    Returns:
+        datetime: The moment
+    """
+    return datetime.combine(date.today() + timedelta(days=1), day_time(hour, minute))
+
+
+class BookingTest(unittest.TestCase):
+    """Booked slots test cases
+
+    Args:
+        unittest (unittest.TestCase): TestCase base class
+    """
+
+    def get_mask(self, start: datetime) -> int:
+        """Gets the slots taken by an appointment of the test service
+
+        Args:
+            start (datetime): Start of the appointment
+
+        Returns:
+            int: Bitmap of the slots
+        """
+        return availability.get_booking(SERVICE_ID, LOCATION_ID, start).mask
+
+    def test_overlaps(self):
+        """Appointments overlap when they share a slot
+        """
+        self.assertTrue(self.get_mask(at(9)) & self.get_mask(at(9, 15)))
+        self.assertTrue(self.get_mask(at(9, 10)) & self.get_mask(at(9, 30)))
+        self.assertFalse(self.get_mask(at(9)) & self.get_mask(at(9, 30)))
+        self.assertIsNone(availability.get_booking(SERVICE_ID, None, at(9)))
+
+
+class AvailabilityTest(unittest.TestCase):
+    """Appointment booking test cases over an in-memory database
+
+    Args:
+        unittest (unittest.TestCase): TestCase base class
+    """
+
+    def setUp(self):
+        self.session = memory.create_session()
+        patcher = mock.patch.object(availability, "index", availability.AvailabilityIndex())
+        self.index = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.session.close()
+
+    def create(self, start: datetime) -> int:
+        """Books an appointment of the test service
+
+        Args:
+            start (datetime): Start of the appointment
+
+        Returns:
+            int: ID of the created appointment
+        """
+        return availability.create_appointment(
+            self.session,
+            {
+                "customerId": CUSTOMER_ID,
+                "serviceId": SERVICE_ID,
+                "locationId": LOCATION_ID,
+                "statusId": PENDING_STATUS_ID,
+                "serviceEndingExpected": start,
+            },
+            availability.get_booking(SERVICE_ID, LOCATION_ID, start),
+            PENDING_STATUS_ID,
+        )
+
+    def count_booked(self) -> int:
+        """Counts the appointments of the test service from tomorrow
+
+        Returns:
+            int: Appointments in the database
+        """
+        return self.session.scalar(
+            select(func.count())
+            .select_from(db_models.Appointment)
+            .where(db_models.Appointment.service_id == SERVICE_ID)
+            .where(db_models.Appointment.service_ending_expected >= at(0))
+        )
+
+    def assert_unavailable(self, start: datetime) -> None:
+        """Checks that booking a moment is rejected as a conflict
+
+        Args:
+            start (datetime): Start of the appointment
+        """
+        with self.assertRaises(HTTPException) as context:
+            self.create(start)
+
+        self.assertEqual(context.exception.status_code, 409)
+
+    def test_overlap_rejected(self):
+        """Overlapping appointments are rejected and adjacent ones accepted
+        """
+        self.create(at(9))
+        self.assert_unavailable(at(9, 15))
+        self.create(at(9, 30))
+
+        self.assertEqual(self.count_booked(), 2)
+
+    def test_overlap_rejected_with_stale_index(self):
+        """Appointments booked by other workers are caught by the database check
+        """
+        self.index.refresh(self.session)
+        self.index.built_at = self.index.synced_at = time.monotonic() + 3600
+        self.session.add(
+            db_models.Appointment(
+                customer_id=CUSTOMER_ID,
+                service_id=SERVICE_ID,
+                location_id=LOCATION_ID,
+                status_id=PENDING_STATUS_ID,
+                service_ending_expected=at(10),
+            )
+        )
+        self.session.commit()
+
+        self.assert_unavailable(at(10, 5))
+        self.assertEqual(self.count_booked(), 1)
+        self.assertTrue(all(isinstance(holder, int) for holder in self.index.appointments))
+
+        self.create(at(11))
+        self.assertEqual(self.count_booked(), 2)
+
+    def move(self, appointment_id: int, start: datetime) -> None:
+        """Reschedules an appointment of the test service
+
+        Args:
+            appointment_id (int): ID of the appointment
+            start (datetime): New start of the appointment
+        """
+        availability.update_appointment(
+            self.session,
+            appointment_id,
+            {"serviceEndingExpected": start},
+            availability.get_booking(SERVICE_ID, LOCATION_ID, start),
+            PENDING_STATUS_ID,
+        )
+
+    def test_reschedule_onto_booked_slot_rejected(self):
+        """Moving an appointment onto another one is rejected, within its own slot it isn't
+        """
+        self.create(at(9))
+        appointment_id = self.create(at(10))
+
+        with self.assertRaises(HTTPException):
+            self.move(appointment_id, at(9, 10))
+
+        self.move(appointment_id, at(10, 10))
+        self.assertEqual(
+            self.session.get(db_models.Appointment, appointment_id).service_ending_expected,
+            at(10, 10),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
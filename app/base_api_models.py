@@ -1,7 +1,9 @@
 """Common API models"""
 
-from typing import Optional
+from datetime import date
+from typing import Generic, List, Optional, TypeVar
 from pydantic import BaseModel
+from pydantic.generics import GenericModel
 from . import enums
 
 
@@ -17,6 +19,21 @@ class APIResponse(BaseModel):
     message: str
 
 
+ItemT = TypeVar("ItemT")
+
+
+class BatchItem(GenericModel, Generic[ItemT]):
+    """Batch item data
+
+    Args:
+        GenericModel (class): Generic model class
+    """
+
+    id: int
+    found: bool
+    item: Optional[ItemT] = None
+
+
 class Status(BaseModel):
     """Status data
 
@@ -240,3 +257,49 @@ class ServiceTurnStatusItem(BaseModel):
     queueName: str
     statusName: str
     statusCode: str
+    estimatedWaitSeconds: Optional[int] = None
+
+
+class StatsReportItem(BaseModel):
+    """Statistics of a period, service, location, priority and status
+
+    Args:
+        BaseModel (class): Base model class
+    """
+
+    period: date
+    locationId: Optional[int] = None
+    serviceId: Optional[int] = None
+    priorityId: Optional[int] = None
+    statusId: Optional[int] = None
+    count: int
+    waitCount: int
+    averageWaitSeconds: Optional[float] = None
+    medianWaitSeconds: Optional[float] = None
+    p90WaitSeconds: Optional[float] = None
+    serviceCount: int
+    averageServiceSeconds: Optional[float] = None
+    medianServiceSeconds: Optional[float] = None
+    p90ServiceSeconds: Optional[float] = None
+
+
+class TurnAnalyticsItem(BaseModel):
+    """Wait and service time distributions of a service, location and hour
+
+    Args:
+        BaseModel (class): Base model class
+    """
+
+    serviceId: Optional[int] = None
+    locationId: Optional[int] = None
+    hour: Optional[int] = None
+    waitCount: int
+    p50WaitSeconds: Optional[float] = None
+    p90WaitSeconds: Optional[float] = None
+    p99WaitSeconds: Optional[float] = None
+    waitHistogram: List[int]
+    serviceCount: int
+    p50ServiceSeconds: Optional[float] = None
+    p90ServiceSeconds: Optional[float] = None
+    p99ServiceSeconds: Optional[float] = None
+    serviceHistogram: List[int]
@@ -10,3 +10,7 @@ DELETE_CATEGORY_BY_ID_OPERATION_ID = "deleteCategoryById"
 ADD_CATEGORY_OPERATION_ID = "addCategory"
 UPDATE_CATEGORY_OPERATION_ID = "updateCategory"
 PATCH_CATEGORY_OPERATION_ID = "patchCategory"
+GET_CATEGORIES_BATCH_OPERATION_ID = "getCategoriesBatch"
+
+# Internal routes paths
+BATCH_PATH = "/batch"
@@ -1,9 +1,11 @@
 """Category API handlers"""
 
+from typing import List
 from sqlalchemy.orm import Session
 from .. import base_api_models
 from .. import api_responses
 from ..database import models as db_models
+from ..database import loaders
 from .. import enums
 from .. import mappers
 from . import models as category_api_models
@@ -63,6 +65,22 @@ def get_category_services(
     return list(map(mappers.map_service, items))
 
 
+def get_categories_batch(
+    session: Session, ids: List[int]
+) -> category_api_models.CategoriesBatchResponse:
+    """Get info of several existing categories by their Ids with a single query
+
+    Args:
+        session (Session): Database session
+        ids (List[int]): ids of the categories
+
+    Returns:
+        CategoriesBatchResponse: Result for each id, in the requested order
+    """
+    items = db_models.Category.find_by_ids(session, ids, loaders.category_options())
+    return mappers.map_batch_items(ids, items, mappers.map_category)
+
+
 def get_category_by_id(session: Session, category_id: int) -> base_api_models.Category:
     """Get info of an existing category by Id
 
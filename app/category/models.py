@@ -46,3 +46,4 @@ class PatchCategoryPayload(base_api_models.CategoryBasicData):
 CategoryService = base_api_models.Service
 CategoriesListResponse = List[base_api_models.Category]
 CategoryServicesListResponse = List[CategoryService]
+CategoriesBatchResponse = List[base_api_models.BatchItem[base_api_models.Category]]
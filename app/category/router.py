@@ -1,5 +1,6 @@
 """Category API router"""
 
+from typing import List
 from fastapi import APIRouter, Depends, Header, Query, status
 from sqlalchemy.orm import Session
 from .. import api_responses
@@ -16,6 +17,8 @@ from .constants import (
     ADD_CATEGORY_OPERATION_ID,
     UPDATE_CATEGORY_OPERATION_ID,
     PATCH_CATEGORY_OPERATION_ID,
+    GET_CATEGORIES_BATCH_OPERATION_ID,
+    BATCH_PATH,
 )
 from . import handlers
 from . import models as category_api_models
@@ -72,6 +75,27 @@ def get_category_services(
     )
 
 
+@router.get(
+    BATCH_PATH,
+    dependencies=[
+        Depends(helpers.validate_api_access),
+        Depends(helpers.validate_token(constants.READ_CATEGORIES_SCOPE)),
+    ],
+    tags=TAGS,
+    operation_id=GET_CATEGORIES_BATCH_OPERATION_ID,
+    response_model=category_api_models.CategoriesBatchResponse,
+    responses=api_responses.responses_descriptions,
+)
+def get_categories_batch(
+    ids: List[int] = Depends(helpers.get_batch_ids),
+    session: Session = Depends(main.get_session),
+) -> category_api_models.CategoriesBatchResponse:
+    """
+    Get info of several existing categories by a comma separated list of Ids
+    """
+    return handlers.get_categories_batch(session, ids)
+
+
 @router.get(
     "/{category_id}",
     dependencies=[
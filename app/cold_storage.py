@@ -0,0 +1,383 @@
+"""Cold storage of the old service turns and appointments
+
+Archived turns and closed appointments older than
+``COLD_STORAGE_AFTER_DAYS`` days are appended to gzipped NDJSON segments on
+local disk, one per table and day, and deleted from the database in
+batches. A small JSON index keeps the rows and the committed length of
+every segment, so historical exports only open the segments of their range.
+
+Segments are only read up to their indexed length and truncated to it
+before appending, and the index is saved before the rows are deleted, so
+an interrupted run leaves no partial segment and loses no row: at worst the
+rows of its last batch are stored twice, and the reads skip the repeated
+ones. Only one run may write to a directory at a time.
+
+The days moved are rolled up again in full and frozen first, so the
+reports keep them whatever the incremental runs missed.
+"""
+
+import gzip
+import itertools
+import json
+import os
+import time
+from datetime import date, datetime, time as day_time, timedelta
+from typing import Callable, Dict, Iterator, List, NamedTuple, Sequence
+from sqlalchemy import delete, or_, select
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+from . import archive
+from . import constants
+from . import exports
+from . import rollups
+from .database import models as db_models
+from .enums import ExportFormat, StatusType
+
+
+class ColdTable(NamedTuple):
+    """Table moved to cold storage, and how its rows are chosen and segmented"""
+
+    name: str
+    model: type
+    select_rows: Callable[[datetime], Select]
+    get_day: Callable[[Row], date]
+
+
+def select_cold_turns(cutoff: datetime) -> Select:
+    """Builds the query of the archived turns created before a moment
+
+    Args:
+        cutoff (datetime): Exclusive end of the creation
+
+    Returns:
+        Select: Columns of the turns
+    """
+    turn = db_models.ArchivedServiceTurn
+    return select(*turn.__table__.columns).where(turn.created < cutoff)
+
+
+def select_cold_appointments(cutoff: datetime) -> Select:
+    """Builds the query of the closed appointments booked, created and last
+    modified before a moment, which no turn refers to anymore
+
+    Args:
+        cutoff (datetime): Exclusive end of the booked date, the creation and
+            the last modification
+
+    Returns:
+        Select: Columns of the appointments
+    """
+    appointment = db_models.Appointment
+    return (
+        select(*appointment.__table__.columns)
+        .where(
+            appointment.status_id.in_(
+                select(db_models.Status.id)
+                .where(db_models.Status.type == StatusType.APPOINTMENT)
+                .where(db_models.Status.code.in_(constants.CLOSED_APPOINTMENT_STATUSES))
+            )
+        )
+        .where(rollups.get_appointment_day() < cutoff)
+        .where(appointment.created < cutoff)
+        .where(or_(appointment.last_modified.is_(None), appointment.last_modified < cutoff))
+        .where(
+            *(
+                ~select(model.id).where(model.appointment_id == appointment.id).exists()
+                for model in archive.TURN_MODELS
+            )
+        )
+    )
+
+
+TABLES = {
+    table.name: table
+    for table in (
+        ColdTable(
+            db_models.ServiceTurn.__tablename__,
+            db_models.ArchivedServiceTurn,
+            select_cold_turns,
+            lambda row: row.created.date(),
+        ),
+        ColdTable(
+            db_models.Appointment.__tablename__,
+            db_models.Appointment,
+            select_cold_appointments,
+            lambda row: (row.service_ending_expected or row.created).date(),
+        ),
+    )
+}
+
+
+def load_index(directory: str) -> Dict[str, Dict[str, Dict[str, int]]]:
+    """Loads the index of a cold storage directory
+
+    Args:
+        directory (str): Cold storage directory
+
+    Returns:
+        Dict[str, Dict[str, Dict[str, int]]]: Rows and committed bytes of the
+        segments by table and ISO formatted day, empty for a new directory
+    """
+    path = os.path.join(directory, constants.COLD_STORAGE_INDEX_FILE)
+
+    if not os.path.exists(path):
+        return {}
+
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+class SegmentStore:
+    """Appends rows to the daily segments of a cold storage directory"""
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        self.index = load_index(directory)
+
+    def get_path(self, table: str, day: str) -> str:
+        """Gets the path of a segment
+
+        Args:
+            table (str): Table name
+            day (str): ISO formatted day
+
+        Returns:
+            str: Path of the segment
+        """
+        return os.path.join(
+            self.directory, table, day + constants.COLD_STORAGE_SEGMENT_EXTENSION
+        )
+
+    def append(self, table: str, day: date, columns: List[str], rows: Sequence[Row]) -> None:
+        """Appends rows to a segment as a new gzip member, durably
+
+        Args:
+            table (str): Table name
+            day (date): Day of the segment
+            columns (List[str]): Names of the columns
+            rows (Sequence[Row]): Rows values
+        """
+        segment = self.index.setdefault(table, {}).setdefault(
+            day.isoformat(), {"rows": 0, "bytes": 0}
+        )
+        path = self.get_path(table, day.isoformat())
+        data = gzip.compress(
+            exports.encode_ndjson(columns, rows).encode(), constants.EXPORT_COMPRESSION_LEVEL
+        )
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with open(path, "ab") as file:
+            file.truncate(segment["bytes"])
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+
+        segment["rows"] += len(rows)
+        segment["bytes"] += len(data)
+
+    def save(self) -> None:
+        """Replaces the index atomically with the one in memory"""
+        path = os.path.join(self.directory, constants.COLD_STORAGE_INDEX_FILE)
+        temporary = path + ".tmp"
+
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump(self.index, file, sort_keys=True)
+            file.flush()
+            os.fsync(file.fileno())
+
+        os.replace(temporary, path)
+
+
+def store_batch(
+    session: Session, store: SegmentStore, table: ColdTable, statement: Select
+) -> List[int]:
+    """Appends a batch of rows to their segments, then deletes them
+
+    Args:
+        session (Session): Database session
+        store (SegmentStore): Cold storage segments
+        table (ColdTable): Table moved
+        statement (Select): Query of the batch
+
+    Returns:
+        List[int]: IDs of the rows moved
+    """
+    result = session.execute(statement.with_for_update(skip_locked=True))
+    columns = list(result.keys())
+    rows = sorted(result.all(), key=table.get_day)
+    row_ids = [row.id for row in rows]
+
+    if not rows:
+        session.rollback()
+        return row_ids
+
+    for day, items in itertools.groupby(rows, key=table.get_day):
+        store.append(table.name, day, columns, list(items))
+
+    store.save()
+    session.execute(delete(table.model).where(table.model.id.in_(row_ids)))
+    session.commit()
+    return row_ids
+
+
+def store_rows(
+    session: Session, store: SegmentStore, table: ColdTable, cutoff: datetime, batch_size: int
+) -> int:
+    """Moves every row of a table before a moment to cold storage
+
+    Batches go on from the last id moved, so the rows left, like the
+    appointments turns still refer to, are only looked at once.
+
+    Args:
+        session (Session): Database session
+        store (SegmentStore): Cold storage segments
+        table (ColdTable): Table moved
+        cutoff (datetime): Rows before it are moved
+        batch_size (int): Rows moved per transaction
+
+    Returns:
+        int: Rows moved
+    """
+    statement = table.select_rows(cutoff).order_by(table.model.id).limit(batch_size)
+    moved = 0
+    last_id = 0
+
+    try:
+        while True:
+            row_ids = store_batch(
+                session, store, table, statement.where(table.model.id > last_id)
+            )
+            moved += len(row_ids)
+
+            if len(row_ids) < batch_size:
+                return moved
+
+            last_id = max(row_ids)
+    except:
+        session.rollback()
+        raise
+
+
+def read_segment(directory: str, table: str, day: str, size: int) -> Iterator[dict]:
+    """Reads the committed rows of a segment, skipping the repeated ones
+
+    Args:
+        directory (str): Cold storage directory
+        table (str): Table name
+        day (str): ISO formatted day
+        size (int): Committed bytes
+
+    Yields:
+        dict: Row values by column
+    """
+    path = os.path.join(directory, table, day + constants.COLD_STORAGE_SEGMENT_EXTENSION)
+
+    with open(path, "rb") as file:
+        lines = gzip.decompress(file.read(size)).decode().splitlines()
+
+    seen = set()
+
+    for line in lines:
+        row = json.loads(line)
+
+        if row["id"] not in seen:
+            seen.add(row["id"])
+            yield row
+
+
+def iterate_rows(directory: str, table: str, start: date, end: date) -> Iterator[dict]:
+    """Scans the segments of a table within a date range, in order
+
+    Args:
+        directory (str): Cold storage directory
+        table (str): Table name
+        start (date): Inclusive start of the range
+        end (date): Exclusive end of the range
+
+    Yields:
+        dict: Row values by column
+    """
+    segments = load_index(directory).get(table, {})
+
+    for day in sorted(segments):
+        if start.isoformat() <= day < end.isoformat():
+            yield from read_segment(directory, table, day, segments[day]["bytes"])
+
+
+def export_rows(
+    directory: str, table: str, start: date, end: date, export_format: ExportFormat
+) -> Iterator[str]:
+    """Encodes the stored rows of a table within a date range in batches
+
+    Args:
+        directory (str): Cold storage directory
+        table (str): Table name
+        start (date): Inclusive start of the range
+        end (date): Exclusive end of the range
+        export_format (ExportFormat): Output format, the same as the API exports
+
+    Yields:
+        str: Encoded chunks
+    """
+    columns = [column.name for column in TABLES[table].model.__table__.columns]
+    rows = iterate_rows(directory, table, start, end)
+
+    if export_format == ExportFormat.CSV:
+        yield exports.encode_csv(columns, [], True)
+
+    while True:
+        batch = [
+            [row.get(column) for column in columns]
+            for row in itertools.islice(rows, constants.EXPORT_BATCH_SIZE)
+        ]
+
+        if not batch:
+            return
+
+        if export_format == ExportFormat.CSV:
+            yield exports.encode_csv(columns, batch, False)
+        else:
+            yield exports.encode_ndjson(columns, batch)
+
+
+def run(
+    session: Session,
+    directory: str,
+    days: int = constants.COLD_STORAGE_AFTER_DAYS,
+    batch_size: int = constants.COLD_STORAGE_BATCH_SIZE,
+) -> Dict[str, int]:
+    """Moves the turns and appointments older than some days to cold storage
+
+    The closed turns still live are archived and the days moved rolled up
+    again from their rows first, then those days are frozen in the rollups,
+    and the turns are moved before the appointments they refer to.
+
+    Args:
+        session (Session): Database session
+        directory (str): Cold storage directory
+        days (int): Full days the rows must be older than
+        batch_size (int): Rows moved per transaction
+
+    Returns:
+        Dict[str, int]: Rows moved by table
+    """
+    started = time.perf_counter()
+    cutoff = datetime.combine(date.today() - timedelta(days=days), day_time.min)
+    archive.archive_turns(session, days, batch_size)
+
+    for stat_type in rollups.SOURCES:
+        rollups.rollup_before(session, stat_type, cutoff.date())
+        rollups.freeze(session, stat_type, cutoff.date())
+
+    store = SegmentStore(directory)
+    moved = {
+        name: store_rows(session, store, table, cutoff, batch_size)
+        for name, table in TABLES.items()
+    }
+    elapsed = time.perf_counter() - started
+    print(
+        f"Moved {sum(moved.values())} rows to cold storage in {elapsed:.2f} s "
+        + ", ".join(f"({name}: {count})" for name, count in moved.items())
+    )
+    return moved
@@ -0,0 +1,165 @@
+"""Cold storage test cases
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import date, datetime, timedelta
+from sqlalchemy import func, select
+from . import cold_storage
+from .database import memory
+from .database import models as db_models
+
+# pylint: disable=E1102
+
+TABLE = db_models.ServiceTurn.__tablename__
+DAY = date(2024, 1, 1)
+COLUMNS = ["id", "ticket_number", "created"]
+
+
+def make_rows(*row_ids: int) -> list:
+    """Builds rows of the test day
+
+    Args:
+        row_ids (int): IDs of the rows
+
+    Returns:
+        list: Values of the rows
+    """
+    return [
+        (row_id, f"S1-{row_id}", datetime(2024, 1, 1, 9) + timedelta(minutes=row_id))
+        for row_id in row_ids
+    ]
+
+
+class SegmentStoreTest(unittest.TestCase):
+    """Cold storage segments test cases
+
+    Args:
+        unittest (unittest.TestCase): TestCase base class
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def read_ids(self) -> list:
+        """Reads the ids of the rows stored on the test day
+
+        Returns:
+            list: IDs in the order stored
+        """
+        return [
+            row["id"]
+            for row in cold_storage.iterate_rows(
+                self.directory, TABLE, DAY, DAY + timedelta(days=1)
+            )
+        ]
+
+    def test_write_and_read(self):
+        """Rows appended in batches are read back in order with their values
+        """
+        store = cold_storage.SegmentStore(self.directory)
+        store.append(TABLE, DAY, COLUMNS, make_rows(1, 2, 3))
+        store.save()
+        store.append(TABLE, DAY, COLUMNS, make_rows(4))
+        store.save()
+
+        rows = list(
+            cold_storage.iterate_rows(self.directory, TABLE, DAY, DAY + timedelta(days=1))
+        )
+
+        self.assertEqual([row["id"] for row in rows], [1, 2, 3, 4])
+        self.assertEqual(
+            rows[0], {"id": 1, "ticket_number": "S1-1", "created": "2024-01-01T09:01:00"}
+        )
+        self.assertEqual(list(cold_storage.iterate_rows(self.directory, TABLE, DAY, DAY)), [])
+
+    def test_crash_before_saving_the_index(self):
+        """A batch written but not indexed is ignored, then overwritten by the retry
+        """
+        store = cold_storage.SegmentStore(self.directory)
+        store.append(TABLE, DAY, COLUMNS, make_rows(1, 2))
+        store.save()
+        store.append(TABLE, DAY, COLUMNS, make_rows(3, 4))
+
+        with open(store.get_path(TABLE, DAY.isoformat()), "ab") as file:
+            file.write(b"torn write")
+
+        self.assertEqual(self.read_ids(), [1, 2])
+
+        retry = cold_storage.SegmentStore(self.directory)
+        retry.append(TABLE, DAY, COLUMNS, make_rows(3, 4))
+        retry.save()
+
+        self.assertEqual(self.read_ids(), [1, 2, 3, 4])
+        self.assertEqual(
+            os.path.getsize(retry.get_path(TABLE, DAY.isoformat())),
+            cold_storage.load_index(self.directory)[TABLE][DAY.isoformat()]["bytes"],
+        )
+
+    def test_crash_before_deleting_the_rows(self):
+        """Rows stored again because they weren't deleted are read once
+        """
+        store = cold_storage.SegmentStore(self.directory)
+        store.append(TABLE, DAY, COLUMNS, make_rows(1, 2))
+        store.save()
+
+        retry = cold_storage.SegmentStore(self.directory)
+        retry.append(TABLE, DAY, COLUMNS, make_rows(1, 2, 3))
+        retry.save()
+
+        self.assertEqual(self.read_ids(), [1, 2, 3])
+
+
+class StoreRowsTest(unittest.TestCase):
+    """Moving rows to cold storage test cases over an in-memory database
+
+    Args:
+        unittest (unittest.TestCase): TestCase base class
+    """
+
+    def setUp(self):
+        self.session = memory.create_session()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def tearDown(self):
+        self.session.close()
+
+    def test_store_rows(self):
+        """Old archived turns are stored by day in batches and deleted
+        """
+        for turn_id, minutes in enumerate((0, 30, 24 * 60, 3 * 24 * 60), 1):
+            self.session.add(
+                db_models.ArchivedServiceTurn(
+                    id=turn_id,
+                    ticket_number=f"S1-{minutes}",
+                    service_id=1,
+                    created=datetime(2024, 1, 1, 9) + timedelta(minutes=minutes),
+                )
+            )
+
+        self.session.commit()
+        store = cold_storage.SegmentStore(self.directory)
+        moved = cold_storage.store_rows(
+            self.session, store, cold_storage.TABLES[TABLE], datetime(2024, 1, 3), 2
+        )
+        rows = list(cold_storage.iterate_rows(self.directory, TABLE, DAY, date(2024, 1, 5)))
+
+        self.assertEqual(moved, 3)
+        self.assertEqual(
+            [row["ticket_number"] for row in rows], ["S1-0", "S1-30", f"S1-{24 * 60}"]
+        )
+        self.assertEqual(
+            sorted(cold_storage.load_index(self.directory)[TABLE]), ["2024-01-01", "2024-01-02"]
+        )
+        self.assertEqual(
+            self.session.scalar(select(func.count()).select_from(db_models.ArchivedServiceTurn)),
+            1,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
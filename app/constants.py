@@ -13,12 +13,113 @@ EMPTY_VALUE = ""
 TIMEOUT = 10
 SYSTEM_CREATOR = "SYSTEM"
 DEFAULT_TURN_STATUS = "PENDING"
+BEING_ATTENDED_TURN_STATUS = "BEING_ATTENDED"
+ATTENDED_TURN_STATUS = "ATTENDED"
 DEFAULT_APPOINTMENT_STATUS = "PENDING"
 DEFAULT_TURN_PRIORITY = "NORMAL_PRIORITY"
 NOT_AVAILABLE = "N/A"
 
 DEFAULT_PAGE_OFFSET = 0
 DEFAULT_PAGE_LIMIT = 10
+FIELDS_SEPARATOR = ","
+IDS_SEPARATOR = ","
+MAX_BATCH_IDS = 100
+STREAM_BATCH_SIZE = 500
+JSON_MEDIA_TYPE = "application/json"
+
+# Logging
+DEFAULT_LOG_LEVEL = "INFO"
+LOG_LEVELS_SEPARATOR = ","
+LOG_LEVEL_SEPARATOR = "="
+LOG_QUEUE_SIZE = 10000
+LOG_SAMPLING_WINDOW = 60
+LOG_SAMPLING_BURST = 10
+REQUEST_ID_HEADER = "X-Request-ID"
+
+# Metrics
+METRICS_PATH = "/metrics"
+METRICS_MEDIA_TYPE = "text/plain; version=0.0.4"
+METRICS_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+METRICS_UNMATCHED_ROUTE = "unmatched"
+METRICS_ERROR_STATUS = "error"
+METRICS_QUERY_COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100, 200)
+
+# Database instrumentation
+QUERY_START_KEY = "query_start"
+DEFAULT_SLOW_QUERY_THRESHOLD = 200
+SLOW_QUERY_STATEMENT_MAX_LENGTH = 1000
+QUERY_COUNT_HEADER = "X-DB-Query-Count"
+QUERY_TIME_HEADER = "X-DB-Time-Ms"
+TRUE_VALUES = ("1", "true", "yes")
+
+# Profiling
+PROFILE_HEADER = "X-Profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+PROFILE_INTERVAL = 0.005
+DEFAULT_PROFILE_SECONDS = 10
+MAX_PROFILE_SECONDS = 60
+MAX_REQUEST_PROFILES = 20
+COLLAPSED_STACKS_MEDIA_TYPE = "text/plain"
+
+# Turn dispatch
+TURN_INDEX_SYNC_INTERVAL = 1
+TURN_INDEX_REBUILD_INTERVAL = 300
+TURN_INDEX_SYNC_OVERLAP = 30
+
+# Appointment availability
+APPOINTMENT_SLOT_MINUTES = 30
+APPOINTMENT_OPENING_HOUR = 8
+APPOINTMENT_CLOSING_HOUR = 18
+APPOINTMENT_AVAILABILITY_MAX_DAYS = 31
+APPOINTMENT_INDEX_SYNC_INTERVAL = 1
+APPOINTMENT_INDEX_REBUILD_INTERVAL = 300
+RELEASED_APPOINTMENT_STATUSES = ("SUSPENDED",)
+
+# Turn archive
+TURN_ARCHIVE_AFTER_DAYS = 1
+TURN_ARCHIVE_BATCH_SIZE = 1000
+ARCHIVED_TURN_STATUSES = ("ATTENDED", "SUSPENDED")
+
+# Cold storage
+COLD_STORAGE_AFTER_DAYS = 365
+COLD_STORAGE_BATCH_SIZE = 5000
+CLOSED_APPOINTMENT_STATUSES = ("ATTENDED", "SUSPENDED")
+DEFAULT_COLD_STORAGE_DIR = "cold_storage"
+COLD_STORAGE_INDEX_FILE = "index.json"
+COLD_STORAGE_SEGMENT_EXTENSION = ".ndjson.gz"
+
+# Daily rollups
+ROLLUP_DURATION_BUCKETS = (
+    60, 120, 300, 600, 900, 1200, 1800, 2700, 3600, 5400, 7200, 10800, 14400, 28800, 86400
+)
+ROLLUP_HISTOGRAM_SEPARATOR = ","
+ROLLUP_WATERMARK_OVERLAP = 300
+REPORT_MAX_DAYS = 3660
+GROUP_BY_SEPARATOR = ","
+
+# Turn analytics
+ANALYTICS_BATCH_SIZE = 100000
+ANALYTICS_RELATIVE_ACCURACY = 0.01
+ANALYTICS_PERCENTILES = (50, 90, 99)
+ANALYTICS_MAX_DAYS = 366
+
+# Turn counters
+TURN_COUNTERS_RECONCILE_INTERVAL = 30
+
+# Wait time estimates
+WAIT_TIME_SMOOTHING = 0.2
+WAIT_TIME_HISTORY_DAYS = 14
+WAIT_TIME_RESEED_INTERVAL = 3600
+
+# Synthetic data
+GENERATED_CUSTOMER_EMAIL = "customer{}@qms.generated"
+
+# Exports
+EXPORT_BATCH_SIZE = 5000
+EXPORT_COMPRESSION_LEVEL = 6
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+CSV_MEDIA_TYPE = "text/csv"
+GZIP_ENCODING = "gzip"
 
 # Scopes START
 
@@ -91,6 +192,9 @@ WRITE_LOCATIONS_SCOPE = "write_locations"
 # Administrate location
 ADMIN_LOCATIONS_SCOPE = "admin_locations"
 
+# Profile the running API
+ADMIN_PROFILING_SCOPE = "admin_profiling"
+
 # Scopes END
 
 # API Metadata
@@ -109,6 +213,7 @@ SERVICES_ROUTE_PREFIX = "/api/v1/services"
 SERVICE_TURNS_ROUTE_PREFIX = "/api/v1/serviceturns"
 STATUSES_ROUTE_PREFIX = "/api/v1/statuses"
 LOCATIONS_ROUTE_PREFIX = "/api/v1/locations"
+PROFILING_ROUTE_PREFIX = "/api/v1/profiling"
 
 # Environment names
 AUTH_API_BASE_URL_ENV_NAME = "AUTH_API_BASE_URL"
@@ -118,6 +223,11 @@ IAM_API_KEY_ENV_NAME = "IAM_API_KEY"
 AUTH_ALLOWED_IP_ADDRESSES_ENV_NAME = "AUTH_ALLOWED_IP_ADDRESSES"
 AUTH_ALLOWED_API_KEYS_ENV_NAME = "AUTH_ALLOWED_API_KEYS"
 DB_CONNECTION_STRING_ENV_NAME = "DB_CONNECTION_STRING"
+LOG_LEVEL_ENV_NAME = "LOG_LEVEL"
+LOG_LEVELS_ENV_NAME = "LOG_LEVELS"
+DEBUG_ENV_NAME = "DEBUG"
+SLOW_QUERY_THRESHOLD_ENV_NAME = "SLOW_QUERY_THRESHOLD"
+COLD_STORAGE_DIR_ENV_NAME = "COLD_STORAGE_DIR"
 
 # Error messages
 INTERNAL_SERVER_ERROR_MESSAGE = "Internal Server Error"
@@ -127,6 +237,15 @@ FORBIDDEN_ERROR_MESSAGE = "Client doen't have permission to request this resourc
 UNAUTHORIZED_ERROR_MESSAGE = "Client is not authenticated against the API"
 NOT_FOUND_ERROR_MESSAGE = "Item not found. Please review your request."
 INVALID_STATUS_ERROR_MESSAGE = "Invalid status type provided."
+INVALID_IDS_ERROR_MESSAGE = f"Provide between 1 and {MAX_BATCH_IDS} comma separated ids."
+INVALID_FIELDS_ERROR_MESSAGE = "Invalid fields or expand values provided."
+PROFILER_BUSY_ERROR_MESSAGE = "A profile is already running. Please, try later."
+NO_PENDING_TURNS_ERROR_MESSAGE = "There are no pending turns for the service."
+INVALID_TURN_REFERENCE_ERROR_MESSAGE = "Provide either the id or the ticket number of the turn."
+SLOT_UNAVAILABLE_ERROR_MESSAGE = "The appointment slot is already booked. Please, choose another one."
+INVALID_DATE_RANGE_ERROR_MESSAGE = "Provide an end after the start within the allowed number of days."
+INVALID_REPORT_GROUPING_ERROR_MESSAGE = "Invalid groupBy values provided."
+ANALYTICS_UNAVAILABLE_ERROR_MESSAGE = "The analytics are not available on this server."
 CONFLICT_ERROR_MESSAGE = "Request could not be processed because of conflict in the current state of the resource."
 INVALID_REQUEST = "INVALID_REQUEST"
 
@@ -137,7 +256,16 @@ NOT_FOUND_ERROR_TYPE = "NOT_FOUND"
 FORBIDDEN_ERROR_TYPE = "FORBIDDEN"
 NOT_FOUND_ERROR_TYPE = "NOT_FOUND"
 INVALID_STATUS_ERROR_TYPE = "INVALID_STATUS_TYPE"
+INVALID_FIELDS_ERROR_TYPE = "INVALID_FIELDS"
+INVALID_IDS_ERROR_TYPE = "INVALID_IDS"
 CONFLICT_ERROR_TYPE = "CONFLICT"
+PROFILER_BUSY_ERROR_TYPE = "PROFILER_BUSY"
+NO_PENDING_TURNS_ERROR_TYPE = "NO_PENDING_TURNS"
+INVALID_TURN_REFERENCE_ERROR_TYPE = "INVALID_TURN_REFERENCE"
+SLOT_UNAVAILABLE_ERROR_TYPE = "SLOT_UNAVAILABLE"
+INVALID_DATE_RANGE_ERROR_TYPE = "INVALID_DATE_RANGE"
+INVALID_REPORT_GROUPING_ERROR_TYPE = "INVALID_REPORT_GROUPING"
+ANALYTICS_UNAVAILABLE_ERROR_TYPE = "ANALYTICS_UNAVAILABLE"
 DUPLICATE_KEYWORD = "Duplicate"
 
 # Operations
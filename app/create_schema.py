@@ -0,0 +1,13 @@
+"""Schema creation entry point"""
+
+import sys
+import os
+
+# pylint: disable=C0413
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(SCRIPT_DIR))
+
+from app.database.main import create_schema
+
+create_schema()
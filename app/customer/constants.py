@@ -14,3 +14,7 @@ DELETE_CUSTOMER_BY_ID_OPERATION_ID = "deleteCustomerById"
 ADD_CUSTOMER_OPERATION_ID = "addCustomer"
 UPDATE_CUSTOMER_OPERATION_ID = "updateCustomer"
 PATCH_CUSTOMER_OPERATION_ID = "patchCustomer"
+GET_CUSTOMERS_BATCH_OPERATION_ID = "getCustomersBatch"
+
+# Internal routes paths
+BATCH_PATH = "/batch"
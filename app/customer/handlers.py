@@ -1,12 +1,17 @@
 """Customer API handlers"""
 
+from typing import List
 from datetime import datetime
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 from .. import base_api_models
 from .. import api_responses
+from .. import archive
+from .. import availability
 from ..enums import StatusType
 from ..database import models as db_models
+from ..database import loaders
 from ..auth import api as auth_api
 from .. import enums
 from .. import mappers as general_mappers
@@ -53,6 +58,22 @@ def get_customers(
     return list(map(general_mappers.map_customer, items))
 
 
+def get_customers_batch(
+    session: Session, ids: List[int]
+) -> customer_api_models.CustomersBatchResponse:
+    """Get info of several existing customers by their Ids with a single query
+
+    Args:
+        session (Session): Database session
+        ids (List[int]): ids of the customers
+
+    Returns:
+        CustomersBatchResponse: Result for each id, in the requested order
+    """
+    items = db_models.Customer.find_by_ids(session, ids, loaders.customer_options())
+    return general_mappers.map_batch_items(ids, items, general_mappers.map_customer)
+
+
 def get_customer_by_id(session: Session, customer_id: int) -> base_api_models.Customer:
     """Get info of an existing customer by Id
 
@@ -148,34 +169,52 @@ def create_own_appointment(
         "lastModifiedBy": customer.firstName,
     }
 
-    created_item = db_models.Appointment.create_from_data(session, data)
-    item = db_models.Appointment.find_by_id(session, created_item.id)
+    created_id = availability.create_appointment(
+        session,
+        data,
+        availability.get_booking(payload.serviceId, payload.locationId, date),
+        status.id,
+    )
+    item = db_models.Appointment.find_by_id(
+        session, created_id, loaders.appointment_options()
+    )
     return general_mappers.map_appointment(item)
 
 
 def get_customer_serviceturns(
     session: Session,
     customer_id: int,
-) -> customer_api_models.CustomersServiceTurnsListResponse:
+    include_archived: bool = False,
+) -> StreamingResponse:
     """Get list of turns an existing customer by customer Id
 
     Args:
         session (Session): Database session
         customer_id (int): id of the customer
+        include_archived (bool): Whether to stream the archived turns after the live ones
 
     Returns:
-        CustomersServiceTurnsListResponse: List of service turns associated to customer
+        StreamingResponse: Streamed list of service turns associated to customer
     """
-    items = db_models.ServiceTurn.find_many(
-        session, lambda x: x.where(db_models.ServiceTurn.customer_id == customer_id)
+    if include_archived:
+        items = archive.find_streamed_turns(
+            session, lambda model: model.customer_id == customer_id
+        )
+    else:
+        items = db_models.ServiceTurn.find_streamed(
+            session,
+            lambda x: x.where(db_models.ServiceTurn.customer_id == customer_id),
+            loaders.service_turn_options(),
+        )
+    return api_responses.get_streaming_list_response(
+        items, general_mappers.map_service_turn
     )
-    return list(map(general_mappers.map_service_turn, items))
 
 
 def get_customer_appointments(
     session: Session,
     customer_id: int,
-) -> customer_api_models.Appointments:
+) -> StreamingResponse:
     """Get list of appoinments of an existing customer by customer Id
 
     Args:
@@ -183,12 +222,16 @@ def get_customer_appointments(
         customer_id (int): id of the customer
 
     Returns:
-        Appointments: List of appoinments associated to customer
+        StreamingResponse: Streamed list of appoinments associated to customer
     """
-    items = db_models.Appointment.find_many(
-        session, lambda x: x.where(db_models.Appointment.customer_id == customer_id)
+    items = db_models.Appointment.find_streamed(
+        session,
+        lambda x: x.where(db_models.Appointment.customer_id == customer_id),
+        loaders.appointment_options(),
+    )
+    return api_responses.get_streaming_list_response(
+        items, general_mappers.map_appointment
     )
-    return list(map(general_mappers.map_appointment, items))
 
 
 def delete_customer_by_id(
@@ -62,3 +62,4 @@ class CreateOwnAppointmentPayload(BaseModel):
     serviceId: int
     locationId: int
     date: str
+CustomersBatchResponse = List[base_api_models.BatchItem[base_api_models.Customer]]
@@ -1,6 +1,8 @@
 """Customer API router"""
 
+from typing import List
 from fastapi import APIRouter, Depends, Query, status, Header
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from .. import api_responses
 from .. import base_api_models
@@ -20,6 +22,8 @@ from .constants import (
     GET_CUSTOMER_SERVICE_TURNS_OPERATION_ID,
     PATCH_CUSTOMER_OPERATION_ID,
     UPDATE_CUSTOMER_OPERATION_ID,
+    GET_CUSTOMERS_BATCH_OPERATION_ID,
+    BATCH_PATH,
 )
 from . import handlers
 from . import models as customer_api_models
@@ -115,6 +119,27 @@ def create_own_appointment(
     return handlers.create_own_appointment(session, payload, application, authorization)
 
 
+@router.get(
+    BATCH_PATH,
+    dependencies=[
+        Depends(helpers.validate_api_access),
+        Depends(helpers.validate_token(constants.READ_CUSTOMERS_SCOPE)),
+    ],
+    tags=TAGS,
+    operation_id=GET_CUSTOMERS_BATCH_OPERATION_ID,
+    response_model=customer_api_models.CustomersBatchResponse,
+    responses=api_responses.responses_descriptions,
+)
+def get_customers_batch(
+    ids: List[int] = Depends(helpers.get_batch_ids),
+    session: Session = Depends(main.get_session),
+) -> customer_api_models.CustomersBatchResponse:
+    """
+    Get info of several existing customers by a comma separated list of Ids
+    """
+    return handlers.get_customers_batch(session, ids)
+
+
 @router.get(
     "/{customer_id}",
     dependencies=[
@@ -150,7 +175,7 @@ def get_customer_by_id(
 def get_customer_appointments(
     customer_id: int,
     session: Session = Depends(main.get_session)
-) -> customer_api_models.Appointments:
+) -> StreamingResponse:
     """
     Get list of appointments of an existing customer by customer Id
     """
@@ -170,12 +195,14 @@ def get_customer_appointments(
 )
 def get_customer_serviceturns(
     customer_id: int,
+    include_archived: bool = Query(default=False, alias="includeArchived"),
     session: Session = Depends(main.get_session)
-) -> customer_api_models.CustomersServiceTurnsListResponse:
+) -> StreamingResponse:
     """
-    Get list of turns an existing customer by customer Id
+    Get list of turns an existing customer by customer Id, the archived ones
+    too when includeArchived is set
     """
-    return handlers.get_customer_serviceturns(session, customer_id)
+    return handlers.get_customer_serviceturns(session, customer_id, include_archived)
 
 
 @router.post(
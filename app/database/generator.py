@@ -0,0 +1,601 @@
+"""Synthetic data generator
+
+Generates production-sized volumes of locations, categories, services,
+customers, appointments and service turns on top of the reference statuses
+and priorities of ``data/data.json``. Rows are generated lazily, so any volume
+can be inserted in batches or written as CSV files for ``LOAD DATA``.
+"""
+
+import argparse
+import csv
+import json
+import math
+import os
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+from sqlalchemy import Table, delete, insert
+from sqlalchemy.engine import Engine
+from app import constants, enums
+from . import models, setup
+from .main import create_schema
+
+# pylint: disable=R0902
+# pylint: disable=R0903
+# pylint: disable=R0914
+
+DATA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "data.json")
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+NULL_VALUE = r"\N"
+INSERT_BATCH_SIZE = 10000
+CREATOR = "GENERATOR"
+
+FIRST_NAMES = [
+    "Ana", "Luis", "María", "José", "Carmen", "Juan", "Laura", "Carlos", "Sofía", "Pedro"
+]
+LAST_NAMES = ["García", "Rodríguez", "Martínez", "López", "Pérez", "Gómez", "Sánchez", "Díaz"]
+GENDER_WEIGHTS = {"M": 48, "F": 48, "N/S": 4}
+WEEKDAY_WEIGHTS = [1.0, 0.9, 0.9, 0.9, 1.1, 0.35, 0.05]
+HOUR_WEIGHTS = {8: 6, 9: 10, 10: 12, 11: 11, 12: 8, 13: 6, 14: 8, 15: 10, 16: 8, 17: 4}
+PRIORITY_WEIGHTS = {
+    "NORMAL_PRIORITY": 60,
+    "ROUTINE_PRIORITY": 15,
+    "LOW_PRIORITY": 8,
+    "MEDIUM_PRIORITY": 6,
+    "HIGH_PRIORITY": 4,
+    "DEFERRED_PRIORITY": 3,
+    "URGENT_PRIORITY": 2,
+    "EMERGENCY_PRIORITY": 1,
+    "CRITICAL_PRIORITY": 1,
+}
+ACTIVE_WEIGHTS = {"ACTIVE": 95, "INACTIVE": 5}
+CUSTOMER_STATUS_WEIGHTS = {"ACTIVE": 90, "INACTIVE": 8, "CANCELLED": 2}
+PAST_STATUS_WEIGHTS = {"ATTENDED": 90, "SUSPENDED": 10}
+PENDING_STATUS_WEIGHTS = {"PENDING": 1}
+SERVICE_POPULARITY_EXPONENT = 1.1
+MEAN_WAIT_SECONDS = 12 * 60
+MEDIAN_SERVICE_SECONDS = 8 * 60
+CUSTOMER_TURNS_RATIO = 0.3
+APPOINTMENTS_HORIZON_DAYS = 60
+REFERENCED_VOLUMES = {
+    "services": ["categories"],
+    "appointments": ["customers", "services", "locations"],
+    "service_turns": ["services"],
+}
+
+
+class Volumes(NamedTuple):
+    """Amount of rows to generate per table"""
+
+    locations: int = 100
+    categories: int = 50
+    services: int = 1000
+    customers: int = 5_000_000
+    appointments: int = 5_000_000
+    service_turns: int = 50_000_000
+    years: float = 3.0
+
+
+def check_volumes(volumes: Volumes) -> None:
+    """Checks that the volumes describe data that can be generated
+
+    Args:
+        volumes (Volumes): Amount of rows to generate per table
+
+    Raises:
+        ValueError: When a volume is negative, the period is empty, or a
+                    table would be generated without the rows it references
+    """
+    if min(volumes) < 0 or volumes.years <= 0:
+        raise ValueError("Volumes can't be negative and years must be positive")
+
+    for table, referenced in REFERENCED_VOLUMES.items():
+        missing = [name for name in referenced if not getattr(volumes, name)]
+
+        if getattr(volumes, table) and missing:
+            raise ValueError(f"Generating {table} needs {' and '.join(missing)}")
+
+
+class WeightedChoice:
+    """Picks values with the given weights in logarithmic time"""
+
+    def __init__(self, rand: random.Random, values: List, weights: List[float]):
+        if not values:
+            raise ValueError("Nothing to choose from")
+
+        self.rand = rand
+        self.values = values
+        self.cum_weights = []
+        total = 0
+
+        for weight in weights:
+            total += weight
+            self.cum_weights.append(total)
+
+    def __call__(self):
+        return self.rand.choices(self.values, cum_weights=self.cum_weights)[0]
+
+
+def load_reference(path: str = DATA_FILE) -> Tuple[Dict[str, Dict[str, int]], Dict[str, int]]:
+    """Loads the reference statuses and priorities
+
+    Args:
+        path (str): Reference data file
+
+    Returns:
+        Tuple[Dict[str, Dict[str, int]], Dict[str, int]]: Status ids by type
+                                                          and code, priority ids by code
+    """
+    with open(path, encoding="utf-8") as data_file:
+        entities = {entity["model"]: entity["data"] for entity in json.load(data_file)}
+
+    statuses = {}
+
+    for status in entities["database.models.Status"]:
+        statuses.setdefault(status["type"], {})[status["code"]] = status["id"]
+
+    priorities = {
+        priority["code"]: priority["id"]
+        for priority in entities["database.models.Priority"]
+    }
+    return statuses, priorities
+
+
+class DataGenerator:
+    """Generates the rows of every synthetic table"""
+
+    def __init__(
+        self,
+        volumes: Volumes,
+        seed: int = 1,
+        end: Optional[datetime] = None,
+        reference_path: str = DATA_FILE,
+    ):
+        check_volumes(volumes)
+        self.volumes = volumes
+        self.rand = random.Random(seed)
+        self.end = (end or datetime.now()).replace(microsecond=0)
+        self.start = self.end - timedelta(days=round(volumes.years * 365))
+        self.statuses, priorities = load_reference(reference_path)
+        self.pick_priority = self.weighted(priorities, PRIORITY_WEIGHTS)
+        days = list(range((self.end.date() - self.start.date()).days + 1))
+        self.pick_day = WeightedChoice(
+            self.rand,
+            days,
+            [WEEKDAY_WEIGHTS[(self.start + timedelta(days=day)).weekday()] for day in days],
+        )
+        self.pick_hour = WeightedChoice(
+            self.rand, list(HOUR_WEIGHTS), list(HOUR_WEIGHTS.values())
+        )
+        self.pick_service = (
+            WeightedChoice(
+                self.rand,
+                list(range(1, volumes.services + 1)),
+                [
+                    1 / rank**SERVICE_POPULARITY_EXPONENT
+                    for rank in range(1, volumes.services + 1)
+                ],
+            )
+            if volumes.services
+            else None
+        )
+
+    def weighted(self, ids: Dict[str, int], weights: Dict[str, float]) -> WeightedChoice:
+        """Builds a picker of ids by code with the weights of their codes
+
+        Codes without a weight are picked with weight one.
+
+        Args:
+            ids (Dict[str, int]): Ids by code
+            weights (Dict[str, float]): Weights by code
+
+        Returns:
+            WeightedChoice: Id picker
+        """
+        codes = [code for code in ids if weights.get(code, 1) > 0]
+        return WeightedChoice(
+            self.rand, [ids[code] for code in codes], [weights.get(code, 1) for code in codes]
+        )
+
+    def status_picker(self, status_type: enums.StatusType, weights: Dict[str, float]):
+        """Builds a picker of statuses of a type
+
+        Args:
+            status_type (enums.StatusType): Type of status
+            weights (Dict[str, float]): Weights by code
+
+        Returns:
+            WeightedChoice: Status id picker
+        """
+        statuses = self.statuses[status_type.value]
+        known = {code: ids for code, ids in statuses.items() if code in weights}
+        return self.weighted(known or statuses, weights)
+
+    def random_moment(self) -> datetime:
+        """Gets a moment within business hours of the generated period
+
+        Returns:
+            datetime: Moment
+        """
+        day = self.start.replace(hour=0, minute=0, second=0) + timedelta(
+            days=self.pick_day()
+        )
+        moment = day + timedelta(
+            hours=self.pick_hour(), seconds=self.rand.randrange(3600)
+        )
+        return moment if moment <= self.end else moment - timedelta(days=1)
+
+    def locations(self) -> Iterator[dict]:
+        """Generates locations"""
+        for location_id in range(1, self.volumes.locations + 1):
+            yield {
+                "id": location_id,
+                "name": f"Location {location_id}",
+                "code": f"LOCATION_{location_id}",
+                "address": f"Street {location_id}",
+                "description": f"Location {location_id}",
+                "is_active": self.rand.random() < 0.95,
+            }
+
+    def categories(self) -> Iterator[dict]:
+        """Generates categories"""
+        pick_status = self.status_picker(enums.StatusType.CATEGORY, ACTIVE_WEIGHTS)
+
+        for category_id in range(1, self.volumes.categories + 1):
+            yield {
+                "id": category_id,
+                "name": f"Category {category_id}",
+                "code": f"CATEGORY_{category_id}",
+                "description": f"Category {category_id}",
+                "icon_url": "app://web",
+                "is_active": True,
+                "status_id": pick_status(),
+            }
+
+    def services(self) -> Iterator[dict]:
+        """Generates services"""
+        pick_status = self.status_picker(enums.StatusType.SERVICE, ACTIVE_WEIGHTS)
+
+        for service_id in range(1, self.volumes.services + 1):
+            yield {
+                "id": service_id,
+                "name": f"Service {service_id}",
+                "code": f"SERVICE_{service_id}",
+                "prefix": f"S{service_id}",
+                "description": f"Service {service_id}",
+                "icon_url": "app://web",
+                "is_active": True,
+                "status_id": pick_status(),
+                "category_id": self.rand.randint(1, self.volumes.categories),
+                "archived_turns": 0,
+            }
+
+    def customers(self) -> Iterator[dict]:
+        """Generates customers"""
+        pick_status = self.status_picker(
+            enums.StatusType.CUSTOMER, CUSTOMER_STATUS_WEIGHTS
+        )
+        pick_gender = WeightedChoice(
+            self.rand, list(GENDER_WEIGHTS), list(GENDER_WEIGHTS.values())
+        )
+
+        for customer_id in range(1, self.volumes.customers + 1):
+            created = self.random_moment()
+            yield {
+                "id": customer_id,
+                "first_name": self.rand.choice(FIRST_NAMES),
+                "last_name": self.rand.choice(LAST_NAMES),
+                "email": constants.GENERATED_CUSTOMER_EMAIL.format(customer_id),
+                "gender": pick_gender(),
+                "year_of_birth": min(2008, max(1930, round(self.rand.gauss(1982, 15)))),
+                "status_id": pick_status(),
+                "created": created,
+                "created_by": CREATOR,
+                "last_modified": created,
+                "last_modified_by": CREATOR,
+            }
+
+    def served(self, created: datetime) -> Tuple[datetime, datetime, datetime]:
+        """Gets when a turn or appointment was expected to end, started and ended
+
+        Args:
+            created (datetime): When it was created
+
+        Returns:
+            Tuple[datetime, datetime, datetime]: Expected end, start and end
+        """
+        wait = timedelta(seconds=self.rand.expovariate(1 / MEAN_WAIT_SECONDS))
+        duration = timedelta(
+            seconds=self.rand.lognormvariate(math.log(MEDIAN_SERVICE_SECONDS), 0.5)
+        )
+        expected = created + timedelta(seconds=MEAN_WAIT_SECONDS) + duration
+        return expected, created + wait, created + wait + duration
+
+    def appointments(self) -> Iterator[dict]:
+        """Generates appointments, the latest ones in the future"""
+        pick_past_status = self.status_picker(
+            enums.StatusType.APPOINTMENT, PAST_STATUS_WEIGHTS
+        )
+        pick_pending_status = self.status_picker(
+            enums.StatusType.APPOINTMENT, PENDING_STATUS_WEIGHTS
+        )
+        future = self.volumes.years * 365 / APPOINTMENTS_HORIZON_DAYS
+
+        for appointment_id in range(1, self.volumes.appointments + 1):
+            scheduled = self.random_moment()
+
+            if self.rand.random() * (future + 1) < 1:
+                scheduled += timedelta(days=self.rand.randint(1, APPOINTMENTS_HORIZON_DAYS))
+
+            created = scheduled - timedelta(days=self.rand.randint(1, 30))
+            is_past = scheduled < self.end
+            _, started, ended = self.served(scheduled)
+            yield {
+                "id": appointment_id,
+                "customer_id": self.rand.randint(1, self.volumes.customers),
+                "service_id": self.pick_service(),
+                "location_id": self.rand.randint(1, self.volumes.locations),
+                "status_id": pick_past_status() if is_past else pick_pending_status(),
+                "service_ending_expected": scheduled,
+                "service_started": started if is_past else None,
+                "service_ended": ended if is_past else None,
+                "created": created,
+                "created_by": CREATOR,
+                "last_modified": ended if is_past else created,
+                "last_modified_by": CREATOR,
+            }
+
+    def service_turns(self) -> Iterator[dict]:
+        """Generates service turns, the ones of the last hour still pending,
+        numbered per service like the ones created through the API"""
+        pick_past_status = self.status_picker(enums.StatusType.TURN, PAST_STATUS_WEIGHTS)
+        pick_pending_status = self.status_picker(
+            enums.StatusType.TURN, PENDING_STATUS_WEIGHTS
+        )
+        pending_since = self.end - timedelta(hours=1)
+        tickets: Dict[int, int] = {}
+
+        for turn_id in range(1, self.volumes.service_turns + 1):
+            created = self.random_moment()
+            service_id = self.pick_service()
+            tickets[service_id] = tickets.get(service_id, 0) + 1
+            expected, started, ended = self.served(created)
+            is_pending = created >= pending_since
+            has_customer = self.volumes.customers and (
+                self.rand.random() < CUSTOMER_TURNS_RATIO
+            )
+            yield {
+                "id": turn_id,
+                "ticket_number": f"S{service_id}-{tickets[service_id]}",
+                "customer_name": f"{self.rand.choice(FIRST_NAMES)} {self.rand.choice(LAST_NAMES)}",
+                "customer_id": (
+                    self.rand.randint(1, self.volumes.customers) if has_customer else None
+                ),
+                "service_id": service_id,
+                "priority_id": self.pick_priority(),
+                "status_id": pick_pending_status() if is_pending else pick_past_status(),
+                "service_ending_expected": expected,
+                "service_started": None if is_pending else started,
+                "service_ended": None if is_pending else ended,
+                "created": created,
+                "created_by": CREATOR,
+                "last_modified": created if is_pending else ended,
+                "last_modified_by": CREATOR,
+            }
+
+    def tables(self) -> List[Tuple[Table, Callable[[], Iterator[dict]]]]:
+        """Gets the generated tables in dependency order
+
+        Returns:
+            List[Tuple[Table, Callable[[], Iterator[dict]]]]: Tables and their rows
+        """
+        return [
+            (models.Location.__table__, self.locations),
+            (models.Category.__table__, self.categories),
+            (models.Service.__table__, self.services),
+            (models.Customer.__table__, self.customers),
+            (models.Appointment.__table__, self.appointments),
+            (models.ServiceTurn.__table__, self.service_turns),
+        ]
+
+
+def get_cleared_tables(tables: List[Tuple[Table, Callable[[], Iterator[dict]]]]) -> List[Table]:
+    """Gets the tables emptied before generating, in deletion order
+
+    Besides the generated tables, the archived turns and the rollups are
+    derived from them, so they are cleared too and rebuilt from the new rows.
+
+    Args:
+        tables (List[Tuple[Table, Callable[[], Iterator[dict]]]]): Generated tables
+
+    Returns:
+        List[Table]: Tables to empty
+    """
+    return [
+        models.RollupChange.__table__,
+        models.RollupWatermark.__table__,
+        models.DailyStat.__table__,
+        models.ArchivedServiceTurn.__table__,
+    ] + [table for table, _ in reversed(tables)]
+
+
+def batched(rows: Iterator[dict], size: int) -> Iterator[List[dict]]:
+    """Groups rows in batches
+
+    Args:
+        rows (Iterator[dict]): Rows
+        size (int): Batch size
+
+    Yields:
+        List[dict]: Batch of rows
+    """
+    batch = []
+
+    for row in rows:
+        batch.append(row)
+
+        if len(batch) == size:
+            yield batch
+            batch = []
+
+    if batch:
+        yield batch
+
+
+def report(table: Table, rows: int, started: float) -> None:
+    """Prints the rows generated for a table and the pace
+
+    Args:
+        table (Table): Generated table
+        rows (int): Generated rows
+        started (float): When the generation of the table started
+    """
+    elapsed = time.perf_counter() - started
+    print(f"{table.name}: {rows} rows in {elapsed:.1f} s ({rows / max(elapsed, 1e-9):.0f} rows/s)")
+
+
+def insert_rows(
+    engine: Engine, generator: DataGenerator, batch_size: int = INSERT_BATCH_SIZE
+) -> None:
+    """Replaces the generated tables content with bulk inserts, emptying
+    the tables derived from them
+
+    Args:
+        engine (Engine): Database engine
+        generator (DataGenerator): Data generator
+        batch_size (int): Rows per insert
+    """
+    tables = generator.tables()
+
+    with engine.begin() as connection:
+        for table in get_cleared_tables(tables):
+            connection.execute(delete(table))
+
+    for table, rows in tables:
+        started = time.perf_counter()
+        count = 0
+
+        for batch in batched(rows(), batch_size):
+            with engine.begin() as connection:
+                connection.execute(insert(table), batch)
+
+            count += len(batch)
+
+        report(table, count, started)
+
+
+def format_value(value) -> str:
+    """Formats a value for LOAD DATA
+
+    Args:
+        value (Any): Value
+
+    Returns:
+        str: Formatted value
+    """
+    if value is None:
+        return NULL_VALUE
+
+    if isinstance(value, datetime):
+        return value.strftime(DATETIME_FORMAT)
+
+    if isinstance(value, bool):
+        return str(int(value))
+
+    return str(value)
+
+
+def write_load_files(generator: DataGenerator, directory: str) -> None:
+    """Writes a CSV file per table and a script loading them with LOAD DATA
+
+    Args:
+        generator (DataGenerator): Data generator
+        directory (str): Output directory
+    """
+    os.makedirs(directory, exist_ok=True)
+    tables = generator.tables()
+    statements = ["SET FOREIGN_KEY_CHECKS = 0;"]
+    statements += [f"DELETE FROM {table.name};" for table in get_cleared_tables(tables)]
+
+    for table, rows in tables:
+        started = time.perf_counter()
+        path = os.path.abspath(os.path.join(directory, f"{table.name}.csv"))
+        count = 0
+        columns = None
+
+        with open(path, "w", newline="", encoding="utf-8") as csv_file:
+            writer = csv.writer(csv_file, lineterminator="\n")
+
+            for row in rows():
+                if columns is None:
+                    columns = list(row)
+
+                writer.writerow([format_value(row[column]) for column in columns])
+                count += 1
+
+        statements.append(
+            f"LOAD DATA LOCAL INFILE '{path}' INTO TABLE {table.name} "
+            "CHARACTER SET utf8mb4 FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' "
+            f"LINES TERMINATED BY '\\n' ({', '.join(columns or [])});"
+        )
+        report(table, count, started)
+
+    statements.append("SET FOREIGN_KEY_CHECKS = 1;")
+
+    with open(os.path.join(directory, "load.sql"), "w", encoding="utf-8") as script:
+        script.write("\n".join(statements) + "\n")
+
+
+def parse_args() -> argparse.Namespace:
+    """Parses the command line arguments
+
+    Returns:
+        argparse.Namespace: The parsed arguments
+    """
+    defaults = Volumes()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+
+    for name, value in defaults._asdict().items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(value), default=value)
+
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=INSERT_BATCH_SIZE)
+    parser.add_argument(
+        "--output-dir",
+        help="Writes CSV files and a LOAD DATA script instead of inserting the rows",
+    )
+    args = parser.parse_args()
+
+    try:
+        check_volumes(get_volumes(args))
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    return args
+
+
+def get_volumes(args: argparse.Namespace) -> Volumes:
+    """Gets the volumes of the command line arguments
+
+    Args:
+        args (argparse.Namespace): The parsed arguments
+
+    Returns:
+        Volumes: Amount of rows to generate per table
+    """
+    return Volumes(**{name: getattr(args, name) for name in Volumes._fields})
+
+
+def main() -> None:
+    """Generates the data with the command line volumes"""
+    args = parse_args()
+    generator = DataGenerator(get_volumes(args), args.seed)
+
+    if args.output_dir:
+        write_load_files(generator, args.output_dir)
+        return
+
+    engine = setup.get_engine()
+    create_schema(engine)
+    insert_rows(engine, generator, args.batch_size)
@@ -0,0 +1,110 @@
+"""Synthetic data generator test cases
+"""
+
+import unittest
+from datetime import datetime
+from sqlalchemy import func, select
+from . import generator
+from . import memory
+from . import models as db_models
+from ..enums import StatusType
+
+# pylint: disable=E1102
+
+VOLUMES = generator.Volumes(
+    locations=2,
+    categories=2,
+    services=3,
+    customers=5,
+    appointments=10,
+    service_turns=30,
+    years=0.1,
+)
+
+
+class CheckVolumesTest(unittest.TestCase):
+    """Volumes validation test cases
+
+    Args:
+        unittest (unittest.TestCase): TestCase base class
+    """
+
+    def test_valid_volumes(self):
+        """Fractional years and tables without rows are accepted
+        """
+        generator.check_volumes(VOLUMES)
+        generator.check_volumes(VOLUMES._replace(customers=0, appointments=0))
+        self.assertIsInstance(generator.Volumes().years, float)
+
+    def test_invalid_volumes(self):
+        """Rows that would reference no rows and empty periods are rejected
+        """
+        for volumes in (
+            VOLUMES._replace(customers=0),
+            VOLUMES._replace(services=0),
+            VOLUMES._replace(categories=0),
+            VOLUMES._replace(locations=0),
+            VOLUMES._replace(years=0.0),
+            VOLUMES._replace(service_turns=-1),
+        ):
+            with self.assertRaises(ValueError):
+                generator.DataGenerator(volumes)
+
+
+class InsertRowsTest(unittest.TestCase):
+    """Bulk generation test cases over an in-memory database
+
+    Args:
+        unittest (unittest.TestCase): TestCase base class
+    """
+
+    def setUp(self):
+        self.session = memory.create_session()
+        self.engine = self.session.bind
+
+    def tearDown(self):
+        self.session.close()
+
+    def count(self, model) -> int:
+        """Counts the rows of a table
+
+        Args:
+            model (Any): Database model
+
+        Returns:
+            int: Rows in the table
+        """
+        return self.session.scalar(select(func.count()).select_from(model))
+
+    def test_regenerate(self):
+        """Generating again replaces the archive and the rollups of the previous data
+        """
+        generator.insert_rows(self.engine, generator.DataGenerator(VOLUMES))
+        self.session.add(db_models.ArchivedServiceTurn(id=VOLUMES.service_turns + 1))
+        self.session.add(db_models.DailyStat(type=StatusType.TURN, count=1))
+        self.session.add(db_models.RollupChange(type=StatusType.TURN))
+        self.session.add(
+            db_models.RollupWatermark(type=StatusType.TURN, last_modified=datetime.now())
+        )
+        self.session.get(db_models.Service, 1).archived_turns = 7
+        self.session.commit()
+
+        generator.insert_rows(self.engine, generator.DataGenerator(VOLUMES, seed=2))
+        self.session.expire_all()
+
+        self.assertEqual(self.count(db_models.ServiceTurn), VOLUMES.service_turns)
+        self.assertEqual(self.count(db_models.Appointment), VOLUMES.appointments)
+
+        for model in (
+            db_models.ArchivedServiceTurn,
+            db_models.DailyStat,
+            db_models.RollupChange,
+            db_models.RollupWatermark,
+        ):
+            self.assertEqual(self.count(model), 0)
+
+        self.assertEqual(self.session.get(db_models.Service, 1).archived_turns, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,10 +2,13 @@
 """
 
 from typing import Callable
+import logging
 import re
 from sqlalchemy.exc import IntegrityError
 from app import constants, exceptions
 
+logger = logging.getLogger(__name__)
+
 
 def is_a_duplicate_exception(exc: Exception) -> bool:
     """Checks if a thrown exception was due to a duplicate found
@@ -57,7 +60,7 @@ def handle_session_rollback(func: Callable):
         try:
             return func(*args, **kwargs)
         except:
-            print(args[0])
+            logger.warning("Error in %s", func.__qualname__, exc_info=True)
             # main.session.rollback()
             raise
 
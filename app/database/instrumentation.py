@@ -0,0 +1,80 @@
+"""Database instrumentation
+
+Counts the statements and the time spent on them by the current request and
+logs the slow ones.
+"""
+
+import logging
+import time
+from typing import Any
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app import constants, environment, metrics
+
+# pylint: disable=R0913
+# pylint: disable=W0613
+
+logger = logging.getLogger(__name__)
+
+
+def get_parameters_shape(parameters: Any, executemany: bool) -> Any:
+    """Describes the bound parameters of a statement without their values
+
+    Args:
+        parameters (Any): Bound parameters
+        executemany (bool): Whether the statement runs for many parameter sets
+
+    Returns:
+        Any: Parameter types by name or position
+    """
+    if executemany:
+        first = get_parameters_shape(parameters[0], False) if parameters else None
+        return {"sets": len(parameters), "shape": first}
+
+    if isinstance(parameters, dict):
+        return {name: type(value).__name__ for name, value in parameters.items()}
+
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+
+    return None
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    """Marks the start of a statement execution"""
+    conn.info.setdefault(constants.QUERY_START_KEY, []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    """Accounts the statement to the current request and logs it when slow"""
+    elapsed = time.perf_counter() - conn.info[constants.QUERY_START_KEY].pop()
+    stats = metrics.request_stats.get()
+
+    if stats is not None:
+        stats.queries += 1
+        stats.database_time += elapsed
+
+    if elapsed * 1000 >= environment.slow_query_threshold:
+        logger.warning(
+            "Slow query took %.1f ms",
+            elapsed * 1000,
+            extra={
+                "statement": statement[: constants.SLOW_QUERY_STATEMENT_MAX_LENGTH],
+                "parameters": get_parameters_shape(parameters, executemany),
+                "route": stats.route if stats else None,
+            },
+        )
+
+
+@event.listens_for(Engine, "handle_error")
+def handle_error(context):
+    """Discards the start of a failed statement execution"""
+    if context.connection is None:
+        return
+
+    starts = context.connection.info.get(constants.QUERY_START_KEY)
+
+    if starts:
+        starts.pop()
@@ -0,0 +1,81 @@
+"""Database relationship loaders
+
+Eager loading options that populate every relationship used by the
+API mappers in a single query.
+"""
+
+from typing import List
+from sqlalchemy.orm import joinedload
+from sqlalchemy.orm.interfaces import LoaderOption
+from . import models
+
+
+def category_options() -> List[LoaderOption]:
+    """Gets the loading options needed to map a category
+
+    Returns:
+        List[LoaderOption]: Loader options
+    """
+    return [joinedload(models.Category.status)]
+
+
+def service_options() -> List[LoaderOption]:
+    """Gets the loading options needed to map a service
+
+    Returns:
+        List[LoaderOption]: Loader options
+    """
+    return [
+        joinedload(models.Service.status),
+        joinedload(models.Service.category).options(*category_options()),
+    ]
+
+
+def customer_options() -> List[LoaderOption]:
+    """Gets the loading options needed to map a customer
+
+    Returns:
+        List[LoaderOption]: Loader options
+    """
+    return [joinedload(models.Customer.status)]
+
+
+def queue_options() -> List[LoaderOption]:
+    """Gets the loading options needed to map a queue
+
+    Returns:
+        List[LoaderOption]: Loader options
+    """
+    return [joinedload(models.Queue.status), joinedload(models.Queue.priority)]
+
+
+def appointment_options() -> List[LoaderOption]:
+    """Gets the loading options needed to map an appointment
+
+    Returns:
+        List[LoaderOption]: Loader options
+    """
+    return [
+        joinedload(models.Appointment.status),
+        joinedload(models.Appointment.service).options(*service_options()),
+        joinedload(models.Appointment.customer).options(*customer_options()),
+        joinedload(models.Appointment.location),
+    ]
+
+
+def service_turn_options(model: type = models.ServiceTurn) -> List[LoaderOption]:
+    """Gets the loading options needed to map a service turn
+
+    Args:
+        model (type): ServiceTurn or ArchivedServiceTurn
+
+    Returns:
+        List[LoaderOption]: Loader options
+    """
+    return [
+        joinedload(model.status),
+        joinedload(model.priority),
+        joinedload(model.service).options(*service_options()),
+        joinedload(model.appointment).options(*appointment_options()),
+        joinedload(model.customer).options(*customer_options()),
+    ]
@@ -1,15 +1,24 @@
 """Database entry
 """
 
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session
-from .setup import Base, engine, Session as DBSession
+from . import models  # pylint: disable=W0611
+from .setup import Base, get_engine, Session as DBSession
 
-Base.metadata.create_all(engine)
+
+def create_schema(engine: Engine = None) -> None:
+    """Creates the missing tables of every model
+
+    Args:
+        engine (Engine, optional): Database engine, the application one by default
+    """
+    Base.metadata.create_all(engine or get_engine())
 
 
 def get_session() -> Session:
     """Gets a database session"""
-    session = DBSession()
+    session = DBSession(bind=get_engine())
     try:
         yield session
     finally:
@@ -0,0 +1,22 @@
+"""In-memory databases for the unit tests
+"""
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+from . import seed
+from . import setup
+
+
+def create_session() -> Session:
+    """Creates a session of a new in-memory SQLite database seeded with the
+    reference data
+
+    Returns:
+        Session: Database session
+    """
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    seed.run_bulk(engine=engine)
+    return setup.Session(bind=engine)
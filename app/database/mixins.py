@@ -1,35 +1,42 @@
 """Database mixins
 """
 
-from typing import Type, TypeVar, List, Callable
-from sqlalchemy import select
+from typing import Type, TypeVar, List, Dict, Callable, Iterable, Iterator
+from sqlalchemy import select, update, delete
 from sqlalchemy.sql import Select
 from sqlalchemy.exc import NoResultFound
 from sqlalchemy.orm import Session
-from app import exceptions
+from app import constants, exceptions
 from . import setup
 from . import helpers
 
 
 T = TypeVar("T", bound=setup.Base)
 
+# pylint: disable=R0913
+
 
 class ModelMethodsMixin:
     """Model Methods Mixin"""
 
     @classmethod
-    def find_by_id(cls: Type[T], session: Session, entity_id: int) -> T:
+    def find_by_id(
+        cls: Type[T], session: Session, entity_id: int, options: Iterable = ()
+    ) -> T:
         """Gets an entity by id
 
         Args:
             session (Session): Database session
             entity_id (int): ID of entity
+            options (Iterable): Loader options applied to the query
 
         Returns:
             T: The matched entity
         """
         try:
-            statement = select(cls).where(cls.id == entity_id).limit(1)
+            statement = (
+                select(cls).where(cls.id == entity_id).options(*options).limit(1)
+            )
             return session.scalars(statement).one()
         except NoResultFound as exc:
             session.rollback()
@@ -38,6 +45,27 @@ class ModelMethodsMixin:
             session.rollback()
             raise
 
+    @classmethod
+    def find_by_ids(
+        cls: Type[T], session: Session, entity_ids: List[int], options: Iterable = ()
+    ) -> Dict[int, T]:
+        """Gets the entities matching any of the ids with a single query
+
+        Args:
+            session (Session): Database session
+            entity_ids (List[int]): IDs of entities
+            options (Iterable): Loader options applied to the query
+
+        Returns:
+            Dict[int, T]: The matched entities by id
+        """
+        try:
+            statement = select(cls).where(cls.id.in_(entity_ids)).options(*options)
+            return {item.id: item for item in session.scalars(statement)}
+        except:
+            session.rollback()
+            raise
+
     @classmethod
     def find_one(
         cls: Type[T], session: Session, filter_selection: Callable[[Select], Select]
@@ -88,6 +116,50 @@ class ModelMethodsMixin:
             session.rollback()
             raise
 
+    @classmethod
+    def find_streamed(
+        cls: Type[T],
+        session: Session,
+        filter_selection: Callable[[Select], Select] = None,
+        options: Iterable = (),
+        batch_size: int = constants.STREAM_BATCH_SIZE,
+    ) -> Iterator[T]:
+        """Find many items fetching them from the database in batches,
+        so that only one batch of entities is held in memory at a time
+
+        Every batch is a query of its own, continuing from the last id of
+        the previous one, since drivers like mysqlconnector buffer the whole
+        result of a query on the client, and the items come in order of id.
+
+        Args:
+            session (Session): Database session
+            filter_selection (Callable[[Any], Any]): Filter func
+            options (Iterable): Loader options applied to the query
+            batch_size (int): Number of rows fetched per batch
+
+        Yields:
+            T: The matched entities
+        """
+        selection = select(cls).options(*options).order_by(cls.id).limit(batch_size)
+
+        if callable(filter_selection):
+            selection = filter_selection(selection)
+
+        batch = selection
+
+        try:
+            while True:
+                items = session.scalars(batch).all()
+                yield from items
+
+                if len(items) < batch_size:
+                    return
+
+                batch = selection.where(cls.id > items[-1].id)
+        except:
+            session.rollback()
+            raise
+
     @classmethod
     def find_paginated(
         cls: Type[T],
@@ -95,6 +167,7 @@ class ModelMethodsMixin:
         limit: int,
         offset: int,
         filter_selection: Callable[[Select], Select] = None,
+        options: Iterable = (),
     ) -> List[T]:
         """Find many items in a paginated manner
 
@@ -103,12 +176,13 @@ class ModelMethodsMixin:
             limit (int): total number of items to be returned
             offset (int): starting offset position
             filter_selection (Callable[[Any], Any]): Filter func
+            options (Iterable): Loader options applied to the query
 
         Returns:
             List[T]: The matched entities
         """
         try:
-            selection = select(cls)
+            selection = select(cls).options(*options)
 
             if callable(filter_selection):
                 selection = filter_selection(selection)
@@ -136,36 +210,80 @@ class ModelMethodsMixin:
         return item
 
     @classmethod
-    def update_by_id(cls: Type[T], session: Session, entity_id: int, data: dict) -> T:
-        """Gets an entity by id
+    def get_column_values(cls: Type[T], data: dict) -> dict:
+        """Gets the values from data dictionary that can be written to the table
 
         Args:
-            session (Session): Database session
-            entity_id (int): ID of entity
-            data (dict): Update data
+            data (dict): Data dictionary
 
         Returns:
-            T: The updated entity
+            dict: The column values, excluding the id and empty values
         """
-        item = cls.find_by_id(session, entity_id)
-        item.set_values(helpers.snake_case_props(data))
-        item.update(session)
-        return item
+        return {
+            name: data[name]
+            for name in data
+            if name != "id"
+            and (name in cls.__table__.columns)
+            and not data[name] is None
+        }
 
     @classmethod
-    def delete_by_id(cls: Type[T], session: Session, entity_id: int) -> T:
-        """Deletes an entity by id
+    @helpers.handle_duplicate_error
+    def update_by_id(cls: Type[T], session: Session, entity_id: int, data: dict) -> None:
+        """Updates an entity by id with a single UPDATE statement
 
         Args:
             session (Session): Database session
             entity_id (int): ID of entity
+            data (dict): Update data
+        """
+        values = cls.get_column_values(helpers.snake_case_props(data))
 
-        Returns:
-            T: The deleted entity
+        if not values:
+            cls.find_by_id(session, entity_id)
+            return
+
+        statement = (
+            update(cls)
+            .where(cls.id == entity_id)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+
+        try:
+            result = session.execute(statement)
+            session.commit()
+        except:
+            session.rollback()
+            raise
+
+        if result.rowcount == 0:
+            raise exceptions.NOT_FOUND_ERROR
+
+    @classmethod
+    @helpers.handle_duplicate_error
+    def delete_by_id(cls: Type[T], session: Session, entity_id: int) -> None:
+        """Deletes an entity by id with a single DELETE statement
+
+        Args:
+            session (Session): Database session
+            entity_id (int): ID of entity
         """
-        item = cls.find_by_id(session, entity_id)
-        item.delete(session)
-        return item
+        statement = (
+            delete(cls)
+            .where(cls.id == entity_id)
+            .execution_options(synchronize_session=False)
+        )
+
+        try:
+            result = session.execute(statement)
+            session.commit()
+        except:
+            session.rollback()
+            raise
+
+        if result.rowcount == 0:
+            raise exceptions.NOT_FOUND_ERROR
 
     def to_dict(self: T) -> dict:
         """Transform the item into dictionary
@@ -184,13 +302,8 @@ class ModelMethodsMixin:
         Args:
             data (dict): Data dictionary
         """
-        for name in data:
-            if (
-                name != "id"
-                and (name in self.__table__.columns)
-                and not data[name] is None
-            ):
-                setattr(self, name, data[name])
+        for name, value in self.get_column_values(data).items():
+            setattr(self, name, value)
 
     @helpers.handle_duplicate_error
     @helpers.handle_session_rollback
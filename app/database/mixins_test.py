@@ -0,0 +1,82 @@
+"""Model methods mixin test cases
+"""
+
+import unittest
+from fastapi import HTTPException
+from sqlalchemy import event
+from . import memory
+from . import models as db_models
+
+MISSING_ID = 999999
+
+
+class ModelMethodsMixinTest(unittest.TestCase):
+    """Single statement updates and deletes test cases over an in-memory database
+
+    Args:
+        unittest (unittest.TestCase): TestCase base class
+    """
+
+    def setUp(self):
+        self.session = memory.create_session()
+        self.location = db_models.Location(name="Test", code="TEST")
+        self.session.add(self.location)
+        self.session.commit()
+        self.location_id = self.location.id
+        self.statements = []
+        event.listen(self.session.bind, "before_cursor_execute", self.record_statement)
+
+    def tearDown(self):
+        event.remove(self.session.bind, "before_cursor_execute", self.record_statement)
+        self.session.close()
+
+    def record_statement(self, *args) -> None:
+        """Records the statements sent to the database
+
+        Args:
+            args (tuple): Connection, cursor, statement and its parameters
+        """
+        self.statements.append(args[2].split()[0])
+
+    def assert_not_found(self, method, *args) -> None:
+        """Checks that a method raises the not found error
+
+        Args:
+            method (Callable): Model method
+            args (tuple): Arguments after the session
+        """
+        with self.assertRaises(HTTPException) as context:
+            method(self.session, *args)
+
+        self.assertEqual(context.exception.status_code, 404)
+
+    def test_update_by_id(self):
+        """An update is a single UPDATE statement
+        """
+        db_models.Location.update_by_id(self.session, self.location_id, {"address": "Main"})
+
+        self.assertEqual(self.statements, ["UPDATE"])
+        self.assertEqual(
+            self.session.get(db_models.Location, self.location_id, populate_existing=True).address,
+            "Main",
+        )
+
+    def test_update_missing(self):
+        """Updating a missing entity raises the not found error
+        """
+        self.assert_not_found(db_models.Location.update_by_id, MISSING_ID, {"address": "Main"})
+        self.assert_not_found(db_models.Location.update_by_id, MISSING_ID, {})
+        self.assertEqual(self.statements, ["UPDATE", "SELECT"])
+
+    def test_delete_by_id(self):
+        """A delete is a single DELETE statement and a second one finds nothing
+        """
+        db_models.Location.delete_by_id(self.session, self.location_id)
+
+        self.assertEqual(self.statements, ["DELETE"])
+        self.assert_not_found(db_models.Location.delete_by_id, self.location_id)
+        self.assert_not_found(db_models.Location.find_by_id, self.location_id)
+
+
+if __name__ == "__main__":
+    unittest.main()
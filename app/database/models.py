@@ -3,16 +3,18 @@
 
 from sqlalchemy import (
     Column,
+    Date,
     DateTime,
     Integer,
     String,
     Enum,
     Boolean,
     ForeignKey,
+    Index,
     UniqueConstraint,
 )
 from sqlalchemy.sql import func
-from sqlalchemy.orm import mapped_column, relationship, Session
+from sqlalchemy.orm import declared_attr, mapped_column, relationship, Session
 from app import enums, exceptions
 from . import setup
 from .mixins import ModelMethodsMixin
@@ -131,6 +133,7 @@ class Service(ModelMethodsMixin, setup.Base):
     status = relationship("Status")
     category_id = mapped_column(ForeignKey("categories.id"))
     category = relationship("Category")
+    archived_turns = Column(Integer, default=0, server_default="0")
     __table_args__ = (
         UniqueConstraint("name", name="service_name_unique"),
         UniqueConstraint("code", name="service_code_unique"),
@@ -190,18 +193,15 @@ class Appointment(ModelMethodsMixin, setup.Base):
     customer = relationship("Customer")
     location_id = mapped_column(ForeignKey("locations.id"))
     location = relationship("Location")
+    __table_args__ = (
+        Index("appointment_last_modified", "last_modified"),
+        Index("appointment_service_slot", "service_id", "service_ending_expected"),
+    )
 
 
-class ServiceTurn(ModelMethodsMixin, setup.Base):
-    """Service turns are customer's
-       or visitor's time to be served by a service agent
-       or at a service counter on a specific.
-
-    Args:
-        setup (Base): Database base model
-    """
+class ServiceTurnMixin:
+    """Columns and relationships shared by the live and the archived service turns"""
 
-    __tablename__ = "service_turns"
     id = Column(Integer, primary_key=True)
     ticket_number = Column(String(30))
     customer_name = Column(String(50))
@@ -213,17 +213,69 @@ class ServiceTurn(ModelMethodsMixin, setup.Base):
     created = Column(DateTime(timezone=True), server_default=func.now())
     last_modified = Column(DateTime(timezone=True), onupdate=func.now())
     status_id = mapped_column(ForeignKey("statuses.id"))
-    status = relationship("Status")
     service_id = mapped_column(ForeignKey("services.id"))
-    service = relationship("Service")
     priority_id = mapped_column(ForeignKey("priorities.id"))
-    priority = relationship("Priority")
     appointment_id = mapped_column(ForeignKey("appointments.id"))
-    appointment = relationship("Appointment")
     customer_id = mapped_column(ForeignKey("customers.id"))
-    customer = relationship("Customer")
+
+    @declared_attr
+    def status(self):
+        """Status of the turn"""
+        return relationship("Status")
+
+    @declared_attr
+    def service(self):
+        """Service of the turn"""
+        return relationship("Service")
+
+    @declared_attr
+    def priority(self):
+        """Priority of the turn"""
+        return relationship("Priority")
+
+    @declared_attr
+    def appointment(self):
+        """Appointment the turn was created for"""
+        return relationship("Appointment")
+
+    @declared_attr
+    def customer(self):
+        """Customer of the turn"""
+        return relationship("Customer")
+
+
+class ServiceTurn(ServiceTurnMixin, ModelMethodsMixin, setup.Base):
+    """Service turns are customer's
+       or visitor's time to be served by a service agent
+       or at a service counter on a specific.
+
+    Args:
+        setup (Base): Database base model
+    """
+
+    __tablename__ = "service_turns"
     __table_args__ = (
         UniqueConstraint("ticket_number", name="turn_ticket_number_unique"),
+        Index("turn_created", "created"),
+        Index("turn_last_modified", "last_modified"),
+        Index("turn_appointment", "appointment_id"),
+    )
+
+
+class ArchivedServiceTurn(ServiceTurnMixin, ModelMethodsMixin, setup.Base):
+    """Service turns in a terminal status moved out of the live table
+       once they were left untouched for some days.
+
+    Args:
+        setup (Base): Database base model
+    """
+
+    __tablename__ = "service_turns_archive"
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    __table_args__ = (
+        Index("archived_turn_created", "created"),
+        Index("archived_turn_customer", "customer_id"),
+        Index("archived_turn_appointment", "appointment_id"),
     )
 
 
@@ -246,3 +298,56 @@ class Queue(ModelMethodsMixin, setup.Base):
         UniqueConstraint("name", name="queue_name_unique"),
         UniqueConstraint("code", name="queue_code_unique"),
     )
+
+
+class DailyStat(ModelMethodsMixin, setup.Base):
+    """Daily rollups of the turns or appointments
+       of a location, service, priority and status.
+
+    Args:
+        setup (Base): Database base model
+    """
+
+    __tablename__ = "daily_stats"
+    id = Column(Integer, primary_key=True)
+    type = Column(Enum(enums.StatusType))
+    day = Column(Date)
+    location_id = mapped_column(ForeignKey("locations.id"))
+    service_id = mapped_column(ForeignKey("services.id"))
+    priority_id = mapped_column(ForeignKey("priorities.id"))
+    status_id = mapped_column(ForeignKey("statuses.id"))
+    count = Column(Integer)
+    wait_count = Column(Integer)
+    wait_seconds = Column(Integer)
+    wait_histogram = Column(String(500))
+    service_count = Column(Integer)
+    service_seconds = Column(Integer)
+    service_histogram = Column(String(500))
+    updated = Column(DateTime(timezone=True))
+    __table_args__ = (Index("daily_stat_type_day", "type", "day"),)
+
+
+class RollupWatermark(ModelMethodsMixin, setup.Base):
+    """Last modification rolled up of the turns or appointments
+
+    Args:
+        setup (Base): Database base model
+    """
+
+    __tablename__ = "rollup_watermarks"
+    type = Column(Enum(enums.StatusType), primary_key=True)
+    last_modified = Column(DateTime(timezone=True))
+    frozen_before = Column(Date)
+
+
+class RollupChange(ModelMethodsMixin, setup.Base):
+    """Day a turn or appointment was moved out of, to be rolled up again
+
+    Args:
+        setup (Base): Database base model
+    """
+
+    __tablename__ = "rollup_changes"
+    id = Column(Integer, primary_key=True)
+    type = Column(Enum(enums.StatusType))
+    day = Column(Date)
@@ -1,20 +1,177 @@
 """Database seed script
 """
 
+import json
 import os
-from sqlalchemyseed import load_entities_from_json
-from sqlalchemyseed import Seeder
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+from sqlalchemy import DateTime, Enum, Table, delete, insert
+from sqlalchemy.engine import Connection, Engine
 from . import main
+from . import models
+from . import setup
+
+DATA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "data.json")
+BULK_BATCH_SIZE = 10000
 
 
 def run():
     """
     Run the seed script
     """
+    # pylint: disable=C0415
+    # pylint: disable=E0401
+    from sqlalchemyseed import load_entities_from_json
+    from sqlalchemyseed import Seeder
 
-    dir_name = os.path.dirname(os.path.abspath(__file__))
     session = next(main.get_session())
     seeder = Seeder(session)
-    entities = load_entities_from_json(f"{dir_name}/data/data.json")
+    entities = load_entities_from_json(DATA_FILE)
     seeder.seed(entities)
     session.commit()
+
+
+def get_converters(table: Table) -> Dict[str, Callable]:
+    """Gets the functions converting fixture values to the types of the columns
+
+    Args:
+        table (Table): Destination table
+
+    Returns:
+        Dict[str, Callable]: Converter by column name for the columns needing one
+    """
+    converters = {}
+
+    for column in table.columns:
+        if isinstance(column.type, DateTime):
+            converters[column.name] = parse_datetime
+        elif isinstance(column.type, Enum) and column.type.enum_class:
+            converters[column.name] = column.type.enum_class
+
+    return converters
+
+
+def parse_datetime(value: Any) -> Any:
+    """Parses fixture datetimes such as 2023-10-20 03:14:07
+
+    Args:
+        value (Any): Fixture value
+
+    Returns:
+        Any: Parsed datetime or the value when it isn't a string
+    """
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+def convert_rows(table: Table, rows: List[dict]) -> List[dict]:
+    """Converts the values of fixture rows to the types of the table columns
+
+    Args:
+        table (Table): Destination table
+        rows (List[dict]): Fixture rows
+
+    Returns:
+        List[dict]: Rows ready to be inserted
+    """
+    converters = get_converters(table)
+
+    if not converters:
+        return rows
+
+    return [
+        {
+            name: converters[name](value) if name in converters else value
+            for name, value in row.items()
+        }
+        for row in rows
+    ]
+
+
+def load_fixtures(path: str) -> Dict[Table, List[dict]]:
+    """Loads the rows of a fixture file by table
+
+    Args:
+        path (str): Fixture file in the sqlalchemyseed format
+
+    Returns:
+        Dict[Table, List[dict]]: Rows by table
+    """
+    with open(path, encoding="utf-8") as fixture_file:
+        entities = json.load(fixture_file)
+
+    rows = {}
+
+    for entity in entities:
+        table = getattr(models, entity["model"].rsplit(".", 1)[-1]).__table__
+        data = entity["data"] if isinstance(entity["data"], list) else [entity["data"]]
+        rows.setdefault(table, []).extend(data)
+
+    return rows
+
+
+def truncate(connection: Connection, tables: List[Table]) -> None:
+    """Removes every row of the tables
+
+    Args:
+        connection (Connection): Database connection
+        tables (List[Table]): Tables in dependency order
+    """
+    if connection.dialect.name == "mysql":
+        connection.exec_driver_sql("SET FOREIGN_KEY_CHECKS = 0")
+
+        for table in tables:
+            connection.exec_driver_sql(f"TRUNCATE TABLE {table.name}")
+
+        connection.exec_driver_sql("SET FOREIGN_KEY_CHECKS = 1")
+        return
+
+    for table in reversed(tables):
+        connection.execute(delete(table))
+
+
+def run_bulk(
+    path: str = DATA_FILE,
+    truncate_first: bool = False,
+    engine: Optional[Engine] = None,
+    batch_size: int = BULK_BATCH_SIZE,
+) -> Dict[str, int]:
+    """Seeds a fixture file with Core executemany inserts in dependency order
+
+    Missing tables are created and everything is inserted in a single
+    transaction.
+
+    Args:
+        path (str): Fixture file in the sqlalchemyseed format
+        truncate_first (bool): Whether to empty every table first
+        engine (Engine, optional): Database engine, the application one by default
+        batch_size (int): Rows per executemany
+
+    Returns:
+        Dict[str, int]: Inserted rows by table name
+    """
+    fixtures = load_fixtures(path)
+    tables = setup.Base.metadata.sorted_tables
+    inserted = {}
+    started = time.perf_counter()
+
+    engine = engine or setup.get_engine()
+    main.create_schema(engine)
+
+    with engine.begin() as connection:
+        if truncate_first:
+            truncate(connection, tables)
+
+        for table in tables:
+            rows = convert_rows(table, fixtures.get(table, []))
+
+            for offset in range(0, len(rows), batch_size):
+                connection.execute(insert(table), rows[offset : offset + batch_size])
+
+            if rows:
+                inserted[table.name] = len(rows)
+
+    elapsed = time.perf_counter() - started
+    total = sum(inserted.values())
+    print(f"Seeded {total} rows in {elapsed:.2f} s ({total / max(elapsed, 1e-9):.0f} rows/s)")
+    return inserted
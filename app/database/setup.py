@@ -1,11 +1,22 @@
 """Database setup
 """
 
+from functools import lru_cache
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.environment import database_connection_string
 
-engine = create_engine(database_connection_string)
 Base = declarative_base()
-Session = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+Session = sessionmaker(autocommit=False, autoflush=False)
+
+
+@lru_cache(maxsize=None)
+def get_engine() -> Engine:
+    """Gets the application engine, created on first use
+
+    Returns:
+        Engine: Database engine
+    """
+    return create_engine(database_connection_string)
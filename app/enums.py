@@ -15,6 +15,37 @@ class StatusType(Enum):
     APPOINTMENT = "APPOINTMENT"
 
 
+class ExportFormat(Enum):
+    """Diferent formats of exported data"""
+
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+class ReportPeriod(Enum):
+    """Diferent periods statistics are reported by"""
+
+    DAY = "day"
+    MONTH = "month"
+
+
+class ReportDimension(Enum):
+    """Diferent dimensions statistics can be grouped by"""
+
+    SERVICE = "service"
+    LOCATION = "location"
+    PRIORITY = "priority"
+    STATUS = "status"
+
+
+class AnalyticsDimension(Enum):
+    """Diferent dimensions the turn analytics can be grouped by"""
+
+    SERVICE = "service"
+    LOCATION = "location"
+    HOUR = "hour"
+
+
 class Gender(Enum):
     """Diferent types of genders"""
 
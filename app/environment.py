@@ -17,3 +17,18 @@ allowed_api_keys = os.getenv(
 )
 
 database_connection_string = os.getenv(constants.DB_CONNECTION_STRING_ENV_NAME)
+
+log_level = os.getenv(constants.LOG_LEVEL_ENV_NAME, constants.DEFAULT_LOG_LEVEL)
+log_levels = os.getenv(constants.LOG_LEVELS_ENV_NAME, constants.EMPTY_VALUE)
+
+debug = os.getenv(constants.DEBUG_ENV_NAME, constants.EMPTY_VALUE).lower() in (
+    constants.TRUE_VALUES
+)
+slow_query_threshold = float(
+    os.getenv(constants.SLOW_QUERY_THRESHOLD_ENV_NAME)
+    or constants.DEFAULT_SLOW_QUERY_THRESHOLD
+)
+
+cold_storage_dir = os.getenv(
+    constants.COLD_STORAGE_DIR_ENV_NAME, constants.DEFAULT_COLD_STORAGE_DIR
+)
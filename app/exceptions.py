@@ -53,6 +53,22 @@ INVALID_STATUS_TYPE_ERROR = HTTPException(
     },
 )
 
+INVALID_FIELDS_ERROR = HTTPException(
+    status_code=status.HTTP_400_BAD_REQUEST,
+    detail={
+        "type": constants.INVALID_FIELDS_ERROR_TYPE,
+        "message": constants.INVALID_FIELDS_ERROR_MESSAGE,
+    },
+)
+
+INVALID_IDS_ERROR = HTTPException(
+    status_code=status.HTTP_400_BAD_REQUEST,
+    detail={
+        "type": constants.INVALID_IDS_ERROR_TYPE,
+        "message": constants.INVALID_IDS_ERROR_MESSAGE,
+    },
+)
+
 CONFLICT_ERROR = HTTPException(
     status_code=status.HTTP_409_CONFLICT,
     detail={
@@ -60,3 +76,59 @@ CONFLICT_ERROR = HTTPException(
         "message": constants.CONFLICT_ERROR_MESSAGE,
     },
 )
+
+PROFILER_BUSY_ERROR = HTTPException(
+    status_code=status.HTTP_409_CONFLICT,
+    detail={
+        "type": constants.PROFILER_BUSY_ERROR_TYPE,
+        "message": constants.PROFILER_BUSY_ERROR_MESSAGE,
+    },
+)
+
+NO_PENDING_TURNS_ERROR = HTTPException(
+    status_code=status.HTTP_404_NOT_FOUND,
+    detail={
+        "type": constants.NO_PENDING_TURNS_ERROR_TYPE,
+        "message": constants.NO_PENDING_TURNS_ERROR_MESSAGE,
+    },
+)
+
+INVALID_TURN_REFERENCE_ERROR = HTTPException(
+    status_code=status.HTTP_400_BAD_REQUEST,
+    detail={
+        "type": constants.INVALID_TURN_REFERENCE_ERROR_TYPE,
+        "message": constants.INVALID_TURN_REFERENCE_ERROR_MESSAGE,
+    },
+)
+
+SLOT_UNAVAILABLE_ERROR = HTTPException(
+    status_code=status.HTTP_409_CONFLICT,
+    detail={
+        "type": constants.SLOT_UNAVAILABLE_ERROR_TYPE,
+        "message": constants.SLOT_UNAVAILABLE_ERROR_MESSAGE,
+    },
+)
+
+INVALID_DATE_RANGE_ERROR = HTTPException(
+    status_code=status.HTTP_400_BAD_REQUEST,
+    detail={
+        "type": constants.INVALID_DATE_RANGE_ERROR_TYPE,
+        "message": constants.INVALID_DATE_RANGE_ERROR_MESSAGE,
+    },
+)
+
+INVALID_REPORT_GROUPING_ERROR = HTTPException(
+    status_code=status.HTTP_400_BAD_REQUEST,
+    detail={
+        "type": constants.INVALID_REPORT_GROUPING_ERROR_TYPE,
+        "message": constants.INVALID_REPORT_GROUPING_ERROR_MESSAGE,
+    },
+)
+
+ANALYTICS_UNAVAILABLE_ERROR = HTTPException(
+    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+    detail={
+        "type": constants.ANALYTICS_UNAVAILABLE_ERROR_TYPE,
+        "message": constants.ANALYTICS_UNAVAILABLE_ERROR_MESSAGE,
+    },
+)
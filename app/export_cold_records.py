@@ -0,0 +1,36 @@
+"""Cold storage export entry point"""
+
+import argparse
+import sys
+import os
+from datetime import date
+
+# pylint: disable=C0413
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(SCRIPT_DIR))
+
+from app import cold_storage, environment
+from app.enums import ExportFormat
+
+parser = argparse.ArgumentParser(
+    description="Writes the service turns or appointments of a date range in cold storage"
+)
+parser.add_argument("table", choices=list(cold_storage.TABLES))
+parser.add_argument(
+    "--start", type=date.fromisoformat, required=True, help="Inclusive start day"
+)
+parser.add_argument("--end", type=date.fromisoformat, required=True, help="Exclusive end day")
+parser.add_argument(
+    "--format",
+    default=ExportFormat.NDJSON.value,
+    choices=[item.value for item in ExportFormat],
+    help="Output format",
+)
+parser.add_argument("--directory", default=environment.cold_storage_dir, help="Storage directory")
+args = parser.parse_args()
+
+for chunk in cold_storage.export_rows(
+    args.directory, args.table, args.start, args.end, ExportFormat(args.format)
+):
+    sys.stdout.write(chunk)
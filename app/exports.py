@@ -0,0 +1,189 @@
+"""Data exports
+
+Encodes the rows of a column projection as NDJSON or CSV while they are
+fetched from the database in batches, without building ORM objects or
+API models for them. Every batch is a query of its own continuing from the
+last id of the previous one, since drivers like mysqlconnector buffer the
+whole result of a query on the client. Dates are written in ISO 8601.
+"""
+
+import csv
+import io
+import json
+import zlib
+from datetime import date
+from typing import Any, Callable, Iterator, List, Optional, Sequence
+from fastapi.responses import StreamingResponse
+from sqlalchemy.sql import ColumnElement, Select
+from sqlalchemy.orm import Session
+from . import constants
+from .enums import ExportFormat
+
+
+MEDIA_TYPES = {
+    ExportFormat.NDJSON: constants.NDJSON_MEDIA_TYPE,
+    ExportFormat.CSV: constants.CSV_MEDIA_TYPE,
+}
+
+
+def encode_value(value: Any) -> Any:
+    """Encodes the values JSON and CSV have no type for
+
+    Args:
+        value (Any): Column value
+
+    Returns:
+        Any: ISO 8601 text for dates, the text of other values
+    """
+    return value.isoformat() if isinstance(value, date) else str(value)
+
+
+def encode_ndjson(columns: List[str], rows: Sequence[Sequence]) -> str:
+    """Encodes rows as newline delimited JSON objects
+
+    Args:
+        columns (List[str]): Names of the columns
+        rows (Sequence[Sequence]): Rows values
+
+    Returns:
+        str: One JSON object per line
+    """
+    return "".join(
+        json.dumps(dict(zip(columns, row)), default=encode_value, ensure_ascii=False) + "\n"
+        for row in rows
+    )
+
+
+def encode_csv(columns: List[str], rows: Sequence[Sequence], header: bool) -> str:
+    """Encodes rows as CSV lines
+
+    Args:
+        columns (List[str]): Names of the columns
+        rows (Sequence[Sequence]): Rows values
+        header (bool): Whether to write the header line first
+
+    Returns:
+        str: CSV lines
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    if header:
+        writer.writerow(columns)
+
+    writer.writerows(
+        [encode_value(value) if isinstance(value, date) else value for value in row]
+        for row in rows
+    )
+    return buffer.getvalue()
+
+
+def select_batch(statement: Select, key: ColumnElement, after: Optional[int]) -> Select:
+    """Restricts a column projection to the batch of rows following a key
+
+    Args:
+        statement (Select): Column projection
+        key (ColumnElement): Unique integer column the rows are ordered by
+        after (int, optional): Key of the last row exported, None at first
+
+    Returns:
+        Select: The next rows, ``EXPORT_BATCH_SIZE`` at most
+    """
+    if after is not None:
+        statement = statement.where(key > after)
+
+    return statement.order_by(key).limit(constants.EXPORT_BATCH_SIZE)
+
+
+def iterate_export(
+    session: Session,
+    select_rows: Callable[[Optional[int]], Select],
+    export_format: ExportFormat,
+) -> Iterator[str]:
+    """Encodes the rows one database batch at a time
+
+    Args:
+        session (Session): Database session
+        select_rows (Callable[[Optional[int]], Select]): Builds the query of
+            the batch of rows following an id, with an ``id`` column
+        export_format (ExportFormat): Output format
+
+    Yields:
+        str: Encoded chunks
+    """
+    after = None
+
+    try:
+        while True:
+            result = session.execute(select_rows(after))
+            columns = list(result.keys())
+            rows = result.all()
+
+            if export_format == ExportFormat.CSV:
+                yield encode_csv(columns, rows, after is None)
+            else:
+                yield encode_ndjson(columns, rows)
+
+            if len(rows) < constants.EXPORT_BATCH_SIZE:
+                return
+
+            after = rows[-1].id
+    except:
+        session.rollback()
+        raise
+
+
+def compress_chunks(chunks: Iterator[str]) -> Iterator[bytes]:
+    """Gzips the chunks as a single stream
+
+    Args:
+        chunks (Iterator[str]): Text chunks
+
+    Yields:
+        bytes: Compressed chunks
+    """
+    compressor = zlib.compressobj(
+        constants.EXPORT_COMPRESSION_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS
+    )
+
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode())
+
+        if data:
+            yield data
+
+    yield compressor.flush()
+
+
+def get_export_response(
+    session: Session,
+    select_rows: Callable[[Optional[int]], Select],
+    export_format: ExportFormat,
+    compress: bool,
+    filename: str,
+) -> StreamingResponse:
+    """Gets a response streaming the exported rows
+
+    Args:
+        session (Session): Database session
+        select_rows (Callable[[Optional[int]], Select]): Builds the query of
+            the batch of rows following an id, with an ``id`` column
+        export_format (ExportFormat): Output format
+        compress (bool): Whether to gzip the content
+        filename (str): Name of the exported file, without extension
+
+    Returns:
+        StreamingResponse: Export response
+    """
+    chunks = iterate_export(session, select_rows, export_format)
+    headers = {
+        "Content-Disposition": f'attachment; filename="{filename}.{export_format.value}"'
+    }
+
+    if compress:
+        chunks = compress_chunks(chunks)
+        headers["Content-Encoding"] = constants.GZIP_ENCODING
+
+    return StreamingResponse(
+        chunks, media_type=MEDIA_TYPES[export_format], headers=headers
+    )
@@ -0,0 +1,123 @@
+"""Data exports test cases
+"""
+
+import asyncio
+import csv
+import gzip
+import io
+import json
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+from fastapi.responses import StreamingResponse
+from . import constants
+from .database import memory
+from .database import models as db_models
+from .enums import ExportFormat
+from .service_turn import handlers
+
+START = datetime(2024, 1, 1)
+SERVICE_ID = 1
+
+
+def read_body(response: StreamingResponse) -> bytes:
+    """Reads the whole content of a streamed response
+
+    Args:
+        response (StreamingResponse): Streamed response
+
+    Returns:
+        bytes: Content
+    """
+
+    async def read() -> bytes:
+        chunks = [chunk async for chunk in response.body_iterator]
+        return b"".join(chunk.encode() if isinstance(chunk, str) else chunk for chunk in chunks)
+
+    return asyncio.run(read())
+
+
+class ExportsTest(unittest.TestCase):
+    """Service turns export test cases over an in-memory database
+
+    Args:
+        unittest (unittest.TestCase): TestCase base class
+    """
+
+    def setUp(self):
+        self.session = memory.create_session()
+
+        for turn_id in range(1, 6):
+            model = db_models.ArchivedServiceTurn if turn_id % 2 else db_models.ServiceTurn
+            self.session.add(
+                model(
+                    id=100 + turn_id,
+                    ticket_number=f"S{SERVICE_ID}-{turn_id}",
+                    customer_name="José Peña",
+                    service_id=SERVICE_ID,
+                    created=START + timedelta(hours=turn_id),
+                )
+            )
+
+        self.session.commit()
+        patcher = mock.patch.object(constants, "EXPORT_BATCH_SIZE", 2)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.session.close()
+
+    def export(self, export_format: ExportFormat, compress: bool = False) -> StreamingResponse:
+        """Exports the turns of the test day, archived ones included
+
+        Args:
+            export_format (ExportFormat): Output format
+            compress (bool): Whether to gzip the content
+
+        Returns:
+            StreamingResponse: Streamed export
+        """
+        return handlers.export_service_turns(
+            self.session, START, START + timedelta(days=1), export_format, compress, True
+        )
+
+    def test_ndjson(self):
+        """Every turn is exported once in order of id, in ISO 8601 and without escapes
+        """
+        response = self.export(ExportFormat.NDJSON)
+        lines = read_body(response).decode().splitlines()
+        items = [json.loads(line) for line in lines]
+
+        self.assertEqual(response.media_type, constants.NDJSON_MEDIA_TYPE)
+        self.assertEqual([item["id"] for item in items], [101, 102, 103, 104, 105])
+        self.assertEqual(items[0]["created"], "2024-01-01T01:00:00")
+        self.assertIn('"customer_name": "José Peña"', lines[0])
+
+    def test_csv(self):
+        """The header is written once, followed by a line per turn
+        """
+        response = self.export(ExportFormat.CSV)
+        rows = list(csv.DictReader(io.StringIO(read_body(response).decode())))
+
+        self.assertEqual(response.media_type, constants.CSV_MEDIA_TYPE)
+        self.assertEqual([row["id"] for row in rows], ["101", "102", "103", "104", "105"])
+        self.assertEqual(rows[1]["created"], "2024-01-01T02:00:00")
+        self.assertEqual(rows[1]["customer_name"], "José Peña")
+        self.assertEqual(rows[1]["service_ended"], "")
+
+    def test_gzip(self):
+        """The compressed export is a single gzip stream of the same content
+        """
+        response = self.export(ExportFormat.CSV, True)
+
+        self.assertEqual(response.headers["content-encoding"], constants.GZIP_ENCODING)
+        self.assertEqual(
+            response.headers["content-disposition"], 'attachment; filename="serviceturns.csv"'
+        )
+        self.assertEqual(
+            gzip.decompress(read_body(response)), read_body(self.export(ExportFormat.CSV))
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,157 @@
+"""Sparse fieldsets
+
+Lets clients pick the fields of a response (``fields``) and which
+relationships are embedded as nested objects or returned as flat ids
+(``expand``). Only the expanded relationships are joined in the query.
+"""
+
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Set, Type, Union
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy.orm import joinedload
+from sqlalchemy.orm.interfaces import LoaderOption
+from . import constants
+from . import exceptions
+
+
+class Relation(NamedTuple):
+    """Relationship that can be expanded into a nested object"""
+
+    attribute: Any
+    id_attribute: Any
+    mapper: Callable[[Any], BaseModel]
+    options: Callable[[], List[LoaderOption]]
+
+
+class Resource(NamedTuple):
+    """Resource whose responses support sparse fieldsets"""
+
+    model: Type[BaseModel]
+    mapper: Callable[[Any], BaseModel]
+    values: Callable[[Any], dict]
+    relations: Dict[str, Relation]
+
+
+def parse_names(value: Optional[str]) -> Optional[Set[str]]:
+    """Parses a comma separated list of names
+
+    Args:
+        value (Optional[str]): Comma separated names
+
+    Returns:
+        Optional[Set[str]]: The names, None when no value was given
+    """
+    if value is None:
+        return None
+
+    return {
+        name.strip()
+        for name in value.split(constants.FIELDS_SEPARATOR)
+        if name.strip()
+    }
+
+
+class FieldSet:
+    """Fields and expanded relationships requested for a resource"""
+
+    def __init__(
+        self, resource: Resource, fields: Optional[str], expand: Optional[str]
+    ):
+        self.resource = resource
+        self.fields = parse_names(fields)
+        self.expand = parse_names(expand)
+        self.is_sparse = not (self.fields is None and self.expand is None)
+
+        if self.expand is None:
+            self.expand = set(resource.relations)
+
+        if (
+            self.fields is not None
+            and not self.fields.issubset(resource.model.__fields__)
+        ) or not self.expand.issubset(resource.relations):
+            raise exceptions.INVALID_FIELDS_ERROR
+
+    def is_selected(self, name: str) -> bool:
+        """Checks if a field was requested
+
+        Args:
+            name (str): API name of the field
+
+        Returns:
+            bool: True if the field is part of the response
+        """
+        return self.fields is None or name in self.fields
+
+    def get_loader_options(self) -> List[LoaderOption]:
+        """Gets the loading options joining the expanded relationships
+
+        Returns:
+            List[LoaderOption]: Loader options
+        """
+        return [
+            joinedload(relation.attribute).options(*relation.options())
+            for name, relation in self.resource.relations.items()
+            if name in self.expand and self.is_selected(name)
+        ]
+
+    def map(self, item: Any) -> Union[BaseModel, dict]:
+        """Maps a database item to the requested fields
+
+        Args:
+            item (Any): Database item
+
+        Returns:
+            Union[BaseModel, dict]: The full API model when nothing specific
+                                    was requested, otherwise the selected data
+        """
+        if not self.is_sparse:
+            return self.resource.mapper(item)
+
+        data = {
+            name: value
+            for name, value in self.resource.values(item).items()
+            if self.is_selected(name)
+        }
+
+        for name, relation in self.resource.relations.items():
+            if not self.is_selected(name):
+                continue
+
+            if name in self.expand:
+                related = getattr(item, relation.attribute.key)
+                data[name] = None if related is None else relation.mapper(related)
+            else:
+                data[f"{name}Id"] = getattr(item, relation.id_attribute.key)
+
+        return data
+
+    def get_item_response(self, item: Any) -> Union[BaseModel, JSONResponse]:
+        """Gets the response for a single item
+
+        Args:
+            item (Any): Database item
+
+        Returns:
+            Union[BaseModel, JSONResponse]: Item response
+        """
+        if not self.is_sparse:
+            return self.map(item)
+
+        return JSONResponse(content=jsonable_encoder(self.map(item)))
+
+    def get_list_response(self, items: List[Any]) -> Union[List[BaseModel], JSONResponse]:
+        """Gets the response for a list of items
+
+        Args:
+            items (List[Any]): Database items
+
+        Returns:
+            Union[List[BaseModel], JSONResponse]: List response
+        """
+        mapped_items = [self.map(item) for item in items]
+
+        if not self.is_sparse:
+            return mapped_items
+
+        return JSONResponse(content=jsonable_encoder(mapped_items))
@@ -0,0 +1,125 @@
+"""Sparse fieldsets test cases
+"""
+
+import json
+import unittest
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from . import base_api_models
+from . import constants
+from . import mappers
+from .database import memory
+from .database import models as db_models
+from .fieldsets import FieldSet
+from .service_turn import handlers
+
+SERVICE_ID = 1
+PENDING_STATUS_ID = 5
+HIGH_PRIORITY_ID = 1
+
+
+class FieldSetTest(unittest.TestCase):
+    """Fields and expand parameters test cases
+
+    Args:
+        unittest (unittest.TestCase): TestCase base class
+    """
+
+    def assert_invalid(self, fields: str, expand: str) -> None:
+        """Checks that a fieldset is rejected as invalid fields
+
+        Args:
+            fields (str): Comma separated fields
+            expand (str): Comma separated relationships
+        """
+        with self.assertRaises(HTTPException) as context:
+            FieldSet(mappers.SERVICE_TURN_RESOURCE, fields, expand)
+
+        self.assertEqual(context.exception.status_code, 400)
+        self.assertEqual(context.exception.detail["type"], constants.INVALID_FIELDS_ERROR_TYPE)
+
+    def test_invalid_fields(self):
+        """Unknown fields and relationships are rejected
+        """
+        self.assert_invalid("id,unknown", None)
+        self.assert_invalid(None, "status,unknown")
+        self.assert_invalid("id", "ticketNumber")
+
+    def test_loader_options(self):
+        """Only the relationships both selected and expanded are joined
+        """
+        self.assertEqual(
+            len(FieldSet(mappers.SERVICE_TURN_RESOURCE, None, None).get_loader_options()),
+            len(mappers.SERVICE_TURN_RESOURCE.relations),
+        )
+        self.assertEqual(
+            len(FieldSet(mappers.SERVICE_TURN_RESOURCE, "id,status", "").get_loader_options()),
+            0,
+        )
+        self.assertEqual(
+            len(FieldSet(mappers.SERVICE_TURN_RESOURCE, "id,status", None).get_loader_options()),
+            1,
+        )
+
+
+class SparseResponseTest(unittest.TestCase):
+    """Sparse service turn responses test cases over an in-memory database
+
+    Args:
+        unittest (unittest.TestCase): TestCase base class
+    """
+
+    def setUp(self):
+        self.session = memory.create_session()
+        turn = db_models.ServiceTurn(
+            ticket_number=f"S{SERVICE_ID}-1",
+            service_id=SERVICE_ID,
+            priority_id=HIGH_PRIORITY_ID,
+            status_id=PENDING_STATUS_ID,
+        )
+        self.session.add(turn)
+        self.session.commit()
+        self.turn_id = turn.id
+
+    def tearDown(self):
+        self.session.close()
+
+    def get_turn(self, fields: str = None, expand: str = None) -> dict:
+        """Gets the sparse response of the test turn
+
+        Args:
+            fields (str): Comma separated fields
+            expand (str): Comma separated relationships
+
+        Returns:
+            dict: Response content
+        """
+        response = handlers.get_service_turn_by_id(self.session, self.turn_id, fields, expand)
+
+        self.assertIsInstance(response, JSONResponse)
+        return json.loads(response.body)
+
+    def test_full_response(self):
+        """Without fields nor expand the full API model is returned
+        """
+        response = handlers.get_service_turn_by_id(self.session, self.turn_id)
+
+        self.assertIsInstance(response, base_api_models.ServiceTurn)
+        self.assertEqual(response.status.id, PENDING_STATUS_ID)
+
+    def test_sparse_response(self):
+        """Only the selected fields are returned, with flat ids for the relationships not expanded
+        """
+        self.assertEqual(
+            self.get_turn("id,ticketNumber,status", ""),
+            {"id": self.turn_id, "ticketNumber": f"S{SERVICE_ID}-1", "statusId": PENDING_STATUS_ID},
+        )
+
+        turn = self.get_turn("id,status,priority", "status")
+
+        self.assertEqual(sorted(turn), ["id", "priorityId", "status"])
+        self.assertEqual(turn["status"]["id"], PENDING_STATUS_ID)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,10 +1,20 @@
 """Common helpers"""
 
-from fastapi import Header, Request
+from datetime import date, datetime, timedelta
+from enum import Enum
+from typing import Callable, List, Optional, Type, TypeVar
+from fastapi import Header, Query, Request
 from .auth import api
 from . import constants
 from . import environment
 from . import exceptions
+from . import analytics
+from . import rollups
+from .enums import AnalyticsDimension, ReportDimension, ReportPeriod, StatusType
+
+# pylint: disable=R0913
+
+EnumT = TypeVar("EnumT", bound=Enum)
 
 
 def validate_api_access(
@@ -73,3 +83,148 @@ def validate_token(expected_scope: str):
             raise exceptions.FORBIDDEN_ERROR
 
     return _validate
+
+
+def get_batch_ids(ids: str = Query(...)) -> List[int]:
+    """Gets the ids requested in a batch
+
+    Args:
+        ids (str): Comma separated ids
+
+    Raises:
+        HTTPException: Invalid ids error when the ids are not integers
+                       or their amount is out of the allowed range
+
+    Returns:
+        List[int]: The ids in the requested order
+    """
+    try:
+        values = [
+            int(value)
+            for value in ids.split(constants.IDS_SEPARATOR)
+            if value.strip()
+        ]
+    except ValueError as exc:
+        raise exceptions.INVALID_IDS_ERROR from exc
+
+    if not values or len(values) > constants.MAX_BATCH_IDS:
+        raise exceptions.INVALID_IDS_ERROR
+
+    return values
+
+
+def get_dimensions(group_by: Optional[str], dimension_type: Type[EnumT]) -> List[EnumT]:
+    """Parses a comma separated list of dimensions to group by
+
+    Args:
+        group_by (str, optional): Comma separated dimensions
+        dimension_type (Type[EnumT]): Enum of the valid dimensions
+
+    Raises:
+        HTTPException: Invalid grouping error when a dimension doesn't exist
+
+    Returns:
+        List[EnumT]: The dimensions
+    """
+    try:
+        return [
+            dimension_type(value.strip())
+            for value in (group_by or constants.EMPTY_VALUE).split(constants.GROUP_BY_SEPARATOR)
+            if value.strip()
+        ]
+    except ValueError as exc:
+        raise exceptions.INVALID_REPORT_GROUPING_ERROR from exc
+
+
+def get_report_query(stat_type: StatusType) -> Callable[..., rollups.ReportQuery]:
+    """Builds the dependency reading the query of a statistics report
+
+    Args:
+        stat_type (StatusType): TURN or APPOINTMENT
+
+    Returns:
+        Callable[..., ReportQuery]: The dependency
+    """
+
+    def _get_query(
+        start: date,
+        end: date,
+        period: ReportPeriod = ReportPeriod.DAY,
+        group_by: Optional[str] = Query(default=None, alias="groupBy"),
+        service_id: Optional[int] = Query(default=None, alias="serviceId"),
+        location_id: Optional[int] = Query(default=None, alias="locationId"),
+    ) -> rollups.ReportQuery:
+        """Report query internal function
+
+        Args:
+            start (date): Inclusive first day
+            end (date): Exclusive last day
+            period (ReportPeriod): Period length
+            group_by (str, optional): Comma separated dimensions to keep apart
+            service_id (int, optional): Only the statistics of this service
+            location_id (int, optional): Only the statistics at this location
+
+        Raises:
+            HTTPException: Invalid date range error when the range is empty or too long
+            HTTPException: Invalid grouping error when a dimension doesn't exist
+
+        Returns:
+            ReportQuery: The report query
+        """
+        if not 0 < (end - start).days <= constants.REPORT_MAX_DAYS:
+            raise exceptions.INVALID_DATE_RANGE_ERROR
+
+        dimensions = get_dimensions(group_by, ReportDimension)
+        filters = {
+            dimension: value
+            for dimension, value in (
+                (ReportDimension.SERVICE, service_id),
+                (ReportDimension.LOCATION, location_id),
+            )
+            if value is not None
+        }
+        return rollups.ReportQuery(stat_type, start, end, period, dimensions, filters)
+
+    return _get_query
+
+
+def get_analytics_query(
+    start: datetime,
+    end: datetime,
+    group_by: Optional[str] = Query(default=None, alias="groupBy"),
+    service_id: Optional[int] = Query(default=None, alias="serviceId"),
+    location_id: Optional[int] = Query(default=None, alias="locationId"),
+    include_archived: bool = Query(default=False, alias="includeArchived"),
+) -> analytics.AnalyticsQuery:
+    """Reads the query of the turn analytics
+
+    Args:
+        start (datetime): Inclusive start
+        end (datetime): Exclusive end
+        group_by (str, optional): Comma separated dimensions to keep apart
+        service_id (int, optional): Only the turns of this service
+        location_id (int, optional): Only the turns at this location
+        include_archived (bool): Whether to add the archived turns
+
+    Raises:
+        HTTPException: Analytics unavailable error when NumPy isn't installed
+        HTTPException: Invalid date range error when the range is empty or too long
+        HTTPException: Invalid grouping error when a dimension doesn't exist
+
+    Returns:
+        AnalyticsQuery: The analytics query
+    """
+    if not analytics.is_available():
+        raise exceptions.ANALYTICS_UNAVAILABLE_ERROR
+
+    if not start < end <= start + timedelta(days=constants.ANALYTICS_MAX_DAYS):
+        raise exceptions.INVALID_DATE_RANGE_ERROR
+
+    return analytics.AnalyticsQuery(
+        start,
+        end,
+        get_dimensions(group_by, AnalyticsDimension),
+        service_id,
+        location_id,
+        include_archived,
+    )
@@ -0,0 +1,47 @@
+"""Helpers test cases
+"""
+
+import unittest
+from fastapi import HTTPException
+from . import constants
+from . import helpers
+
+
+class BatchIdsTest(unittest.TestCase):
+    """Batch ids parameter test cases
+
+    Args:
+        unittest (unittest.TestCase): TestCase base class
+    """
+
+    def assert_invalid(self, ids: str) -> None:
+        """Checks that some ids are rejected as invalid ids
+
+        Args:
+            ids (str): Comma separated ids
+        """
+        with self.assertRaises(HTTPException) as context:
+            helpers.get_batch_ids(ids)
+
+        self.assertEqual(context.exception.status_code, 400)
+        self.assertEqual(context.exception.detail["type"], constants.INVALID_IDS_ERROR_TYPE)
+
+    def test_valid_ids(self):
+        """Ids keep the requested order and blank entries are skipped
+        """
+        self.assertEqual(helpers.get_batch_ids("3, 1,,2"), [3, 1, 2])
+        self.assertEqual(
+            len(helpers.get_batch_ids(",".join(["1"] * constants.MAX_BATCH_IDS))),
+            constants.MAX_BATCH_IDS,
+        )
+
+    def test_invalid_ids(self):
+        """Anything but 1 to MAX_BATCH_IDS integers is rejected
+        """
+        self.assert_invalid("1,a")
+        self.assert_invalid(" , ")
+        self.assert_invalid(",".join(["1"] * (constants.MAX_BATCH_IDS + 1)))
+
+
+if __name__ == "__main__":
+    unittest.main()
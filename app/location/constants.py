@@ -9,3 +9,7 @@ DELETE_LOCATION_BY_ID_OPERATION_ID = "deleteLocationById"
 ADD_LOCATION_OPERATION_ID = "addLocation"
 UPDATE_LOCATION_OPERATION_ID = "updateLocation"
 PATCH_LOCATION_OPERATION_ID = "patchLocation"
+GET_LOCATIONS_BATCH_OPERATION_ID = "getLocationsBatch"
+
+# Internal routes paths
+BATCH_PATH = "/batch"
@@ -1,5 +1,6 @@
 """Location API handlers"""
 
+from typing import List
 from sqlalchemy.orm import Session
 from .. import base_api_models
 from .. import api_responses
@@ -31,6 +32,22 @@ def get_locations(
     return list(map(mappers.map_location, items))
 
 
+def get_locations_batch(
+    session: Session, ids: List[int]
+) -> location_api_models.LocationsBatchResponse:
+    """Get info of several existing locations by their Ids with a single query
+
+    Args:
+        session (Session): Database session
+        ids (List[int]): ids of the locations
+
+    Returns:
+        LocationsBatchResponse: Result for each id, in the requested order
+    """
+    items = db_models.Location.find_by_ids(session, ids)
+    return mappers.map_batch_items(ids, items, mappers.map_location)
+
+
 def get_location_by_id(session: Session, location_id: int) -> base_api_models.Location:
     """Get info of an existing location by Id
 
@@ -40,3 +40,4 @@ class PatchLocationPayload(base_api_models.Location):
 
 
 LocationsListResponse = List[base_api_models.Location]
+LocationsBatchResponse = List[base_api_models.BatchItem[base_api_models.Location]]
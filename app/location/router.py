@@ -1,5 +1,6 @@
 """Location API router"""
 
+from typing import List
 from fastapi import APIRouter, Depends, Query, status
 from sqlalchemy.orm import Session
 from .. import api_responses
@@ -15,6 +16,8 @@ from .constants import (
     GET_LOCATION_BY_ID_OPERATION_ID,
     PATCH_LOCATION_OPERATION_ID,
     UPDATE_LOCATION_OPERATION_ID,
+    GET_LOCATIONS_BATCH_OPERATION_ID,
+    BATCH_PATH,
 )
 from . import handlers
 from . import models as location_api_models
@@ -46,6 +49,27 @@ def get_locations(
     return handlers.get_locations(session, active, offset, limit)
 
 
+@router.get(
+    BATCH_PATH,
+    dependencies=[
+        Depends(helpers.validate_api_access),
+        Depends(helpers.validate_token(constants.READ_LOCATIONS_SCOPE)),
+    ],
+    tags=TAGS,
+    operation_id=GET_LOCATIONS_BATCH_OPERATION_ID,
+    response_model=location_api_models.LocationsBatchResponse,
+    responses=api_responses.responses_descriptions,
+)
+def get_locations_batch(
+    ids: List[int] = Depends(helpers.get_batch_ids),
+    session: Session = Depends(main.get_session),
+) -> location_api_models.LocationsBatchResponse:
+    """
+    Get info of several existing locations by a comma separated list of Ids
+    """
+    return handlers.get_locations_batch(session, ids)
+
+
 @router.get(
     "/{location_id}",
     dependencies=[
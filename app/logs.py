@@ -0,0 +1,176 @@
+"""Structured logging"""
+
+import atexit
+import copy
+import json
+import logging
+import queue
+import sys
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional, Tuple
+from . import constants
+from . import environment
+
+# pylint: disable=R0903
+
+request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+RECORD_ATTRIBUTES = set(
+    logging.LogRecord("", logging.NOTSET, "", 0, "", (), None).__dict__
+) | {"message", "asctime", "request_id", "suppressed"}
+
+
+class RequestIdFilter(logging.Filter):
+    """Adds the id of the current request to the log records"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Lets through a burst of repeated records per window and drops the rest
+
+    Records are considered repeated when they share logger, level, message
+    template and exception type. The first record let through after a window
+    reports how many of them were dropped.
+    """
+
+    def __init__(
+        self,
+        window: float = constants.LOG_SAMPLING_WINDOW,
+        burst: int = constants.LOG_SAMPLING_BURST,
+    ):
+        super().__init__()
+        self.window = window
+        self.burst = burst
+        self.lock = threading.Lock()
+        self.windows: Dict[Tuple, Tuple[float, int, int]] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        exc_type = record.exc_info[0] if record.exc_info else None
+        key = (record.name, record.levelno, record.msg, exc_type)
+        now = time.monotonic()
+
+        with self.lock:
+            started, count, suppressed = self.windows.get(key, (now, 0, 0))
+
+            if now - started >= self.window:
+                started, count = now, 0
+
+            if count >= self.burst:
+                self.windows[key] = (started, count, suppressed + 1)
+                return False
+
+            self.windows[key] = (started, count + 1, 0)
+
+        record.suppressed = suppressed
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats log records as single line JSON objects"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "timestamp": datetime.fromtimestamp(
+                record.created, timezone.utc
+            ).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "requestId": getattr(record, "request_id", None),
+        }
+
+        if getattr(record, "suppressed", 0):
+            data["suppressed"] = record.suppressed
+
+        for name, value in record.__dict__.items():
+            if name not in RECORD_ATTRIBUTES:
+                data[name] = value
+
+        if record.exc_info:
+            data["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            data["exception"] = record.exc_text
+
+        return json.dumps(data, default=str)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """Queue handler that drops records instead of blocking when full"""
+
+    def __init__(self, records: queue.Queue):
+        super().__init__(records)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Tracebacks can't be rendered once the exception is gone, render
+        # them now and leave the rest of the formatting to the listener
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+
+        if record.exc_info:
+            record.exc_text = self.formatter.formatException(record.exc_info)
+            record.exc_info = None
+
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def parse_levels(levels: str) -> Dict[str, str]:
+    """Parses per module log levels
+
+    Args:
+        levels (str): Levels such as app.database=DEBUG,app.main=WARNING
+
+    Returns:
+        Dict[str, str]: Level by logger name
+    """
+    parsed = {}
+
+    for entry in levels.split(constants.LOG_LEVELS_SEPARATOR):
+        name, _, level = entry.strip().partition(constants.LOG_LEVEL_SEPARATOR)
+
+        if name and level:
+            parsed[name.strip()] = level.strip().upper()
+
+    return parsed
+
+
+def configure() -> QueueListener:
+    """Routes the application logs through a queue written by a background thread
+
+    Returns:
+        QueueListener: Listener writing the queued records
+    """
+    records = queue.Queue(constants.LOG_QUEUE_SIZE)
+    handler = DroppingQueueHandler(records)
+    handler.setFormatter(logging.Formatter())
+    handler.addFilter(SamplingFilter())
+    handler.addFilter(RequestIdFilter())
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JsonFormatter())
+    listener = QueueListener(records, output, respect_handler_level=True)
+
+    logger = logging.getLogger(__package__)
+    logger.handlers = [handler]
+    logger.propagate = False
+    logger.setLevel(environment.log_level.upper())
+
+    for name, level in parse_levels(environment.log_levels).items():
+        logging.getLogger(name).setLevel(level)
+
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
@@ -1,11 +1,17 @@
 """Entry point"""
 
-from fastapi import FastAPI, Request, status as status_codes, HTTPException
-from fastapi.responses import JSONResponse
+import logging
+from fastapi import Depends, FastAPI, Request, status as status_codes, HTTPException
+from fastapi.responses import JSONResponse, Response
 from fastapi.exceptions import RequestValidationError
 from sqlalchemy.exc import IntegrityError
 from . import constants
+from . import helpers
+from . import logs
+from . import metrics
 from . import api_responses
+from . import middlewares
+from .database import instrumentation  # pylint: disable=W0611
 from .appointment import router as appointment
 from .category import router as category
 from .customer import router as customer
@@ -15,7 +21,10 @@ from .service import router as service
 from .service_turn import router as service_turn
 from .status import router as status
 from .location import router as location
+from .profiling import router as profiling
 
+logs.configure()
+logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title=constants.API_TITLE,
@@ -24,6 +33,11 @@ app = FastAPI(
     version=constants.API_VERSION,
 )
 
+app.add_middleware(middlewares.MappingScopeMiddleware)
+app.add_middleware(middlewares.ProfilingMiddleware)
+app.add_middleware(middlewares.MetricsMiddleware)
+app.add_middleware(middlewares.RequestIdMiddleware)
+
 # pylint: disable=W0613
 
 
@@ -39,7 +53,13 @@ def http_exception_handler(request: Request, exc: HTTPException):
     Returns:
         JSONResponse: Error response
     """
-    print(exc)
+    logger.log(
+        logging.ERROR if exc.status_code >= 500 else logging.INFO,
+        "HTTP exception on %s %s",
+        request.method,
+        request.url.path,
+        extra={"statusCode": exc.status_code, "detail": exc.detail},
+    )
     return JSONResponse(
         status_code=exc.status_code,
         content=api_responses.get_response_from_exception(exc).__dict__,
@@ -56,7 +76,12 @@ def integrity_error_handler(request: Request, exc: IntegrityError):
     Returns:
         JSONResponse: Error response
     """
-    print(exc)
+    logger.warning(
+        "Database integrity error on %s %s",
+        request.method,
+        request.url.path,
+        extra={"detail": str(exc.orig)},
+    )
     return JSONResponse(
         status_code=status_codes.HTTP_400_BAD_REQUEST,
         content=api_responses.get_validation_error_response(
@@ -77,13 +102,32 @@ def request_validation_error_handler(request: Request, exc: RequestValidationErr
     """
     errors = [f"{err['msg']} ({'.'.join(err['loc'])})" for err in exc.errors()]
     message = ". ".join(errors)
-    print(exc)
+    logger.info(
+        "Request validation error on %s %s",
+        request.method,
+        request.url.path,
+        extra={"detail": message},
+    )
     return JSONResponse(
         status_code=status_codes.HTTP_400_BAD_REQUEST,
         content=api_responses.get_validation_error_response(message).__dict__,
     )
 
 
+@app.get(
+    constants.METRICS_PATH,
+    include_in_schema=False,
+    dependencies=[Depends(helpers.validate_api_access)],
+)
+def get_metrics() -> Response:
+    """Exposes the metrics in the Prometheus text format
+
+    Returns:
+        Response: Metrics response
+    """
+    return Response(metrics.render(), media_type=constants.METRICS_MEDIA_TYPE)
+
+
 app.include_router(appointment.router, prefix=constants.APPOINTMENTS_ROUTE_PREFIX)
 app.include_router(category.router, prefix=constants.CATEGORIES_ROUTE_PREFIX)
 app.include_router(customer.router, prefix=constants.CUSTOMERS_ROUTE_PREFIX)
@@ -93,3 +137,4 @@ app.include_router(service.router, prefix=constants.SERVICES_ROUTE_PREFIX)
 app.include_router(status.router, prefix=constants.STATUSES_ROUTE_PREFIX)
 app.include_router(service_turn.router, prefix=constants.SERVICE_TURNS_ROUTE_PREFIX)
 app.include_router(location.router, prefix=constants.LOCATIONS_ROUTE_PREFIX)
+app.include_router(profiling.router, prefix=constants.PROFILING_ROUTE_PREFIX)
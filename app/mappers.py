@@ -1,11 +1,87 @@
 """Base API mappers"""
 
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from pydantic import BaseModel
+from . import analytics
 from . import base_api_models
+from . import rollups
 from .database import models as db_models
+from .database import loaders
+from .fieldsets import Relation, Resource
 from .enums import Gender
 from .constants import NOT_AVAILABLE
 
 
+mapped_entities: ContextVar[Optional[dict]] = ContextVar("mapped_entities", default=None)
+
+
+@contextmanager
+def mapping_scope() -> Iterator[None]:
+    """Scope, usually a request, within which each distinct entity
+    of the memoized mappers is mapped only once and then reused
+    """
+    token = mapped_entities.set({})
+
+    try:
+        yield
+    finally:
+        mapped_entities.reset(token)
+
+
+def memoized(mapper: Callable[[Any], BaseModel]) -> Callable[[Any], BaseModel]:
+    """Reuses the API item mapped for a database item within the current mapping scope
+
+    Args:
+        mapper (Callable[[Any], BaseModel]): Wrapped mapper
+
+    Returns:
+        Callable[[Any], BaseModel]: Memoized mapper
+    """
+
+    @wraps(mapper)
+    def memoized_mapper(item: Any) -> BaseModel:
+        memo = mapped_entities.get()
+
+        if memo is None:
+            return mapper(item)
+
+        key = (mapper, item.id)
+
+        if key not in memo:
+            memo[key] = mapper(item)
+
+        return memo[key]
+
+    return memoized_mapper
+
+
+def map_batch_items(
+    ids: List[int], items: Dict[int, Any], mapper: Callable[[Any], BaseModel]
+) -> List[base_api_models.BatchItem]:
+    """Maps the database items found for a batch of ids
+
+    Args:
+        ids (List[int]): requested ids
+        items (Dict[int, Any]): database items by id
+        mapper (Callable[[Any], BaseModel]): item mapper
+
+    Returns:
+        List[base_api_models.BatchItem]: API batch items in the requested order
+    """
+    return [
+        base_api_models.BatchItem(
+            id=item_id,
+            found=item_id in items,
+            item=mapper(items[item_id]) if item_id in items else None,
+        )
+        for item_id in ids
+    ]
+
+
+@memoized
 def map_status(status: db_models.Status) -> base_api_models.Status:
     """Maps a database status to a API status
 
@@ -25,6 +101,7 @@ def map_status(status: db_models.Status) -> base_api_models.Status:
     )
 
 
+@memoized
 def map_priority(priority: db_models.Priority) -> base_api_models.Priority:
     """Maps a database priority to a API priority
 
@@ -43,6 +120,7 @@ def map_priority(priority: db_models.Priority) -> base_api_models.Priority:
         isActive=priority.is_active,
     )
 
+@memoized
 def map_location(location: db_models.Location) -> base_api_models.Location:
     """Maps a database location to a API location
 
@@ -82,6 +160,7 @@ def map_queue(queue: db_models.Queue) -> base_api_models.Queue:
     )
 
 
+@memoized
 def map_category(category: db_models.Category) -> base_api_models.Category:
     """Maps a database category to a API category
 
@@ -102,6 +181,7 @@ def map_category(category: db_models.Category) -> base_api_models.Category:
     )
 
 
+@memoized
 def map_service(service: db_models.Service) -> base_api_models.Service:
     """Maps a database service to a API service
 
@@ -148,6 +228,27 @@ def map_customer(customer: db_models.Customer) -> base_api_models.Customer:
     )
 
 
+def get_appointment_values(appointment: db_models.Appointment) -> dict:
+    """Gets the API values of the own fields of a database appointment
+
+    Args:
+        appointment (db_models.Appointment): database appointment item
+
+    Returns:
+        dict: API values by field name
+    """
+    return {
+        "id": appointment.id,
+        "createdBy": appointment.created_by or NOT_AVAILABLE,
+        "lastModifiedBy": appointment.last_modified_by or NOT_AVAILABLE,
+        "serviceEndingExpected": str(appointment.service_ending_expected),
+        "serviceStarted": str(appointment.service_started),
+        "serviceEnded": str(appointment.service_ended),
+        "created": str(appointment.created),
+        "lastModified": str(appointment.last_modified),
+    }
+
+
 def map_appointment(appointment: db_models.Appointment) -> base_api_models.Appointment:
     """Maps a database appointment to a API appointment
 
@@ -158,14 +259,7 @@ def map_appointment(appointment: db_models.Appointment) -> base_api_models.Appoi
         base_api_models.Appointment: API appointment item
     """
     return base_api_models.Appointment(
-        id=appointment.id,
-        createdBy=appointment.created_by or NOT_AVAILABLE,
-        lastModifiedBy=appointment.last_modified_by or NOT_AVAILABLE,
-        serviceEndingExpected=str(appointment.service_ending_expected),
-        serviceStarted=str(appointment.service_started),
-        serviceEnded=str(appointment.service_ended),
-        created=str(appointment.created),
-        lastModified=str(appointment.last_modified),
+        **get_appointment_values(appointment),
         status=map_status(appointment.status),
         service=map_service(appointment.service),
         customer=map_customer(appointment.customer),
@@ -173,6 +267,29 @@ def map_appointment(appointment: db_models.Appointment) -> base_api_models.Appoi
     )
 
 
+def get_service_turn_values(turn: db_models.ServiceTurn) -> dict:
+    """Gets the API values of the own fields of a database service turn
+
+    Args:
+        turn (db_models.ServiceTurn): database service turn item
+
+    Returns:
+        dict: API values by field name
+    """
+    return {
+        "id": turn.id,
+        "ticketNumber": turn.ticket_number,
+        "customerName": turn.customer_name,
+        "createdBy": turn.created_by or NOT_AVAILABLE,
+        "lastModifiedBy": turn.last_modified_by or NOT_AVAILABLE,
+        "serviceEndingExpected": str(turn.service_ending_expected),
+        "serviceStarted": str(turn.service_started),
+        "serviceEnded": str(turn.service_ended),
+        "created": str(turn.created),
+        "lastModified": str(turn.last_modified),
+    }
+
+
 def map_service_turn(turn: db_models.ServiceTurn) -> base_api_models.ServiceTurn:
     """Maps a database service turn to a API service turn
 
@@ -183,16 +300,7 @@ def map_service_turn(turn: db_models.ServiceTurn) -> base_api_models.ServiceTurn
         base_api_models.ServiceTurn: API service turn item
     """
     return base_api_models.ServiceTurn(
-        id=turn.id,
-        ticketNumber=turn.ticket_number,
-        customerName=turn.customer_name,
-        createdBy=turn.created_by or NOT_AVAILABLE,
-        lastModifiedBy=turn.last_modified_by or NOT_AVAILABLE,
-        serviceEndingExpected=str(turn.service_ending_expected),
-        serviceStarted=str(turn.service_started),
-        serviceEnded=str(turn.service_ended),
-        created=str(turn.created),
-        lastModified=str(turn.last_modified),
+        **get_service_turn_values(turn),
         priority=map_priority(turn.priority),
         appointment=map_appointment(turn.appointment) if not turn.appointment is None else None,
         status=map_status(turn.status),
@@ -201,11 +309,14 @@ def map_service_turn(turn: db_models.ServiceTurn) -> base_api_models.ServiceTurn
     )
 
 
-def map_turn_status_item(turn: db_models.ServiceTurn) -> base_api_models.ServiceTurnStatusItem:
+def map_turn_status_item(
+    turn: db_models.ServiceTurn, estimated_wait_seconds: Optional[int] = None
+) -> base_api_models.ServiceTurnStatusItem:
     """Maps a service turn status item from the given data
 
     Args:
         turn (db_models.ServiceTurn): database service turn item
+        estimated_wait_seconds (int, optional): estimated wait of the turn
 
     Returns:
         base_api_models.ServiceTurnStatusItem: Service Turn status item
@@ -215,4 +326,129 @@ def map_turn_status_item(turn: db_models.ServiceTurn) -> base_api_models.Service
         queueName=turn.service.name,
         statusName=turn.status.name,
         statusCode=turn.status.code,
+        estimatedWaitSeconds=estimated_wait_seconds,
+    )
+
+
+def map_stats_report_item(row: rollups.ReportRow) -> base_api_models.StatsReportItem:
+    """Maps a statistics report item from the given data
+
+    Args:
+        row (rollups.ReportRow): merged rollups of a period and group
+
+    Returns:
+        base_api_models.StatsReportItem: Statistics report item
+    """
+    return base_api_models.StatsReportItem(
+        period=row.period,
+        locationId=row.location_id,
+        serviceId=row.service_id,
+        priorityId=row.priority_id,
+        statusId=row.status_id,
+        count=row.stats.count,
+        waitCount=row.stats.wait.count,
+        averageWaitSeconds=row.stats.wait.get_average(),
+        medianWaitSeconds=row.stats.wait.get_percentile(50),
+        p90WaitSeconds=row.stats.wait.get_percentile(90),
+        serviceCount=row.stats.service.count,
+        averageServiceSeconds=row.stats.service.get_average(),
+        medianServiceSeconds=row.stats.service.get_percentile(50),
+        p90ServiceSeconds=row.stats.service.get_percentile(90),
     )
+
+
+def map_turn_analytics_item(row: analytics.AnalyticsRow) -> base_api_models.TurnAnalyticsItem:
+    """Maps a turn analytics item from the given data
+
+    Args:
+        row (analytics.AnalyticsRow): distributions of a service, location and hour
+
+    Returns:
+        base_api_models.TurnAnalyticsItem: Turn analytics item
+    """
+    return base_api_models.TurnAnalyticsItem(
+        serviceId=row.service_id,
+        locationId=row.location_id,
+        hour=row.hour,
+        waitCount=row.wait.count,
+        p50WaitSeconds=row.wait.percentiles[50],
+        p90WaitSeconds=row.wait.percentiles[90],
+        p99WaitSeconds=row.wait.percentiles[99],
+        waitHistogram=row.wait.histogram,
+        serviceCount=row.service.count,
+        p50ServiceSeconds=row.service.percentiles[50],
+        p90ServiceSeconds=row.service.percentiles[90],
+        p99ServiceSeconds=row.service.percentiles[99],
+        serviceHistogram=row.service.histogram,
+    )
+
+
+APPOINTMENT_RESOURCE = Resource(
+    model=base_api_models.Appointment,
+    mapper=map_appointment,
+    values=get_appointment_values,
+    relations={
+        "status": Relation(
+            db_models.Appointment.status,
+            db_models.Appointment.status_id,
+            map_status,
+            list,
+        ),
+        "service": Relation(
+            db_models.Appointment.service,
+            db_models.Appointment.service_id,
+            map_service,
+            loaders.service_options,
+        ),
+        "customer": Relation(
+            db_models.Appointment.customer,
+            db_models.Appointment.customer_id,
+            map_customer,
+            loaders.customer_options,
+        ),
+        "location": Relation(
+            db_models.Appointment.location,
+            db_models.Appointment.location_id,
+            map_location,
+            list,
+        ),
+    },
+)
+
+SERVICE_TURN_RESOURCE = Resource(
+    model=base_api_models.ServiceTurn,
+    mapper=map_service_turn,
+    values=get_service_turn_values,
+    relations={
+        "priority": Relation(
+            db_models.ServiceTurn.priority,
+            db_models.ServiceTurn.priority_id,
+            map_priority,
+            list,
+        ),
+        "status": Relation(
+            db_models.ServiceTurn.status,
+            db_models.ServiceTurn.status_id,
+            map_status,
+            list,
+        ),
+        "service": Relation(
+            db_models.ServiceTurn.service,
+            db_models.ServiceTurn.service_id,
+            map_service,
+            loaders.service_options,
+        ),
+        "appointment": Relation(
+            db_models.ServiceTurn.appointment,
+            db_models.ServiceTurn.appointment_id,
+            map_appointment,
+            loaders.appointment_options,
+        ),
+        "customer": Relation(
+            db_models.ServiceTurn.customer,
+            db_models.ServiceTurn.customer_id,
+            map_customer,
+            loaders.customer_options,
+        ),
+    },
+)
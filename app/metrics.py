@@ -0,0 +1,288 @@
+"""Prometheus compatible metrics"""
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from . import constants
+
+# pylint: disable=R0903
+
+registry: List["Metric"] = []
+
+
+class Metric:
+    """Base metric holding one value per labels combination"""
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.lock = threading.Lock()
+        self.values: Dict[Tuple[str, ...], float] = {}
+        registry.append(self)
+
+    def format_labels(self, labels: Tuple[str, ...], extra: str = "") -> str:
+        """Formats labels in the exposition format
+
+        Args:
+            labels (Tuple[str, ...]): Label values
+            extra (str): Additional formatted label
+
+        Returns:
+            str: Formatted labels
+        """
+        pairs = [
+            f'{name}="{escape(value)}"'
+            for name, value in zip(self.label_names, labels)
+        ]
+
+        if extra:
+            pairs.append(extra)
+
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def samples(self) -> List[str]:
+        """Gets the sample lines of the metric
+
+        Returns:
+            List[str]: Sample lines
+        """
+        with self.lock:
+            values = list(self.values.items())
+
+        return [
+            f"{self.name}{self.format_labels(labels)} {value}"
+            for labels, value in values
+        ]
+
+    def render(self) -> str:
+        """Renders the metric in the exposition format
+
+        Returns:
+            str: Rendered metric
+        """
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+            *self.samples(),
+        ]
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    """Monotonically increasing value"""
+
+    type_name = "counter"
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        """Increments the counter
+
+        Args:
+            labels (str): Label values
+            amount (float): Increment
+        """
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+
+class Gauge(Metric):
+    """Value that goes up and down"""
+
+    type_name = "gauge"
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        """Increments the gauge
+
+        Args:
+            labels (str): Label values
+            amount (float): Increment
+        """
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        """Decrements the gauge
+
+        Args:
+            labels (str): Label values
+            amount (float): Decrement
+        """
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(Metric):
+    """Distribution of observed values in cumulative buckets"""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = constants.METRICS_LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(buckets)
+        self.observations: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        """Observes a value
+
+        Args:
+            value (float): Observed value
+            labels (str): Label values
+        """
+        with self.lock:
+            counts = self.observations.get(labels)
+
+            if counts is None:
+                counts = self.observations[labels] = [0] * (len(self.buckets) + 2)
+
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            else:
+                counts[len(self.buckets)] += 1
+
+            counts[-1] += value
+
+    def samples(self) -> List[str]:
+        with self.lock:
+            observations = [
+                (labels, list(counts)) for labels, counts in self.observations.items()
+            ]
+
+        lines = []
+
+        for labels, counts in observations:
+            cumulative = 0
+
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                bucket = self.format_labels(labels, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{bucket} {cumulative}")
+
+            lines.append(f"{self.name}_sum{self.format_labels(labels)} {counts[-1]}")
+            lines.append(f"{self.name}_count{self.format_labels(labels)} {cumulative}")
+
+        return lines
+
+
+class RequestStats:
+    """Work done by the current request"""
+
+    def __init__(self, route: str = constants.METRICS_UNMATCHED_ROUTE):
+        self.route = route
+        self.database_time = 0.0
+        self.queries = 0
+
+
+request_stats: ContextVar[Optional[RequestStats]] = ContextVar(
+    "request_stats", default=None
+)
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "Total HTTP requests",
+    ("method", "route", "status"),
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency in seconds",
+    ("method", "route", "status"),
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests being served",
+    ("method", "route"),
+)
+DATABASE_REQUEST_DURATION = Histogram(
+    "db_request_duration_seconds",
+    "Database time spent per HTTP request in seconds",
+    ("method", "route"),
+)
+DATABASE_REQUEST_QUERIES = Histogram(
+    "db_request_queries",
+    "Database queries executed per HTTP request",
+    ("method", "route"),
+    constants.METRICS_QUERY_COUNT_BUCKETS,
+)
+IAM_REQUEST_DURATION = Histogram(
+    "iam_request_duration_seconds",
+    "IAM API call latency in seconds",
+    ("operation", "status"),
+)
+
+
+def escape(value: str) -> str:
+    """Escapes a label value
+
+    Args:
+        value (str): Label value
+
+    Returns:
+        str: Escaped value
+    """
+    return str(value).replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def render() -> str:
+    """Renders every metric in the exposition format
+
+    Returns:
+        str: Rendered metrics
+    """
+    return "\n".join(metric.render() for metric in registry) + "\n"
+
+
+@contextmanager
+def tracking_request(route: str) -> Iterator[RequestStats]:
+    """Tracks the work done by the current request
+
+    Args:
+        route (str): Template of the requested route
+
+    Yields:
+        RequestStats: Stats of the request
+    """
+    stats = RequestStats(route)
+    token = request_stats.set(stats)
+
+    try:
+        yield stats
+    finally:
+        request_stats.reset(token)
+
+
+def timed_iam_call(operation: str):
+    """Records the latency of an IAM API call
+
+    Args:
+        operation (str): IAM operation name
+    """
+
+    def decorator(func: Callable):
+        @wraps(func)
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            status = constants.METRICS_ERROR_STATUS
+
+            try:
+                response = func(*args, **kwargs)
+                status = str(response.status_code)
+                return response
+            finally:
+                IAM_REQUEST_DURATION.observe(
+                    time.perf_counter() - started, operation, status
+                )
+
+        return timed
+
+    return decorator
@@ -0,0 +1,182 @@
+"""ASGI middlewares"""
+
+import time
+import uuid
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from . import constants
+from . import environment
+from . import logs
+from . import metrics
+from .profiling import sampler
+from . import mappers
+
+# pylint: disable=R0903
+
+
+class MappingScopeMiddleware:
+    """Maps each distinct catalogue entity once per request"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with mappers.mapping_scope():
+            await self.app(scope, receive, send)
+
+
+class RequestIdMiddleware:
+    """Correlates the logs of a request through its request id
+
+    The id is taken from the request header when the client sends it and
+    returned in the response headers.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        current_id = (
+            Headers(scope=scope).get(constants.REQUEST_ID_HEADER) or uuid.uuid4().hex
+        )
+        token = logs.request_id.set(current_id)
+
+        async def send_with_id(message: Message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers[constants.REQUEST_ID_HEADER] = current_id
+
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            logs.request_id.reset(token)
+
+
+class ProfilingMiddleware:
+    """Profiles a single request sent with the profiling header
+
+    The profile is stored under the request id, returned in the response
+    headers, and can be fetched from the profiling API. Requests without the
+    header only pay for the header lookup.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not is_profiling_requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = logs.request_id.get() or uuid.uuid4().hex
+        profiler = sampler.RequestProfiler.acquire(profile_id)
+
+        if profiler is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_id(message: Message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers[constants.PROFILE_ID_HEADER] = profile_id
+
+            await send(message)
+
+        with profiler:
+            await self.app(scope, receive, send_with_id)
+
+
+class MetricsMiddleware:
+    """Records request count, latency, concurrency and database work per route
+
+    Requests are labelled by route template so ids in the path don't create
+    new series. Requests not matching any route share a single label. In debug
+    mode the queries run and the database time spent until the response
+    starts are also returned as headers.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = get_route_template(scope)
+        status = str(500)
+
+        async def send_with_status(message: Message):
+            nonlocal status
+
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+
+                if environment.debug:
+                    headers = MutableHeaders(scope=message)
+                    headers[constants.QUERY_COUNT_HEADER] = str(stats.queries)
+                    headers[constants.QUERY_TIME_HEADER] = (
+                        f"{stats.database_time * 1000:.1f}"
+                    )
+
+            await send(message)
+
+        metrics.HTTP_REQUESTS_IN_PROGRESS.inc(method, route)
+        started = time.perf_counter()
+
+        with metrics.tracking_request(route) as stats:
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                metrics.HTTP_REQUESTS_IN_PROGRESS.dec(method, route)
+                metrics.HTTP_REQUESTS.inc(method, route, status)
+                metrics.HTTP_REQUEST_DURATION.observe(
+                    time.perf_counter() - started, method, route, status
+                )
+                metrics.DATABASE_REQUEST_DURATION.observe(
+                    stats.database_time, method, route
+                )
+                metrics.DATABASE_REQUEST_QUERIES.observe(stats.queries, method, route)
+
+
+def is_profiling_requested(scope: Scope) -> bool:
+    """Checks whether the request asks to be profiled
+
+    Args:
+        scope (Scope): Request scope
+
+    Returns:
+        bool: True when the profiling header is enabled
+    """
+    value = Headers(scope=scope).get(constants.PROFILE_HEADER, constants.EMPTY_VALUE)
+    return value.lower() in constants.TRUE_VALUES
+
+
+def get_route_template(scope: Scope) -> str:
+    """Gets the template of the route matching the request
+
+    Args:
+        scope (Scope): Request scope
+
+    Returns:
+        str: Route template
+    """
+    for route in scope["app"].router.routes:
+        match, _ = route.matches(scope)
+
+        if match == Match.FULL:
+            return route.path
+
+    return constants.METRICS_UNMATCHED_ROUTE
@@ -9,3 +9,7 @@ DELETE_PRIORITY_BY_ID_OPERATION_ID = "deletePriorityById"
 ADD_PRIORITY_OPERATION_ID = "addPriority"
 UPDATE_PRIORITY_OPERATION_ID = "updatePriority"
 PATCH_PRIORITY_OPERATION_ID = "patchPriority"
+GET_PRIORITIES_BATCH_OPERATION_ID = "getPrioritiesBatch"
+
+# Internal routes paths
+BATCH_PATH = "/batch"
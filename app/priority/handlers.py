@@ -1,5 +1,6 @@
 """Priority API handlers"""
 
+from typing import List
 from sqlalchemy.orm import Session
 from .. import base_api_models
 from .. import api_responses
@@ -31,6 +32,22 @@ def get_priorities(
     return list(map(mappers.map_priority, items))
 
 
+def get_priorities_batch(
+    session: Session, ids: List[int]
+) -> priority_api_models.PrioritiesBatchResponse:
+    """Get info of several existing priorities by their Ids with a single query
+
+    Args:
+        session (Session): Database session
+        ids (List[int]): ids of the priorities
+
+    Returns:
+        PrioritiesBatchResponse: Result for each id, in the requested order
+    """
+    items = db_models.Priority.find_by_ids(session, ids)
+    return mappers.map_batch_items(ids, items, mappers.map_priority)
+
+
 def get_priority_by_id(session: Session, priority_id: int) -> base_api_models.Priority:
     """Get info of an existing priority by Id
 
@@ -42,3 +42,4 @@ class PatchPriorityPayload(base_api_models.Priority):
 
 
 PrioritiesListResponse = List[base_api_models.Priority]
+PrioritiesBatchResponse = List[base_api_models.BatchItem[base_api_models.Priority]]
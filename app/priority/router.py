@@ -1,5 +1,6 @@
 """Priority API router"""
 
+from typing import List
 from fastapi import APIRouter, Depends, Query, status
 from sqlalchemy.orm import Session
 from .. import api_responses
@@ -15,6 +16,8 @@ from .constants import (
     GET_PRIORITY_BY_ID_OPERATION_ID,
     PATCH_PRIORITY_OPERATION_ID,
     UPDATE_PRIORITY_OPERATION_ID,
+    GET_PRIORITIES_BATCH_OPERATION_ID,
+    BATCH_PATH,
 )
 from . import handlers
 from . import models as priority_api_models
@@ -46,6 +49,27 @@ def get_priorities(
     return handlers.get_priorities(session, active, offset, limit)
 
 
+@router.get(
+    BATCH_PATH,
+    dependencies=[
+        Depends(helpers.validate_api_access),
+        Depends(helpers.validate_token(constants.READ_PRIORITIES_SCOPE)),
+    ],
+    tags=TAGS,
+    operation_id=GET_PRIORITIES_BATCH_OPERATION_ID,
+    response_model=priority_api_models.PrioritiesBatchResponse,
+    responses=api_responses.responses_descriptions,
+)
+def get_priorities_batch(
+    ids: List[int] = Depends(helpers.get_batch_ids),
+    session: Session = Depends(main.get_session),
+) -> priority_api_models.PrioritiesBatchResponse:
+    """
+    Get info of several existing priorities by a comma separated list of Ids
+    """
+    return handlers.get_priorities_batch(session, ids)
+
+
 @router.get(
     "/{priority_id}",
     dependencies=[
@@ -0,0 +1,10 @@
+"""Profiling API constants"""
+
+TAGS = ["profiling"]
+
+# Operation Ids
+PROFILE_PROCESS_OPERATION_ID = "profileProcess"
+GET_REQUEST_PROFILE_OPERATION_ID = "getRequestProfile"
+
+# Internal routes paths
+REQUEST_PROFILE_PATH = "/requests/{profile_id}"
@@ -0,0 +1,51 @@
+"""Profiling API handlers"""
+
+from fastapi.responses import PlainTextResponse
+from .. import constants
+from .. import exceptions
+from . import sampler
+
+
+def profile_process(seconds: float, interval: float) -> PlainTextResponse:
+    """Samples the stacks of the running process
+
+    Args:
+        seconds (float): Profiling duration
+        interval (float): Seconds between samples
+
+    Raises:
+        HTTPException: Profiler busy error when another profile is running
+
+    Returns:
+        PlainTextResponse: Collapsed stacks
+    """
+    stacks = sampler.profile_process(seconds, interval)
+
+    if stacks is None:
+        raise exceptions.PROFILER_BUSY_ERROR
+
+    return PlainTextResponse(
+        stacks, media_type=constants.COLLAPSED_STACKS_MEDIA_TYPE
+    )
+
+
+def get_request_profile(profile_id: str) -> PlainTextResponse:
+    """Gets the profile of a request served with the profiling header
+
+    Args:
+        profile_id (str): Profile Id returned with the request
+
+    Raises:
+        HTTPException: Not found error when the profile is unknown or expired
+
+    Returns:
+        PlainTextResponse: Collapsed stacks
+    """
+    stacks = sampler.request_profiles.get(profile_id)
+
+    if stacks is None:
+        raise exceptions.NOT_FOUND_ERROR
+
+    return PlainTextResponse(
+        stacks, media_type=constants.COLLAPSED_STACKS_MEDIA_TYPE
+    )
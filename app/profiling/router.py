@@ -0,0 +1,61 @@
+"""Profiling API router"""
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import PlainTextResponse
+from .. import api_responses
+from .. import constants
+from .. import helpers
+from .constants import (
+    TAGS,
+    PROFILE_PROCESS_OPERATION_ID,
+    GET_REQUEST_PROFILE_OPERATION_ID,
+    REQUEST_PROFILE_PATH,
+)
+from . import handlers
+
+
+router = APIRouter()
+
+
+@router.get(
+    "/",
+    dependencies=[
+        Depends(helpers.validate_api_access),
+        Depends(helpers.validate_token(constants.ADMIN_PROFILING_SCOPE)),
+    ],
+    tags=TAGS,
+    operation_id=PROFILE_PROCESS_OPERATION_ID,
+    response_class=PlainTextResponse,
+    responses=api_responses.responses_descriptions,
+)
+def profile_process(
+    seconds: float = Query(
+        default=constants.DEFAULT_PROFILE_SECONDS,
+        gt=0,
+        le=constants.MAX_PROFILE_SECONDS,
+    ),
+    interval: float = Query(default=constants.PROFILE_INTERVAL, gt=0, le=1),
+) -> PlainTextResponse:
+    """
+    Samples the stacks of the worker for some seconds in collapsed stacks format
+    """
+    return handlers.profile_process(seconds, interval)
+
+
+@router.get(
+    REQUEST_PROFILE_PATH,
+    dependencies=[
+        Depends(helpers.validate_api_access),
+        Depends(helpers.validate_token(constants.ADMIN_PROFILING_SCOPE)),
+    ],
+    tags=TAGS,
+    operation_id=GET_REQUEST_PROFILE_OPERATION_ID,
+    response_class=PlainTextResponse,
+    responses=api_responses.responses_descriptions,
+)
+def get_request_profile(profile_id: str) -> PlainTextResponse:
+    """
+    Gets the collapsed stacks sampled while serving a request sent with the
+    profiling header
+    """
+    return handlers.get_request_profile(profile_id)
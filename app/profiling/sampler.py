@@ -0,0 +1,177 @@
+"""Sampling stack profiler
+
+Stacks are sampled from a separate thread through ``sys._current_frames`` so
+nothing is installed in the profiled threads and there is no cost while no
+profile is running.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+from types import FrameType
+from typing import Callable, Optional
+from .. import constants
+
+# pylint: disable=R1732
+# pylint: disable=W0212
+
+PROFILING_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+APP_DIRECTORY = os.path.dirname(PROFILING_DIRECTORY)
+
+profile_lock = threading.Lock()
+request_profile_lock = threading.Lock()
+request_profiles: "OrderedDict[str, str]" = OrderedDict()
+
+
+def collapse(frame: FrameType) -> str:
+    """Collapses a stack into a flame graph line from its root to the frame
+
+    Args:
+        frame (FrameType): Innermost frame
+
+    Returns:
+        str: Frames separated by semicolons
+    """
+    names = []
+
+    while frame is not None:
+        code = frame.f_code
+        module = frame.f_globals.get("__name__", code.co_filename)
+        names.append(f"{module}:{code.co_name}")
+        frame = frame.f_back
+
+    return ";".join(reversed(names))
+
+
+def runs_app_code(frame: FrameType) -> bool:
+    """Checks whether the stack of a frame goes through the application code
+
+    Args:
+        frame (FrameType): Innermost frame
+
+    Returns:
+        bool: True when any frame belongs to the application package
+    """
+    while frame is not None:
+        filename = frame.f_code.co_filename
+
+        if filename.startswith(APP_DIRECTORY) and not filename.startswith(
+            PROFILING_DIRECTORY
+        ):
+            return True
+
+        frame = frame.f_back
+
+    return False
+
+
+def sample(
+    stacks: Counter,
+    until: Callable[[], bool],
+    interval: float,
+    include: Optional[Callable[[FrameType], bool]] = None,
+) -> None:
+    """Samples the stacks of the other threads until told to stop
+
+    Args:
+        stacks (Counter): Samples by collapsed stack
+        until (Callable[[], bool]): Tells when to stop sampling
+        interval (float): Seconds between samples
+        include (Callable[[FrameType], bool], optional): Filters the sampled stacks
+    """
+    own_id = threading.get_ident()
+
+    while not until():
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id != own_id and (include is None or include(frame)):
+                stacks[collapse(frame)] += 1
+
+        time.sleep(interval)
+
+
+def format_stacks(stacks: Counter) -> str:
+    """Formats the samples in the collapsed stacks format
+
+    Args:
+        stacks (Counter): Samples by collapsed stack
+
+    Returns:
+        str: A line with the stack and its samples for each stack
+    """
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+def profile_process(seconds: float, interval: float) -> Optional[str]:
+    """Profiles every thread of the process for a while
+
+    Args:
+        seconds (float): Profiling duration
+        interval (float): Seconds between samples
+
+    Returns:
+        Optional[str]: Collapsed stacks or None when a profile is already running
+    """
+    if not profile_lock.acquire(blocking=False):
+        return None
+
+    try:
+        stacks = Counter()
+        deadline = time.monotonic() + seconds
+        sample(stacks, lambda: time.monotonic() >= deadline, interval)
+        return format_stacks(stacks)
+    finally:
+        profile_lock.release()
+
+
+class RequestProfiler:
+    """Profiles the application code running while a request is served
+
+    Other requests served concurrently by the worker are sampled as well, only
+    one request is profiled at a time.
+    """
+
+    def __init__(self, profile_id: str):
+        self.profile_id = profile_id
+        self.stacks = Counter()
+        self.done = threading.Event()
+        self.thread = threading.Thread(
+            target=sample,
+            args=(
+                self.stacks,
+                self.done.is_set,
+                constants.PROFILE_INTERVAL,
+                runs_app_code,
+            ),
+            daemon=True,
+        )
+
+    def __enter__(self) -> "RequestProfiler":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.done.set()
+        self.thread.join()
+        request_profiles[self.profile_id] = format_stacks(self.stacks)
+
+        while len(request_profiles) > constants.MAX_REQUEST_PROFILES:
+            request_profiles.popitem(last=False)
+
+        request_profile_lock.release()
+
+    @classmethod
+    def acquire(cls, profile_id: str) -> Optional["RequestProfiler"]:
+        """Gets a profiler for a request unless another request is being profiled
+
+        Args:
+            profile_id (str): Id to store the profile with
+
+        Returns:
+            Optional[RequestProfiler]: The profiler or None when busy
+        """
+        if not request_profile_lock.acquire(blocking=False):
+            return None
+
+        return cls(profile_id)
@@ -9,3 +9,7 @@ DELETE_QUEUE_BY_ID_OPERATION_ID = "deleteQueueById"
 ADD_QUEUE_OPERATION_ID = "addQueue"
 UPDATE_QUEUE_OPERATION_ID = "updateQueue"
 PATCH_QUEUE_OPERATION_ID = "patchQueue"
+GET_QUEUES_BATCH_OPERATION_ID = "getQueuesBatch"
+
+# Internal routes paths
+BATCH_PATH = "/batch"
@@ -1,9 +1,11 @@
 """Queue API handlers"""
 
+from typing import List
 from sqlalchemy.orm import Session
 from .. import base_api_models
 from .. import api_responses
 from ..database import models as db_models
+from ..database import loaders
 from .. import enums
 from .. import mappers
 from . import models as queue_api_models
@@ -29,6 +31,22 @@ def get_queues(
     return list(map(mappers.map_queue, items))
 
 
+def get_queues_batch(
+    session: Session, ids: List[int]
+) -> queue_api_models.QueuesBatchResponse:
+    """Get info of several existing queues by their Ids with a single query
+
+    Args:
+        session (Session): Database session
+        ids (List[int]): ids of the queues
+
+    Returns:
+        QueuesBatchResponse: Result for each id, in the requested order
+    """
+    items = db_models.Queue.find_by_ids(session, ids, loaders.queue_options())
+    return mappers.map_batch_items(ids, items, mappers.map_queue)
+
+
 def get_queue_by_id(session: Session, queue_id: int) -> base_api_models.Queue:
     """Get info of an existing queue by Id
 
@@ -47,3 +47,4 @@ class PatchQueuePayload(base_api_models.QueueBasicData):
 
 
 QueuesListResponse = List[base_api_models.Queue]
+QueuesBatchResponse = List[base_api_models.BatchItem[base_api_models.Queue]]
@@ -1,5 +1,6 @@
 """Queue API router"""
 
+from typing import List
 from fastapi import APIRouter, Depends, Query, status
 from sqlalchemy.orm import Session
 from .. import api_responses
@@ -15,6 +16,8 @@ from .constants import (
     GET_QUEUE_BY_ID_OPERATION_ID,
     PATCH_QUEUE_OPERATION_ID,
     UPDATE_QUEUE_OPERATION_ID,
+    GET_QUEUES_BATCH_OPERATION_ID,
+    BATCH_PATH,
 )
 from . import handlers
 from . import models as queue_api_models
@@ -46,6 +49,27 @@ def get_queues(
     return handlers.get_queues(session, active, offset, limit)
 
 
+@router.get(
+    BATCH_PATH,
+    dependencies=[
+        Depends(helpers.validate_api_access),
+        Depends(helpers.validate_token(constants.READ_QUEUES_SCOPE)),
+    ],
+    tags=TAGS,
+    operation_id=GET_QUEUES_BATCH_OPERATION_ID,
+    response_model=queue_api_models.QueuesBatchResponse,
+    responses=api_responses.responses_descriptions,
+)
+def get_queues_batch(
+    ids: List[int] = Depends(helpers.get_batch_ids),
+    session: Session = Depends(main.get_session),
+) -> queue_api_models.QueuesBatchResponse:
+    """
+    Get info of several existing queues by a comma separated list of Ids
+    """
+    return handlers.get_queues_batch(session, ids)
+
+
 @router.get(
     "/{queue_id}",
     dependencies=[
@@ -0,0 +1,30 @@
+"""Daily rollups entry point"""
+
+import argparse
+import sys
+import os
+
+# pylint: disable=C0413
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(SCRIPT_DIR))
+
+from app import rollups
+from app.database.main import get_session
+
+parser = argparse.ArgumentParser(
+    description="Rolls up the turn and appointment statistics by day"
+)
+parser.add_argument(
+    "--full",
+    action="store_true",
+    help="Re-aggregates every day instead of the ones modified since the last run",
+)
+args = parser.parse_args()
+
+session = next(get_session())
+
+try:
+    rollups.run(session, args.full)
+finally:
+    session.close()
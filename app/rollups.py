@@ -0,0 +1,679 @@
+"""Daily rollups of the turn and appointment statistics
+
+The turns and appointments of each day are aggregated by location,
+service, priority and status into the ``daily_stats`` table: counts, total
+wait and service seconds and histograms of both durations, which merge
+into percentiles over any range of days. Each run only re-aggregates the
+days of the rows modified since the last run, found through a watermark
+per type, so reports read a few rows per day instead of the raw turns.
+Rows never modified count as modified when created, the watermark is looked
+back ``ROLLUP_WATERMARK_OVERLAP`` seconds so modifications committed late
+aren't skipped, and the days appointments are moved out of are recorded as
+changes to re-aggregate too.
+Archived turns are rolled up together with the live ones. Rows deleted
+from the source tables are only rolled up again by a full run, except the
+days moved to cold storage, which are frozen and never rolled up again.
+"""
+
+import bisect
+import operator
+import time
+from datetime import date, datetime, time as day_time, timedelta
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from sqlalchemy import and_, delete, func, insert, null, or_, select, union, union_all
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import ColumnElement, Select
+from . import archive
+from . import constants
+from .database import models as db_models
+from .enums import ReportDimension, ReportPeriod, StatusType
+
+# pylint: disable=E1102
+
+StatsKey = Tuple[Optional[int], Optional[int], Optional[int], Optional[int]]
+
+DIMENSION_INDEXES = {
+    ReportDimension.LOCATION: 0,
+    ReportDimension.SERVICE: 1,
+    ReportDimension.PRIORITY: 2,
+    ReportDimension.STATUS: 3,
+}
+
+
+class RollupSource(NamedTuple):
+    """Tables rolled up, the live one first, and how their rows are bucketed
+    and measured"""
+
+    models: Tuple[type, ...]
+    day: Callable[[type], ColumnElement]
+    select_facts: Callable[[type], Select]
+
+
+class Durations:
+    """Count, total and histogram of durations"""
+
+    def __init__(self) -> None:
+        self.histogram = [0] * (len(constants.ROLLUP_DURATION_BUCKETS) + 1)
+        self.count = 0
+        self.seconds = 0
+
+    def add(self, seconds: float) -> None:
+        """Adds a duration
+
+        Args:
+            seconds (float): Duration in seconds, negative ones are counted as 0
+        """
+        seconds = max(seconds, 0)
+        self.histogram[bisect.bisect_left(constants.ROLLUP_DURATION_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.seconds += round(seconds)
+
+    def merge(self, count: int, seconds: int, histogram: str) -> None:
+        """Adds the durations of a rollup row
+
+        Args:
+            count (int): Number of durations
+            seconds (int): Total seconds
+            histogram (str): Comma separated counts by bucket
+        """
+        self.histogram = list(
+            map(
+                operator.add,
+                self.histogram,
+                map(int, histogram.split(constants.ROLLUP_HISTOGRAM_SEPARATOR)),
+            )
+        )
+
+        self.count += count
+        self.seconds += seconds
+
+    def get_average(self) -> Optional[float]:
+        """Gets the average duration
+
+        Returns:
+            float: Average seconds, None without durations
+        """
+        return self.seconds / self.count if self.count else None
+
+    def get_percentile(self, percentile: float) -> Optional[float]:
+        """Estimates a percentile interpolating within its histogram bucket
+
+        Args:
+            percentile (float): Percentile between 0 and 100
+
+        Returns:
+            float: Estimated seconds, None without durations
+        """
+        if not self.count:
+            return None
+
+        rank = self.count * percentile / 100
+        cumulative = 0
+
+        for bucket, value in enumerate(self.histogram):
+            if value and cumulative + value >= rank:
+                if bucket == len(constants.ROLLUP_DURATION_BUCKETS):
+                    return float(constants.ROLLUP_DURATION_BUCKETS[-1])
+
+                lower = constants.ROLLUP_DURATION_BUCKETS[bucket - 1] if bucket else 0
+                upper = constants.ROLLUP_DURATION_BUCKETS[bucket]
+                return lower + (upper - lower) * (rank - cumulative) / value
+
+            cumulative += value
+
+        return float(constants.ROLLUP_DURATION_BUCKETS[-1])
+
+    def format_histogram(self) -> str:
+        """Formats the histogram to be stored
+
+        Returns:
+            str: Comma separated counts by bucket
+        """
+        return constants.ROLLUP_HISTOGRAM_SEPARATOR.join(map(str, self.histogram))
+
+
+class Stats:
+    """Statistics of a group of turns or appointments"""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.wait = Durations()
+        self.service = Durations()
+
+    def add(
+        self,
+        waited: Optional[datetime],
+        started: Optional[datetime],
+        ended: Optional[datetime],
+    ) -> None:
+        """Adds a turn or appointment
+
+        Args:
+            waited (datetime, optional): When the wait started
+            started (datetime, optional): When the attention started
+            ended (datetime, optional): When the attention ended
+        """
+        self.count += 1
+
+        if waited is not None and started is not None:
+            self.wait.add((started - waited).total_seconds())
+
+        if started is not None and ended is not None:
+            self.service.add((ended - started).total_seconds())
+
+    def merge(self, row: tuple) -> None:
+        """Adds the statistics of a rollup row
+
+        Args:
+            row (tuple): Count, then count, seconds and histogram of the waits
+                and of the attentions
+        """
+        self.count += row[0]
+        self.wait.merge(*row[1:4])
+        self.service.merge(*row[4:7])
+
+
+class ReportQuery(NamedTuple):
+    """Range and grouping of a statistics report"""
+
+    stat_type: StatusType
+    start: date
+    end: date
+    period: ReportPeriod
+    group_by: List[ReportDimension]
+    filters: Dict[ReportDimension, int]
+
+
+class ReportRow(NamedTuple):
+    """Statistics of a period and group"""
+
+    period: date
+    location_id: Optional[int]
+    service_id: Optional[int]
+    priority_id: Optional[int]
+    status_id: Optional[int]
+    stats: Stats
+
+
+def select_turn_facts(model: type = db_models.ServiceTurn) -> Select:
+    """Builds the query of the values rolled up from the turns
+
+    Args:
+        model (type): ServiceTurn or ArchivedServiceTurn
+
+    Returns:
+        Select: Selection of location, service, priority, status, wait start,
+        service start and service end
+    """
+    return select(
+        db_models.Appointment.location_id,
+        model.service_id,
+        model.priority_id,
+        model.status_id,
+        model.created,
+        model.service_started,
+        model.service_ended,
+    ).outerjoin(
+        db_models.Appointment,
+        db_models.Appointment.id == model.appointment_id,
+    )
+
+
+def get_appointment_day() -> ColumnElement:
+    """Gets the moment an appointment is bucketed by: its booked date
+
+    Returns:
+        ColumnElement: Booked date, the creation for unscheduled appointments
+    """
+    return func.coalesce(
+        db_models.Appointment.service_ending_expected, db_models.Appointment.created
+    )
+
+
+def select_appointment_facts() -> Select:
+    """Builds the query of the values rolled up from the appointments
+
+    Returns:
+        Select: Selection of location, service, priority, status, wait start,
+        service start and service end
+    """
+    return select(
+        db_models.Appointment.location_id,
+        db_models.Appointment.service_id,
+        null(),
+        db_models.Appointment.status_id,
+        get_appointment_day(),
+        db_models.Appointment.service_started,
+        db_models.Appointment.service_ended,
+    )
+
+
+SOURCES = {
+    StatusType.TURN: RollupSource(
+        archive.TURN_MODELS, lambda model: model.created, select_turn_facts
+    ),
+    StatusType.APPOINTMENT: RollupSource(
+        (db_models.Appointment,),
+        lambda _: get_appointment_day(),
+        lambda _: select_appointment_facts(),
+    ),
+}
+
+
+def to_date(value: object) -> date:
+    """Converts the result of the SQL DATE function, a string on SQLite
+
+    Args:
+        value (object): Date or ISO formatted date
+
+    Returns:
+        date: The date
+    """
+    return value if isinstance(value, date) else date.fromisoformat(str(value))
+
+
+def select_modified_since(model: type, since: datetime) -> ColumnElement:
+    """Builds the condition of the rows modified from a moment, the rows
+    never modified from their creation
+
+    Args:
+        model (type): Live table model
+        since (datetime): Inclusive start
+
+    Returns:
+        ColumnElement: The condition
+    """
+    return or_(
+        model.last_modified >= since,
+        and_(model.last_modified.is_(None), model.created >= since),
+    )
+
+
+def get_last_modified(session: Session, model: type) -> Optional[datetime]:
+    """Gets the last modification of a table, the creation of the rows never
+    modified
+
+    Args:
+        session (Session): Database session
+        model (type): Live table model
+
+    Returns:
+        datetime: Last modification, None for an empty table
+    """
+    values = (
+        session.scalar(select(func.max(model.last_modified))),
+        session.scalar(
+            select(func.max(model.created)).where(model.last_modified.is_(None))
+        ),
+    )
+    return max((value for value in values if value is not None), default=None)
+
+
+def get_changed_days(
+    session: Session,
+    stat_type: StatusType,
+    since: Optional[datetime],
+    frozen_before: Optional[date] = None,
+) -> List[date]:
+    """Gets the days with rows modified after a moment
+
+    Rows are only modified in the live table, so only a full run looks into
+    the other ones.
+
+    Args:
+        session (Session): Database session
+        stat_type (StatusType): TURN or APPOINTMENT
+        since (datetime, optional): Inclusive start, None for every day
+        frozen_before (date, optional): Days before it are skipped
+
+    Returns:
+        List[date]: Days in order
+    """
+    source = SOURCES[stat_type]
+    statements = [
+        select(func.date(source.day(model)).label("day"))
+        .distinct()
+        .where(
+            source.day(model).is_not(None)
+            if frozen_before is None
+            else source.day(model) >= datetime.combine(frozen_before, day_time.min)
+        )
+        for model in source.models
+    ]
+
+    if since is not None:
+        statements = [
+            statements[0].where(select_modified_since(source.models[0], since))
+        ]
+
+    return sorted(to_date(value) for value in session.scalars(union(*statements)))
+
+
+def aggregate(rows: Iterable[tuple]) -> Dict[StatsKey, Stats]:
+    """Aggregates fact rows by location, service, priority and status
+
+    Args:
+        rows (Iterable[tuple]): Rows of a facts query
+
+    Returns:
+        Dict[StatsKey, Stats]: Statistics by group
+    """
+    groups: Dict[StatsKey, Stats] = {}
+
+    for location_id, service_id, priority_id, status_id, waited, started, ended in rows:
+        key = (location_id, service_id, priority_id, status_id)
+        stats = groups.get(key)
+
+        if stats is None:
+            stats = groups[key] = Stats()
+
+        stats.add(waited, started, ended)
+
+    return groups
+
+
+def rollup_day(session: Session, stat_type: StatusType, day: date) -> int:
+    """Replaces the rollups of a day
+
+    Args:
+        session (Session): Database session
+        stat_type (StatusType): TURN or APPOINTMENT
+        day (date): Day to aggregate
+
+    Returns:
+        int: Rollup rows written
+    """
+    source = SOURCES[stat_type]
+    start = datetime.combine(day, day_time.min)
+    groups = aggregate(
+        session.execute(
+            union_all(
+                *(
+                    source.select_facts(model)
+                    .where(source.day(model) >= start)
+                    .where(source.day(model) < start + timedelta(days=1))
+                    for model in source.models
+                )
+            ).execution_options(yield_per=constants.STREAM_BATCH_SIZE)
+        )
+    )
+    session.execute(
+        delete(db_models.DailyStat)
+        .where(db_models.DailyStat.type == stat_type)
+        .where(db_models.DailyStat.day == day)
+    )
+    updated = datetime.now()
+
+    if groups:
+        session.execute(
+            insert(db_models.DailyStat),
+            [
+                {
+                    "type": stat_type,
+                    "day": day,
+                    "location_id": key[0],
+                    "service_id": key[1],
+                    "priority_id": key[2],
+                    "status_id": key[3],
+                    "count": stats.count,
+                    "wait_count": stats.wait.count,
+                    "wait_seconds": stats.wait.seconds,
+                    "wait_histogram": stats.wait.format_histogram(),
+                    "service_count": stats.service.count,
+                    "service_seconds": stats.service.seconds,
+                    "service_histogram": stats.service.format_histogram(),
+                    "updated": updated,
+                }
+                for key, stats in groups.items()
+            ],
+        )
+
+    return len(groups)
+
+
+def rollup(session: Session, stat_type: StatusType, full: bool = False) -> List[date]:
+    """Re-aggregates the days modified since the last run
+
+    Every day is replaced in a transaction of its own and the watermark only
+    moves, and the changes recorded are only cleared, once every day is rolled
+    up, so an interrupted run is resumed by the next one. A full run drops the
+    rollups of the days left without rows last, in the same transaction, so
+    the days it didn't get to keep their previous rollups. Frozen days are
+    left as they are, even by a full run.
+
+    Args:
+        session (Session): Database session
+        stat_type (StatusType): TURN or APPOINTMENT
+        full (bool): Whether to re-aggregate every day
+
+    Returns:
+        List[date]: Re-aggregated days
+    """
+    source = SOURCES[stat_type]
+    watermark = session.get(db_models.RollupWatermark, stat_type)
+    frozen_before = watermark.frozen_before if watermark else None
+    last_modified = get_last_modified(session, source.models[0])
+    since = None
+
+    if not full and watermark is not None and watermark.last_modified is not None:
+        since = watermark.last_modified - timedelta(seconds=constants.ROLLUP_WATERMARK_OVERLAP)
+
+    changes = session.execute(
+        select(db_models.RollupChange.id, db_models.RollupChange.day).where(
+            db_models.RollupChange.type == stat_type
+        )
+    ).all()
+    days = sorted(
+        {
+            *get_changed_days(session, stat_type, since, frozen_before),
+            *(
+                to_date(day)
+                for _, day in changes
+                if frozen_before is None or to_date(day) >= frozen_before
+            ),
+        }
+    )
+
+    try:
+        for day in days:
+            rollup_day(session, stat_type, day)
+            session.commit()
+
+        if full:
+            statement = (
+                delete(db_models.DailyStat)
+                .where(db_models.DailyStat.type == stat_type)
+                .where(db_models.DailyStat.day.not_in(days))
+            )
+
+            if frozen_before is not None:
+                statement = statement.where(db_models.DailyStat.day >= frozen_before)
+
+            session.execute(statement)
+
+        if watermark is None:
+            session.add(db_models.RollupWatermark(type=stat_type, last_modified=last_modified))
+        elif last_modified is not None:
+            watermark.last_modified = max(last_modified, watermark.last_modified or last_modified)
+
+        if changes:
+            session.execute(
+                delete(db_models.RollupChange).where(
+                    db_models.RollupChange.id.in_([change_id for change_id, _ in changes])
+                )
+            )
+
+        session.commit()
+    except:
+        session.rollback()
+        raise
+
+    return days
+
+
+def rollup_before(session: Session, stat_type: StatusType, before: date) -> List[date]:
+    """Re-aggregates every day not frozen yet before a day, as a full run
+    does, dropping the rollups of the days left without rows
+
+    Args:
+        session (Session): Database session
+        stat_type (StatusType): TURN or APPOINTMENT
+        before (date): First day left as it is
+
+    Returns:
+        List[date]: Re-aggregated days
+    """
+    watermark = session.get(db_models.RollupWatermark, stat_type)
+    frozen_before = watermark.frozen_before if watermark else None
+    days = [
+        day for day in get_changed_days(session, stat_type, None, frozen_before) if day < before
+    ]
+    statement = (
+        delete(db_models.DailyStat)
+        .where(db_models.DailyStat.type == stat_type)
+        .where(db_models.DailyStat.day < before)
+        .where(db_models.DailyStat.day.not_in(days))
+    )
+
+    if frozen_before is not None:
+        statement = statement.where(db_models.DailyStat.day >= frozen_before)
+
+    try:
+        for day in days:
+            rollup_day(session, stat_type, day)
+            session.commit()
+
+        session.execute(statement)
+        session.commit()
+    except:
+        session.rollback()
+        raise
+
+    return days
+
+
+def mark_changed(session: Session, stat_type: StatusType, moment: Optional[datetime]) -> None:
+    """Records the day a row is moved out of, for the next run to re-aggregate
+    it, within the transaction moving the row
+
+    Args:
+        session (Session): Database session
+        stat_type (StatusType): TURN or APPOINTMENT
+        moment (datetime, optional): Moment the row was bucketed by
+    """
+    if moment is not None:
+        session.add(db_models.RollupChange(type=stat_type, day=moment.date()))
+
+
+def freeze(session: Session, stat_type: StatusType, before: date) -> None:
+    """Stops rolling up the days before a day, once their rows are deleted
+
+    Args:
+        session (Session): Database session
+        stat_type (StatusType): TURN or APPOINTMENT
+        before (date): First day still rolled up
+    """
+    watermark = session.get(db_models.RollupWatermark, stat_type)
+
+    if watermark is None:
+        session.add(db_models.RollupWatermark(type=stat_type, frozen_before=before))
+    else:
+        watermark.frozen_before = max(before, watermark.frozen_before or before)
+
+    session.commit()
+
+
+def run(session: Session, full: bool = False) -> Dict[StatusType, List[date]]:
+    """Rolls up the turns and the appointments
+
+    Args:
+        session (Session): Database session
+        full (bool): Whether to re-aggregate every day
+
+    Returns:
+        Dict[StatusType, List[date]]: Re-aggregated days by type
+    """
+    started = time.perf_counter()
+    days = {stat_type: rollup(session, stat_type, full) for stat_type in SOURCES}
+    elapsed = time.perf_counter() - started
+    print(
+        f"Rolled up {sum(map(len, days.values()))} days in {elapsed:.2f} s "
+        + ", ".join(f"({stat_type.value}: {len(items)})" for stat_type, items in days.items())
+    )
+    return days
+
+
+def get_period(day: date, period: ReportPeriod) -> date:
+    """Gets the first day of the period of a day
+
+    Args:
+        day (date): Day
+        period (ReportPeriod): Period length
+
+    Returns:
+        date: First day of the period
+    """
+    return day.replace(day=1) if period == ReportPeriod.MONTH else day
+
+
+def get_report(session: Session, query: ReportQuery) -> List[ReportRow]:
+    """Merges the rollups of a date range by period and the given dimensions
+
+    Args:
+        session (Session): Database session
+        query (ReportQuery): Range, period, dimensions and filters
+
+    Returns:
+        List[ReportRow]: Statistics by period and group, in order
+    """
+    columns = [
+        db_models.DailyStat.location_id,
+        db_models.DailyStat.service_id,
+        db_models.DailyStat.priority_id,
+        db_models.DailyStat.status_id,
+    ]
+    statement = (
+        select(
+            db_models.DailyStat.day,
+            *columns,
+            db_models.DailyStat.count,
+            db_models.DailyStat.wait_count,
+            db_models.DailyStat.wait_seconds,
+            db_models.DailyStat.wait_histogram,
+            db_models.DailyStat.service_count,
+            db_models.DailyStat.service_seconds,
+            db_models.DailyStat.service_histogram,
+        )
+        .where(db_models.DailyStat.type == query.stat_type)
+        .where(db_models.DailyStat.day >= query.start)
+        .where(db_models.DailyStat.day < query.end)
+    )
+
+    for dimension, value in query.filters.items():
+        statement = statement.where(columns[DIMENSION_INDEXES[dimension]] == value)
+
+    kept = [DIMENSION_INDEXES[dimension] for dimension in query.group_by]
+    groups: Dict[tuple, Stats] = {}
+
+    for row in session.execute(statement):
+        key = (
+            get_period(row[0], query.period),
+            *(row[index + 1] if index in kept else None for index in range(4)),
+        )
+        stats = groups.get(key)
+
+        if stats is None:
+            stats = groups[key] = Stats()
+
+        stats.merge(row[5:])
+
+    return [
+        ReportRow(*key, stats)
+        for key, stats in sorted(
+            groups.items(),
+            key=lambda item: (
+                item[0][0],
+                *(-1 if value is None else value for value in item[0][1:]),
+            ),
+        )
+    ]
@@ -0,0 +1,205 @@
+"""Daily rollups test cases
+"""
+
+import unittest
+from datetime import date, datetime, time as day_time, timedelta
+from unittest import mock
+from sqlalchemy import delete, func, select, update
+from . import rollups
+from .database import memory
+from .database import models as db_models
+from .enums import StatusType
+
+SERVICE_ID = 1
+LOCATION_ID = 1
+CUSTOMER_ID = 1
+HIGH_PRIORITY_ID = 1
+PENDING_TURN_STATUS_ID = 5
+ATTENDED_TURN_STATUS_ID = 7
+PENDING_APPOINTMENT_STATUS_ID = 14
+
+
+def days_ago(days: int, hour: int = 9) -> datetime:
+    """Gets a moment of a past day
+
+    Args:
+        days (int): Days before today
+        hour (int): Hour
+
+    Returns:
+        datetime: The moment
+    """
+    return datetime.combine(date.today() - timedelta(days=days), day_time(hour))
+
+
+def make_appointment(expected: datetime, created: datetime) -> db_models.Appointment:
+    """Builds a pending appointment of the test service
+
+    Args:
+        expected (datetime): Expected end of the service
+        created (datetime): Creation moment
+
+    Returns:
+        Appointment: Appointment
+    """
+    return db_models.Appointment(
+        service_id=SERVICE_ID,
+        location_id=LOCATION_ID,
+        customer_id=CUSTOMER_ID,
+        status_id=PENDING_APPOINTMENT_STATUS_ID,
+        service_ending_expected=expected,
+        created=created,
+    )
+
+
+class RollupsTest(unittest.TestCase):
+    """Incremental and full rollups test cases over an in-memory database
+
+    Args:
+        unittest (unittest.TestCase): TestCase base class
+    """
+
+    def setUp(self):
+        self.session = memory.create_session()
+
+        for days in (10, 10, 9, 8):
+            self.session.add(
+                db_models.ServiceTurn(
+                    service_id=SERVICE_ID,
+                    priority_id=HIGH_PRIORITY_ID,
+                    status_id=ATTENDED_TURN_STATUS_ID,
+                    created=days_ago(days),
+                    service_started=days_ago(days) + timedelta(minutes=5),
+                    service_ended=days_ago(days) + timedelta(minutes=20),
+                    last_modified=days_ago(days, 10),
+                )
+            )
+
+        self.appointment = make_appointment(days_ago(5), days_ago(20))
+        self.appointment.last_modified = days_ago(20)
+        self.session.add(self.appointment)
+        self.session.commit()
+        self.roll_up()
+
+    def tearDown(self):
+        self.session.close()
+
+    def roll_up(self, full: bool = False) -> None:
+        """Rolls up the turns and the appointments
+
+        Args:
+            full (bool): Whether to re-aggregate every day
+        """
+        for stat_type in rollups.SOURCES:
+            rollups.rollup(self.session, stat_type, full)
+
+    def get_stats(self) -> list:
+        """Gets the rollups without their ids and update times
+
+        Returns:
+            list: Values of every rollup row, in order
+        """
+        stat = db_models.DailyStat
+        rows = self.session.execute(
+            select(
+                stat.type,
+                stat.day,
+                stat.location_id,
+                stat.service_id,
+                stat.priority_id,
+                stat.status_id,
+                stat.count,
+                stat.wait_histogram,
+                stat.service_histogram,
+            )
+        ).all()
+        return sorted(tuple(map(str, row)) for row in rows)
+
+    def test_incremental_matches_full(self):
+        """An incremental run after all kinds of changes matches a full run
+        """
+        turn = db_models.ServiceTurn
+        first_turn_id = self.session.scalar(
+            select(func.min(turn.id)).where(turn.created >= days_ago(10, 0))
+        )
+        watermark = self.session.get(db_models.RollupWatermark, StatusType.TURN).last_modified
+
+        # Modified after the last run
+        self.session.execute(
+            update(turn)
+            .where(turn.id == first_turn_id)
+            .values(status_id=PENDING_TURN_STATUS_ID, last_modified=datetime.now())
+        )
+        # Committed after the last run, stamped before its watermark
+        self.session.execute(
+            update(turn)
+            .where(turn.created >= days_ago(8, 0))
+            .where(turn.created < days_ago(7, 0))
+            .values(
+                status_id=PENDING_TURN_STATUS_ID,
+                last_modified=watermark - timedelta(seconds=60),
+            )
+        )
+        # Never modified
+        self.session.add(
+            turn(service_id=SERVICE_ID, status_id=PENDING_TURN_STATUS_ID, created=days_ago(2))
+        )
+        self.session.add(make_appointment(days_ago(1), days_ago(3)))
+        # Rescheduled to another day
+        rollups.mark_changed(
+            self.session, StatusType.APPOINTMENT, self.appointment.service_ending_expected
+        )
+        self.appointment.service_ending_expected = days_ago(4)
+        self.appointment.last_modified = datetime.now()
+        self.session.commit()
+
+        self.roll_up()
+        incremental = self.get_stats()
+        self.roll_up(True)
+
+        self.assertEqual(incremental, self.get_stats())
+        self.assertIsNone(self.session.scalar(select(db_models.RollupChange.id)))
+
+    def test_changed_days(self):
+        """Only the days of the rows modified since a moment are re-aggregated
+        """
+        since = days_ago(9, 0)
+        days = rollups.get_changed_days(self.session, StatusType.TURN, since)
+
+        self.assertEqual(days, [days_ago(9).date(), days_ago(8).date()])
+
+    def test_interrupted_full(self):
+        """A full run interrupted midway keeps the rollups of the days it didn't get to
+        """
+        turn = db_models.ServiceTurn
+        self.session.execute(delete(turn).where(turn.created >= days_ago(8, 0)))
+        self.session.commit()
+        stats = self.get_stats()
+        rollup_day = rollups.rollup_day
+        rolled_up = []
+
+        def rollup_first_day(session, stat_type, day):
+            if rolled_up:
+                raise RuntimeError("Interrupted")
+
+            rolled_up.append(day)
+            return rollup_day(session, stat_type, day)
+
+        with mock.patch.object(rollups, "rollup_day", rollup_first_day):
+            with self.assertRaises(RuntimeError):
+                rollups.rollup(self.session, StatusType.TURN, True)
+
+        self.assertEqual(self.get_stats(), stats)
+
+        rollups.rollup(self.session, StatusType.TURN, True)
+        days = self.session.scalars(
+            select(db_models.DailyStat.day)
+            .where(db_models.DailyStat.type == StatusType.TURN)
+            .where(db_models.DailyStat.day >= days_ago(10).date())
+        ).all()
+
+        self.assertEqual(sorted(set(days)), [days_ago(10).date(), days_ago(9).date()])
+
+
+if __name__ == "__main__":
+    unittest.main()
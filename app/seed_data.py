@@ -1,5 +1,6 @@
 """Entry point"""
 
+import argparse
 import sys
 import os
 
@@ -9,6 +10,21 @@ import os
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(os.path.dirname(SCRIPT_DIR))
 
-from database.seed import run
+from database.seed import DATA_FILE, run, run_bulk
 
-run()
+parser = argparse.ArgumentParser(description="Seeds the database")
+parser.add_argument(
+    "--bulk",
+    action="store_true",
+    help="Inserts the fixtures with executemany instead of one entity at a time",
+)
+parser.add_argument("--file", default=DATA_FILE, help="Fixtures file for --bulk")
+parser.add_argument(
+    "--truncate", action="store_true", help="Empties every table first with --bulk"
+)
+args = parser.parse_args()
+
+if args.bulk:
+    run_bulk(args.file, args.truncate)
+else:
+    run()
@@ -10,3 +10,9 @@ DELETE_SERVICE_BY_ID_OPERATION_ID = "deleteServiceById"
 ADD_SERVICE_OPERATION_ID = "addService"
 UPDATE_SERVICE_OPERATION_ID = "updateService"
 PATCH_SERVICE_OPERATION_ID = "patchService"
+GET_SERVICES_BATCH_OPERATION_ID = "getServicesBatch"
+CALL_NEXT_SERVICE_TURN_OPERATION_ID = "callNextServiceTurn"
+
+# Internal routes paths
+BATCH_PATH = "/batch"
+NEXT_SERVICE_TURN_PATH = "/{service_id}/serviceturns:next"
@@ -1,9 +1,15 @@
 """Service API handlers"""
 
+from typing import List
 from sqlalchemy.orm import Session
 from .. import base_api_models
 from .. import api_responses
+from .. import exceptions
+from .. import turn_counters
+from .. import turns
+from .. import wait_times
 from ..database import models as db_models
+from ..database import loaders
 from .. import enums
 from .. import mappers as general_mappers
 from . import models as service_api_models
@@ -34,6 +40,22 @@ def get_services(
     return list(map(general_mappers.map_service, items))
 
 
+def get_services_batch(
+    session: Session, ids: List[int]
+) -> service_api_models.ServicesBatchResponse:
+    """Get info of several existing services by their Ids with a single query
+
+    Args:
+        session (Session): Database session
+        ids (List[int]): ids of the services
+
+    Returns:
+        ServicesBatchResponse: Result for each id, in the requested order
+    """
+    items = db_models.Service.find_by_ids(session, ids, loaders.service_options())
+    return general_mappers.map_batch_items(ids, items, general_mappers.map_service)
+
+
 def get_service_by_id(session: Session, service_id: int) -> base_api_models.Service:
     """Get info of an existing service by Id
 
@@ -142,10 +164,43 @@ def create_service_turn(
     Returns:
         CreateServiceTurnResponse: Created service turn
     """
-    item = service.create_service_turn(
+    turn, people_in_queue = service.create_service_turn(
         session,
         application,
         service_id,
         item,
     )
-    return mappers.map_service_turn_response(item)
+    return mappers.map_service_turn_response(
+        turn,
+        item.customerName,
+        people_in_queue,
+        wait_times.estimator.estimate(turn.service_id, people_in_queue),
+    )
+
+
+def call_next_service_turn(
+    session: Session, service_id: int
+) -> base_api_models.ServiceTurn:
+    """Moves the highest priority and oldest pending turn of the service
+    to being attended
+
+    Args:
+        session (Session):  Database session
+        service_id (int): ID of service to call the turn from
+
+    Raises:
+        HTTPException: When the service has no pending turns
+
+    Returns:
+        ServiceTurn: Called service turn
+    """
+    turn_id = turns.index.call_next(session, service_id)
+
+    if turn_id is None:
+        raise exceptions.NO_PENDING_TURNS_ERROR
+
+    turn_counters.counters.sync_turn(session, turn_id)
+    item = db_models.ServiceTurn.find_by_id(
+        session, turn_id, loaders.service_turn_options()
+    )
+    return general_mappers.map_service_turn(item)
@@ -1,23 +1,31 @@
 """Service API mappers"""
 
+from typing import Optional
 from . import models as api_models
-from ..database import models as db_models
+from .. import turns
 
 
 def map_service_turn_response(
-    turn: db_models.ServiceTurn,
+    turn: turns.PendingTurn,
+    customer_name: Optional[str],
+    people_in_queue: int,
+    estimated_wait_seconds: Optional[int] = None,
 ) -> api_models.CreateServiceTurnResponse:
-    """Maps a database service turn to a API Service Turn Response
+    """Maps a created service turn to a API Service Turn Response
 
     Args:
-        turn (db_models.ServiceTurn): database service turn
+        turn (turns.PendingTurn): created service turn
+        customer_name (str, optional): name of the customer of the turn
+        people_in_queue (int): pending turns called before this one
+        estimated_wait_seconds (int, optional): estimated wait of the turn
 
     Returns:
         api_models.CreateServiceTurnResponse: API Service Turn Response
     """
     return api_models.CreateServiceTurnResponse(
         id=turn.id,
-        customerName=turn.customer_name,
+        customerName=customer_name,
         ticketNumber=turn.ticket_number,
-        peopleInQueue=12,
+        peopleInQueue=people_in_queue,
+        estimatedWaitSeconds=estimated_wait_seconds,
     )
@@ -68,5 +68,7 @@ class CreateServiceTurnResponse(BaseModel):
     customerName: str
     ticketNumber: str
     peopleInQueue: int
+    estimatedWaitSeconds: Optional[int] = None
 
 ServicesListResponse = List[base_api_models.Service]
+ServicesBatchResponse = List[base_api_models.BatchItem[base_api_models.Service]]
@@ -1,5 +1,6 @@
 """Service API router"""
 
+from typing import List
 from fastapi import APIRouter, Depends, Header, Query, status
 from sqlalchemy.orm import Session
 from .. import api_responses
@@ -15,6 +16,10 @@ from .constants import (
     ADD_SERVICE_OPERATION_ID,
     UPDATE_SERVICE_OPERATION_ID,
     PATCH_SERVICE_OPERATION_ID,
+    GET_SERVICES_BATCH_OPERATION_ID,
+    CALL_NEXT_SERVICE_TURN_OPERATION_ID,
+    BATCH_PATH,
+    NEXT_SERVICE_TURN_PATH,
 )
 from .. import helpers
 from . import handlers
@@ -45,6 +50,27 @@ def get_services(
     return handlers.get_services(session, active, offset, limit)
 
 
+@router.get(
+    BATCH_PATH,
+    dependencies=[
+        Depends(helpers.validate_api_access),
+        Depends(helpers.validate_token(constants.READ_SERVICES_SCOPE)),
+    ],
+    tags=TAGS,
+    operation_id=GET_SERVICES_BATCH_OPERATION_ID,
+    response_model=service_api_models.ServicesBatchResponse,
+    responses=api_responses.responses_descriptions,
+)
+def get_services_batch(
+    ids: List[int] = Depends(helpers.get_batch_ids),
+    session: Session = Depends(main.get_session),
+) -> service_api_models.ServicesBatchResponse:
+    """
+    Get info of several existing services by a comma separated list of Ids
+    """
+    return handlers.get_services_batch(session, ids)
+
+
 @router.get(
     "/{service_id}",
     dependencies=[
@@ -172,3 +198,23 @@ def create_service_turn(
 ) -> service_api_models.CreateServiceTurnResponse:
     """Creates a service turn for the given service"""
     return handlers.create_service_turn(session, application, service_id, item)
+
+
+@router.post(
+    NEXT_SERVICE_TURN_PATH,
+    dependencies=[
+        Depends(helpers.validate_api_access),
+        Depends(helpers.validate_token(constants.WRITE_SERVICE_TURNS_SCOPE)),
+    ],
+    tags=TAGS,
+    operation_id=CALL_NEXT_SERVICE_TURN_OPERATION_ID,
+    response_model=base_api_models.ServiceTurn,
+    responses=api_responses.responses_descriptions,
+)
+def call_next_service_turn(
+    service_id: int,
+    session: Session = Depends(main.get_session),
+) -> base_api_models.ServiceTurn:
+    """Calls the highest priority and oldest pending turn of the service,
+    moving it to being attended"""
+    return handlers.call_next_service_turn(session, service_id)
@@ -1,9 +1,12 @@
 """Service API service"""
 
 from datetime import datetime
-from sqlalchemy import select, func
+from typing import Tuple
+from sqlalchemy import inspect, select, func
 from sqlalchemy.orm import Session
 from .. import constants
+from .. import turn_counters
+from .. import turns
 from ..database import models as db_models
 from ..enums import StatusType
 from . import models as api_models
@@ -67,7 +70,7 @@ def get_priority_by_code(session: Session, code: str) -> db_models.Priority:
 
 
 def get_total_turns_for_service_id(session: Session, service_id: int) -> int:
-    """Gets the total of turns for the given service
+    """Gets the total of live turns for the given service, without the archived ones
 
     Args:
         session (Session):  Database session
@@ -88,7 +91,7 @@ def create_service_turn(
     application: str,
     service_id: int,
     item: api_models.CreateServiceTurnPayload,
-) -> db_models.ServiceTurn:
+) -> Tuple[turns.PendingTurn, int]:
     """Creates a service turn for the given service
 
     Args:
@@ -98,25 +101,45 @@ def create_service_turn(
         item (api_models.CreateServiceTurnPayload): The required payload
 
     Returns:
-        db_models.ServiceTurn: Created service turn
+        Tuple[turns.PendingTurn, int]: Created service turn and the people
+        in the queue ahead of it
     """
+    turns.index.refresh(session)
     service = get_service_by_id(session, service_id)
-    turns_count = get_total_turns_for_service_id(session, service_id)
-    status = get_status_by_code_and_type(
-        session, constants.DEFAULT_TURN_STATUS, StatusType.TURN
+    turns_count = get_total_turns_for_service_id(session, service_id) + (
+        service.archived_turns or 0
     )
+    # Committing expires the loaded objects, their values are kept beforehand
+    status_id = get_status_by_code_and_type(
+        session, constants.DEFAULT_TURN_STATUS, StatusType.TURN
+    ).id
     priority = get_priority_by_code(session, constants.DEFAULT_TURN_PRIORITY)
+    priority_id = priority.id
+    weight = priority.weight or 0
+    ticket_number = f"{service.prefix}-{turns_count + 1}"
     current_datetime = datetime.now()
     turn = db_models.ServiceTurn(
         customer_name=item.customerName,
-        service_id=service.id,
-        ticket_number=f"{service.prefix}-{turns_count + 1}",
+        service_id=service_id,
+        ticket_number=ticket_number,
         created_by=constants.SYSTEM_CREATOR,
         last_modified=current_datetime,
         created=current_datetime,
-        status_id=status.id,
-        priority_id=priority.id,
+        status_id=status_id,
+        priority_id=priority_id,
     )
     session.add_all([turn])
     session.commit()
-    return turn
+    # The identity key is kept after commit, reading the id would refresh the row
+    pending_turn = turns.PendingTurn(
+        inspect(turn).identity[0],
+        ticket_number,
+        service_id,
+        priority_id,
+        weight,
+        current_datetime,
+    )
+    people_in_queue = turns.index.count_ahead(service_id, weight)
+    turns.index.track(pending_turn)
+    turn_counters.counters.track(session, pending_turn.id, service_id, status_id)
+    return pending_turn, people_in_queue
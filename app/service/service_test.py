@@ -0,0 +1,131 @@
+"""Service API service test cases
+"""
+
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+from sqlalchemy import event, update
+from .. import archive
+from .. import turn_counters
+from .. import turns
+from .. import wait_times
+from ..database import memory
+from ..database import models as db_models
+from . import handlers
+from . import models as api_models
+
+SERVICE_ID = 1
+PREFIX = "DS-SA"
+HIGH_PRIORITY_ID = 1
+PENDING_STATUS_ID = 5
+ATTENDED_STATUS_ID = 7
+
+
+class CreateServiceTurnTest(unittest.TestCase):
+    """Service turn creation test cases over an in-memory database
+
+    Args:
+        unittest (unittest.TestCase): TestCase base class
+    """
+
+    def setUp(self):
+        self.session = memory.create_session()
+
+        for module, name, value in (
+            (turns, "index", turns.TurnIndex()),
+            (turn_counters, "counters", turn_counters.TurnCounters()),
+            (wait_times, "estimator", wait_times.WaitTimeEstimator()),
+        ):
+            patcher = mock.patch.object(module, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.session.close()
+
+    def create(self, customer_name: str = "Ana") -> api_models.CreateServiceTurnResponse:
+        """Creates a turn of the test service
+
+        Args:
+            customer_name (str): Name of the customer
+
+        Returns:
+            CreateServiceTurnResponse: Created service turn
+        """
+        return handlers.create_service_turn(
+            self.session,
+            None,
+            SERVICE_ID,
+            api_models.CreateServiceTurnPayload(customerName=customer_name),
+        )
+
+    def test_people_in_queue(self):
+        """Turns report the pending turns of the same or higher weight called before them
+        """
+        self.session.add(
+            db_models.ServiceTurn(
+                ticket_number="HIGH-1",
+                service_id=SERVICE_ID,
+                priority_id=HIGH_PRIORITY_ID,
+                status_id=PENDING_STATUS_ID,
+                created=datetime.now(),
+            )
+        )
+        self.session.commit()
+        created = [self.create(name) for name in ("Ana", "José", "Luis")]
+
+        self.assertEqual([turn.peopleInQueue for turn in created], [1, 2, 3])
+        self.assertEqual(
+            [turn.ticketNumber for turn in created],
+            [f"{PREFIX}-2", f"{PREFIX}-3", f"{PREFIX}-4"],
+        )
+        self.assertEqual(created[1].customerName, "José")
+
+    def test_ticket_numbers_across_archive(self):
+        """Tickets go on from the turns moved to the archive
+        """
+        for _ in range(2):
+            self.create()
+
+        moment = datetime.now() - timedelta(days=3)
+        self.session.execute(
+            update(db_models.ServiceTurn)
+            .where(db_models.ServiceTurn.service_id == SERVICE_ID)
+            .values(status_id=ATTENDED_STATUS_ID, created=moment, last_modified=moment)
+        )
+        self.session.commit()
+        archive.archive_turns(self.session)
+
+        self.assertEqual(self.session.get(db_models.Service, SERVICE_ID).archived_turns, 2)
+        self.assertEqual(self.create().ticketNumber, f"{PREFIX}-3")
+
+    def test_no_refresh_after_commit(self):
+        """The created turn and the rows read for it aren't loaded again after the insert
+        """
+        self.create()
+        statements = []
+
+        def listener(*args):
+            statements.append(args[2])
+
+        event.listen(self.session.bind, "before_cursor_execute", listener)
+
+        try:
+            turn_id = self.create().id
+        finally:
+            event.remove(self.session.bind, "before_cursor_execute", listener)
+
+        inserted = next(
+            index
+            for index, statement in enumerate(statements)
+            if statement.startswith("INSERT INTO service_turns")
+        )
+
+        self.assertEqual(statements[inserted + 1:], [])
+        self.assertEqual(
+            self.session.get(db_models.ServiceTurn, turn_id).ticket_number, f"{PREFIX}-2"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -10,6 +10,19 @@ ADD_SERVICE_TURN_OPERATION_ID = "addServiceTurn"
 UPDATE_SERVICE_TURN_OPERATION_ID = "updateServiceTurn"
 PATCH_SERVICE_TURN_OPERATION_ID = "patchServiceTurn"
 GET_TURNS_STATUS_TABLE_OPERATION_ID = "getTurnsStatusTable"
+EXPORT_SERVICE_TURNS_OPERATION_ID = "exportServiceTurns"
+GET_SERVICE_TURNS_BATCH_OPERATION_ID = "getServiceTurnsBatch"
+GET_SERVICE_TURN_POSITION_OPERATION_ID = "getServiceTurnPosition"
+GET_SERVICE_TURN_COUNTERS_OPERATION_ID = "getServiceTurnCounters"
+GET_SERVICE_TURNS_REPORT_OPERATION_ID = "getServiceTurnsReport"
+GET_SERVICE_TURNS_ANALYTICS_OPERATION_ID = "getServiceTurnsAnalytics"
 
 # Internal routes paths
+BATCH_PATH = "/batch"
+POSITION_PATH = "/position"
+COUNTERS_PATH = "/counters"
+REPORT_PATH = "/report"
+ANALYTICS_PATH = "/analytics"
 TURNS_STATUS_TABLE_PATH = "/status-table"
+EXPORT_PATH = "/export"
+EXPORT_FILENAME = "serviceturns"
@@ -1,46 +1,122 @@
 """ServiceTurn API handlers"""
 
-from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import List, Optional, Union
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.sql import Select
 from .. import base_api_models
 from .. import api_responses
+from .. import constants
+from .. import exceptions
 from ..database import models as db_models
+from ..database import loaders
 from .. import enums
 from .. import mappers
+from .. import exports
+from .. import analytics
+from .. import archive
+from .. import rollups
+from .. import turn_counters
+from .. import turns
+from .. import wait_times
+from ..fieldsets import FieldSet
+from .constants import EXPORT_FILENAME
 from . import models as service_turn_api_models
 
+# pylint: disable=R0913
+
 
 def get_service_turns(
-    session: Session, offset: int, limit: int
-) -> service_turn_api_models.ServiceTurnsListResponse:
-    """Get list of service_turns
+    session: Session,
+    offset: int,
+    limit: int,
+    fields: Optional[str] = None,
+    expand: Optional[str] = None,
+    include_archived: bool = False,
+) -> Union[service_turn_api_models.ServiceTurnsListResponse, JSONResponse]:
+    """Get list of service turns
 
     Args:
         session (Session): Database session
-        active (bool): Flag to return only active records.
         offset (int): The items to skip before collecting the result set.
         limit (int): The items to return.
+        fields (str, optional): Comma separated fields to return.
+        expand (str, optional): Comma separated relationships to embed.
+        include_archived (bool): Whether to list the archived turns too, by id.
 
     Returns:
         ServiceTurnsListResponse: List of service turns
     """
-    items = db_models.ServiceTurn.find_paginated(session, limit, offset)
-    return list(map(mappers.map_service_turn, items))
+    field_set = FieldSet(mappers.SERVICE_TURN_RESOURCE, fields, expand)
+
+    if include_archived:
+        items = archive.find_paginated_turns(
+            session, limit, offset, field_set.get_loader_options()
+        )
+    else:
+        items = db_models.ServiceTurn.find_paginated(
+            session, limit, offset, options=field_set.get_loader_options()
+        )
+
+    return field_set.get_list_response(items)
+
+
+def get_service_turns_batch(
+    session: Session, ids: List[int], include_archived: bool = False
+) -> service_turn_api_models.ServiceTurnsBatchResponse:
+    """Get info of several existing service turns by their Ids with a single query
+
+    Args:
+        session (Session): Database session
+        ids (List[int]): ids of the service turns
+        include_archived (bool): Whether to look for the missing ids in the archive
+
+    Returns:
+        ServiceTurnsBatchResponse: Result for each id, in the requested order
+    """
+    if include_archived:
+        items = archive.find_turns_by_ids(session, ids)
+    else:
+        items = db_models.ServiceTurn.find_by_ids(
+            session, ids, loaders.service_turn_options()
+        )
+
+    return mappers.map_batch_items(ids, items, mappers.map_service_turn)
 
 
 def get_service_turn_by_id(
-    session: Session, service_turn_id: int
-) -> base_api_models.ServiceTurn:
+    session: Session,
+    service_turn_id: int,
+    fields: Optional[str] = None,
+    expand: Optional[str] = None,
+    include_archived: bool = False,
+) -> Union[base_api_models.ServiceTurn, JSONResponse]:
     """Get info of an existing service_turn by Id
 
     Args:
         session (Session): Database session
         service_turn_id (int): id of the service turn
+        fields (str, optional): Comma separated fields to return.
+        expand (str, optional): Comma separated relationships to embed.
+        include_archived (bool): Whether to look in the archive when it isn't live.
 
     Returns:
         ServiceTurn: ServiceTurn for id
     """
-    item = db_models.ServiceTurn.find_by_id(session, service_turn_id)
-    return mappers.map_service_turn(item)
+    field_set = FieldSet(mappers.SERVICE_TURN_RESOURCE, fields, expand)
+
+    if include_archived:
+        item = archive.find_turn_by_id(
+            session, service_turn_id, field_set.get_loader_options()
+        )
+    else:
+        item = db_models.ServiceTurn.find_by_id(
+            session, service_turn_id, field_set.get_loader_options()
+        )
+
+    return field_set.get_item_response(item)
 
 
 def delete_service_turn_by_id(
@@ -56,6 +132,8 @@ def delete_service_turn_by_id(
         APIResponse: The result of the deletion
     """
     db_models.ServiceTurn.delete_by_id(session, service_turn_id)
+    turns.index.discard(service_turn_id)
+    turn_counters.counters.discard(service_turn_id)
     return api_responses.ITEM_DELETED_RESPONSE
 
 
@@ -75,7 +153,9 @@ def add_service_turn(
     db_models.Status.validate_status_type(
         session, payload.statusId, enums.StatusType.TURN
     )
-    db_models.ServiceTurn.create_from_data(session, payload.dict())
+    item = db_models.ServiceTurn.create_from_data(session, payload.dict())
+    turns.index.sync_turn(session, item.id)
+    turn_counters.counters.sync_turn(session, item.id)
     return api_responses.ITEM_ADDED_RESPONSE
 
 
@@ -97,7 +177,16 @@ def update_service_turn(
     db_models.Status.validate_status_type(
         session, payload.statusId, enums.StatusType.TURN
     )
-    db_models.ServiceTurn.update_by_id(session, service_turn_id, payload.dict())
+    db_models.ServiceTurn.update_by_id(
+        session,
+        service_turn_id,
+        {
+            **payload.dict(),
+            **turns.index.get_status_change_values(session, payload.statusId),
+        },
+    )
+    turns.index.sync_turn(session, service_turn_id)
+    turn_counters.counters.sync_turn(session, service_turn_id)
     return api_responses.ITEM_UPDATED_RESPONSE
 
 
@@ -121,29 +210,228 @@ def partially_update_service_turn(
             session, payload.statusId, enums.StatusType.TURN
         )
 
-    db_models.ServiceTurn.update_by_id(session, service_turn_id, payload.dict())
+    db_models.ServiceTurn.update_by_id(
+        session,
+        service_turn_id,
+        {
+            **payload.dict(),
+            **turns.index.get_status_change_values(session, payload.statusId),
+        },
+    )
+    turns.index.sync_turn(session, service_turn_id)
+    turn_counters.counters.sync_turn(session, service_turn_id)
     return api_responses.ITEM_UPDATED_RESPONSE
 
 
-def get_turns_status_table(
+def get_service_turn_position(
     session: Session,
-) -> service_turn_api_models.ServiceTurnsStatusTableResponse:
+    service_turn_id: Optional[int],
+    ticket_number: Optional[str],
+) -> service_turn_api_models.ServiceTurnPositionResponse:
+    """Gets how many people are ahead of a service turn
+
+    Pending turns are answered from the turn index. The database is only
+    queried for turns the index doesn't hold.
+
+    Args:
+        session (Session): Database session
+        service_turn_id (int, optional): id of the service turn
+        ticket_number (str, optional): ticket number of the service turn
+
+    Raises:
+        HTTPException: When neither or both the id and the ticket are given
+
+    Returns:
+        ServiceTurnPositionResponse: Place of the turn in the queue
+    """
+    if (service_turn_id is None) == (ticket_number is None):
+        raise exceptions.INVALID_TURN_REFERENCE_ERROR
+
+    turns.index.refresh(session)
+    position = turns.index.get_position(service_turn_id, ticket_number)
+
+    if position is None:
+        item = db_models.ServiceTurn.find_one(
+            session,
+            lambda x: x.where(
+                db_models.ServiceTurn.ticket_number == ticket_number
+                if service_turn_id is None
+                else db_models.ServiceTurn.id == service_turn_id
+            ),
+        )
+        turns.index.sync_turn(session, item.id)
+        position = turns.index.get_position(item.id)
+
+        if position is None:
+            return service_turn_api_models.ServiceTurnPositionResponse(
+                id=item.id,
+                ticketNumber=item.ticket_number,
+                serviceId=item.service_id,
+                isPending=False,
+            )
+
+    return service_turn_api_models.ServiceTurnPositionResponse(
+        id=position.turn.id,
+        ticketNumber=position.turn.ticket_number,
+        serviceId=position.turn.service_id,
+        isPending=True,
+        peopleAhead=position.people_ahead,
+        estimatedWaitSeconds=wait_times.estimator.estimate(
+            position.turn.service_id, position.people_ahead
+        ),
+    )
+
+
+def get_service_turn_counters(
+    session: Session, service_id: Optional[int], location_id: Optional[int]
+) -> service_turn_api_models.ServiceTurnCountersResponse:
+    """Gets the live turn counts by service and location
+
+    The counts are kept in memory and only reconciled against the database
+    periodically.
+
+    Args:
+        session (Session): Database session
+        service_id (int, optional): Only the counts of this service
+        location_id (int, optional): Only the counts of this location
+
+    Returns:
+        ServiceTurnCountersResponse: Counts by service and location
+    """
+    return [
+        service_turn_api_models.ServiceTurnCountersItem(
+            serviceId=count.service_id,
+            locationId=count.location_id,
+            pending=count.pending,
+            beingAttended=count.being_attended,
+            completedToday=count.completed_today,
+        )
+        for count in turn_counters.counters.get_counts(session, service_id, location_id)
+    ]
+
+
+def get_turns_status_table(session: Session) -> StreamingResponse:
     """Gets turns status table for the application in context
 
     Args:
         session (Session): Database session
 
     Returns:
-        models.ServiceTurnsStatusTableResponse: Turns status table response
+        StreamingResponse: Streamed turns status table
     """
     statuses = db_models.Status.find_many(
         session,
         lambda x: x.where(
-            db_models.Status.code.in_(["BEING_ATTENDED", "TO_BE_ATTENDED"])
+            db_models.Status.code.in_(
+                [
+                    constants.BEING_ATTENDED_TURN_STATUS,
+                    "TO_BE_ATTENDED",
+                    constants.DEFAULT_TURN_STATUS,
+                ]
+            )
         ).where(db_models.Status.type == enums.StatusType.TURN),
     )
     statuses_ids = [status.id for status in statuses]
-    items = db_models.ServiceTurn.find_many(
-        session, lambda x: x.where(db_models.ServiceTurn.status_id.in_(statuses_ids))
+    turns.index.refresh(session)
+    items = db_models.ServiceTurn.find_streamed(
+        session,
+        lambda x: x.where(db_models.ServiceTurn.status_id.in_(statuses_ids)),
+        [
+            joinedload(db_models.ServiceTurn.service),
+            joinedload(db_models.ServiceTurn.status),
+        ],
+    )
+    return api_responses.get_streaming_list_response(
+        items,
+        lambda turn: mappers.map_turn_status_item(
+            turn,
+            turns.index.estimate_wait(turn.id)
+            if turn.status.code == constants.DEFAULT_TURN_STATUS
+            else None,
+        ),
+    )
+
+
+def get_service_turns_report(
+    session: Session, query: rollups.ReportQuery
+) -> service_turn_api_models.ServiceTurnsReportResponse:
+    """Gets the statistics of the service turns from the daily rollups
+
+    Args:
+        session (Session): Database session
+        query (ReportQuery): Range, period, dimensions and filters
+
+    Returns:
+        ServiceTurnsReportResponse: Statistics by period and group
+    """
+    return [
+        mappers.map_stats_report_item(row) for row in rollups.get_report(session, query)
+    ]
+
+
+def get_service_turns_analytics(
+    session: Session, query: analytics.AnalyticsQuery
+) -> service_turn_api_models.ServiceTurnAnalyticsResponse:
+    """Computes the wait and service time distributions of the service turns
+
+    Args:
+        session (Session): Database session
+        query (AnalyticsQuery): Range, grouping and filters
+
+    Returns:
+        ServiceTurnAnalyticsResponse: Distributions by service, location and hour
+    """
+    return service_turn_api_models.ServiceTurnAnalyticsResponse(
+        histogramBuckets=list(constants.ROLLUP_DURATION_BUCKETS),
+        data=[
+            mappers.map_turn_analytics_item(row)
+            for row in analytics.get_turn_analytics(session, query)
+        ],
+    )
+
+
+def export_service_turns(
+    session: Session,
+    start: datetime,
+    end: datetime,
+    export_format: enums.ExportFormat,
+    compress: bool,
+    include_archived: bool = False,
+) -> StreamingResponse:
+    """Exports the service turns created within a date range
+
+    Every batch takes the next rows of each table and keeps the first ones
+    of both, so the turns are exported in order of id.
+
+    Args:
+        session (Session): Database session
+        start (datetime): Inclusive start of the range
+        end (datetime): Exclusive end of the range
+        export_format (ExportFormat): Output format
+        compress (bool): Whether to gzip the content
+        include_archived (bool): Whether to export the archived turns too
+
+    Returns:
+        StreamingResponse: Streamed export
+    """
+    def select_rows(after: Optional[int]) -> Select:
+        return (
+            archive.union_turns(
+                lambda model: select(
+                    exports.select_batch(
+                        select(*model.__table__.columns)
+                        .where(model.created >= start)
+                        .where(model.created < end),
+                        model.id,
+                        after,
+                    ).subquery()
+                ),
+                include_archived,
+            )
+            .order_by(db_models.ServiceTurn.id.name)
+            .limit(constants.EXPORT_BATCH_SIZE)
+        )
+
+    return exports.get_export_response(
+        session, select_rows, export_format, compress, EXPORT_FILENAME
     )
-    return list(map(mappers.map_turn_status_item, items))
@@ -0,0 +1,136 @@
+"""ServiceTurn API handlers test cases
+"""
+
+import json
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+from .. import turns
+from .. import wait_times
+from ..database import memory
+from ..database import models as db_models
+from ..exports_test import read_body
+from . import handlers
+
+SERVICE_ID = 1
+PENDING_STATUS_ID = 5
+ATTENDED_STATUS_ID = 7
+HIGH_PRIORITY_ID = 1
+SERVICE_SECONDS = 300
+ARCHIVED_TURN_ID = 1000
+MISSING_TURN_ID = 999999
+
+
+class BatchTest(unittest.TestCase):
+    """Batch of service turns test cases over an in-memory database
+
+    Args:
+        unittest (unittest.TestCase): TestCase base class
+    """
+
+    def setUp(self):
+        self.session = memory.create_session()
+        turn = db_models.ServiceTurn(
+            ticket_number=f"S{SERVICE_ID}-2",
+            service_id=SERVICE_ID,
+            priority_id=HIGH_PRIORITY_ID,
+            status_id=PENDING_STATUS_ID,
+        )
+        self.session.add(turn)
+        self.session.add(
+            db_models.ArchivedServiceTurn(
+                id=ARCHIVED_TURN_ID,
+                ticket_number=f"S{SERVICE_ID}-1",
+                service_id=SERVICE_ID,
+                priority_id=HIGH_PRIORITY_ID,
+                status_id=PENDING_STATUS_ID,
+            )
+        )
+        self.session.commit()
+        self.turn_id = turn.id
+
+    def tearDown(self):
+        self.session.close()
+
+    def test_batch(self):
+        """Every requested id gets an entry in order, missing ones not found
+        """
+        ids = [MISSING_TURN_ID, ARCHIVED_TURN_ID, self.turn_id]
+        items = handlers.get_service_turns_batch(self.session, ids)
+
+        self.assertEqual([item.id for item in items], ids)
+        self.assertEqual([item.found for item in items], [False, False, True])
+        self.assertEqual(items[2].item.ticketNumber, f"S{SERVICE_ID}-2")
+        self.assertIsNone(items[0].item)
+
+    def test_batch_with_archive(self):
+        """Archived turns are found when asked for
+        """
+        items = handlers.get_service_turns_batch(
+            self.session, [ARCHIVED_TURN_ID, self.turn_id], True
+        )
+
+        self.assertEqual([item.found for item in items], [True, True])
+        self.assertEqual(items[0].item.ticketNumber, f"S{SERVICE_ID}-1")
+
+
+class StatusTableTest(unittest.TestCase):
+    """Turns status table test cases over an in-memory database
+
+    Args:
+        unittest (unittest.TestCase): TestCase base class
+    """
+
+    def setUp(self):
+        self.session = memory.create_session()
+        started = datetime.now() - timedelta(hours=1)
+        self.session.add(
+            db_models.ArchivedServiceTurn(
+                id=ARCHIVED_TURN_ID,
+                ticket_number=f"S{SERVICE_ID}-1",
+                service_id=SERVICE_ID,
+                priority_id=HIGH_PRIORITY_ID,
+                status_id=ATTENDED_STATUS_ID,
+                service_started=started,
+                service_ended=started + timedelta(seconds=SERVICE_SECONDS),
+            )
+        )
+        self.session.add_all(
+            db_models.ServiceTurn(
+                ticket_number=f"S{SERVICE_ID}-{number}",
+                service_id=SERVICE_ID,
+                priority_id=HIGH_PRIORITY_ID,
+                status_id=PENDING_STATUS_ID,
+            )
+            for number in (2, 3)
+        )
+        self.session.commit()
+
+        for patcher in (
+            mock.patch.object(turns, "index", turns.TurnIndex()),
+            mock.patch.object(wait_times, "estimator", wait_times.WaitTimeEstimator()),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.session.close()
+
+    def test_pending_estimates(self):
+        """The pending turns are listed with the wait estimated from the history
+        """
+        queue_name = db_models.Service.find_by_id(self.session, SERVICE_ID).name
+        response = handlers.get_turns_status_table(self.session)
+        items = {
+            item["ticketNumber"]: item
+            for item in json.loads(read_body(response))
+            if item["queueName"] == queue_name
+        }
+
+        self.assertEqual(sorted(items), [f"S{SERVICE_ID}-2", f"S{SERVICE_ID}-3"])
+        self.assertEqual(items[f"S{SERVICE_ID}-2"]["estimatedWaitSeconds"], 0)
+        self.assertEqual(items[f"S{SERVICE_ID}-3"]["estimatedWaitSeconds"], SERVICE_SECONDS)
+
+
+if __name__ == "__main__":
+    unittest.main()
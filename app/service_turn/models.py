@@ -1,6 +1,7 @@
 """ServiceTurn API models"""
 
 from typing import List, Optional
+from pydantic import BaseModel
 from .. import base_api_models
 
 
@@ -43,6 +44,50 @@ class PatchServiceTurnPayload(base_api_models.ServiceTurnBasicData):
     lastModifiedBy: Optional[str] = None
 
 
+class ServiceTurnPositionResponse(BaseModel):
+    """Place of a service turn in the queue of its service
+
+    Args:
+        BaseModel (class): Base model class
+    """
+
+    id: int
+    ticketNumber: str
+    serviceId: int
+    isPending: bool
+    peopleAhead: Optional[int] = None
+    estimatedWaitSeconds: Optional[int] = None
+
+
+class ServiceTurnCountersItem(BaseModel):
+    """Live counts of the service turns of a service at a location
+
+    Args:
+        BaseModel (class): Base model class
+    """
+
+    serviceId: int
+    locationId: Optional[int] = None
+    pending: int
+    beingAttended: int
+    completedToday: int
+
+
+class ServiceTurnAnalyticsResponse(BaseModel):
+    """Wait and service time distributions of the service turns, with the
+    upper bounds in seconds of the histogram buckets, the last one unbounded
+
+    Args:
+        BaseModel (class): Base model class
+    """
+
+    histogramBuckets: List[int]
+    data: List[base_api_models.TurnAnalyticsItem]
+
+
+ServiceTurnCountersResponse = List[ServiceTurnCountersItem]
+ServiceTurnsReportResponse = List[base_api_models.StatsReportItem]
 ServiceTurnsStatusTableResponse = List[base_api_models.ServiceTurnStatusItem]
 
 ServiceTurnsListResponse = List[base_api_models.ServiceTurn]
+ServiceTurnsBatchResponse = List[base_api_models.BatchItem[base_api_models.ServiceTurn]]
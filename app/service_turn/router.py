@@ -1,11 +1,17 @@
 """ServiceTurn API router"""
 
+from datetime import datetime
+from typing import List, Optional
 from fastapi import APIRouter, Depends, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from .. import api_responses
 from .. import base_api_models
 from .. import constants
 from .. import helpers
+from .. import analytics
+from .. import rollups
+from ..enums import ExportFormat, StatusType
 from ..database import main
 from .constants import (
     TAGS,
@@ -17,10 +23,23 @@ from .constants import (
     UPDATE_SERVICE_TURN_OPERATION_ID,
     GET_TURNS_STATUS_TABLE_OPERATION_ID,
     TURNS_STATUS_TABLE_PATH,
+    EXPORT_SERVICE_TURNS_OPERATION_ID,
+    EXPORT_PATH,
+    GET_SERVICE_TURNS_BATCH_OPERATION_ID,
+    GET_SERVICE_TURN_POSITION_OPERATION_ID,
+    GET_SERVICE_TURN_COUNTERS_OPERATION_ID,
+    GET_SERVICE_TURNS_REPORT_OPERATION_ID,
+    GET_SERVICE_TURNS_ANALYTICS_OPERATION_ID,
+    BATCH_PATH,
+    REPORT_PATH,
+    ANALYTICS_PATH,
+    POSITION_PATH,
+    COUNTERS_PATH,
 )
 from . import handlers
 from . import models as service_turn_api_models
 
+# pylint: disable=R0913
 
 router = APIRouter()
 
@@ -39,12 +58,17 @@ router = APIRouter()
 def get_service_turns(
     offset: int = Query(default=constants.DEFAULT_PAGE_OFFSET, ge=0),
     limit: int = Query(default=constants.DEFAULT_PAGE_LIMIT, ge=1),
+    fields: Optional[str] = None,
+    expand: Optional[str] = None,
+    include_archived: bool = Query(default=False, alias="includeArchived"),
     session: Session = Depends(main.get_session),
 ) -> service_turn_api_models.ServiceTurnsListResponse:
     """
-    Gets a list of service turns
+    Gets a list of service turns, the archived ones too when includeArchived is set
     """
-    return handlers.get_service_turns(session, offset, limit)
+    return handlers.get_service_turns(
+        session, offset, limit, fields, expand, include_archived
+    )
 
 
 @router.get(
@@ -60,11 +84,153 @@ def get_service_turns(
 )
 def get_turns_status_table(
     session: Session = Depends(main.get_session),
-) -> service_turn_api_models.ServiceTurnsStatusTableResponse:
+) -> StreamingResponse:
     """Gets turns status table for the application in context"""
     return handlers.get_turns_status_table(session)
 
 
+@router.get(
+    EXPORT_PATH,
+    dependencies=[
+        Depends(helpers.validate_api_access),
+        Depends(helpers.validate_token(constants.READ_SERVICE_TURNS_SCOPE)),
+    ],
+    tags=TAGS,
+    operation_id=EXPORT_SERVICE_TURNS_OPERATION_ID,
+    response_class=StreamingResponse,
+    responses=api_responses.responses_descriptions,
+)
+def export_service_turns(
+    start: datetime,
+    end: datetime,
+    export_format: ExportFormat = Query(default=ExportFormat.NDJSON, alias="format"),
+    compress: bool = Query(default=False, alias="gzip"),
+    include_archived: bool = Query(default=False, alias="includeArchived"),
+    session: Session = Depends(main.get_session),
+) -> StreamingResponse:
+    """
+    Exports the service turns created within a date range as NDJSON or CSV,
+    the archived ones too when includeArchived is set
+    """
+    return handlers.export_service_turns(
+        session, start, end, export_format, compress, include_archived
+    )
+
+
+@router.get(
+    REPORT_PATH,
+    dependencies=[
+        Depends(helpers.validate_api_access),
+        Depends(helpers.validate_token(constants.READ_SERVICE_TURNS_SCOPE)),
+    ],
+    tags=TAGS,
+    operation_id=GET_SERVICE_TURNS_REPORT_OPERATION_ID,
+    response_model=service_turn_api_models.ServiceTurnsReportResponse,
+    responses=api_responses.responses_descriptions,
+)
+def get_service_turns_report(
+    query: rollups.ReportQuery = Depends(helpers.get_report_query(StatusType.TURN)),
+    session: Session = Depends(main.get_session),
+) -> service_turn_api_models.ServiceTurnsReportResponse:
+    """
+    Gets the statistics of the service turns by day or month from the daily rollups,
+    optionally grouped by a comma separated list of service, location,
+    priority and status
+    """
+    return handlers.get_service_turns_report(session, query)
+
+
+@router.get(
+    ANALYTICS_PATH,
+    dependencies=[
+        Depends(helpers.validate_api_access),
+        Depends(helpers.validate_token(constants.READ_SERVICE_TURNS_SCOPE)),
+    ],
+    tags=TAGS,
+    operation_id=GET_SERVICE_TURNS_ANALYTICS_OPERATION_ID,
+    response_model=service_turn_api_models.ServiceTurnAnalyticsResponse,
+    responses=api_responses.responses_descriptions,
+)
+def get_service_turns_analytics(
+    query: analytics.AnalyticsQuery = Depends(helpers.get_analytics_query),
+    session: Session = Depends(main.get_session),
+) -> service_turn_api_models.ServiceTurnAnalyticsResponse:
+    """
+    Computes the 50th, 90th and 99th percentiles and histograms of the wait and
+    service times of the service turns created in a range, optionally grouped
+    by a comma separated list of service, location and hour of creation
+    """
+    return handlers.get_service_turns_analytics(session, query)
+
+
+@router.get(
+    BATCH_PATH,
+    dependencies=[
+        Depends(helpers.validate_api_access),
+        Depends(helpers.validate_token(constants.READ_SERVICE_TURNS_SCOPE)),
+    ],
+    tags=TAGS,
+    operation_id=GET_SERVICE_TURNS_BATCH_OPERATION_ID,
+    response_model=service_turn_api_models.ServiceTurnsBatchResponse,
+    responses=api_responses.responses_descriptions,
+)
+def get_service_turns_batch(
+    ids: List[int] = Depends(helpers.get_batch_ids),
+    include_archived: bool = Query(default=False, alias="includeArchived"),
+    session: Session = Depends(main.get_session),
+) -> service_turn_api_models.ServiceTurnsBatchResponse:
+    """
+    Get info of several existing service turns by a comma separated list of Ids,
+    looking in the archive too when includeArchived is set
+    """
+    return handlers.get_service_turns_batch(session, ids, include_archived)
+
+
+@router.get(
+    POSITION_PATH,
+    dependencies=[
+        Depends(helpers.validate_api_access),
+        Depends(helpers.validate_token(constants.READ_SERVICE_TURNS_SCOPE)),
+    ],
+    tags=TAGS,
+    operation_id=GET_SERVICE_TURN_POSITION_OPERATION_ID,
+    response_model=service_turn_api_models.ServiceTurnPositionResponse,
+    responses=api_responses.responses_descriptions,
+)
+def get_service_turn_position(
+    service_turn_id: Optional[int] = Query(default=None, alias="id"),
+    ticket_number: Optional[str] = Query(default=None, alias="ticketNumber"),
+    session: Session = Depends(main.get_session),
+) -> service_turn_api_models.ServiceTurnPositionResponse:
+    """
+    Gets how many people are ahead of a service turn, by id or ticket number
+    """
+    return handlers.get_service_turn_position(session, service_turn_id, ticket_number)
+
+
+@router.get(
+    COUNTERS_PATH,
+    dependencies=[
+        Depends(helpers.validate_api_access),
+        Depends(helpers.validate_token(constants.READ_SERVICE_TURNS_SCOPE)),
+    ],
+    tags=TAGS,
+    operation_id=GET_SERVICE_TURN_COUNTERS_OPERATION_ID,
+    response_model=service_turn_api_models.ServiceTurnCountersResponse,
+    responses=api_responses.responses_descriptions,
+)
+def get_service_turn_counters(
+    service_id: Optional[int] = Query(default=None, alias="serviceId"),
+    location_id: Optional[int] = Query(default=None, alias="locationId"),
+    session: Session = Depends(main.get_session),
+) -> service_turn_api_models.ServiceTurnCountersResponse:
+    """
+    Gets how many turns are pending, being attended and completed today
+    by service and location
+    """
+    return handlers.get_service_turn_counters(session, service_id, location_id)
+
+
 @router.get(
     "/{service_turn_id}",
     dependencies=[
@@ -77,12 +243,19 @@ def get_turns_status_table(
     responses=api_responses.responses_descriptions,
 )
 def get_service_turn_by_id(
-    service_turn_id: int, session: Session = Depends(main.get_session)
+    service_turn_id: int,
+    fields: Optional[str] = None,
+    expand: Optional[str] = None,
+    include_archived: bool = Query(default=False, alias="includeArchived"),
+    session: Session = Depends(main.get_session),
 ) -> base_api_models.ServiceTurn:
     """
-    Get info of an existing service turn by Id
+    Get info of an existing service turn by Id, looking in the archive too
+    when includeArchived is set
     """
-    return handlers.get_service_turn_by_id(session, service_turn_id)
+    return handlers.get_service_turn_by_id(
+        session, service_turn_id, fields, expand, include_archived
+    )
 
 
 @router.post(
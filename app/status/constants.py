@@ -9,3 +9,7 @@ DELETE_STATUS_BY_ID_OPERATION_ID = "deleteStatusById"
 ADD_STATUS_OPERATION_ID = "addStatus"
 UPDATE_STATUS_OPERATION_ID = "updateStatus"
 PATCH_STATUS_OPERATION_ID = "patchStatus"
+GET_STATUSES_BATCH_OPERATION_ID = "getStatusesBatch"
+
+# Internal routes paths
+BATCH_PATH = "/batch"
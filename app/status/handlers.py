@@ -1,5 +1,6 @@
 """Status API handlers"""
 
+from typing import List
 from sqlalchemy.orm import Session
 from .. import base_api_models
 from .. import api_responses
@@ -34,6 +35,22 @@ def get_statuses(
     return list(map(mappers.map_status, items))
 
 
+def get_statuses_batch(
+    session: Session, ids: List[int]
+) -> status_api_models.StatusesBatchResponse:
+    """Get info of several existing statuses by their Ids with a single query
+
+    Args:
+        session (Session): Database session
+        ids (List[int]): ids of the statuses
+
+    Returns:
+        StatusesBatchResponse: Result for each id, in the requested order
+    """
+    items = db_models.Status.find_by_ids(session, ids)
+    return mappers.map_batch_items(ids, items, mappers.map_status)
+
+
 def get_status_by_id(session: Session, status_id: int) -> base_api_models.Status:
     """Get info of an existing status by Id
 
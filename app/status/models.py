@@ -40,3 +40,4 @@ class PatchStatusPayload(base_api_models.Status):
 
 
 StatusesListResponse = List[base_api_models.Status]
+StatusesBatchResponse = List[base_api_models.BatchItem[base_api_models.Status]]
@@ -1,5 +1,6 @@
 """Status API router"""
 
+from typing import List
 from fastapi import APIRouter, Depends, Query, status
 from sqlalchemy.orm import Session
 from .. import api_responses
@@ -15,6 +16,8 @@ from .constants import (
     GET_STATUS_BY_ID_OPERATION_ID,
     PATCH_STATUS_OPERATION_ID,
     UPDATE_STATUS_OPERATION_ID,
+    GET_STATUSES_BATCH_OPERATION_ID,
+    BATCH_PATH,
 )
 from . import handlers
 from . import models as status_api_models
@@ -46,6 +49,27 @@ def get_statuses(
     return handlers.get_statuses(session, active, offset, limit)
 
 
+@router.get(
+    BATCH_PATH,
+    dependencies=[
+        Depends(helpers.validate_api_access),
+        Depends(helpers.validate_token(constants.READ_STATUSES_SCOPE)),
+    ],
+    tags=TAGS,
+    operation_id=GET_STATUSES_BATCH_OPERATION_ID,
+    response_model=status_api_models.StatusesBatchResponse,
+    responses=api_responses.responses_descriptions,
+)
+def get_statuses_batch(
+    ids: List[int] = Depends(helpers.get_batch_ids),
+    session: Session = Depends(main.get_session),
+) -> status_api_models.StatusesBatchResponse:
+    """
+    Get info of several existing statuses by a comma separated list of Ids
+    """
+    return handlers.get_statuses_batch(session, ids)
+
+
 @router.get(
     "/{status_id}",
     dependencies=[
@@ -0,0 +1,42 @@
+"""Cold storage entry point"""
+
+import argparse
+import sys
+import os
+
+# pylint: disable=C0413
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(SCRIPT_DIR))
+
+from app import cold_storage, constants, environment
+from app.database.main import get_session
+
+parser = argparse.ArgumentParser(
+    description="Moves the old service turns and appointments to compressed files"
+)
+parser.add_argument(
+    "--days",
+    type=int,
+    default=constants.COLD_STORAGE_AFTER_DAYS,
+    help="Full days the turns and appointments must be older than",
+)
+parser.add_argument(
+    "--batch-size",
+    type=int,
+    default=constants.COLD_STORAGE_BATCH_SIZE,
+    help="Rows moved per transaction",
+)
+parser.add_argument(
+    "--directory",
+    default=environment.cold_storage_dir,
+    help="Cold storage directory",
+)
+args = parser.parse_args()
+
+session = next(get_session())
+
+try:
+    cold_storage.run(session, args.directory, args.days, args.batch_size)
+finally:
+    session.close()
@@ -0,0 +1,267 @@
+"""Live counters of the service turns by service and location
+
+Every worker keeps how many turns of each service and location are
+pending, being attended and were completed today, and moves a turn between
+them when it is written through the API, so dashboards read them without
+grouping over the turns table. Turns take the location of their
+appointment. The counters are reconciled against the database every
+``TURN_COUNTERS_RECONCILE_INTERVAL`` seconds, which also picks up the
+writes of other workers, and when the day changes.
+"""
+
+import logging
+import threading
+import time
+from datetime import date, datetime, time as day_time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+from . import constants
+from .database import models as db_models
+from .enums import StatusType
+
+# pylint: disable=E1102
+
+PENDING = 0
+BEING_ATTENDED = 1
+COMPLETED_TODAY = 2
+
+CountersKey = Tuple[int, Optional[int]]
+
+logger = logging.getLogger(__name__)
+
+
+class TurnCount(NamedTuple):
+    """Counts of the turns of a service at a location"""
+
+    service_id: int
+    location_id: Optional[int]
+    pending: int
+    being_attended: int
+    completed_today: int
+
+
+def select_counted_turns() -> Select:
+    """Builds the query of the turns the counters need
+
+    Returns:
+        Select: Selection of id, service, location, status and attention end
+    """
+    return select(
+        db_models.ServiceTurn.id,
+        db_models.ServiceTurn.service_id,
+        db_models.Appointment.location_id,
+        db_models.ServiceTurn.status_id,
+        func.coalesce(
+            db_models.ServiceTurn.service_ended, db_models.ServiceTurn.last_modified
+        ),
+    ).outerjoin(
+        db_models.Appointment,
+        db_models.Appointment.id == db_models.ServiceTurn.appointment_id,
+    )
+
+
+class TurnCounters:
+    """Turn counts of every service and location"""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.refresh_lock = threading.Lock()
+        self.counts: Dict[CountersKey, List[int]] = {}
+        self.turns: Dict[int, Tuple[CountersKey, int]] = {}
+        self.buckets: Dict[int, int] = {}
+        self.day: Optional[date] = None
+        self.reconciled_at: Optional[float] = None
+
+    def refresh(self, session: Session) -> None:
+        """Reconciles the counters on first use, periodically and daily
+
+        Args:
+            session (Session): Database session
+        """
+        if (
+            self.reconciled_at is not None
+            and self.day == date.today()
+            and time.monotonic() - self.reconciled_at
+            < constants.TURN_COUNTERS_RECONCILE_INTERVAL
+        ):
+            return
+
+        with self.refresh_lock:
+            if (
+                self.reconciled_at is None
+                or self.day != date.today()
+                or time.monotonic() - self.reconciled_at
+                >= constants.TURN_COUNTERS_RECONCILE_INTERVAL
+            ):
+                self.reconcile(session)
+
+    def reconcile(self, session: Session) -> None:
+        """Recounts the live and today's completed turns from the database
+
+        Args:
+            session (Session): Database session
+        """
+        statuses = dict(
+            session.execute(
+                select(db_models.Status.code, db_models.Status.id).where(
+                    db_models.Status.type == StatusType.TURN
+                )
+            ).all()
+        )
+        buckets = {
+            statuses[code]: bucket
+            for code, bucket in (
+                (constants.DEFAULT_TURN_STATUS, PENDING),
+                (constants.BEING_ATTENDED_TURN_STATUS, BEING_ATTENDED),
+                (constants.ATTENDED_TURN_STATUS, COMPLETED_TODAY),
+            )
+            if code in statuses
+        }
+        today = date.today()
+        turns = {}
+        counts: Dict[CountersKey, List[int]] = {}
+
+        if buckets:
+            rows = session.execute(
+                select_counted_turns()
+                .where(db_models.ServiceTurn.status_id.in_(buckets))
+                .where(
+                    or_(
+                        db_models.ServiceTurn.status_id
+                        != statuses.get(constants.ATTENDED_TURN_STATUS),
+                        func.coalesce(
+                            db_models.ServiceTurn.service_ended,
+                            db_models.ServiceTurn.last_modified,
+                        )
+                        >= datetime.combine(today, day_time.min),
+                    )
+                )
+                .execution_options(yield_per=constants.STREAM_BATCH_SIZE)
+            )
+
+            for turn_id, service_id, location_id, status_id, _ in rows:
+                key = (service_id, location_id)
+                bucket = buckets[status_id]
+                turns[turn_id] = (key, bucket)
+                counts.setdefault(key, [0, 0, 0])[bucket] += 1
+
+        with self.lock:
+            if self.counts and self.day == today and counts != self.counts:
+                logger.info("Reconciled the turn counters of %d turns", len(turns))
+
+            self.counts = counts
+            self.turns = turns
+            self.buckets = buckets
+            self.day = today
+            self.reconciled_at = time.monotonic()
+
+    def get_bucket(self, status_id: int, ended: Optional[datetime]) -> Optional[int]:
+        """Gets the counter a turn belongs to
+
+        Args:
+            status_id (int): ID of the status of the turn
+            ended (datetime, optional): When the attention ended
+
+        Returns:
+            int: Counter of the turn, None when it isn't counted
+        """
+        bucket = self.buckets.get(status_id)
+
+        if bucket == COMPLETED_TODAY and (ended is None or ended.date() != self.day):
+            return None
+
+        return bucket
+
+    def move(self, turn_id: int, key: Optional[CountersKey], bucket: Optional[int]) -> None:
+        """Moves a turn to a counter, or out of every counter
+
+        Args:
+            turn_id (int): ID of the turn
+            key (CountersKey, optional): Service and location of the turn
+            bucket (int, optional): New counter, None to stop counting the turn
+        """
+        with self.lock:
+            previous = self.turns.pop(turn_id, None)
+
+            if previous is not None:
+                self.counts[previous[0]][previous[1]] -= 1
+
+            if key is not None and bucket is not None:
+                self.turns[turn_id] = (key, bucket)
+                self.counts.setdefault(key, [0, 0, 0])[bucket] += 1
+
+    def track(
+        self, session: Session, turn_id: int, service_id: int, status_id: int
+    ) -> None:
+        """Counts a walk-in turn just created by this worker, which has no
+        appointment and so no location
+
+        Args:
+            session (Session): Database session
+            turn_id (int): ID of the turn
+            service_id (int): ID of the service
+            status_id (int): ID of the status
+        """
+        self.refresh(session)
+        self.move(turn_id, (service_id, None), self.get_bucket(status_id, None))
+
+    def sync_turn(self, session: Session, turn_id: int) -> None:
+        """Recounts a turn after it was written
+
+        Args:
+            session (Session): Database session
+            turn_id (int): ID of the turn
+        """
+        self.refresh(session)
+        row = session.execute(
+            select_counted_turns().where(db_models.ServiceTurn.id == turn_id)
+        ).first()
+
+        if row is None:
+            self.move(turn_id, None, None)
+            return
+
+        _, service_id, location_id, status_id, ended = row
+        self.move(turn_id, (service_id, location_id), self.get_bucket(status_id, ended))
+
+    def discard(self, turn_id: int) -> None:
+        """Stops counting a deleted turn
+
+        Args:
+            turn_id (int): ID of the turn
+        """
+        self.move(turn_id, None, None)
+
+    def get_counts(
+        self,
+        session: Session,
+        service_id: Optional[int] = None,
+        location_id: Optional[int] = None,
+    ) -> List[TurnCount]:
+        """Gets the counts of every service and location with turns
+
+        Args:
+            session (Session): Database session
+            service_id (int, optional): Only the counts of this service
+            location_id (int, optional): Only the counts of this location
+
+        Returns:
+            List[TurnCount]: Counts by service and location
+        """
+        self.refresh(session)
+
+        with self.lock:
+            items = list(self.counts.items())
+
+        return [
+            TurnCount(key[0], key[1], *values)
+            for key, values in sorted(items, key=lambda item: (item[0][0], item[0][1] or 0))
+            if any(values)
+            and (service_id is None or key[0] == service_id)
+            and (location_id is None or key[1] == location_id)
+        ]
+
+
+counters = TurnCounters()
@@ -0,0 +1,140 @@
+"""Turn counters test cases
+"""
+
+import unittest
+from datetime import date, datetime, timedelta
+from sqlalchemy import delete, update
+from . import turn_counters
+from .database import memory
+from .database import models as db_models
+
+SERVICE_ID = 1
+OTHER_SERVICE_ID = 2
+HIGH_PRIORITY_ID = 1
+PENDING_STATUS_ID = 5
+ATTENDED_STATUS_ID = 7
+BEING_ATTENDED_STATUS_ID = 17
+
+
+class TurnCountersTest(unittest.TestCase):
+    """Live turn counters test cases over an in-memory database
+
+    Args:
+        unittest (unittest.TestCase): TestCase base class
+    """
+
+    def setUp(self):
+        self.session = memory.create_session()
+        self.counters = turn_counters.TurnCounters()
+        self.number = 0
+
+    def tearDown(self):
+        self.session.close()
+
+    def add_turn(
+        self, status_id: int, ended: datetime = None, service_id: int = SERVICE_ID
+    ) -> int:
+        """Adds a turn without appointment
+
+        Args:
+            status_id (int): ID of the status
+            ended (datetime): When the attention ended
+            service_id (int): ID of the service
+
+        Returns:
+            int: ID of the turn
+        """
+        self.number += 1
+        turn = db_models.ServiceTurn(
+            ticket_number=f"S{service_id}-{self.number}",
+            service_id=service_id,
+            priority_id=HIGH_PRIORITY_ID,
+            status_id=status_id,
+            service_ended=ended,
+        )
+        self.session.add(turn)
+        self.session.commit()
+        return turn.id
+
+    def get_counts(self, service_id: int = SERVICE_ID) -> tuple:
+        """Gets the counts of a service without location
+
+        Args:
+            service_id (int): ID of the service
+
+        Returns:
+            tuple: Pending, being attended and completed today counts
+        """
+        counts = self.counters.get_counts(self.session, service_id)
+
+        if not counts:
+            return (0, 0, 0)
+
+        self.assertEqual(
+            [(count.service_id, count.location_id) for count in counts], [(service_id, None)]
+        )
+        return counts[0][2:]
+
+    def test_reconcile(self):
+        """Live turns and the turns attended today are counted, older ones are not
+        """
+        self.add_turn(PENDING_STATUS_ID)
+        self.add_turn(PENDING_STATUS_ID)
+        self.add_turn(BEING_ATTENDED_STATUS_ID)
+        self.add_turn(ATTENDED_STATUS_ID, datetime.now())
+        self.add_turn(ATTENDED_STATUS_ID, datetime.now() - timedelta(days=1))
+        self.add_turn(PENDING_STATUS_ID, service_id=OTHER_SERVICE_ID)
+
+        self.assertEqual(self.get_counts(), (2, 1, 1))
+        self.assertEqual(self.get_counts(OTHER_SERVICE_ID), (1, 0, 0))
+
+    def test_moves(self):
+        """Turns written by the worker move between the counters
+        """
+        self.assertEqual(self.get_counts(), (0, 0, 0))
+
+        turn_id = self.add_turn(PENDING_STATUS_ID)
+        self.counters.track(self.session, turn_id, SERVICE_ID, PENDING_STATUS_ID)
+
+        self.assertEqual(self.get_counts(), (1, 0, 0))
+
+        for status_id, ended, counts in (
+            (BEING_ATTENDED_STATUS_ID, None, (0, 1, 0)),
+            (ATTENDED_STATUS_ID, datetime.now(), (0, 0, 1)),
+        ):
+            self.session.execute(
+                update(db_models.ServiceTurn)
+                .where(db_models.ServiceTurn.id == turn_id)
+                .values(status_id=status_id, service_ended=ended)
+            )
+            self.session.commit()
+            self.counters.sync_turn(self.session, turn_id)
+
+            self.assertEqual(self.get_counts(), counts)
+
+        self.session.execute(
+            delete(db_models.ServiceTurn).where(db_models.ServiceTurn.id == turn_id)
+        )
+        self.session.commit()
+        self.counters.sync_turn(self.session, turn_id)
+
+        self.assertEqual(self.get_counts(), (0, 0, 0))
+
+    def test_day_change(self):
+        """The counters are reconciled when the day changes, picking up other writes
+        """
+        self.add_turn(ATTENDED_STATUS_ID, datetime.now())
+
+        self.assertEqual(self.get_counts(), (0, 0, 1))
+
+        self.add_turn(PENDING_STATUS_ID)
+
+        self.assertEqual(self.get_counts(), (0, 0, 1))
+
+        self.counters.day = date.today() - timedelta(days=1)
+
+        self.assertEqual(self.get_counts(), (1, 0, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
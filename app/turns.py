@@ -0,0 +1,811 @@
+"""In-memory index of the pending service turns
+
+Every worker keeps the pending turns of each service in a heap ordered by
+priority weight and arrival, so calling the next turn doesn't scan the
+table, together with Fenwick trees answering how many turns are ahead of
+any of them. The database remains the source of truth: a turn is only
+handed out once a conditional UPDATE moves it out of the pending status, so
+entries made stale by other workers are skipped. Turns created or modified
+by other workers are picked up every ``TURN_INDEX_SYNC_INTERVAL`` seconds,
+looking ``TURN_INDEX_SYNC_OVERLAP`` seconds back so the ones committed late
+with an earlier id or time aren't missed, and the whole index is rebuilt in
+creation order every ``TURN_INDEX_REBUILD_INTERVAL`` seconds. The turns
+tracked and removed while a rebuild reads the database are journaled and
+replayed on the rebuilt index, so turns called meanwhile don't come back as
+pending.
+"""
+
+import heapq
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+from . import constants
+from . import exceptions
+from . import wait_times
+from .database import models as db_models
+from .enums import StatusType
+
+# pylint: disable=E1102
+# pylint: disable=R0902
+
+HEAP_COMPACTION_MIN_SIZE = 1024
+FENWICK_TREE_MIN_SIZE = 64
+
+
+class PendingTurn(NamedTuple):
+    """Pending turn with the values ordering the dispatch"""
+
+    id: int
+    ticket_number: str
+    service_id: int
+    priority_id: int
+    weight: int
+    created: datetime
+
+
+class TurnPosition(NamedTuple):
+    """Place of a pending turn in the queue of its service"""
+
+    turn: PendingTurn
+    people_ahead: int
+
+
+class FenwickTree:
+    """Counts by position with O(log n) updates and prefix sums
+
+    Positions start at 1 and the tree doubles its size as needed.
+    """
+
+    def __init__(self, size: int = FENWICK_TREE_MIN_SIZE) -> None:
+        self.values = [0] * (size + 1)
+        self.tree = [0] * (size + 1)
+
+    def add(self, position: int, delta: int) -> None:
+        """Adds to the count of a position
+
+        Args:
+            position (int): Position, from 1
+            delta (int): Value added
+        """
+        if position >= len(self.tree):
+            self.grow(2 * position)
+
+        self.values[position] += delta
+
+        while position < len(self.tree):
+            self.tree[position] += delta
+            position += position & -position
+
+    def prefix_sum(self, position: int) -> int:
+        """Sums the counts up to a position
+
+        Args:
+            position (int): Last position included
+
+        Returns:
+            int: Sum of the counts of positions 1 to position
+        """
+        total = 0
+        position = min(position, len(self.tree) - 1)
+
+        while position > 0:
+            total += self.tree[position]
+            position -= position & -position
+
+        return total
+
+    def grow(self, size: int) -> None:
+        """Rebuilds the tree with room for more positions in O(size)
+
+        Args:
+            size (int): New number of positions
+        """
+        self.values.extend([0] * (size + 1 - len(self.values)))
+        self.tree = list(self.values)
+
+        for position in range(1, size + 1):
+            parent = position + (position & -position)
+
+            if parent <= size:
+                self.tree[parent] += self.tree[position]
+
+
+class ServiceQueue:
+    """Pending turns of a service with the next one to call on top, their
+    counts by priority and their places in line
+
+    Every turn gets an arrival sequence number, kept when it changes
+    priority. Turns are called by weight and then by sequence, and a
+    Fenwick tree per weight counts the pending turns by sequence. Removed
+    or changed turns leave their old key in the heap, which is skipped when
+    popped and dropped when the heap is compacted.
+    """
+
+    def __init__(self) -> None:
+        self.heap: List[Tuple[int, int, int]] = []
+        self.turns: Dict[int, PendingTurn] = {}
+        self.sequences: Dict[int, int] = {}
+        self.last_sequence = 0
+        self.counts: Dict[Tuple[int, int], int] = {}
+        self.trees: Dict[int, FenwickTree] = {}
+
+    def __len__(self) -> int:
+        return len(self.turns)
+
+    def get_key(self, turn: PendingTurn) -> Tuple[int, int, int]:
+        """Gets the heap key of a queued turn, higher weights first and
+        then the earliest arrival
+
+        Args:
+            turn (PendingTurn): Queued turn
+
+        Returns:
+            Tuple[int, int, int]: Negated weight, sequence and id
+        """
+        return (-turn.weight, self.sequences[turn.id], turn.id)
+
+    def push(self, turn: PendingTurn) -> None:
+        """Adds or replaces a turn
+
+        Args:
+            turn (PendingTurn): Pending turn
+        """
+        current = self.turns.get(turn.id)
+
+        if current == turn:
+            return
+
+        if current is None:
+            self.last_sequence += 1
+            self.sequences[turn.id] = self.last_sequence
+        else:
+            self.count(current, -1)
+
+        self.turns[turn.id] = turn
+        self.count(turn, 1)
+        heapq.heappush(self.heap, self.get_key(turn))
+        self.compact_if_sparse()
+
+    def discard(self, turn_id: int) -> Optional[PendingTurn]:
+        """Removes a turn
+
+        Args:
+            turn_id (int): ID of the turn
+
+        Returns:
+            PendingTurn: The removed turn, if it was pending
+        """
+        turn = self.turns.get(turn_id)
+
+        if turn is not None:
+            self.remove(turn)
+            self.compact_if_sparse()
+
+        return turn
+
+    def pop(self) -> Optional[PendingTurn]:
+        """Removes the turn to call next
+
+        Returns:
+            PendingTurn: Highest priority and earliest turn, if any
+        """
+        while self.heap:
+            key = heapq.heappop(self.heap)
+            turn = self.turns.get(key[2])
+
+            if turn is not None and self.get_key(turn) == key:
+                self.remove(turn)
+                return turn
+
+        return None
+
+    def remove(self, turn: PendingTurn) -> None:
+        """Forgets a queued turn
+
+        Args:
+            turn (PendingTurn): Queued turn
+        """
+        self.count(turn, -1)
+        del self.turns[turn.id]
+        del self.sequences[turn.id]
+
+    def count(self, turn: PendingTurn, delta: int) -> None:
+        """Updates the counts of pending turns with a queued turn
+
+        Args:
+            turn (PendingTurn): Added or removed turn
+            delta (int): 1 when added, -1 when removed
+        """
+        group = (turn.priority_id, turn.weight)
+        count = self.counts.get(group, 0) + delta
+
+        if count:
+            self.counts[group] = count
+        else:
+            del self.counts[group]
+
+        tree = self.trees.setdefault(turn.weight, FenwickTree())
+        tree.add(self.sequences[turn.id], delta)
+
+    def count_heavier(self, weight: int, inclusive: bool) -> int:
+        """Counts the pending turns by priority weight
+
+        Args:
+            weight (int): Priority weight
+            inclusive (bool): Whether to count the turns of the same weight
+
+        Returns:
+            int: Pending turns with a higher weight, or the same if inclusive
+        """
+        return sum(
+            count
+            for (_, group_weight), count in self.counts.items()
+            if group_weight > weight or (inclusive and group_weight == weight)
+        )
+
+    def count_ahead(self, weight: int) -> int:
+        """Counts the pending turns called before a new turn of a weight
+
+        Args:
+            weight (int): Priority weight of the new turn
+
+        Returns:
+            int: Pending turns with the same or a higher weight
+        """
+        return self.count_heavier(weight, True)
+
+    def get_position(self, turn_id: int) -> Optional[TurnPosition]:
+        """Gets the place in line of a pending turn in O(log n)
+
+        Args:
+            turn_id (int): ID of the turn
+
+        Returns:
+            TurnPosition: The turn and the people ahead, if it is pending
+        """
+        turn = self.turns.get(turn_id)
+
+        if turn is None:
+            return None
+
+        earlier = self.trees[turn.weight].prefix_sum(self.sequences[turn_id] - 1)
+        return TurnPosition(turn, self.count_heavier(turn.weight, False) + earlier)
+
+    def compact_if_sparse(self) -> None:
+        """Rebuilds the heap once most of its keys are stale"""
+        if len(self.heap) > max(2 * len(self.turns), HEAP_COMPACTION_MIN_SIZE):
+            self.heap = [self.get_key(turn) for turn in self.turns.values()]
+            heapq.heapify(self.heap)
+
+
+def select_pending_turns() -> Select:
+    """Builds the selection of turns as pending turn values
+
+    Returns:
+        Select: Selection of id, ticket, service, priority, weight, creation,
+        attention times and status
+    """
+    return select(
+        db_models.ServiceTurn.id,
+        db_models.ServiceTurn.ticket_number,
+        db_models.ServiceTurn.service_id,
+        db_models.ServiceTurn.priority_id,
+        func.coalesce(db_models.Priority.weight, 0),
+        db_models.ServiceTurn.created,
+        db_models.ServiceTurn.service_started,
+        db_models.ServiceTurn.service_ended,
+        db_models.ServiceTurn.status_id,
+    ).outerjoin(
+        db_models.Priority, db_models.ServiceTurn.priority_id == db_models.Priority.id
+    )
+
+
+def to_pending_turn(row: tuple) -> PendingTurn:
+    """Builds a pending turn from a row of select_pending_turns
+
+    Args:
+        row (tuple): Selected row
+
+    Returns:
+        PendingTurn: Pending turn
+    """
+    return PendingTurn(*row[:5], row[5] or datetime.min)
+
+
+def get_latest(*moments: Optional[datetime]) -> Optional[datetime]:
+    """Gets the latest of some moments
+
+    Args:
+        moments (datetime, optional): Moments, None when unknown
+
+    Returns:
+        datetime: The latest moment known, if any
+    """
+    return max((moment for moment in moments if moment is not None), default=None)
+
+
+class TurnIndex:
+    """Pending turns of every service"""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.refresh_lock = threading.Lock()
+        self.queues: Dict[int, ServiceQueue] = {}
+        self.turns: Dict[int, PendingTurn] = {}
+        self.tickets: Dict[str, int] = {}
+        self.status_ids: Dict[str, int] = {}
+        self.last_turn_id = 0
+        self.last_modified: Optional[datetime] = None
+        self.built_at: Optional[float] = None
+        self.synced_at = 0.0
+        self.journal: Optional[List[Tuple[int, Optional[PendingTurn]]]] = None
+
+    @property
+    def pending_status_id(self) -> Optional[int]:
+        """ID of the status of the turns waiting to be called"""
+        return self.status_ids.get(constants.DEFAULT_TURN_STATUS)
+
+    @property
+    def attending_status_id(self) -> Optional[int]:
+        """ID of the status of the turns being attended"""
+        return self.status_ids.get(constants.BEING_ATTENDED_TURN_STATUS)
+
+    def is_pending(self, row: tuple) -> bool:
+        """Checks whether a row of select_pending_turns is a pending turn
+
+        Args:
+            row (tuple): Selected row
+
+        Returns:
+            bool: Whether the turn is pending
+        """
+        return self.pending_status_id is not None and row[-1] == self.pending_status_id
+
+    def refresh(self, session: Session) -> None:
+        """Builds the index on first use, catches up with the turns created
+        by other workers and rebuilds it periodically
+
+        Args:
+            session (Session): Database session
+        """
+        if (
+            self.built_at is not None
+            and time.monotonic() - self.synced_at < constants.TURN_INDEX_SYNC_INTERVAL
+        ):
+            return
+
+        with self.refresh_lock:
+            now = time.monotonic()
+
+            if (
+                self.built_at is None
+                or now - self.built_at >= constants.TURN_INDEX_REBUILD_INTERVAL
+            ):
+                self.rebuild(session)
+            elif now - self.synced_at >= constants.TURN_INDEX_SYNC_INTERVAL:
+                self.catch_up(session)
+
+            wait_times.estimator.refresh(session, self.attending_status_id)
+
+    def rebuild(self, session: Session) -> None:
+        """Loads every pending turn from the database
+
+        Args:
+            session (Session): Database session
+        """
+        with self.lock:
+            self.journal = []
+
+        try:
+            statuses = db_models.Status.find_many(
+                session, lambda x: x.where(db_models.Status.type == StatusType.TURN)
+            )
+            status_ids = {status.code: status.id for status in statuses}
+            last_turn_id, last_created, last_modified = session.execute(
+                select(
+                    func.max(db_models.ServiceTurn.id),
+                    func.max(db_models.ServiceTurn.created),
+                    func.max(db_models.ServiceTurn.last_modified),
+                )
+            ).one()
+            pending_status_id = status_ids.get(constants.DEFAULT_TURN_STATUS)
+            rows = []
+
+            if pending_status_id is not None:
+                rows = session.execute(
+                    select_pending_turns()
+                    .where(db_models.ServiceTurn.status_id == pending_status_id)
+                    .order_by(db_models.ServiceTurn.created, db_models.ServiceTurn.id)
+                )
+
+            queues: Dict[int, ServiceQueue] = {}
+            turns = {}
+
+            for row in rows:
+                turn = to_pending_turn(row)
+                queues.setdefault(turn.service_id, ServiceQueue()).push(turn)
+                turns[turn.id] = turn
+
+            with self.lock:
+                journal, self.journal = self.journal, None
+                self.queues = queues
+                self.turns = turns
+                self.tickets = {turn.ticket_number: turn.id for turn in turns.values()}
+                self.status_ids = status_ids
+                self.last_turn_id = last_turn_id or 0
+                self.last_modified = get_latest(last_created, last_modified)
+                self.built_at = self.synced_at = time.monotonic()
+
+                for turn_id, turn in journal or []:
+                    if turn is None:
+                        self.discard_unlocked(turn_id)
+                    else:
+                        self.track_unlocked(turn)
+        finally:
+            with self.lock:
+                self.journal = None
+
+    def catch_up(self, session: Session) -> None:
+        """Adds the pending turns created since the last refresh, and updates
+        or removes the ones modified since
+
+        The turns created or modified ``TURN_INDEX_SYNC_OVERLAP`` seconds
+        before the latest one seen are read again, since a turn committed
+        late can have a lower id or an earlier time than the ones already
+        read.
+
+        Args:
+            session (Session): Database session
+        """
+        turn_model = db_models.ServiceTurn
+        condition = turn_model.id > self.last_turn_id
+
+        if self.last_modified is not None:
+            since = self.last_modified - timedelta(seconds=constants.TURN_INDEX_SYNC_OVERLAP)
+            condition = or_(
+                condition, turn_model.created >= since, turn_model.last_modified >= since
+            )
+
+        rows = session.execute(
+            select_pending_turns()
+            .add_columns(turn_model.last_modified)
+            .where(condition)
+            .order_by(turn_model.id)
+        ).all()
+
+        with self.lock:
+            for *values, last_modified in rows:
+                turn_id = values[0]
+
+                if self.is_pending(values):
+                    turn = to_pending_turn(values)
+
+                    if self.turns.get(turn_id) != turn:
+                        self.record_unlocked(turn_id, turn)
+                        self.track_unlocked(turn)
+                elif turn_id in self.turns:
+                    self.record_unlocked(turn_id, None)
+                    self.discard_unlocked(turn_id)
+
+                self.last_modified = get_latest(self.last_modified, values[5], last_modified)
+
+            if rows:
+                self.last_turn_id = max(self.last_turn_id, rows[-1][0])
+
+            self.synced_at = time.monotonic()
+
+    def track(self, turn: PendingTurn) -> None:
+        """Adds a pending turn or updates it
+
+        Args:
+            turn (PendingTurn): Pending turn
+        """
+        with self.lock:
+            self.record_unlocked(turn.id, turn)
+            self.track_unlocked(turn)
+
+    def track_unlocked(self, turn: PendingTurn) -> None:
+        """Adds a pending turn or updates it, holding the lock
+
+        Args:
+            turn (PendingTurn): Pending turn
+        """
+        self.discard_unlocked(turn.id, turn.service_id)
+        self.queues.setdefault(turn.service_id, ServiceQueue()).push(turn)
+        self.forget_unlocked(turn.id)
+        self.turns[turn.id] = turn
+        self.tickets[turn.ticket_number] = turn.id
+
+    def discard(self, turn_id: int) -> None:
+        """Removes a turn that is no longer pending
+
+        Args:
+            turn_id (int): ID of the turn
+        """
+        with self.lock:
+            self.record_unlocked(turn_id, None)
+            self.discard_unlocked(turn_id)
+
+        wait_times.estimator.complete(turn_id, None)
+
+    def record_unlocked(self, turn_id: int, turn: Optional[PendingTurn]) -> None:
+        """Journals a change for the rebuild running, if any, holding the lock
+
+        Args:
+            turn_id (int): ID of the turn
+            turn (PendingTurn): The turn tracked, or None when removed
+        """
+        if self.journal is not None:
+            self.journal.append((turn_id, turn))
+
+    def discard_unlocked(self, turn_id: int, keep_service_id: int = None) -> None:
+        """Removes a turn from its service queue, holding the lock
+
+        Args:
+            turn_id (int): ID of the turn
+            keep_service_id (int, optional): Service whose queue is left untouched
+        """
+        turn = self.turns.get(turn_id)
+
+        if turn is None or turn.service_id == keep_service_id:
+            return
+
+        self.forget_unlocked(turn_id)
+        self.queues[turn.service_id].discard(turn_id)
+
+    def forget_unlocked(self, turn_id: int) -> None:
+        """Removes a turn from the lookups by id and ticket, holding the lock
+
+        Args:
+            turn_id (int): ID of the turn
+        """
+        turn = self.turns.pop(turn_id, None)
+
+        if turn is not None and self.tickets.get(turn.ticket_number) == turn_id:
+            del self.tickets[turn.ticket_number]
+
+    def count_ahead(self, service_id: int, weight: int) -> int:
+        """Counts the pending turns of a service called before a new turn
+
+        Args:
+            service_id (int): ID of the service
+            weight (int): Priority weight of the new turn
+
+        Returns:
+            int: People in the queue ahead of the new turn
+        """
+        with self.lock:
+            queue = self.queues.get(service_id)
+            return queue.count_ahead(weight) if queue else 0
+
+    def get_position(
+        self, turn_id: Optional[int] = None, ticket_number: Optional[str] = None
+    ) -> Optional[TurnPosition]:
+        """Gets the place in line of a pending turn without querying the
+        database
+
+        Args:
+            turn_id (int, optional): ID of the turn
+            ticket_number (str, optional): Ticket number of the turn, when no id
+
+        Returns:
+            TurnPosition: The turn and the people ahead, if it is pending
+        """
+        with self.lock:
+            if turn_id is None:
+                turn_id = self.tickets.get(ticket_number)
+
+            turn = self.turns.get(turn_id)
+
+            if turn is None:
+                return None
+
+            return self.queues[turn.service_id].get_position(turn.id)
+
+    def sync_turn(self, session: Session, turn_id: int) -> None:
+        """Reloads a turn after it was written outside the index
+
+        Args:
+            session (Session): Database session
+            turn_id (int): ID of the turn
+        """
+        self.refresh(session)
+        row = session.execute(
+            select_pending_turns().where(db_models.ServiceTurn.id == turn_id)
+        ).first()
+
+        if row is not None and self.is_pending(row):
+            self.track(to_pending_turn(row))
+            wait_times.estimator.complete(turn_id, None)
+            return
+
+        with self.lock:
+            self.record_unlocked(turn_id, None)
+            self.discard_unlocked(turn_id)
+
+        if row is None:
+            wait_times.estimator.complete(turn_id, None)
+            return
+
+        _, _, service_id, _, _, _, started, ended, status_id = row
+
+        if status_id == self.attending_status_id:
+            wait_times.estimator.start(turn_id, service_id, started or datetime.now())
+        else:
+            wait_times.estimator.complete(turn_id, ended or datetime.now())
+
+    def get_status_change_values(self, session: Session, status_id: int) -> dict:
+        """Gets the attention times to stamp on a turn moved to a status,
+        keeping the ones already set
+
+        Args:
+            session (Session): Database session
+            status_id (int): ID of the new status
+
+        Returns:
+            dict: Start of the attention when being attended, its end when
+            attended and nothing otherwise
+        """
+        self.refresh(session)
+        current_datetime = datetime.now()
+
+        if status_id is not None and status_id == self.attending_status_id:
+            return {
+                "service_started": func.coalesce(
+                    db_models.ServiceTurn.service_started, current_datetime
+                )
+            }
+
+        if status_id is not None and status_id == self.status_ids.get(
+            constants.ATTENDED_TURN_STATUS
+        ):
+            return {
+                "service_ended": func.coalesce(
+                    db_models.ServiceTurn.service_ended, current_datetime
+                )
+            }
+
+        return {}
+
+    def estimate_wait(self, turn_id: int) -> Optional[int]:
+        """Estimates the wait of a pending turn without querying the database
+
+        Args:
+            turn_id (int): ID of the turn
+
+        Returns:
+            int: Estimated seconds until the turn is called, if known
+        """
+        position = self.get_position(turn_id)
+
+        if position is None:
+            return None
+
+        return wait_times.estimator.estimate(
+            position.turn.service_id, position.people_ahead
+        )
+
+    def call_next(self, session: Session, service_id: int) -> Optional[int]:
+        """Moves the highest priority and oldest pending turn of a service
+        to being attended
+
+        Args:
+            session (Session): Database session
+            service_id (int): ID of the service
+
+        Returns:
+            int: ID of the called turn, if any was pending
+        """
+        self.refresh(session)
+
+        while True:
+            with self.lock:
+                queue = self.queues.get(service_id)
+                turn = queue.pop() if queue else None
+
+                if turn is not None:
+                    self.record_unlocked(turn.id, None)
+                    self.forget_unlocked(turn.id)
+
+            if turn is None:
+                return self.call_next_locked(session, service_id)
+
+            try:
+                if self.claim(session, turn.id, service_id):
+                    return turn.id
+            except:
+                self.track(turn)
+                raise
+
+    def call_next_locked(self, session: Session, service_id: int) -> Optional[int]:
+        """Calls the next turn from the database, skipping the rows locked by
+        concurrent calls, for the turns this worker doesn't know about yet
+
+        Args:
+            session (Session): Database session
+            service_id (int): ID of the service
+
+        Returns:
+            int: ID of the called turn, if any was pending
+        """
+        if self.pending_status_id is None:
+            return None
+
+        statement = (
+            select(db_models.ServiceTurn.id)
+            .outerjoin(
+                db_models.Priority,
+                db_models.ServiceTurn.priority_id == db_models.Priority.id,
+            )
+            .where(db_models.ServiceTurn.service_id == service_id)
+            .where(db_models.ServiceTurn.status_id == self.pending_status_id)
+            .order_by(
+                func.coalesce(db_models.Priority.weight, 0).desc(),
+                db_models.ServiceTurn.created,
+                db_models.ServiceTurn.id,
+            )
+            .limit(1)
+            .with_for_update(skip_locked=True, of=db_models.ServiceTurn)
+        )
+
+        try:
+            turn_id = session.scalar(statement)
+        except:
+            session.rollback()
+            raise
+
+        if turn_id is None:
+            session.rollback()
+            return None
+
+        self.discard(turn_id)
+        return turn_id if self.claim(session, turn_id, service_id) else None
+
+    def claim(self, session: Session, turn_id: int, service_id: int) -> bool:
+        """Moves a turn to being attended if it is still pending
+
+        Args:
+            session (Session): Database session
+            turn_id (int): ID of the turn
+            service_id (int): ID of the service of the turn
+
+        Returns:
+            bool: Whether the turn was still pending
+        """
+        attending_status_id = self.attending_status_id
+
+        if attending_status_id is None:
+            session.rollback()
+            raise exceptions.NOT_FOUND_ERROR
+
+        current_datetime = datetime.now()
+        statement = (
+            update(db_models.ServiceTurn)
+            .where(db_models.ServiceTurn.id == turn_id)
+            .where(db_models.ServiceTurn.status_id == self.pending_status_id)
+            .values(
+                status_id=attending_status_id,
+                service_started=current_datetime,
+                last_modified=current_datetime,
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+        try:
+            claimed = session.execute(statement).rowcount == 1
+            session.commit()
+        except:
+            session.rollback()
+            raise
+
+        if claimed:
+            wait_times.estimator.start(turn_id, service_id, current_datetime)
+
+        return claimed
+
+
+index = TurnIndex()
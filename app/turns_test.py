@@ -0,0 +1,216 @@
+"""Pending turns index test cases
+"""
+
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+from sqlalchemy import update
+from . import turns
+from .database import memory
+from .database import models as db_models
+
+SERVICE_ID = 1
+PENDING_STATUS_ID = 5
+BEING_ATTENDED_STATUS_ID = 17
+HIGH_PRIORITY_ID = 1
+LOW_PRIORITY_ID = 3
+HIGH_WEIGHT = 6
+LOW_WEIGHT = 3
+
+
+def make_turn(turn_id: int, weight: int) -> turns.PendingTurn:
+    """Builds a pending turn of the test service
+
+    Args:
+        turn_id (int): ID of the turn
+        weight (int): Priority weight, also used as priority id
+
+    Returns:
+        PendingTurn: Pending turn
+    """
+    return turns.PendingTurn(
+        turn_id,
+        f"S{SERVICE_ID}-{turn_id}",
+        SERVICE_ID,
+        weight,
+        weight,
+        datetime(2024, 1, 1) + timedelta(minutes=turn_id),
+    )
+
+
+class ServiceQueueTest(unittest.TestCase):
+    """Service queue test cases
+
+    Args:
+        unittest (unittest.TestCase): TestCase base class
+    """
+
+    def setUp(self):
+        self.queue = turns.ServiceQueue()
+
+        for turn_id, weight in enumerate((LOW_WEIGHT, HIGH_WEIGHT, LOW_WEIGHT, HIGH_WEIGHT), 1):
+            self.queue.push(make_turn(turn_id, weight))
+
+    def get_people_ahead(self, turn_id: int) -> int:
+        """Gets the people ahead of a queued turn
+
+        Args:
+            turn_id (int): ID of the turn
+
+        Returns:
+            int: Pending turns called before it
+        """
+        return self.queue.get_position(turn_id).people_ahead
+
+    def test_pop_order(self):
+        """Turns are called by weight and then by arrival
+        """
+        self.assertEqual([self.queue.pop().id for _ in range(4)], [2, 4, 1, 3])
+        self.assertIsNone(self.queue.pop())
+
+    def test_positions(self):
+        """Positions count the heavier turns and the earlier ones of the same weight
+        """
+        self.assertEqual(
+            [self.get_people_ahead(turn_id) for turn_id in (2, 4, 1, 3)], [0, 1, 2, 3]
+        )
+        self.assertEqual(self.queue.count_ahead(HIGH_WEIGHT), 2)
+        self.assertEqual(self.queue.count_ahead(LOW_WEIGHT), 4)
+        self.assertEqual(self.queue.count_ahead(HIGH_WEIGHT + 1), 0)
+
+    def test_positions_after_changes(self):
+        """Removed turns leave the count and changed ones keep their arrival
+        """
+        self.queue.discard(4)
+        self.assertEqual(self.get_people_ahead(1), 1)
+        self.assertEqual(self.get_people_ahead(3), 2)
+
+        self.queue.push(make_turn(1, HIGH_WEIGHT))
+        self.assertEqual(self.get_people_ahead(1), 0)
+        self.assertEqual(self.get_people_ahead(2), 1)
+        self.assertIsNone(self.queue.get_position(4))
+
+
+class TurnIndexTest(unittest.TestCase):
+    """Turn index test cases over an in-memory database
+
+    Args:
+        unittest (unittest.TestCase): TestCase base class
+    """
+
+    def setUp(self):
+        self.session = memory.create_session()
+        self.index = turns.TurnIndex()
+        self.high_first = self.add_turn(1, HIGH_PRIORITY_ID)
+        self.low_first = self.add_turn(2, LOW_PRIORITY_ID)
+        self.high_second = self.add_turn(3, HIGH_PRIORITY_ID)
+        self.low_second = self.add_turn(4, LOW_PRIORITY_ID)
+        self.session.commit()
+
+    def add_turn(self, number: int, priority_id: int, turn_id: int = None) -> int:
+        """Adds a pending turn of the test service created an hour ago
+
+        Args:
+            number (int): Ticket number, also the minutes after the first turn
+            priority_id (int): ID of the priority
+            turn_id (int): ID of the turn, the next one when not given
+
+        Returns:
+            int: ID of the turn
+        """
+        turn = db_models.ServiceTurn(
+            id=turn_id,
+            ticket_number=f"S{SERVICE_ID}-{number}",
+            service_id=SERVICE_ID,
+            priority_id=priority_id,
+            status_id=PENDING_STATUS_ID,
+            created=datetime.now() - timedelta(hours=1, minutes=-number),
+        )
+        self.session.add(turn)
+        self.session.flush()
+        return turn.id
+
+    def tearDown(self):
+        self.session.close()
+
+    def test_call_next_order(self):
+        """The highest priority and oldest turn is called and moved to being attended
+        """
+        called = [self.index.call_next(self.session, SERVICE_ID) for _ in range(5)]
+
+        self.assertEqual(
+            called, [self.high_first, self.high_second, self.low_first, self.low_second, None]
+        )
+        self.assertEqual(
+            {self.session.get(db_models.ServiceTurn, turn_id).status_id for turn_id in called[:4]},
+            {BEING_ATTENDED_STATUS_ID},
+        )
+
+    def test_positions(self):
+        """Positions follow the dispatch order and shrink as turns are called
+        """
+        self.index.refresh(self.session)
+
+        self.assertEqual(self.index.get_position(self.low_second).people_ahead, 3)
+        self.assertEqual(
+            self.index.get_position(ticket_number=f"S{SERVICE_ID}-3").turn.id, self.high_second
+        )
+        self.assertEqual(self.index.count_ahead(SERVICE_ID, HIGH_WEIGHT), 2)
+
+        self.index.call_next(self.session, SERVICE_ID)
+
+        self.assertIsNone(self.index.get_position(self.high_first))
+        self.assertEqual(self.index.get_position(self.low_first).people_ahead, 1)
+        self.assertEqual(self.index.get_position(self.low_second).people_ahead, 2)
+
+    def test_call_next_during_rebuild(self):
+        """A turn called while the index is rebuilt doesn't come back as pending
+        """
+        self.index.refresh(self.session)
+        called = []
+        to_pending_turn = turns.to_pending_turn
+
+        def call_next_once(row):
+            if not called:
+                called.append(self.index.call_next(self.session, SERVICE_ID))
+
+            return to_pending_turn(row)
+
+        with mock.patch.object(turns, "to_pending_turn", call_next_once):
+            self.index.rebuild(self.session)
+
+        self.assertEqual(called, [self.high_first])
+        self.assertIsNone(self.index.get_position(called[0]))
+        self.assertEqual(self.index.count_ahead(SERVICE_ID, LOW_WEIGHT), 3)
+
+    def test_catch_up_late_commit(self):
+        """A turn committed after a later one was read is still picked up
+        """
+        later_turn_id = self.add_turn(5, LOW_PRIORITY_ID, self.low_second + 10)
+        self.session.commit()
+        self.index.refresh(self.session)
+        late_turn_id = self.add_turn(6, HIGH_PRIORITY_ID, later_turn_id - 5)
+        self.session.commit()
+        self.index.catch_up(self.session)
+
+        self.assertEqual(self.index.get_position(late_turn_id).people_ahead, 2)
+        self.assertEqual(self.index.get_position(later_turn_id).people_ahead, 5)
+
+    def test_catch_up_called_elsewhere(self):
+        """A turn called by another worker leaves the queue on the next catch up
+        """
+        self.index.refresh(self.session)
+        self.session.execute(
+            update(db_models.ServiceTurn)
+            .where(db_models.ServiceTurn.id == self.high_first)
+            .values(status_id=BEING_ATTENDED_STATUS_ID, last_modified=datetime.now())
+        )
+        self.session.commit()
+        self.index.catch_up(self.session)
+
+        self.assertIsNone(self.index.get_position(self.high_first))
+        self.assertEqual(self.index.get_position(self.low_second).people_ahead, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,248 @@
+"""Estimated wait times of the pending service turns
+
+Every worker keeps exponentially weighted averages of how long a turn
+takes to be attended and of how many turns of a service are attended at
+the same time, by service and hour of the day. They are replayed from the
+last ``WAIT_TIME_HISTORY_DAYS`` days of turns on first use and every
+``WAIT_TIME_RESEED_INTERVAL`` seconds, in a background thread so no request
+waits for it, and updated as this worker calls and completes turns in
+between, so an estimate is a couple of lookups.
+"""
+
+import heapq
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from . import archive
+from . import constants
+from .database import main as database, models as db_models
+
+# pylint: disable=C0121
+# pylint: disable=R1732
+
+AveragesKey = Tuple[int, Optional[int]]
+
+
+def smooth(averages: Dict[AveragesKey, float], key: AveragesKey, sample: float) -> None:
+    """Adds a sample to an exponentially weighted average
+
+    Args:
+        averages (Dict[AveragesKey, float]): Averages by service and hour
+        key (AveragesKey): Service and hour, or None for every hour
+        sample (float): New value
+    """
+    average = averages.get(key)
+    averages[key] = (
+        sample
+        if average is None
+        else average + constants.WAIT_TIME_SMOOTHING * (sample - average)
+    )
+
+
+def add_sample(
+    averages: Dict[AveragesKey, float], service_id: int, hour: int, sample: float
+) -> None:
+    """Adds a sample to the averages of the hour and of the whole day
+
+    Args:
+        averages (Dict[AveragesKey, float]): Averages by service and hour
+        service_id (int): ID of the service
+        hour (int): Hour of the day
+        sample (float): New value
+    """
+    smooth(averages, (service_id, hour), sample)
+    smooth(averages, (service_id, None), sample)
+
+
+class WaitTimeEstimator:
+    """Service time and concurrency averages of every service"""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.refresh_lock = threading.Lock()
+        self.service_times: Dict[AveragesKey, float] = {}
+        self.agents: Dict[AveragesKey, float] = {}
+        self.attending: Dict[int, Tuple[int, datetime]] = {}
+        self.attending_counts: Dict[int, int] = {}
+        self.seeded_at: Optional[float] = None
+
+    def refresh(self, session: Session, attending_status_id: Optional[int]) -> None:
+        """Replays the history on first use, and periodically in the background
+        while the current averages keep answering the estimates
+
+        Args:
+            session (Session): Database session
+            attending_status_id (int, optional): ID of the being attended status
+        """
+        if self.seeded_at is None:
+            with self.refresh_lock:
+                if self.seeded_at is None:
+                    self.seed(session, attending_status_id)
+
+            return
+
+        if (
+            time.monotonic() - self.seeded_at >= constants.WAIT_TIME_RESEED_INTERVAL
+            and self.refresh_lock.acquire(blocking=False)
+        ):
+            try:
+                threading.Thread(
+                    target=self.reseed, args=(attending_status_id,), daemon=True
+                ).start()
+            except:
+                self.refresh_lock.release()
+                raise
+
+    def reseed(self, attending_status_id: Optional[int]) -> None:
+        """Replays the history with a session of its own, releasing the
+        refresh lock acquired by the caller
+
+        Args:
+            attending_status_id (int, optional): ID of the being attended status
+        """
+        try:
+            session = next(database.get_session())
+
+            try:
+                self.seed(session, attending_status_id)
+            finally:
+                session.close()
+        finally:
+            self.refresh_lock.release()
+
+    def seed(self, session: Session, attending_status_id: Optional[int]) -> None:
+        """Replays the live and archived turns attended in the last days in start order
+
+        Args:
+            session (Session): Database session
+            attending_status_id (int, optional): ID of the being attended status
+        """
+        since = datetime.now() - timedelta(days=constants.WAIT_TIME_HISTORY_DAYS)
+        rows = session.execute(
+            archive.union_turns(
+                lambda model: select(
+                    model.service_id, model.service_started, model.service_ended
+                )
+                .where(model.service_started >= since)
+                .where(model.service_ended != None)
+            )
+            .order_by(db_models.ServiceTurn.service_started.name)
+            .execution_options(yield_per=constants.STREAM_BATCH_SIZE)
+        )
+        service_times: Dict[AveragesKey, float] = {}
+        agents: Dict[AveragesKey, float] = {}
+        endings: Dict[int, List[datetime]] = {}
+
+        for service_id, started, ended in rows:
+            if ended < started:
+                continue
+
+            ongoing = endings.setdefault(service_id, [])
+
+            while ongoing and ongoing[0] <= started:
+                heapq.heappop(ongoing)
+
+            heapq.heappush(ongoing, ended)
+            add_sample(agents, service_id, started.hour, len(ongoing))
+            add_sample(
+                service_times, service_id, started.hour, (ended - started).total_seconds()
+            )
+
+        attending = {}
+
+        if attending_status_id is not None:
+            attending = {
+                turn_id: (service_id, started or datetime.now())
+                for turn_id, service_id, started in session.execute(
+                    select(
+                        db_models.ServiceTurn.id,
+                        db_models.ServiceTurn.service_id,
+                        db_models.ServiceTurn.service_started,
+                    ).where(db_models.ServiceTurn.status_id == attending_status_id)
+                )
+            }
+
+        attending_counts: Dict[int, int] = {}
+
+        for service_id, _ in attending.values():
+            attending_counts[service_id] = attending_counts.get(service_id, 0) + 1
+
+        with self.lock:
+            self.service_times = service_times
+            self.agents = agents
+            self.attending = attending
+            self.attending_counts = attending_counts
+            self.seeded_at = time.monotonic()
+
+    def start(self, turn_id: int, service_id: int, started: datetime) -> None:
+        """Records that a turn started being attended
+
+        Args:
+            turn_id (int): ID of the turn
+            service_id (int): ID of the service
+            started (datetime): When the attention started
+        """
+        with self.lock:
+            if turn_id in self.attending:
+                return
+
+            self.attending[turn_id] = (service_id, started)
+            count = self.attending_counts.get(service_id, 0) + 1
+            self.attending_counts[service_id] = count
+            add_sample(self.agents, service_id, started.hour, count)
+
+    def complete(self, turn_id: int, ended: Optional[datetime]) -> None:
+        """Records that a turn is no longer being attended
+
+        Args:
+            turn_id (int): ID of the turn
+            ended (datetime, optional): When the attention ended, None when
+                the turn was deleted
+        """
+        with self.lock:
+            service_id, started = self.attending.pop(turn_id, (None, None))
+
+            if service_id is None:
+                return
+
+            self.attending_counts[service_id] -= 1
+
+            if ended is not None and ended >= started:
+                add_sample(
+                    self.service_times,
+                    service_id,
+                    started.hour,
+                    (ended - started).total_seconds(),
+                )
+
+    def estimate(self, service_id: int, people_ahead: int) -> Optional[int]:
+        """Estimates the wait of a turn in O(1)
+
+        Args:
+            service_id (int): ID of the service
+            people_ahead (int): Pending turns called before the turn
+
+        Returns:
+            int: Estimated seconds until the turn is called, None without history
+        """
+        hour = datetime.now().hour
+        service_time = self.service_times.get((service_id, hour)) or self.service_times.get(
+            (service_id, None)
+        )
+
+        if service_time is None:
+            return None
+
+        agents = (
+            self.attending_counts.get(service_id)
+            or self.agents.get((service_id, hour))
+            or self.agents.get((service_id, None))
+            or 1
+        )
+        return round(people_ahead * service_time / max(agents, 1))
+
+
+estimator = WaitTimeEstimator()
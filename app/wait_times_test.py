@@ -0,0 +1,131 @@
+"""Estimated wait times test cases
+"""
+
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+from sqlalchemy.orm import Session
+from . import constants
+from . import wait_times
+from .database import memory
+from .database import models as db_models
+
+SERVICE_ID = 1
+HIGH_PRIORITY_ID = 1
+ATTENDED_STATUS_ID = 7
+BEING_ATTENDED_STATUS_ID = 17
+FIRST_TURN_ID = 1000
+
+
+class SmoothTest(unittest.TestCase):
+    """Exponentially weighted averages test cases
+
+    Args:
+        unittest (unittest.TestCase): TestCase base class
+    """
+
+    def test_smooth(self):
+        """The first sample is the average and the next ones move it by the smoothing factor
+        """
+        averages = {}
+        wait_times.add_sample(averages, SERVICE_ID, 9, 100)
+        wait_times.add_sample(averages, SERVICE_ID, 10, 200)
+
+        self.assertEqual(averages[(SERVICE_ID, 9)], 100)
+        self.assertEqual(averages[(SERVICE_ID, 10)], 200)
+        self.assertAlmostEqual(
+            averages[(SERVICE_ID, None)], 100 + constants.WAIT_TIME_SMOOTHING * 100
+        )
+
+
+class WaitTimeEstimatorTest(unittest.TestCase):
+    """Wait time estimator test cases over an in-memory database
+
+    Args:
+        unittest (unittest.TestCase): TestCase base class
+    """
+
+    def setUp(self):
+        self.session = memory.create_session()
+        self.estimator = wait_times.WaitTimeEstimator()
+        self.started = datetime.now() - timedelta(hours=2)
+
+    def tearDown(self):
+        self.session.close()
+
+    def add_turn(self, turn_id: int, offset: int, seconds: int) -> None:
+        """Adds an attended turn of the test service
+
+        Args:
+            turn_id (int): ID of the turn
+            offset (int): Seconds from the first start to the start of the turn
+            seconds (int): Seconds the turn was attended for
+        """
+        started = self.started + timedelta(seconds=offset)
+        self.session.add(
+            db_models.ServiceTurn(
+                id=turn_id,
+                ticket_number=f"S{SERVICE_ID}-{turn_id}",
+                service_id=SERVICE_ID,
+                priority_id=HIGH_PRIORITY_ID,
+                status_id=ATTENDED_STATUS_ID,
+                service_started=started,
+                service_ended=started + timedelta(seconds=seconds),
+            )
+        )
+        self.session.commit()
+
+    def test_estimate(self):
+        """Overlapping turns count as agents attending in parallel
+        """
+        self.assertIsNone(self.estimator.estimate(SERVICE_ID, 3))
+
+        self.add_turn(FIRST_TURN_ID, 0, 100)
+        self.add_turn(FIRST_TURN_ID + 1, 50, 200)
+        self.estimator.refresh(self.session, BEING_ATTENDED_STATUS_ID)
+        service_time = 100 + constants.WAIT_TIME_SMOOTHING * 100
+        agents = 1 + constants.WAIT_TIME_SMOOTHING
+
+        self.assertEqual(self.estimator.estimate(SERVICE_ID, 0), 0)
+        self.assertEqual(self.estimator.estimate(SERVICE_ID, 3), round(3 * service_time / agents))
+
+    def test_start_and_complete(self):
+        """The turns called and completed by the worker update the averages in between
+        """
+        self.estimator.refresh(self.session, BEING_ATTENDED_STATUS_ID)
+        self.estimator.start(FIRST_TURN_ID, SERVICE_ID, self.started)
+        self.estimator.start(FIRST_TURN_ID, SERVICE_ID, self.started)
+
+        self.assertEqual(self.estimator.attending_counts[SERVICE_ID], 1)
+
+        self.estimator.complete(FIRST_TURN_ID, self.started + timedelta(seconds=60))
+        self.estimator.complete(FIRST_TURN_ID, self.started + timedelta(seconds=600))
+
+        self.assertEqual(self.estimator.attending_counts[SERVICE_ID], 0)
+        self.assertEqual(self.estimator.estimate(SERVICE_ID, 2), 120)
+
+    def test_reseed(self):
+        """An outdated history is replayed in the background while the current averages answer
+        """
+        self.add_turn(FIRST_TURN_ID, 0, 100)
+        self.estimator.refresh(self.session, BEING_ATTENDED_STATUS_ID)
+        self.add_turn(FIRST_TURN_ID + 1, 200, 200)
+        self.estimator.refresh(self.session, BEING_ATTENDED_STATUS_ID)
+
+        self.assertEqual(self.estimator.estimate(SERVICE_ID, 1), 100)
+
+        self.estimator.seeded_at -= constants.WAIT_TIME_RESEED_INTERVAL
+
+        with mock.patch.object(
+            wait_times.database, "get_session", lambda: iter([Session(self.session.bind)])
+        ):
+            self.estimator.refresh(self.session, BEING_ATTENDED_STATUS_ID)
+
+            with self.estimator.refresh_lock:
+                pass
+
+        self.assertEqual(self.estimator.estimate(SERVICE_ID, 1), 120)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+"""Benchmark of the vectorized turn analytics
+
+Times the wait and service time distributions of every generated turn of
+the rollups benchmark database by service, location and hour, read from
+the database (``database`` mode), and the sketching alone of random
+durations already in memory (``sketch`` mode), which bounds the throughput
+once the rows are fetched.
+
+Usage:
+    python -m benchmarks.rollups --turns 2000000 --years 3
+    python -m benchmarks.analytics --mode database
+    python -m benchmarks.analytics --mode sketch --rows 20000000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# pylint: disable=C0415
+
+
+def parse_args() -> argparse.Namespace:
+    """Parses the command line arguments
+
+    Returns:
+        argparse.Namespace: The parsed arguments
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", choices=["database", "sketch"], default="database")
+    parser.add_argument("--rows", type=int, default=20000000)
+    parser.add_argument("--group-by", default="service,location,hour")
+    parser.add_argument(
+        "--database",
+        default=os.path.join(tempfile.gettempdir(), "qms_rollups_benchmark.db"),
+    )
+    return parser.parse_args()
+
+
+def run_sketch(rows: int) -> None:
+    """Sketches random durations of 1000 services and 24 hours in batches
+
+    Args:
+        rows (int): Number of durations
+    """
+    import numpy as np
+    from app import analytics, constants
+
+    generator = np.random.default_rng(1)
+    sketch = analytics.DurationSketch()
+    started = time.perf_counter()
+
+    for offset in range(0, rows, constants.ANALYTICS_BATCH_SIZE):
+        size = min(constants.ANALYTICS_BATCH_SIZE, rows - offset)
+        groups = (
+            generator.integers(1, 1000, size) * analytics.LOCATION_SPAN * analytics.HOUR_SPAN
+            + generator.integers(0, 24, size)
+        )
+        sketch.add(groups, generator.lognormal(6, 1, size))
+
+    sketched = time.perf_counter() - started
+    distributions = sketch.summarize(constants.ANALYTICS_PERCENTILES)
+    elapsed = time.perf_counter() - started
+    print(f"mode=sketch rows={rows} groups={len(distributions)}")
+    print(f"sketched in {sketched:.2f} s ({rows / sketched:.0f} rows/s), total {elapsed:.2f} s")
+
+
+def main() -> None:
+    """Runs the benchmark"""
+    args = parse_args()
+    os.environ["DB_CONNECTION_STRING"] = f"sqlite:///{args.database}"
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    if args.mode == "sketch":
+        run_sketch(args.rows)
+        return
+
+    from app import analytics
+    from app.database import main as database
+    from app.enums import AnalyticsDimension
+
+    session = next(database.get_session())
+    query = analytics.AnalyticsQuery(
+        datetime.min,
+        datetime.max,
+        [AnalyticsDimension(value) for value in args.group_by.split(",") if value],
+    )
+    started = time.perf_counter()
+    rows = analytics.get_turn_analytics(session, query)
+    elapsed = time.perf_counter() - started
+    session.close()
+    turns = sum(row.wait.count for row in rows)
+    print(f"mode=database groups={len(rows)} waits={turns}")
+    print(f"computed in {elapsed:.2f} s ({turns / elapsed:.0f} turns/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Benchmark of the service turns archive
+
+Generates years of synthetic turns in a SQLite database, then times
+counting the turns of every service, as the ticket numbering does, with
+every turn in the live table, the archiving of the old ones in batches and
+the same counts once only the recent turns are left.
+
+Usage:
+    python -m benchmarks.archive --turns 2000000 --years 3
+"""
+
+import argparse
+import os
+import sys
+
+from benchmarks.rollups import create_parser, generate, timed
+
+# pylint: disable=C0415
+
+
+def parse_args() -> argparse.Namespace:
+    """Parses the command line arguments
+
+    Returns:
+        argparse.Namespace: The parsed arguments
+    """
+    parser = create_parser(__doc__.splitlines()[0], "qms_archive_benchmark.db")
+    parser.add_argument("--days", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    return parser.parse_args()
+
+
+def count_turns(session, service_ids) -> int:
+    """Counts the live turns of every service one by one
+
+    Args:
+        session (Session): Database session
+        service_ids (List[int]): IDs of the services
+
+    Returns:
+        int: Total of live turns
+    """
+    from app.service import service
+
+    return sum(service.get_total_turns_for_service_id(session, item) for item in service_ids)
+
+
+def main() -> None:
+    """Runs the benchmark"""
+    args = parse_args()
+    os.environ["DB_CONNECTION_STRING"] = f"sqlite:///{args.database}"
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    from sqlalchemy import select
+    from app import archive
+    from app.database import main as database, models
+
+    generate(args)
+    session = next(database.get_session())
+    service_ids = session.scalars(select(models.Service.id)).all()
+    live = timed("ticket counts with every turn live", count_turns, session, service_ids)
+    timed("archiving", archive.run, session, args.days, args.batch_size)
+    left = timed("ticket counts after archiving", count_turns, session, service_ids)
+    print(f"live turns before={live} after={left}")
+    session.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Benchmark of calling the next turn of a service
+
+Seeds a SQLite database with the reference data and the given number of
+pending turns of one service, then times calling turns through the
+in-memory index (``index`` mode) against selecting them from the database
+with ``SELECT ... FOR UPDATE SKIP LOCKED`` (``database`` mode).
+
+Usage:
+    python -m benchmarks.dispatch --pending 100000 --calls 1000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# pylint: disable=C0415
+# pylint: disable=R0914
+
+INSERT_BATCH_SIZE = 10000
+
+
+def parse_args() -> argparse.Namespace:
+    """Parses the command line arguments
+
+    Returns:
+        argparse.Namespace: The parsed arguments
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pending", type=int, default=100000)
+    parser.add_argument("--calls", type=int, default=1000)
+    parser.add_argument("--mode", choices=["index", "database"], default="index")
+    parser.add_argument(
+        "--database",
+        default=os.path.join(tempfile.gettempdir(), "qms_dispatch_benchmark.db"),
+    )
+    return parser.parse_args()
+
+
+def seed(pending: int) -> None:
+    """Seeds the reference data and the pending turns of service 1
+
+    Args:
+        pending (int): Number of pending turns
+    """
+    from sqlalchemy import insert
+    from app import constants, enums
+    from app.database import main as database, models, seed as reference, setup
+
+    reference.run_bulk(truncate_first=True)
+    engine = setup.get_engine()
+    session = next(database.get_session())
+    pending_status = models.Status.find_one(
+        session,
+        lambda x: x.where(models.Status.code == constants.DEFAULT_TURN_STATUS).where(
+            models.Status.type == enums.StatusType.TURN
+        ),
+    )
+    priorities = [priority.id for priority in models.Priority.find_many(session)]
+    session.close()
+    generator = random.Random(1)
+    start = datetime(2024, 1, 1)
+
+    with engine.begin() as connection:
+        for offset in range(0, pending, INSERT_BATCH_SIZE):
+            connection.execute(
+                insert(models.ServiceTurn),
+                [
+                    {
+                        "ticket_number": f"BENCH-{index}",
+                        "customer_name": "John Doe",
+                        "created_by": constants.SYSTEM_CREATOR,
+                        "created": start + timedelta(seconds=index),
+                        "last_modified": start + timedelta(seconds=index),
+                        "status_id": pending_status.id,
+                        "service_id": 1,
+                        "priority_id": generator.choice(priorities),
+                    }
+                    for index in range(offset, min(offset + INSERT_BATCH_SIZE, pending))
+                ],
+            )
+
+
+def main() -> None:
+    """Runs the benchmark"""
+    args = parse_args()
+    os.environ["DB_CONNECTION_STRING"] = f"sqlite:///{args.database}"
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    from app import turns
+    from app.database import main as database
+
+    seed(args.pending)
+    session = next(database.get_session())
+    started = time.perf_counter()
+    turns.index.refresh(session)
+    print(f"index built in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    call = turns.index.call_next
+
+    if args.mode == "database":
+        call = turns.index.call_next_locked
+
+    started = time.perf_counter()
+
+    for _ in range(args.calls):
+        call(session, 1)
+
+    elapsed = time.perf_counter() - started
+    session.close()
+    print(f"mode={args.mode} pending={args.pending} calls={args.calls}")
+    print(f"per_call={elapsed / args.calls * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Local stand-in for the IAM API used by ``app/auth/api.py``
+
+Every token is valid and authorized. The user basic data of a token such as
+``Bearer customer-42`` belongs to the generated customer 42.
+
+Usage:
+    python -m benchmarks.iam_stub --port 8765
+"""
+
+import argparse
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app import constants
+
+VALIDATE_TOKEN_PATH = "/api/v1/auth/token/validate"
+USER_BASIC_DATA_PATH = "/api/v1/auth/user-basic-data"
+CUSTOMER_TOKEN_PREFIX = "Bearer customer-"
+
+
+class IAMStubHandler(BaseHTTPRequestHandler):
+    """Answers the IAM calls of the API"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):  # pylint: disable=C0103
+        """Handles the IAM API calls"""
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+        if self.path == VALIDATE_TOKEN_PATH:
+            body = {"data": {"isValid": True, "isAuthorized": True}}
+        elif self.path == USER_BASIC_DATA_PATH:
+            authorization = self.headers.get("authorization", "")
+            customer_id = authorization[len(CUSTOMER_TOKEN_PREFIX):]
+            body = {"data": {"email": constants.GENERATED_CUSTOMER_EMAIL.format(customer_id)}}
+        else:
+            self.send_error(404)
+            return
+
+        content = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):  # pylint: disable=W0221
+        """Keeps the benchmark output clean"""
+
+
+def main() -> None:
+    """Runs the stub in the foreground"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), IAMStubHandler)
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,507 @@
+"""Load test of the API against a seeded database and a local IAM stub
+
+Seeds the database with the reference data and generated rows,
+starts the IAM stub, boots the API with uvicorn (or in process through the
+test client) and drives a weighted mix of scenarios from concurrent clients.
+Throughput and p50/p95/p99 latencies per route are printed and saved as JSON,
+optionally compared with a previous run.
+
+Usage:
+    python -m benchmarks.loadtest --customers 10000 --turns 100000 \\
+        --duration 60 --concurrency 16 --compare benchmarks/results/previous.json
+"""
+
+import argparse
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Callable, Dict, List, Tuple
+
+import requests
+
+# pylint: disable=C0415
+# pylint: disable=R0913
+# pylint: disable=R0914
+# pylint: disable=R1732
+# pylint: disable=W0613
+
+ROOT_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIRECTORY = os.path.join(ROOT_DIRECTORY, "benchmarks", "results")
+API_KEY = "loadtest"
+STAFF_TOKEN = "Bearer staff"
+DEFAULT_MIX = "status_board=40,catalogue=30,self_service=20,turn_creation=10"
+BOOT_TIMEOUT = 60
+
+Call = Tuple[str, str, str, dict]
+
+
+def parse_args() -> argparse.Namespace:
+    """Parses the command line arguments
+
+    Returns:
+        argparse.Namespace: The parsed arguments
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--database",
+        default=f"sqlite:///{os.path.join(RESULTS_DIRECTORY, 'loadtest.db')}",
+        help="Connection string of the database to seed and serve from",
+    )
+    parser.add_argument("--locations", type=int, default=10)
+    parser.add_argument("--categories", type=int, default=10)
+    parser.add_argument("--services", type=int, default=100)
+    parser.add_argument("--customers", type=int, default=10000)
+    parser.add_argument("--appointments", type=int, default=20000)
+    parser.add_argument("--turns", type=int, default=100000)
+    parser.add_argument("--years", type=float, default=1)
+    parser.add_argument("--skip-seed", action="store_true")
+    parser.add_argument("--server", choices=["uvicorn", "in-process"], default="uvicorn")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers")
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--warmup", type=float, default=5)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Scenario weights")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Results file, timestamped by default")
+    parser.add_argument("--compare", help="Previous results file")
+    return parser.parse_args()
+
+
+def parse_mix(mix: str) -> Dict[str, int]:
+    """Parses the scenario weights
+
+    Args:
+        mix (str): Weights such as status_board=40,catalogue=30
+
+    Returns:
+        Dict[str, int]: Weight by scenario name
+    """
+    weights = {}
+
+    for entry in mix.split(","):
+        name, _, weight = entry.partition("=")
+
+        if name.strip() not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario '{name}', use {', '.join(SCENARIOS)}")
+
+        weights[name.strip()] = int(weight or 1)
+
+    return weights
+
+
+def turn_creation(rand: random.Random, catalogue: dict) -> List[Call]:
+    """A kiosk issuing a ticket"""
+    service_id = rand.choice(catalogue["services"])
+    return [
+        (
+            "POST",
+            "/api/v1/services/{service_id}/serviceturns",
+            f"/api/v1/services/{service_id}/serviceturns",
+            {"customerName": "Load Test"},
+        )
+    ]
+
+
+def status_board(rand: random.Random, catalogue: dict) -> List[Call]:
+    """A waiting room screen polling the turns"""
+    return [
+        (
+            "GET",
+            "/api/v1/serviceturns/status-table",
+            "/api/v1/serviceturns/status-table",
+            None,
+        )
+    ]
+
+
+def self_service(rand: random.Random, catalogue: dict) -> List[Call]:
+    """A customer checking their profile and appointments"""
+    customer_id = rand.choice(catalogue["customers"])
+    token = {"authorization": f"Bearer customer-{customer_id}"}
+    return [
+        ("GET", "/api/v1/customers/current", "/api/v1/customers/current", token),
+        (
+            "GET",
+            "/api/v1/customers/current/appointments",
+            "/api/v1/customers/current/appointments",
+            token,
+        ),
+    ]
+
+
+def catalogue_reads(rand: random.Random, catalogue: dict) -> List[Call]:
+    """A customer browsing the categories and services"""
+    category_id = rand.choice(catalogue["categories"])
+    service_id = rand.choice(catalogue["services"])
+    return [
+        ("GET", "/api/v1/categories/", "/api/v1/categories/", None),
+        (
+            "GET",
+            "/api/v1/categories/{category_id}/services",
+            f"/api/v1/categories/{category_id}/services",
+            None,
+        ),
+        (
+            "GET",
+            "/api/v1/services/{service_id}",
+            f"/api/v1/services/{service_id}",
+            None,
+        ),
+    ]
+
+
+SCENARIOS: Dict[str, Callable[[random.Random, dict], List[Call]]] = {
+    "turn_creation": turn_creation,
+    "status_board": status_board,
+    "self_service": self_service,
+    "catalogue": catalogue_reads,
+}
+
+
+def get_free_port() -> int:
+    """Gets a free local port
+
+    Returns:
+        int: Port number
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def get_catalogue(database: str) -> dict:
+    """Gets the ids the scenarios pick from
+
+    Args:
+        database (str): Connection string
+
+    Returns:
+        dict: Ids of categories, services and customers
+    """
+    from sqlalchemy import create_engine, select
+    from app import constants
+    from app.database import models
+
+    engine = create_engine(database)
+
+    with engine.connect() as connection:
+        catalogue = {
+            "categories": list(connection.scalars(select(models.Category.id))),
+            "services": list(connection.scalars(select(models.Service.id))),
+            "customers": list(
+                connection.scalars(
+                    select(models.Customer.id).where(
+                        models.Customer.email.like(
+                            constants.GENERATED_CUSTOMER_EMAIL.format("%")
+                        )
+                    )
+                )
+            ),
+        }
+
+    engine.dispose()
+    return catalogue
+
+
+def seed(args: argparse.Namespace) -> None:
+    """Seeds the database
+
+    Args:
+        args (argparse.Namespace): Command line arguments
+    """
+    from sqlalchemy import create_engine
+    from app.database import generator
+    from app.database.seed import DATA_FILE, run_bulk
+
+    engine = create_engine(args.database)
+    started = time.perf_counter()
+    run_bulk(DATA_FILE, True, engine)
+    volumes = generator.Volumes(
+        args.locations, args.categories, args.services, args.customers,
+        args.appointments, args.turns, args.years,
+    )
+    generator.insert_rows(engine, generator.DataGenerator(volumes, args.seed))
+    engine.dispose()
+    print(f"seeded in {time.perf_counter() - started:.1f} s")
+
+
+def wait_for(url: str, process: subprocess.Popen) -> None:
+    """Waits for the API to accept requests
+
+    Args:
+        url (str): API base url
+        process (subprocess.Popen): API process
+    """
+    deadline = time.monotonic() + BOOT_TIMEOUT
+
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"API exited with code {process.returncode}")
+
+        try:
+            requests.get(f"{url}/openapi.json", timeout=1)
+            return
+        except requests.ConnectionError:
+            time.sleep(0.2)
+
+    raise SystemExit("API did not start in time")
+
+
+def run_client(
+    session: requests.Session,
+    url: str,
+    scenarios: List[Callable],
+    weights: List[int],
+    catalogue: dict,
+    schedule: Tuple[float, float],
+    rand: random.Random,
+    samples: Dict[str, list],
+) -> None:
+    """Runs scenarios until the end of the test
+
+    Args:
+        session (requests.Session): HTTP session
+        url (str): API base url
+        scenarios (List[Callable]): Scenarios
+        weights (List[int]): Scenario weights
+        catalogue (dict): Ids to pick from
+        schedule (Tuple[float, float]): Start of measurement and end of test
+        rand (random.Random): Random generator
+        samples (Dict[str, list]): Latencies and failures by route
+    """
+    measure_from, until = schedule
+    headers = {"api_key": API_KEY, "application": "loadtest", "authorization": STAFF_TOKEN}
+
+    while time.monotonic() < until:
+        scenario = rand.choices(scenarios, weights)[0]
+
+        for method, route, path, extra_headers in scenario(rand, catalogue):
+            started = time.monotonic()
+
+            try:
+                response = session.request(
+                    method,
+                    f"{url}{path}",
+                    headers={**headers, **(extra_headers or {})},
+                    json={"customerName": "Load Test"} if method == "POST" else None,
+                )
+                failed = response.status_code >= 400
+            except requests.RequestException:
+                failed = True
+
+            if started >= measure_from:
+                samples[f"{method} {route}"].append(
+                    (time.monotonic() - started, failed)
+                )
+
+
+def percentile(values: List[float], rank: float) -> float:
+    """Gets a nearest-rank percentile
+
+    Args:
+        values (List[float]): Sorted values
+        rank (float): Percentile between 0 and 100
+
+    Returns:
+        float: Percentile value
+    """
+    index = max(0, min(len(values) - 1, round(rank / 100 * len(values) + 0.5) - 1))
+    return values[index]
+
+
+def summarize(samples: Dict[str, list], duration: float) -> dict:
+    """Summarizes the samples per route
+
+    Args:
+        samples (Dict[str, list]): Latencies and failures by route
+        duration (float): Measured seconds
+
+    Returns:
+        dict: Throughput, errors and latency percentiles in ms by route
+    """
+    routes = {}
+
+    for route, route_samples in sorted(samples.items()):
+        latencies = sorted(latency * 1000 for latency, _ in route_samples)
+        routes[route] = {
+            "requests": len(latencies),
+            "errors": sum(1 for _, failed in route_samples if failed),
+            "throughput": len(latencies) / duration,
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+        }
+
+    return routes
+
+
+def print_results(routes: dict, previous: dict) -> None:
+    """Prints the results per route
+
+    Args:
+        routes (dict): Results by route
+        previous (dict): Results by route of the compared run
+    """
+    print(f"{'route':62} {'req/s':>8} {'err':>5} {'p50':>8} {'p95':>8} {'p99':>8}")
+
+    for route, result in routes.items():
+        line = (
+            f"{route:62} {result['throughput']:8.1f} {result['errors']:5d} "
+            f"{result['p50']:8.1f} {result['p95']:8.1f} {result['p99']:8.1f}"
+        )
+
+        if route in previous:
+            before = previous[route]["p95"]
+            line += f"  p95 {(result['p95'] - before) / before:+.0%}" if before else ""
+
+        print(line)
+
+
+def get_revision() -> str:
+    """Gets the current git revision
+
+    Returns:
+        str: Revision or an empty string outside of a repository
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT_DIRECTORY, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def start_api(args: argparse.Namespace) -> tuple:
+    """Boots the API
+
+    Args:
+        args (argparse.Namespace): Command line arguments
+
+    Returns:
+        tuple: Base url, session factory and process to stop, if any
+    """
+    if args.server == "in-process":
+        from fastapi.testclient import TestClient
+        from app.main import app
+
+        return "", lambda: TestClient(app), None
+
+    port = get_free_port()
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(args.workers), "--log-level", "warning",
+        ],
+        cwd=ROOT_DIRECTORY,
+    )
+    url = f"http://127.0.0.1:{port}"
+    wait_for(url, process)
+    return url, requests.Session, process
+
+
+def main() -> None:
+    """Runs the load test"""
+    args = parse_args()
+    weights = parse_mix(args.mix)
+    os.makedirs(RESULTS_DIRECTORY, exist_ok=True)
+    sys.path.append(ROOT_DIRECTORY)
+    iam_port = get_free_port()
+    environment = {
+        "DB_CONNECTION_STRING": args.database,
+        "AUTH_API_BASE_URL": f"http://127.0.0.1:{iam_port}",
+        "IAM_API_KEY": "loadtest",
+        "APP_CLIENT_ID": "loadtest",
+        "APP_CLIENT_SECRET": "loadtest",
+        "AUTH_ALLOWED_API_KEYS": API_KEY,
+        "AUTH_ALLOWED_IP_ADDRESSES": "127.0.0.1,testclient",
+        "LOG_LEVEL": "WARNING",
+    }
+    # The application reads its settings when first imported
+    os.environ.update(environment)
+
+    if not args.skip_seed:
+        seed(args)
+
+    catalogue = get_catalogue(args.database)
+    iam = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.iam_stub", "--port", str(iam_port)],
+        cwd=ROOT_DIRECTORY,
+    )
+    api = None
+    started_at = datetime.now()
+
+    try:
+        url, new_session, api = start_api(args)
+        samples = defaultdict(list)
+        now = time.monotonic()
+        schedule = (now + args.warmup, now + args.warmup + args.duration)
+        clients = [
+            threading.Thread(
+                target=run_client,
+                args=(
+                    new_session(), url, [SCENARIOS[name] for name in weights],
+                    list(weights.values()), catalogue, schedule,
+                    random.Random(args.seed + index), samples,
+                ),
+            )
+            for index in range(args.concurrency)
+        ]
+
+        for client in clients:
+            client.start()
+
+        for client in clients:
+            client.join()
+    finally:
+        for process in (api, iam):
+            if process is not None:
+                process.terminate()
+                process.wait()
+
+    routes = summarize(samples, args.duration)
+    previous = {}
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as previous_file:
+            previous = json.load(previous_file)["routes"]
+
+    print_results(routes, previous)
+    output = args.output or os.path.join(
+        RESULTS_DIRECTORY, f"loadtest-{started_at:%Y%m%d-%H%M%S}.json"
+    )
+
+    with open(output, "w", encoding="utf-8") as output_file:
+        json.dump(
+            {
+                "revision": get_revision(),
+                "started": started_at.isoformat(),
+                "config": {
+                    name: value
+                    for name, value in vars(args).items()
+                    if name not in ("output", "compare")
+                },
+                "totals": {
+                    "requests": sum(r["requests"] for r in routes.values()),
+                    "errors": sum(r["errors"] for r in routes.values()),
+                    "throughput": sum(r["throughput"] for r in routes.values()),
+                },
+                "routes": routes,
+            },
+            output_file,
+            indent=2,
+        )
+
+    print(f"results saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""CPU and allocation benchmark of the request-scoped mapping memo
+
+Maps pages of in-memory service turns and appointments, sharing the
+statuses, priorities, locations, categories and services a real page
+shares, with and without a mapping scope, and reports the time and the
+memory allocated per page.
+
+Usage:
+    python -m benchmarks.mapping_memo --page-size 100 --repeat 200
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+# pylint: disable=C0413
+# pylint: disable=C0415
+# pylint: disable=R0914
+
+
+def parse_args() -> argparse.Namespace:
+    """Parses the command line arguments
+
+    Returns:
+        argparse.Namespace: The parsed arguments
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    return parser.parse_args()
+
+
+def build_pages(models, enums, page_size: int) -> dict:
+    """Builds transient database items as a paginated query returns them
+
+    Args:
+        models (module): Database models module
+        enums (module): Enums module
+        page_size (int): Items per page
+
+    Returns:
+        dict: Service turns and appointments pages
+    """
+    rand = random.Random(1)
+    now = datetime(2024, 1, 1)
+    statuses = {
+        status_type: [
+            models.Status(
+                id=index * 10 + position, name=f"Status {position}",
+                code=f"STATUS_{position}", description="Status",
+                type=status_type, is_active=True,
+            )
+            for position in range(3)
+        ]
+        for index, status_type in enumerate(enums.StatusType)
+    }
+    priorities = [
+        models.Priority(
+            id=index, name=f"Priority {index}", code=f"PRIORITY_{index}",
+            weight=index, description="Priority", is_active=True,
+        )
+        for index in range(3)
+    ]
+    locations = [
+        models.Location(
+            id=index, name=f"Location {index}", code=f"LOCATION_{index}",
+            address="Address", description="Location", is_active=True,
+        )
+        for index in range(2)
+    ]
+    categories = [
+        models.Category(
+            id=index, name=f"Category {index}", code=f"CATEGORY_{index}",
+            description="Category", icon_url="app://web", is_active=True,
+            status=statuses[enums.StatusType.CATEGORY][0],
+        )
+        for index in range(6)
+    ]
+    services = [
+        models.Service(
+            id=index, name=f"Service {index}", code=f"SERVICE_{index}",
+            prefix=f"S{index}", description="Service", icon_url="app://web",
+            is_active=True, status=statuses[enums.StatusType.SERVICE][0],
+            category=categories[index % len(categories)],
+        )
+        for index in range(24)
+    ]
+    customers = [
+        models.Customer(
+            id=index, first_name="John", last_name="Doe",
+            email=f"john{index}@doe.com", gender="M", year_of_birth=1983,
+            created=now, last_modified=now,
+            status=statuses[enums.StatusType.CUSTOMER][0],
+        )
+        for index in range(page_size)
+    ]
+    appointments = [
+        models.Appointment(
+            id=index, created=now, last_modified=now,
+            service_ending_expected=now,
+            status=rand.choice(statuses[enums.StatusType.APPOINTMENT]),
+            service=rand.choice(services), customer=customers[index],
+            location=rand.choice(locations),
+        )
+        for index in range(page_size)
+    ]
+    turns = [
+        models.ServiceTurn(
+            id=index, ticket_number=f"T-{index}", customer_name="John Doe",
+            created=now, last_modified=now,
+            status=rand.choice(statuses[enums.StatusType.TURN]),
+            priority=rand.choice(priorities), service=rand.choice(services),
+            appointment=appointments[index] if index % 4 == 0 else None,
+            customer=customers[index] if index % 2 == 0 else None,
+        )
+        for index in range(page_size)
+    ]
+    return {"serviceturns": turns, "appointments": appointments}
+
+
+def measure(mappers, items: list, mapper, memoized: bool, repeat: int) -> tuple:
+    """Measures the mapping of a page
+
+    Args:
+        mappers (module): Mappers module
+        items (list): Page items
+        mapper (Callable): Item mapper
+        memoized (bool): Whether to map within a mapping scope
+        repeat (int): Number of times the page is mapped
+
+    Returns:
+        tuple: Milliseconds per page and KiB allocated per page
+    """
+
+    def map_page():
+        if memoized:
+            with mappers.mapping_scope():
+                return [mapper(item) for item in items]
+
+        return [mapper(item) for item in items]
+
+    started = time.process_time()
+
+    for _ in range(repeat):
+        map_page()
+
+    elapsed = (time.process_time() - started) / repeat
+    tracemalloc.start()
+    page = map_page()
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del page
+    return elapsed * 1000, allocated / 1024
+
+
+def main() -> None:
+    """Runs the benchmark"""
+    args = parse_args()
+    os.environ.setdefault("DB_CONNECTION_STRING", "sqlite://")
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    from app import enums, mappers
+    from app.database import models
+
+    pages = build_pages(models, enums, args.page_size)
+    page_mappers = {
+        "serviceturns": mappers.map_service_turn,
+        "appointments": mappers.map_appointment,
+    }
+
+    print(f"page_size={args.page_size} repeat={args.repeat}")
+
+    for name, items in pages.items():
+        plain_ms, plain_kib = measure(
+            mappers, items, page_mappers[name], False, args.repeat
+        )
+        memo_ms, memo_kib = measure(
+            mappers, items, page_mappers[name], True, args.repeat
+        )
+        print(
+            f"{name}: cpu {plain_ms:.2f} -> {memo_ms:.2f} ms/page "
+            f"({1 - memo_ms / plain_ms:.0%} less), "
+            f"retained {plain_kib:.0f} -> {memo_kib:.0f} KiB/page "
+            f"({1 - memo_kib / plain_kib:.0%} less)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""Benchmark of the daily rollups
+
+Generates years of synthetic turns and appointments in a SQLite database,
+then times a full rollup, an incremental one after touching the latest turns and
+a monthly report grouped by service read from the rollups (``rollups``
+mode) against aggregating the raw turns of the same range (``raw`` mode).
+
+Usage:
+    python -m benchmarks.rollups --turns 2000000 --years 3
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+# pylint: disable=C0415
+# pylint: disable=R0914
+
+TOUCHED_TURNS = 1000
+
+
+def create_parser(description: str, database: str) -> argparse.ArgumentParser:
+    """Creates the parser of the volumes generated and the database file,
+    shared by the benchmarks over generated turns
+
+    Args:
+        description (str): Description of the benchmark
+        database (str): Name of the default database file, in the temporary directory
+
+    Returns:
+        argparse.ArgumentParser: The parser
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--turns", type=int, default=2000000)
+    parser.add_argument("--appointments", type=int, default=200000)
+    parser.add_argument("--services", type=int, default=50)
+    parser.add_argument("--years", type=float, default=3)
+    parser.add_argument("--database", default=os.path.join(tempfile.gettempdir(), database))
+    return parser
+
+
+def parse_args() -> argparse.Namespace:
+    """Parses the command line arguments
+
+    Returns:
+        argparse.Namespace: The parsed arguments
+    """
+    parser = create_parser(__doc__.splitlines()[0], "qms_rollups_benchmark.db")
+    parser.add_argument("--skip-generate", action="store_true")
+    return parser.parse_args()
+
+
+def generate(args: argparse.Namespace) -> None:
+    """Seeds the reference data and generates the turns and appointments
+
+    Args:
+        args (argparse.Namespace): Command line arguments
+    """
+    from app.database import generator, main as database, seed, setup
+
+    database.create_schema()
+    seed.run_bulk(truncate_first=True)
+    volumes = generator.Volumes(
+        locations=20,
+        categories=10,
+        services=args.services,
+        customers=10000,
+        appointments=args.appointments,
+        service_turns=args.turns,
+        years=args.years,
+    )
+    generator.insert_rows(setup.get_engine(), generator.DataGenerator(volumes, 1))
+
+
+def timed(label: str, function, *args):
+    """Runs a function printing how long it took
+
+    Args:
+        label (str): Printed label
+        function (Callable): Function to run
+        *args: Function arguments
+
+    Returns:
+        Any: Result of the function
+    """
+    started = time.perf_counter()
+    result = function(*args)
+    print(f"{label}: {(time.perf_counter() - started) * 1000:.1f} ms")
+    return result
+
+
+def report_raw(session, start: date, end: date) -> dict:
+    """Aggregates the raw turns created in a date range
+
+    Args:
+        session (Session): Database session
+        start (date): Inclusive start
+        end (date): Exclusive end
+
+    Returns:
+        dict: Statistics by location, service, priority and status
+    """
+    from app import rollups
+    from app.database import models
+
+    return rollups.aggregate(
+        session.execute(
+            rollups.select_turn_facts()
+            .where(models.ServiceTurn.created >= start)
+            .where(models.ServiceTurn.created < end)
+        )
+    )
+
+
+def main() -> None:
+    """Runs the benchmark"""
+    args = parse_args()
+    os.environ["DB_CONNECTION_STRING"] = f"sqlite:///{args.database}"
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    from sqlalchemy import func, select, update
+    from app import rollups
+    from app.database import main as database, models
+    from app.enums import ReportDimension, ReportPeriod, StatusType
+
+    if not args.skip_generate:
+        generate(args)
+
+    session = next(database.get_session())
+    timed("full rollup", rollups.run, session, True)
+    modified = max(
+        datetime.now(), session.scalar(select(func.max(models.ServiceTurn.last_modified)))
+    ) + timedelta(seconds=1)
+    touched = session.scalars(
+        select(models.ServiceTurn.id)
+        .order_by(models.ServiceTurn.created.desc())
+        .limit(TOUCHED_TURNS)
+    ).all()
+    session.execute(
+        update(models.ServiceTurn)
+        .where(models.ServiceTurn.id.in_(touched))
+        .values(last_modified=modified)
+    )
+    session.commit()
+    timed(f"incremental rollup after touching {len(touched)} turns", rollups.run, session)
+
+    last_day = session.scalar(select(func.max(models.ServiceTurn.created)))
+    end = date(last_day.year, last_day.month, 1)
+    start = date(end.year - 1 if end.month == 1 else end.year, (end.month - 2) % 12 + 1, 1)
+    query = rollups.ReportQuery(
+        StatusType.TURN, start, end, ReportPeriod.MONTH, [ReportDimension.SERVICE], {}
+    )
+    rows = timed("monthly report from the rollups", rollups.get_report, session, query)
+    raw = timed("same report from the raw turns", report_raw, session, start, end)
+    print(f"groups={len(rows)} raw_groups={len(raw)} turns={sum(row.stats.count for row in rows)}")
+    start = date(end.year - 1, end.month, 1)
+    rows = timed(
+        "yearly report by month from the rollups",
+        rollups.get_report,
+        session,
+        query._replace(start=start),
+    )
+    raw = timed("same report from the raw turns", report_raw, session, start, end)
+    print(f"groups={len(rows)} raw_groups={len(raw)} turns={sum(row.stats.count for row in rows)}")
+    session.close()
+
+
+if __name__ == "__main__":
+    main()
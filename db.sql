@@ -58,6 +58,7 @@ CREATE TABLE services (
     `is_active` tinyint(1) NOT NULL DEFAULT '1',
     `status_id` INTEGER NOT NULL,
     `category_id` INTEGER NOT NULL,
+    `archived_turns` INTEGER NOT NULL DEFAULT '0',
     PRIMARY KEY (`id`),
     FOREIGN KEY(`status_id`) REFERENCES `statuses` (`id`),
     FOREIGN KEY(`category_id`) REFERENCES `categories` (`id`),
@@ -99,7 +100,9 @@ CREATE TABLE appointments (
     PRIMARY KEY (`id`),
     FOREIGN KEY(`status_id`) REFERENCES `statuses` (`id`),
     FOREIGN KEY(`service_id`) REFERENCES `services` (`id`),
-    FOREIGN KEY(`customer_id`) REFERENCES `customers` (`id`)
+    FOREIGN KEY(`customer_id`) REFERENCES `customers` (`id`),
+    INDEX `appointment_last_modified` (`last_modified`),
+    INDEX `appointment_service_slot` (`service_id`, `service_ending_expected`)
 );
 
 
@@ -125,7 +128,37 @@ CREATE TABLE service_turns (
     FOREIGN KEY(`priority_id`) REFERENCES `priorities` (`id`),
     FOREIGN KEY(`appointment_id`) REFERENCES `appointments` (`id`),
     FOREIGN KEY(`customer_id`) REFERENCES `customers` (`id`),
-    CONSTRAINT `turn_ticket_number_unique` UNIQUE (`ticket_number`)
+    CONSTRAINT `turn_ticket_number_unique` UNIQUE (`ticket_number`),
+    INDEX `turn_created` (`created`),
+    INDEX `turn_last_modified` (`last_modified`),
+    INDEX `turn_appointment` (`appointment_id`)
+);
+
+CREATE TABLE service_turns_archive (
+    `id` INTEGER NOT NULL,
+    `ticket_number` VARCHAR(30) NOT NULL,
+    `customer_name` varchar(50),
+    `created_by` varchar(50),
+    `last_modified_by` varchar(50),
+    `service_ending_expected` datetime,
+    `service_started` datetime,
+    `service_ended` datetime,
+    `created` datetime NOT NULL,
+    `last_modified` datetime NOT NULL,
+    `status_id` INTEGER NOT NULL,
+    `service_id` INTEGER NOT NULL,
+    `priority_id` INTEGER NOT NULL,
+    `customer_id` INTEGER,
+    `appointment_id` INTEGER,
+    PRIMARY KEY (`id`),
+    FOREIGN KEY(`status_id`) REFERENCES `statuses` (`id`),
+    FOREIGN KEY(`service_id`) REFERENCES `services` (`id`),
+    FOREIGN KEY(`priority_id`) REFERENCES `priorities` (`id`),
+    FOREIGN KEY(`appointment_id`) REFERENCES `appointments` (`id`),
+    FOREIGN KEY(`customer_id`) REFERENCES `customers` (`id`),
+    INDEX `archived_turn_created` (`created`),
+    INDEX `archived_turn_customer` (`customer_id`),
+    INDEX `archived_turn_appointment` (`appointment_id`)
 );
 
 
@@ -143,3 +176,68 @@ CREATE TABLE queues (
     CONSTRAINT `queue_name_unique` UNIQUE (`name`),
     CONSTRAINT `queue_code_unique` UNIQUE (`code`)
 );
+
+
+CREATE TABLE daily_stats (
+    `id` INTEGER NOT NULL AUTO_INCREMENT,
+    `type` ENUM('TURN','APPOINTMENT') NOT NULL,
+    `day` date NOT NULL,
+    `location_id` INTEGER,
+    `service_id` INTEGER,
+    `priority_id` INTEGER,
+    `status_id` INTEGER,
+    `count` INTEGER NOT NULL,
+    `wait_count` INTEGER NOT NULL,
+    `wait_seconds` INTEGER NOT NULL,
+    `wait_histogram` varchar(500) NOT NULL,
+    `service_count` INTEGER NOT NULL,
+    `service_seconds` INTEGER NOT NULL,
+    `service_histogram` varchar(500) NOT NULL,
+    `updated` datetime NOT NULL,
+    PRIMARY KEY (`id`),
+    FOREIGN KEY(`location_id`) REFERENCES `locations` (`id`),
+    FOREIGN KEY(`service_id`) REFERENCES `services` (`id`),
+    FOREIGN KEY(`priority_id`) REFERENCES `priorities` (`id`),
+    FOREIGN KEY(`status_id`) REFERENCES `statuses` (`id`),
+    INDEX `daily_stat_type_day` (`type`, `day`)
+);
+
+
+CREATE TABLE rollup_watermarks (
+    `type` ENUM('TURN','APPOINTMENT') NOT NULL,
+    `last_modified` datetime,
+    `frozen_before` date,
+    PRIMARY KEY (`type`)
+);
+
+
+CREATE TABLE rollup_changes (
+    `id` INTEGER NOT NULL AUTO_INCREMENT,
+    `type` ENUM('TURN','APPOINTMENT') NOT NULL,
+    `day` date NOT NULL,
+    PRIMARY KEY (`id`)
+);
+
+
+-- Migration: status of the turns being attended, which calling the next turn
+-- of a service moves them to, for the databases seeded before it.
+INSERT IGNORE INTO statuses (`name`, `code`, `description`, `type`, `is_active`)
+VALUES ('En atención', 'BEING_ATTENDED', 'El turno está siendo atendido.', 'TURN', 1);
+
+-- Migration: turns of each service moved to the archive, which the ticket
+-- numbers go on from, for the databases created before it.
+ALTER TABLE services ADD COLUMN `archived_turns` INTEGER NOT NULL DEFAULT '0';
+
+-- Migration: index of the booked slots of a service, which writing an
+-- appointment checks for overlaps, for the databases created before it.
+CREATE INDEX `appointment_service_slot` ON appointments (`service_id`, `service_ending_expected`);
+
+-- Migration: indexes of the creation and modification moments the rollups
+-- look the changed days up by, for the databases created before them.
+CREATE INDEX `appointment_last_modified` ON appointments (`last_modified`);
+CREATE INDEX `turn_created` ON service_turns (`created`);
+CREATE INDEX `turn_last_modified` ON service_turns (`last_modified`);
+
+-- Migration: index of the appointments of the turns, which moving the
+-- appointments to cold storage checks, for the databases created before it.
+CREATE INDEX `turn_appointment` ON service_turns (`appointment_id`);